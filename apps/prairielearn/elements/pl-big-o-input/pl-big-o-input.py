@@ -10,6 +10,8 @@ import prairielearn as pl
 import prairielearn.sympy_utils as psu
 import sympy
 
+PARSED_ELEMENT = True
+
 
 class BigOType(Enum):
     BIG_O = r"O"
@@ -87,8 +89,7 @@ def _get_variables_with_fallback(
     return []
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     required_attribs = ["answers-name"]
     optional_attribs = [
         "weight",
@@ -153,8 +154,7 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
         )
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
-    element = lxml.html.fragment_fromstring(element_html)
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     name = pl.get_string_attrib(element, "answers-name")
     aria_label = pl.get_string_attrib(element, "aria-label", ARIA_LABEL_DEFAULT)
     variables = _get_variables_with_fallback(element, data)
@@ -184,8 +184,7 @@ def render(element_html: str, data: pl.QuestionData) -> str:
         "constants": constants,
     }
 
-    with open(BIG_O_INPUT_MUSTACHE_TEMPLATE_NAME, encoding="utf-8") as f:
-        template = f.read()
+    template = pl.load_template(BIG_O_INPUT_MUSTACHE_TEMPLATE_NAME)
 
     info = chevron.render(template, info_params).strip()
 
@@ -294,8 +293,7 @@ def render(element_html: str, data: pl.QuestionData) -> str:
     assert_never(data["panel"])
 
 
-def parse(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def parse(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
     variables = _get_variables_with_fallback(element, data)
 
@@ -325,8 +323,7 @@ def parse(element_html: str, data: pl.QuestionData) -> None:
         data["submitted_answers"][name] = a_sub
 
 
-def grade(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def grade(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
     variables = _get_variables_with_fallback(element, data)
 
@@ -359,8 +356,7 @@ def grade(element_html: str, data: pl.QuestionData) -> None:
             raise
 
 
-def test(element_html: str, data: pl.ElementTestData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def test(element: lxml.html.HtmlElement, data: pl.ElementTestData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
     weight = pl.get_integer_attrib(element, "weight", WEIGHT_DEFAULT)
     result = data["test_type"]
@@ -1,9 +1,10 @@
 from typing import Any
 
-import chevron
 import lxml.html
 import prairielearn as pl
 
+PARSED_ELEMENT = True
+
 HEADER_DEFAULT = ""
 TITLE_DEFAULT = ""
 SUBTITLE_DEFAULT = ""
@@ -15,8 +16,7 @@ IMG_BOTTOM_ALT_DEFAULT = ""
 WIDTH_DEFAULT = "auto"
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     required_attribs = []
     optional_attribs = [
         "header",
@@ -32,8 +32,7 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
     pl.check_attribs(element, required_attribs, optional_attribs)
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
-    element = lxml.html.fragment_fromstring(element_html)
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
 
     header = pl.get_string_attrib(element, "header", HEADER_DEFAULT)
     title = pl.get_string_attrib(element, "title", TITLE_DEFAULT)
@@ -72,5 +71,4 @@ def render(element_html: str, data: pl.QuestionData) -> str:
             "title": title  # https://github.com/noahmorrison/chevron/issues/117
         }
 
-    with open("pl-card.mustache", encoding="utf-8") as f:
-        return chevron.render(f, html_params).strip()
+    return pl.render_template("pl-card.mustache", html_params).strip()
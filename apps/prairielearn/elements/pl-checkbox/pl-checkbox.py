@@ -5,10 +5,11 @@ from enum import Enum
 from itertools import count
 from typing import Any, NamedTuple, assert_never, cast
 
-import chevron
 import lxml.html
 import prairielearn as pl
 
+PARSED_ELEMENT = True
+
 
 class PartialCreditType(Enum):
     OFF = "off"
@@ -99,8 +100,9 @@ def generate_grading_text(
         "allow_blank": allow_blank,
     }
 
-    with open(CHECKBOX_MUSTACHE_TEMPLATE_NAME, encoding="utf-8") as f:
-        return chevron.render(f, grading_text_params).strip()
+    return pl.render_template(
+        CHECKBOX_MUSTACHE_TEMPLATE_NAME, grading_text_params
+    ).strip()
 
 
 def generate_options_range_text(
@@ -394,8 +396,7 @@ def categorize_options(
     return correct_answers, incorrect_answers
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     pl.validate_element_tree(
         element, SCHEMA_MANIFEST_PATH, allow_legacy_underscore_tags=True
     )
@@ -492,8 +493,7 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
     data["correct_answers"][name] = correct_answer_list
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
-    element = lxml.html.fragment_fromstring(element_html)
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     name = pl.get_string_attrib(element, "answers-name")
 
     partial_credit_mode = get_partial_credit_mode(element)
@@ -623,8 +623,7 @@ def render(element_html: str, data: pl.QuestionData) -> str:
             score_type, score_value = pl.determine_score_params(score)
             html_params[score_type] = score_value
 
-        with open(CHECKBOX_MUSTACHE_TEMPLATE_NAME, encoding="utf-8") as f:
-            return chevron.render(f, html_params).strip()
+        return pl.render_template(CHECKBOX_MUSTACHE_TEMPLATE_NAME, html_params).strip()
 
     elif data["panel"] == "submission":
         blank_submission = False
@@ -682,8 +681,9 @@ def render(element_html: str, data: pl.QuestionData) -> str:
                 score_type, score_value = pl.determine_score_params(score)
                 html_params[score_type] = score_value
 
-            with open(CHECKBOX_MUSTACHE_TEMPLATE_NAME, encoding="utf-8") as f:
-                return chevron.render(f, html_params).strip()
+            return pl.render_template(
+                CHECKBOX_MUSTACHE_TEMPLATE_NAME, html_params
+            ).strip()
         else:
             html_params = {
                 "submission": True,
@@ -691,8 +691,9 @@ def render(element_html: str, data: pl.QuestionData) -> str:
                 "parse_error": parse_error,
                 "inline": inline,
             }
-            with open(CHECKBOX_MUSTACHE_TEMPLATE_NAME, encoding="utf-8") as f:
-                return chevron.render(f, html_params).strip()
+            return pl.render_template(
+                CHECKBOX_MUSTACHE_TEMPLATE_NAME, html_params
+            ).strip()
 
     elif data["panel"] == "answer":
         if pl.get_boolean_attrib(
@@ -710,15 +711,13 @@ def render(element_html: str, data: pl.QuestionData) -> str:
                 element, "hide-letter-keys", HIDE_LETTER_KEYS_DEFAULT
             ),
         }
-        with open(CHECKBOX_MUSTACHE_TEMPLATE_NAME, encoding="utf-8") as f:
-            return chevron.render(f, html_params).strip()
+        return pl.render_template(CHECKBOX_MUSTACHE_TEMPLATE_NAME, html_params).strip()
 
     else:
         assert_never(data["panel"])
 
 
-def parse(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def parse(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
 
     allow_blank = pl.get_boolean_attrib(element, "allow-blank", ALLOW_BLANK_DEFAULT)
@@ -758,8 +757,7 @@ def parse(element_html: str, data: pl.QuestionData) -> None:
         )
 
 
-def grade(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def grade(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
     weight = pl.get_integer_attrib(element, "weight", WEIGHT_DEFAULT)
     partial_credit_mode = get_partial_credit_mode(element)
@@ -809,8 +807,7 @@ def grade(element_html: str, data: pl.QuestionData) -> None:
     }
 
 
-def test(element_html: str, data: pl.ElementTestData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def test(element: lxml.html.HtmlElement, data: pl.ElementTestData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
     weight = pl.get_integer_attrib(element, "weight", WEIGHT_DEFAULT)
     partial_credit_mode = get_partial_credit_mode(element)
@@ -385,7 +385,7 @@ def test_grading_with_old_api(case: GradingTestCase) -> None:
     element_html = f"<pl-checkbox {attrs}></pl-checkbox>"
     data = create_test_data(case.submitted, case.correct, case.all_params)
 
-    pl_checkbox.grade(element_html, data)
+    pl_checkbox.grade(lxml.html.fragment_fromstring(element_html), data)
 
     actual_score = data["partial_scores"]["test"]["score"]
     if isinstance(case.expected_score, float) and case.expected_score not in [0.0, 1.0]:
@@ -731,7 +731,7 @@ def test_grade_with_duplicate_submissions() -> None:
 
     element_html = '<pl-checkbox answers-name="test"></pl-checkbox>'
 
-    pl_checkbox.grade(element_html, data)
+    pl_checkbox.grade(lxml.html.fragment_fromstring(element_html), data)
 
     # With duplicates, set(['a', 'b', 'b', 'c']) == set(['a', 'b', 'c'])
     # So it should be treated as selecting a, b, c (all correct)
@@ -751,7 +751,7 @@ def test_grade_with_duplicate_submissions_partial_credit() -> None:
         '<pl-checkbox answers-name="test" partial-credit="net-correct"></pl-checkbox>'
     )
 
-    pl_checkbox.grade(element_html, data)
+    pl_checkbox.grade(lxml.html.fragment_fromstring(element_html), data)
 
     # set(['a', 'a', 'b']) == set(['a', 'b'])
     # t = 2 (correct answers selected: a, b)
@@ -780,7 +780,7 @@ def test_grade_with_duplicate_correct_answers() -> None:
 
     element_html = '<pl-checkbox answers-name="test"></pl-checkbox>'
 
-    pl_checkbox.grade(element_html, data)
+    pl_checkbox.grade(lxml.html.fragment_fromstring(element_html), data)
 
     # Even with duplicate 'b' in correct_answers, set() should handle it
     # Submitted: {a, b}, Correct: {a, b} (after set conversion)
@@ -799,7 +799,7 @@ def test_grade_coverage_with_duplicates() -> None:
         '<pl-checkbox answers-name="test" partial-credit="coverage"></pl-checkbox>'
     )
 
-    pl_checkbox.grade(element_html, data)
+    pl_checkbox.grade(lxml.html.fragment_fromstring(element_html), data)
 
     # set(['a', 'b', 'b', 'd']) == set(['a', 'b', 'd'])
     # t = 2 (correct answers in submitted: a, b)
@@ -844,7 +844,7 @@ def test_max_correct_respected_without_number_answers() -> None:
         data["correct_answers"] = {}
         data["answers_names"] = {}
 
-        pl_checkbox.prepare(element_html, data)
+        pl_checkbox.prepare(lxml.html.fragment_fromstring(element_html), data)
 
         # Count how many correct answers were selected
         correct_answer_list = data["correct_answers"]["ans"]
@@ -870,7 +870,9 @@ def test_prepare_rejects_unsupported_child_tags() -> None:
     """
 
     with pytest.raises(ValueError, match="Unexpected child p"):
-        pl_checkbox.prepare(element_html, create_prepare_data())
+        pl_checkbox.prepare(
+            lxml.html.fragment_fromstring(element_html), create_prepare_data()
+        )
 
 
 def test_prepare_allows_legacy_underscore_answer_tags() -> None:
@@ -882,7 +884,7 @@ def test_prepare_allows_legacy_underscore_answer_tags() -> None:
     """
     data = create_prepare_data()
 
-    pl_checkbox.prepare(element_html, data)
+    pl_checkbox.prepare(lxml.html.fragment_fromstring(element_html), data)
 
     assert data["correct_answers"]["ans"] == [
         {"key": "a", "html": "Correct", "feedback": None}
@@ -5,7 +5,6 @@ from html import escape, unescape
 from textwrap import dedent
 from typing import Any
 
-import chevron
 import lxml.html
 import prairielearn as pl
 import pygments
@@ -18,6 +17,8 @@ from pygments.styles import STYLE_MAP, get_style_by_name
 from pygments.token import Token, _TokenType
 from pygments_ansi_color import color_tokens
 
+PARSED_ELEMENT = True
+
 LANGUAGE_DEFAULT = None
 # `xcode` is used as the default because it is the light Pygments style whose
 # every token color meets AA contrast (4.5:1) against its background.
@@ -193,8 +194,7 @@ def get_formatter(
     )
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     required_attribs = []
     optional_attribs = [
         "language",
@@ -255,8 +255,7 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
         raise ValueError("Could not parse highlight-lines attribute; check your syntax")
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
-    element = lxml.html.fragment_fromstring(element_html)
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     language = pl.get_string_attrib(element, "language", LANGUAGE_DEFAULT)
     style_name = pl.get_string_attrib(
         element,
@@ -364,5 +363,4 @@ def render(element_html: str, data: pl.QuestionData) -> str:
         ),
     }
 
-    with open("pl-code.mustache", encoding="utf-8") as f:
-        return chevron.render(f, html_params).strip()
+    return pl.render_template("pl-code.mustache", html_params).strip()
@@ -12,6 +12,8 @@ import lxml.etree
 import lxml.html
 import prairielearn as pl
 
+PARSED_ELEMENT = True
+
 WEIGHT_DEFAULT = 1
 ALLOW_BLANK_DEFAULT = False
 SHOW_SCORE_DEFAULT = False
@@ -77,8 +79,7 @@ def check_attributes_rec(element: lxml.html.HtmlElement) -> None:
         check_attributes_rec(child)
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     check_attributes_rec(element)
 
     w_button = None
@@ -261,8 +262,7 @@ def render_drawing_items(elem, curid=0, defaults=None):
     return (objects, curid)
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
-    element = lxml.html.fragment_fromstring(element_html)
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     name = pl.get_string_attrib(element, "answers-name", "")
     aria_label = pl.get_string_attrib(
         element, "aria-label", defaults.element_defaults["aria-label"]
@@ -273,8 +273,7 @@ def render(element_html: str, data: pl.QuestionData) -> str:
     preview_mode = not pl.get_boolean_attrib(
         element, "gradable", defaults.element_defaults["gradable"]
     )
-    with open("pl-drawing.mustache") as f:
-        template = f.read()
+    template = pl.load_template("pl-drawing.mustache")
 
     btn_markup = ""
     init = []
@@ -408,8 +407,7 @@ def render(element_html: str, data: pl.QuestionData) -> str:
     return chevron.render(template, html_params).strip()
 
 
-def parse(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def parse(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     name = pl.get_string_attrib(
         element, "answers-name", defaults.element_defaults["answers-name"]
     )
@@ -450,8 +448,7 @@ def parse(element_html: str, data: pl.QuestionData) -> None:
         data["format_errors"][name] = defaults.no_submission_error
 
 
-def grade(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def grade(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     prev = not pl.get_boolean_attrib(
         element, "gradable", defaults.element_defaults["gradable"]
     )
@@ -509,12 +506,12 @@ def grade(element_html: str, data: pl.QuestionData) -> None:
             num_total_ref += 1
 
     # Loop through and check everything
-    for element in student:
+    for student_element in student:
         if (
-            "gradingName" not in element
-            or not elements.is_gradable(element["gradingName"])
-            or "graded" not in element
-            or not element["graded"]
+            "gradingName" not in student_element
+            or not elements.is_gradable(student_element["gradingName"])
+            or "graded" not in student_element
+            or not student_element["graded"]
         ):
             continue
         # total number of objects inserted by students (using buttons)
@@ -525,7 +522,7 @@ def grade(element_html: str, data: pl.QuestionData) -> None:
             if (
                 not elements.is_gradable(ref_element["gradingName"])
                 or not ref_element["graded"]
-                or element["gradingName"] != ref_element["gradingName"]
+                or student_element["gradingName"] != ref_element["gradingName"]
             ):
                 # Skip if the reference element is not gradable
                 continue
@@ -535,7 +532,11 @@ def grade(element_html: str, data: pl.QuestionData) -> None:
                 continue
 
             if elements.grade(
-                ref_element, element, element["gradingName"], tol, angtol
+                ref_element,
+                student_element,
+                student_element["gradingName"],
+                tol,
+                angtol,
             ):
                 if (ref_element.get("optional_grading")) or (
                     disregard_extra_elements and matches[ref_element["id"]]
@@ -588,8 +589,7 @@ def grade(element_html: str, data: pl.QuestionData) -> None:
     }
 
 
-def test(element_html: str, data: pl.ElementTestData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def test(element: lxml.html.HtmlElement, data: pl.ElementTestData) -> None:
     gradable = pl.get_boolean_attrib(
         element, "gradable", defaults.element_defaults["gradable"]
     )
@@ -644,10 +644,10 @@ def test(element_html: str, data: pl.ElementTestData) -> None:
             element, "angle-tol", defaults.element_defaults["angle-tol"]
         )
         data["raw_submitted_answers"][name] = copy.deepcopy(a_tru)
-        for i, element in enumerate(a_tru):
+        for i, drawing_element in enumerate(a_tru):
             if (
-                not elements.is_gradable(element["gradingName"])
-                or not element["graded"]
+                not elements.is_gradable(drawing_element["gradingName"])
+                or not drawing_element["graded"]
             ):
                 continue
 
@@ -685,7 +685,7 @@ def test(element_html: str, data: pl.ElementTestData) -> None:
 
             if not mutated:
                 raise RuntimeError(
-                    f"Don't know how to mutate the element {element['type']}"
+                    f"Don't know how to mutate the element {drawing_element['type']}"
                 )
         data["raw_submitted_answers"][name] = json.dumps(
             data["raw_submitted_answers"][name]
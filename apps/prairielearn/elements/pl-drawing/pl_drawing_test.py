@@ -1,7 +1,10 @@
+import html
 import importlib
 import json
 import math
 
+import lxml.html
+
 pl_drawing = importlib.import_module("pl-drawing")
 
 
@@ -46,7 +49,7 @@ def test_parse_blank_submission_without_allow_blank_sets_error() -> None:
     element_html = build_element_html(allow_blank=False)
     data = make_question_data(submitted_answers={"test": "[]"})
 
-    pl_drawing.parse(element_html, data)
+    pl_drawing.parse(lxml.html.fragment_fromstring(element_html), data)
 
     assert "test" in data["format_errors"]
     assert data["submitted_answers"]["test"] is None
@@ -56,7 +59,7 @@ def test_parse_malformed_json_with_allow_blank_sets_error() -> None:
     element_html = build_element_html(allow_blank=True)
     data = make_question_data(submitted_answers={"test": "not json"})
 
-    pl_drawing.parse(element_html, data)
+    pl_drawing.parse(lxml.html.fragment_fromstring(element_html), data)
 
     assert "test" in data["format_errors"]
     assert data["submitted_answers"]["test"] is None
@@ -66,7 +69,7 @@ def test_parse_blank_submission_with_allow_blank_no_error() -> None:
     element_html = build_element_html(allow_blank=True)
     data = make_question_data(submitted_answers={"test": "[]"})
 
-    pl_drawing.parse(element_html, data)
+    pl_drawing.parse(lxml.html.fragment_fromstring(element_html), data)
 
     assert "test" not in data["format_errors"]
 
@@ -75,7 +78,7 @@ def test_parse_none_submission_with_allow_blank_no_error() -> None:
     element_html = build_element_html(allow_blank=True)
     data = make_question_data(submitted_answers={})
 
-    pl_drawing.parse(element_html, data)
+    pl_drawing.parse(lxml.html.fragment_fromstring(element_html), data)
 
     assert "test" not in data["format_errors"]
 
@@ -85,7 +88,7 @@ def test_parse_valid_submission_works_with_allow_blank() -> None:
     valid_answer = [{"id": 1, "type": "pl-point", "x1": 100, "y1": 100}]
     data = make_question_data(submitted_answers={"test": json.dumps(valid_answer)})
 
-    pl_drawing.parse(element_html, data)
+    pl_drawing.parse(lxml.html.fragment_fromstring(element_html), data)
 
     assert "test" not in data["format_errors"]
     assert data["submitted_answers"]["test"] == valid_answer
@@ -98,7 +101,7 @@ def test_grade_blank_submission_without_allow_blank_sets_error() -> None:
         correct_answers={"test": []},
     )
 
-    pl_drawing.grade(element_html, data)
+    pl_drawing.grade(lxml.html.fragment_fromstring(element_html), data)
 
     assert "test" in data["format_errors"]
     assert "test" not in data["partial_scores"]
@@ -122,7 +125,7 @@ def test_grade_blank_with_all_optional_refs_scores_full() -> None:
         correct_answers={"test": reference},
     )
 
-    pl_drawing.grade(element_html, data)
+    pl_drawing.grade(lxml.html.fragment_fromstring(element_html), data)
 
     assert "test" not in data["format_errors"]
     assert "test" in data["partial_scores"]
@@ -146,7 +149,7 @@ def test_grade_blank_submission_with_allow_blank_scores_zero() -> None:
         correct_answers={"test": reference},
     )
 
-    pl_drawing.grade(element_html, data)
+    pl_drawing.grade(lxml.html.fragment_fromstring(element_html), data)
 
     assert "test" not in data["format_errors"]
     assert "test" in data["partial_scores"]
@@ -170,7 +173,7 @@ def test_grade_blank_submission_with_allow_blank_uses_weight() -> None:
         correct_answers={"test": reference},
     )
 
-    pl_drawing.grade(element_html, data)
+    pl_drawing.grade(lxml.html.fragment_fromstring(element_html), data)
 
     assert data["partial_scores"]["test"]["weight"] == 5
 
@@ -192,7 +195,7 @@ def test_grade_blank_submission_with_allow_blank_feedback_structure() -> None:
         correct_answers={"test": reference},
     )
 
-    pl_drawing.grade(element_html, data)
+    pl_drawing.grade(lxml.html.fragment_fromstring(element_html), data)
 
     feedback = data["partial_scores"]["test"]["feedback"]
     assert feedback["correct"] is False
@@ -209,7 +212,7 @@ def test_grade_uses_custom_weight() -> None:
         correct_answers={"test": []},
     )
 
-    pl_drawing.grade(element_html, data)
+    pl_drawing.grade(lxml.html.fragment_fromstring(element_html), data)
 
     assert data["partial_scores"]["test"]["weight"] == 3
 
@@ -221,7 +224,7 @@ def test_grade_default_weight_is_one() -> None:
         correct_answers={"test": []},
     )
 
-    pl_drawing.grade(element_html, data)
+    pl_drawing.grade(lxml.html.fragment_fromstring(element_html), data)
 
     assert data["partial_scores"]["test"]["weight"] == 1
 
@@ -255,7 +258,7 @@ def test_grade_only_initial_objects_without_allow_blank_sets_error() -> None:
         correct_answers={"test": reference},
     )
 
-    pl_drawing.grade(element_html, data)
+    pl_drawing.grade(lxml.html.fragment_fromstring(element_html), data)
 
     assert "test" in data["format_errors"]
     assert "test" not in data["partial_scores"]
@@ -290,8 +293,19 @@ def test_grade_only_initial_objects_with_allow_blank_scores_zero() -> None:
         correct_answers={"test": reference},
     )
 
-    pl_drawing.grade(element_html, data)
+    pl_drawing.grade(lxml.html.fragment_fromstring(element_html), data)
 
     assert "test" not in data["format_errors"]
     assert "test" in data["partial_scores"]
     assert math.isclose(data["partial_scores"]["test"]["score"], 0.0)
+
+
+def test_render_controls_sets_arc_vector_direction() -> None:
+    element = lxml.html.fragment_fromstring(
+        '<pl-controls><pl-drawing-button type="pl-arc-vector-CCW"></pl-drawing-button></pl-controls>'
+    )
+
+    markup = pl_drawing.render_controls("{{{options}}}", element)
+
+    opts = json.loads(html.unescape(markup.removesuffix("<br>\n")))
+    assert opts["drawStartArrow"] is True
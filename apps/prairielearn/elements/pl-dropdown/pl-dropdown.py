@@ -2,10 +2,11 @@ import random
 from enum import Enum
 from typing import assert_never
 
-import chevron
 import lxml.html
 import prairielearn as pl
 
+PARSED_ELEMENT = True
+
 WEIGHT_DEFAULT = 1
 BLANK_ANSWER = " "
 BLANK_DEFAULT = True
@@ -54,8 +55,7 @@ def get_solution(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     return solution[0]
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     pl.check_attribs(
         element,
         required_attribs=["answers-name"],
@@ -79,8 +79,7 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
         raise ValueError(f"Correct answer not defined for answers-name: {answers_name}")
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
-    element = lxml.html.fragment_fromstring(element_html)
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     answers_name = pl.get_string_attrib(element, "answers-name")
     aria_label = pl.get_string_attrib(element, "aria-label", ARIA_LABEL_DEFAULT)
     dropdown_options = get_options(element, data)
@@ -146,13 +145,11 @@ def render(element_html: str, data: pl.QuestionData) -> str:
     else:
         assert_never(data["panel"])
 
-    with open("pl-dropdown.mustache", encoding="utf-8") as f:
-        html = chevron.render(f, html_params).strip()
+    html = pl.render_template("pl-dropdown.mustache", html_params).strip()
     return html
 
 
-def parse(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def parse(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     allow_blank = pl.get_boolean_attrib(element, "allow-blank", ALLOW_BLANK_DEFAULT)
     answers_name = pl.get_string_attrib(element, "answers-name")
     answer = data["submitted_answers"].get(answers_name, None)
@@ -176,8 +173,7 @@ def parse(element_html: str, data: pl.QuestionData) -> None:
         data["format_errors"][answers_name] = "Invalid option submitted."
 
 
-def grade(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def grade(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     answers_name = pl.get_string_attrib(element, "answers-name")
     weight = pl.get_integer_attrib(element, "weight", WEIGHT_DEFAULT)
     submitted_answer = data["submitted_answers"].get(answers_name, None)
@@ -188,8 +184,7 @@ def grade(element_html: str, data: pl.QuestionData) -> None:
         data["partial_scores"][answers_name] = {"score": 0, "weight": weight}
 
 
-def test(element_html: str, data: pl.ElementTestData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def test(element: lxml.html.HtmlElement, data: pl.ElementTestData) -> None:
     answers_name = pl.get_string_attrib(element, "answers-name")
     weight = pl.get_integer_attrib(element, "weight", WEIGHT_DEFAULT)
 
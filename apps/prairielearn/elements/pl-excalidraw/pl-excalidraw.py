@@ -3,11 +3,12 @@ import json
 import re
 from pathlib import Path
 
-import chevron
 import lxml.html
 import prairielearn as pl
 from lxml.html import HtmlElement
 
+PARSED_ELEMENT = True
+
 UNITLESS_NUMBER_RE = re.compile(r"^[+-]?(?:\d+(?:\.\d*)?|\.\d+)$")
 
 
@@ -53,8 +54,7 @@ def is_source_file_name_required(panel: str, gradable: bool, fresh: bool) -> boo
 # -----------------------------------------------------------------------------
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     required_attrs = []
     optional_attrs = [
         "gradable",
@@ -96,9 +96,8 @@ def load_file_content(element: HtmlElement, data: pl.QuestionData) -> str:
     return file.read_text(encoding="utf-8")
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     empty_diagram = ""  # pick a default representation
-    element = lxml.html.fragment_fromstring(element_html)
     drawing_name = pl.get_string_attrib(element, "answers-name", None)
 
     gradable = pl.get_boolean_attrib(element, "gradable", True)
@@ -178,12 +177,10 @@ def render(element_html: str, data: pl.QuestionData) -> str:
         "show_widget": show_widget,
     }
 
-    with open("pl-excalidraw.mustache", encoding="utf-8") as template:
-        return chevron.render(template, render_data)
+    return pl.render_template("pl-excalidraw.mustache", render_data)
 
 
-def parse(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def parse(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     drawing_name = pl.get_string_attrib(element, "answers-name", None)
 
     if drawing_name:
@@ -199,8 +196,7 @@ def parse(element_html: str, data: pl.QuestionData) -> None:
             )
 
 
-def test(element_html: str, data: pl.ElementTestData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def test(element: lxml.html.HtmlElement, data: pl.ElementTestData) -> None:
     gradable = pl.get_boolean_attrib(element, "gradable", True)
     if not gradable:
         return
@@ -1,6 +1,7 @@
 import importlib
 from typing import Any
 
+import lxml.html
 import pytest
 
 pl_excalidraw = importlib.import_module("pl-excalidraw")
@@ -19,10 +20,14 @@ def test_prepare_rejects_unitless_size(attrib: str, value: str) -> None:
     with pytest.raises(
         ValueError, match=f'Attribute "{attrib}" must be a CSS size value'
     ):
-        pl_excalidraw.prepare(element_html, make_question_data())
+        pl_excalidraw.prepare(
+            lxml.html.fragment_fromstring(element_html), make_question_data()
+        )
 
 
 def test_prepare_accepts_css_size_values() -> None:
     element_html = '<pl-excalidraw answers-name="drawing" width="100%" height="900px"></pl-excalidraw>'
 
-    pl_excalidraw.prepare(element_html, make_question_data())
+    pl_excalidraw.prepare(
+        lxml.html.fragment_fromstring(element_html), make_question_data()
+    )
@@ -1,12 +1,13 @@
 from typing import Any
 
 import ansi2html.style as ansi2html_style
-import chevron
 import lxml.html
 import prairielearn as pl
 from ansi2html import Ansi2HTMLConverter
 from prairielearn.colors import PLColor
 
+PARSED_ELEMENT = True
+
 # No built-in support for custom schemes, so we'll monkey-patch our own colors
 # into the module. Colors borrowed from the "Dark Background" color preset in
 # iTerm2; blue tweaked a bit for better legibility on black.
@@ -43,8 +44,7 @@ def ansi_to_html(output: str | None) -> str | None:
         return f"[Error converting ANSI to HTML: {exc}]\n\n{output}"
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     required_attribs: list[str] = []
     optional_attribs: list[str] = []
     pl.check_attribs(element, required_attribs, optional_attribs)
@@ -62,7 +62,7 @@ def round_value(value: float, digits: int = 2) -> str:
     return f"{value:.{digits}f}".rstrip("0").rstrip(".")
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     # Early-exit if not the submission panel
     if data["panel"] != "submission":
         return ""
@@ -188,5 +188,6 @@ def render(element_html: str, data: pl.QuestionData) -> str:
     elif not grading_succeeded:
         html_params["message"] = ansi_to_html(feedback.get("message", None))
 
-    with open("pl-external-grader-results.mustache", encoding="utf-8") as f:
-        return chevron.render(f, html_params).strip()
+    return pl.render_template(
+        "pl-external-grader-results.mustache", html_params
+    ).strip()
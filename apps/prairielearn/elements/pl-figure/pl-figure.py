@@ -4,10 +4,11 @@ from enum import Enum
 from typing import assert_never
 from urllib.parse import quote
 
-import chevron
 import lxml.html
 import prairielearn as pl
 
+PARSED_ELEMENT = True
+
 
 class FileType(Enum):
     STATIC = 1
@@ -64,8 +65,7 @@ def get_display_type(element: lxml.html.HtmlElement) -> DisplayType:
     return pl.get_enum_attrib(element, "display", DisplayType, display_type_default)
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     pl.check_attribs(
         element,
         required_attribs=["file-name"],
@@ -96,8 +96,7 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
             )
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
-    element = lxml.html.fragment_fromstring(element_html)
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
 
     # Get file name or raise exception if one does not exist
     file_name = pl.get_string_attrib(element, "file-name")
@@ -136,5 +135,4 @@ def render(element_html: str, data: pl.QuestionData) -> str:
 
     # Create and return html
     html_params = {"src": file_url, "width": width, "inline": inline, "alt": alt_text}
-    with open("pl-figure.mustache", encoding="utf-8") as f:
-        return chevron.render(f, html_params).strip()
+    return pl.render_template("pl-figure.mustache", html_params).strip()
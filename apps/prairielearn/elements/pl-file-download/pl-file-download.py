@@ -8,6 +8,8 @@ from urllib.parse import quote
 import lxml.html
 import prairielearn as pl
 
+PARSED_ELEMENT = True
+
 
 class FileType(Enum):
     STATIC = 1
@@ -29,8 +31,7 @@ DIRECTORY_PATH_DICT = {
 }
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     pl.check_attribs(
         element,
         required_attribs=["file-name"],
@@ -61,8 +62,7 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
             )
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
-    element = lxml.html.fragment_fromstring(element_html)
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
 
     # Get file name or raise exception if one does not exist
     file_name = pl.get_string_attrib(element, "file-name")
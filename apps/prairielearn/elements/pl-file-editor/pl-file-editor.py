@@ -2,11 +2,12 @@ import base64
 import hashlib
 import os
 
-import chevron
 import lxml.html
 import prairielearn as pl
 from text_unidecode import unidecode
 
+PARSED_ELEMENT = True
+
 ACE_MODE_DEFAULT = None
 ACE_THEME_DEFAULT = None
 FONT_SIZE_DEFAULT = None
@@ -25,8 +26,7 @@ def get_answer_name(file_name: str) -> str:
     return "_file_editor_{}".format(hashlib.sha1(file_name.encode("utf-8")).hexdigest())
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     required_attribs = ["file-name"]
     optional_attribs = [
         "ace-mode",
@@ -64,11 +64,10 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
         )
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     if data["panel"] != "question":
         return ""
 
-    element = lxml.html.fragment_fromstring(element_html)
     file_name = pl.get_string_attrib(element, "file-name", "")
     answer_name = get_answer_name(file_name)
     ace_mode = pl.get_string_attrib(element, "ace-mode", ACE_MODE_DEFAULT)
@@ -159,12 +158,10 @@ def render(element_html: str, data: pl.QuestionData) -> str:
     else:
         html_params["current_file_contents"] = html_params["original_file_contents"]
 
-    with open("pl-file-editor.mustache", encoding="utf-8") as f:
-        return chevron.render(f, html_params).strip()
+    return pl.render_template("pl-file-editor.mustache", html_params).strip()
 
 
-def parse(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def parse(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     file_name = pl.get_string_attrib(element, "file-name", "")
     answer_name = get_answer_name(file_name)
     normalize_to_ascii = pl.get_boolean_attrib(
@@ -196,8 +193,7 @@ def parse(element_html: str, data: pl.QuestionData) -> None:
     pl.add_submitted_file(data, file_name, file_contents)
 
 
-def test(element_html: str, data: pl.ElementTestData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def test(element: lxml.html.HtmlElement, data: pl.ElementTestData) -> None:
     file_name = pl.get_string_attrib(element, "file-name", "")
     answer_name = get_answer_name(file_name)
     allow_blank = pl.get_boolean_attrib(element, "allow-blank", ALLOW_BLANK_DEFAULT)
@@ -1,17 +1,17 @@
-import chevron
 import lxml.html
 import prairielearn as pl
 from prairielearn.colors import PLColor
 
+PARSED_ELEMENT = True
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     required_attribs = []
     optional_attribs = []
     pl.check_attribs(element, required_attribs, optional_attribs)
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     if data["panel"] != "submission":
         return ""
 
@@ -42,5 +42,4 @@ def render(element_html: str, data: pl.QuestionData) -> str:
         ],
     }
 
-    with open("pl-file-preview.mustache", encoding="utf-8") as f:
-        return chevron.render(f, html_params).strip()
+    return pl.render_template("pl-file-preview.mustache", html_params).strip()
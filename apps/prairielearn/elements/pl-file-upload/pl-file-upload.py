@@ -8,11 +8,12 @@ import re
 import string
 from io import StringIO
 
-import chevron
 import lxml.html
 import prairielearn as pl
 from prairielearn.colors import PLColor
 
+PARSED_ELEMENT = True
+
 FILE_NAMES_DEFAULT = None
 OPTIONAL_FILE_NAMES_DEFAULT = None
 FILE_PATTERNS_DEFAULT = None
@@ -109,8 +110,7 @@ def add_format_error(
     data["format_errors"][answer_name].append(error_string)
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
 
     # At least one file-names/patterns attributed is required
     required_attribs = []
@@ -161,11 +161,10 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
     data["params"]["_required_file_names"].extend(required_file_names)
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     if data["panel"] != "question":
         return ""
 
-    element = lxml.html.fragment_fromstring(element_html)
     uuid = pl.get_uuid()
 
     raw_file_names = pl.get_string_attrib(element, "file-names", FILE_NAMES_DEFAULT)
@@ -248,12 +247,10 @@ def render(element_html: str, data: pl.QuestionData) -> str:
         "parse_error": "<br>".join(parse_error),
     }
 
-    with open("pl-file-upload.mustache", encoding="utf-8") as f:
-        return chevron.render(f, html_params).strip()
+    return pl.render_template("pl-file-upload.mustache", html_params).strip()
 
 
-def parse(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def parse(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     raw_file_names = pl.get_string_attrib(element, "file-names", FILE_NAMES_DEFAULT)
     file_names = get_file_names_as_array(raw_file_names)
     raw_opt_file_names = pl.get_string_attrib(
@@ -416,8 +413,7 @@ def _generate_unique_filenames(
     return names
 
 
-def test(element_html: str, data: pl.ElementTestData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def test(element: lxml.html.HtmlElement, data: pl.ElementTestData) -> None:
 
     raw_file_names = pl.get_string_attrib(element, "file-names", FILE_NAMES_DEFAULT)
     raw_opt_file_names = pl.get_string_attrib(
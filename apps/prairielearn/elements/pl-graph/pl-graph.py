@@ -9,6 +9,8 @@ import numpy as np
 import prairielearn as pl
 import pygraphviz
 
+PARSED_ELEMENT = True
+
 ENGINE_DEFAULT = "dot"
 # Legacy default
 PARAMS_NAME_MATRIX_DEFAULT = None
@@ -130,7 +132,7 @@ def graphviz_from_adj_matrix(
     return graph.string()
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     optional_attribs = [
         "directed",
         "engine",
@@ -155,7 +157,6 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
         if hasattr(extension, "optional_attribs"):
             optional_attribs.extend(extension.optional_attribs)
 
-    element = lxml.html.fragment_fromstring(element_html)
     pl.check_attribs(element, required_attribs=[], optional_attribs=optional_attribs)
 
     source_file_name = pl.get_string_attrib(
@@ -180,7 +181,7 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
         )
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     matrix_backends = {
         "adjacency-matrix": graphviz_from_adj_matrix,
         "networkx": graphviz_from_networkx,
@@ -192,7 +193,6 @@ def render(element_html: str, data: pl.QuestionData) -> str:
         matrix_backends.update(extension.backends)
 
     # Get attribs
-    element = lxml.html.fragment_fromstring(element_html)
     engine = pl.get_string_attrib(element, "engine", ENGINE_DEFAULT)
     log_warnings = pl.get_boolean_attrib(element, "log-warnings", LOG_WARNINGS_DEFAULT)
 
@@ -2,6 +2,7 @@ import importlib
 import tempfile
 from pathlib import Path
 
+import lxml.html
 import pytest
 
 graph = importlib.import_module("pl-graph")
@@ -29,7 +30,7 @@ def test_render_with_source_file_name() -> None:
         element_html = '<pl-graph source-file-name="test.dot"></pl-graph>'
 
         # Render the element
-        result = graph.render(element_html, data)
+        result = graph.render(lxml.html.fragment_fromstring(element_html), data)
 
         # Verify that result contains expected SVG wrapper
         assert '<div class="pl-graph">' in result
@@ -52,7 +53,7 @@ def test_prepare_with_source_file_name_and_content_error() -> None:
 
     # Verify that prepare raises an error
     with pytest.raises(ValueError, match="Existing graph content cannot be added"):
-        graph.prepare(element_html, data)
+        graph.prepare(lxml.html.fragment_fromstring(element_html), data)
 
 
 def test_render_aria_attributes_expose_labeled_image() -> None:
@@ -65,7 +66,7 @@ def test_render_aria_attributes_expose_labeled_image() -> None:
         "digraph G { A -> B }</pl-graph>"
     )
 
-    result = graph.render(element_html, data)
+    result = graph.render(lxml.html.fragment_fromstring(element_html), data)
 
     assert 'role="img"' in result
     assert 'aria-label="Graph &lt;a&gt; &quot;b&quot;"' in result
@@ -79,7 +80,7 @@ def test_prepare_aria_description_without_label_error() -> None:
     element_html = '<pl-graph aria-description="A to B">digraph G { A -> B }</pl-graph>'
 
     with pytest.raises(ValueError, match='"aria-description" attribute requires'):
-        graph.prepare(element_html, data)
+        graph.prepare(lxml.html.fragment_fromstring(element_html), data)
 
 
 def test_render_missing_file_error() -> None:
@@ -96,4 +97,4 @@ def test_render_missing_file_error() -> None:
     element_html = '<pl-graph source-file-name="missing.dot"></pl-graph>'
 
     with pytest.raises(ValueError, match="Unknown file path"):
-        graph.render(element_html, data)
+        graph.render(lxml.html.fragment_fromstring(element_html), data)
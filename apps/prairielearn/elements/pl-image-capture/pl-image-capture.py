@@ -11,11 +11,12 @@ import json
 import urllib.parse
 from io import BytesIO
 
-import chevron
 import lxml.html
 import prairielearn as pl
 from PIL import Image
 
+PARSED_ELEMENT = True
+
 MOBILE_CAPTURE_ENABLED_DEFAULT = True
 MANUAL_UPLOAD_ENABLED_DEFAULT = False
 ALLOW_BLANK_DEFAULT = False
@@ -27,8 +28,7 @@ def get_answer_name(file_name: str) -> str:
     )
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
 
     pl.check_attribs(
         element,
@@ -49,12 +49,10 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
     pl.check_answers_names(data, file_name)
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     if data["panel"] == "answer":
         return ""
 
-    element = lxml.html.fragment_fromstring(element_html)
-
     file_name = pl.get_string_attrib(element, "file-name")
     answer_name = get_answer_name(file_name)
 
@@ -120,12 +118,10 @@ def render(element_html: str, data: pl.QuestionData) -> str:
 
     html_params["image_capture_options_json"] = json.dumps(image_capture_options)
 
-    with open("pl-image-capture.mustache", encoding="utf-8") as f:
-        return chevron.render(f, html_params).strip()
+    return pl.render_template("pl-image-capture.mustache", html_params).strip()
 
 
-def parse(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def parse(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     file_name = pl.get_string_attrib(element, "file-name")
     answer_name = get_answer_name(file_name)
     allow_blank = pl.get_boolean_attrib(element, "allow-blank", ALLOW_BLANK_DEFAULT)
@@ -189,10 +185,9 @@ def parse(element_html: str, data: pl.QuestionData) -> None:
     pl.add_submitted_file(data, file_name, b64_payload)
 
 
-def test(element_html: str, data: pl.ElementTestData) -> None:
+def test(element: lxml.html.HtmlElement, data: pl.ElementTestData) -> None:
     result = data["test_type"]
 
-    element = lxml.html.fragment_fromstring(element_html)
     file_name = pl.get_string_attrib(element, "file-name")
     answer_name = get_answer_name(file_name)
     allow_blank = pl.get_boolean_attrib(element, "allow-blank", ALLOW_BLANK_DEFAULT)
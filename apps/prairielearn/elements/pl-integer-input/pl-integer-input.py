@@ -8,6 +8,8 @@ import lxml.html
 import numpy as np
 import prairielearn as pl
 
+PARSED_ELEMENT = True
+
 
 class DisplayType(Enum):
     INLINE = "inline"
@@ -33,8 +35,7 @@ INTEGER_INPUT_MUSTACHE_TEMPLATE_NAME = "pl-integer-input.mustache"
 SCHEMA_PATH = pathlib.Path(__file__).parent / "schemas" / "pl-integer-input.json"
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     pl.validate_element(element, SCHEMA_PATH)
     name = pl.get_string_attrib(element, "answers-name")
     pl.check_answers_names(data, name)
@@ -73,8 +74,7 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
             ) from exc
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
-    element = lxml.html.fragment_fromstring(element_html)
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     name = pl.get_string_attrib(element, "answers-name")
     label = pl.get_string_attrib(element, "label", LABEL_DEFAULT)
     aria_label = pl.get_string_attrib(element, "aria-label", ARIA_LABEL_DEFAULT)
@@ -93,8 +93,7 @@ def render(element_html: str, data: pl.QuestionData) -> str:
         )
     score = data["partial_scores"].get(name, {"score": None}).get("score")
 
-    with open(INTEGER_INPUT_MUSTACHE_TEMPLATE_NAME, encoding="utf-8") as f:
-        template = f.read()
+    template = pl.load_template(INTEGER_INPUT_MUSTACHE_TEMPLATE_NAME)
 
     if data["panel"] == "question":
         editable = data["editable"]
@@ -221,8 +220,7 @@ def render(element_html: str, data: pl.QuestionData) -> str:
     assert_never(data["panel"])
 
 
-def parse(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def parse(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
     base = pl.get_integer_attrib(element, "base", BASE_DEFAULT)
     blank_value = pl.get_string_attrib(element, "blank-value", BLANK_VALUE_DEFAULT)
@@ -237,8 +235,7 @@ def parse(element_html: str, data: pl.QuestionData) -> None:
 
     a_sub = str(a_sub)
 
-    with open(INTEGER_INPUT_MUSTACHE_TEMPLATE_NAME, encoding="utf-8") as f:
-        template = f.read()
+    template = pl.load_template(INTEGER_INPUT_MUSTACHE_TEMPLATE_NAME)
 
     if a_sub.strip() == "":
         if pl.get_boolean_attrib(element, "allow-blank", ALLOW_BLANK_DEFAULT):
@@ -280,8 +277,7 @@ def parse(element_html: str, data: pl.QuestionData) -> None:
         data["submitted_answers"][name] = a_sub_parsed
 
 
-def grade(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def grade(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
     base = pl.get_integer_attrib(element, "base", BASE_DEFAULT)
 
@@ -313,8 +309,7 @@ def grade(element_html: str, data: pl.QuestionData) -> None:
     pl.grade_answer_parameterized(data, name, grade_function, weight=weight)
 
 
-def test(element_html: str, data: pl.ElementTestData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def test(element: lxml.html.HtmlElement, data: pl.ElementTestData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
     weight = pl.get_integer_attrib(element, "weight", WEIGHT_DEFAULT)
     base = pl.get_integer_attrib(element, "base", BASE_DEFAULT)
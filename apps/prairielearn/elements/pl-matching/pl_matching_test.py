@@ -1,6 +1,7 @@
 import importlib
 from typing import Any
 
+import lxml.html
 import pytest
 
 pl_matching = importlib.import_module("pl-matching")
@@ -30,13 +31,13 @@ def make_question_data() -> dict[str, Any]:
 def test_grade_defaults_to_partial_credit() -> None:
     data = make_question_data()
     element_html = matching_html()
-    pl_matching.prepare(element_html, data)
+    pl_matching.prepare(lxml.html.fragment_fromstring(element_html), data)
     data["submitted_answers"] = {
         "match-dropdown-0": "0",
         "match-dropdown-1": "0",
     }
 
-    pl_matching.grade(element_html, data)
+    pl_matching.grade(lxml.html.fragment_fromstring(element_html), data)
 
     assert data["partial_scores"]["match"]["score"] == pytest.approx(0.5)
 
@@ -44,12 +45,12 @@ def test_grade_defaults_to_partial_credit() -> None:
 def test_grade_can_disable_partial_credit() -> None:
     data = make_question_data()
     element_html = matching_html('partial-credit="false"')
-    pl_matching.prepare(element_html, data)
+    pl_matching.prepare(lxml.html.fragment_fromstring(element_html), data)
     data["submitted_answers"] = {
         "match-dropdown-0": "0",
         "match-dropdown-1": "0",
     }
 
-    pl_matching.grade(element_html, data)
+    pl_matching.grade(lxml.html.fragment_fromstring(element_html), data)
 
     assert data["partial_scores"]["match"]["score"] == 0
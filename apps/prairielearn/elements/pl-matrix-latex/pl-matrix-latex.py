@@ -4,19 +4,19 @@ import lxml.html
 import numpy as np
 import prairielearn as pl
 
+PARSED_ELEMENT = True
+
 DIGITS_DEFAULT = 2
 PRESENTATION_TYPE_DEFAULT = "f"
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     required_attribs = ["params-name"]
     optional_attribs = ["digits", "presentation-type"]
     pl.check_attribs(element, required_attribs, optional_attribs)
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
-    element = lxml.html.fragment_fromstring(element_html)
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
 
     # Get the number of digits to output
     digits = pl.get_integer_attrib(element, "digits", DIGITS_DEFAULT)
@@ -6,11 +6,12 @@ from collections import Counter
 from enum import Enum
 from typing import NamedTuple, assert_never
 
-import chevron
 import lxml.etree
 import lxml.html
 import prairielearn as pl
 
+PARSED_ELEMENT = True
+
 
 class DisplayType(Enum):
     INLINE = "inline"
@@ -407,8 +408,7 @@ def prepare_answers_to_display(
     ]
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     pl.validate_element_tree(
         element, SCHEMA_MANIFEST_PATH, allow_legacy_underscore_tags=True
     )
@@ -522,8 +522,7 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
     data["correct_answers"][name] = correct_answer
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
-    element = lxml.html.fragment_fromstring(element_html)
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     name = pl.get_string_attrib(element, "answers-name")
 
     hide_score_badge = pl.get_boolean_attrib(
@@ -599,8 +598,9 @@ def render(element_html: str, data: pl.QuestionData) -> str:
             score_type, score_value = pl.determine_score_params(score)
             html_params[score_type] = score_value
 
-        with open(MULTIPLE_CHOICE_MUSTACHE_TEMPLATE_NAME, encoding="utf-8") as f:
-            return chevron.render(f, html_params).strip()
+        return pl.render_template(
+            MULTIPLE_CHOICE_MUSTACHE_TEMPLATE_NAME, html_params
+        ).strip()
 
     elif data["panel"] == "submission":
         parse_error = data["format_errors"].get(name, None)
@@ -635,8 +635,9 @@ def render(element_html: str, data: pl.QuestionData) -> str:
                 html_params["display_feedback"] = True
                 html_params["feedback"] = feedback
 
-        with open(MULTIPLE_CHOICE_MUSTACHE_TEMPLATE_NAME, encoding="utf-8") as f:
-            return chevron.render(f, html_params).strip()
+        return pl.render_template(
+            MULTIPLE_CHOICE_MUSTACHE_TEMPLATE_NAME, html_params
+        ).strip()
 
     elif data["panel"] == "answer":
         if not pl.get_boolean_attrib(
@@ -660,14 +661,14 @@ def render(element_html: str, data: pl.QuestionData) -> str:
                 element, "hide-letter-keys", HIDE_LETTER_KEYS_DEFAULT
             ),
         }
-        with open(MULTIPLE_CHOICE_MUSTACHE_TEMPLATE_NAME, encoding="utf-8") as f:
-            return chevron.render(f, html_params).strip()
+        return pl.render_template(
+            MULTIPLE_CHOICE_MUSTACHE_TEMPLATE_NAME, html_params
+        ).strip()
 
     assert_never(data["panel"])
 
 
-def parse(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def parse(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
 
     allow_blank = pl.get_boolean_attrib(element, "allow-blank", ALLOW_BLANK_DEFAULT)
@@ -687,8 +688,7 @@ def parse(element_html: str, data: pl.QuestionData) -> None:
         return
 
 
-def grade(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def grade(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
 
     if not pl.get_boolean_attrib(element, "builtin-grading", BUILTIN_GRADING_DEFAULT):
@@ -714,8 +714,7 @@ def grade(element_html: str, data: pl.QuestionData) -> None:
     pl.grade_answer_parameterized(data, name, grade_multiple_choice, weight)
 
 
-def test(element_html: str, data: pl.ElementTestData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def test(element: lxml.html.HtmlElement, data: pl.ElementTestData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
 
     number_answers = len(data["params"][name])
@@ -2,6 +2,7 @@ import importlib
 import json
 from typing import Any
 
+import lxml.html
 import pytest
 
 pl_multiple_choice = importlib.import_module("pl-multiple-choice")
@@ -18,10 +19,10 @@ def mc_html(
     answers: str = "<pl-answer>A</pl-answer><pl-answer>B</pl-answer>",
     *,
     builtin_grading: bool = False,
-) -> str:
+) -> lxml.html.HtmlElement:
     bg = "" if builtin_grading else ' builtin-grading="false"'
     extra = f" {extra_attrs}" if extra_attrs else ""
-    return (
+    return lxml.html.fragment_fromstring(
         f'<pl-multiple-choice answers-name="survey" order="fixed"{bg}{extra}>'
         f"{answers}"
         "</pl-multiple-choice>"
@@ -274,7 +275,9 @@ def test_prepare_rejects_duplicate_external_json_answers(tmp_path: Any) -> None:
         "feedback_on_answer",
     ],
 )
-def test_prepare_rejects_with_no_builtin_grading(html: str, match: str) -> None:
+def test_prepare_rejects_with_no_builtin_grading(
+    html: lxml.html.HtmlElement, match: str
+) -> None:
     with pytest.raises(ValueError, match=match):
         pl_multiple_choice.prepare(html, _make_question_data())
 
@@ -310,7 +313,9 @@ def test_grade_skipped_when_builtin_grading_false() -> None:
     ],
     ids=["no_correct", "with_correct"],
 )
-def test_render_answer_panel_empty_when_builtin_grading_false(html: str) -> None:
+def test_render_answer_panel_empty_when_builtin_grading_false(
+    html: lxml.html.HtmlElement,
+) -> None:
     data = _make_question_data()
     pl_multiple_choice.prepare(html, data)
     data["panel"] = "answer"
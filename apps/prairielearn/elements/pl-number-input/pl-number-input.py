@@ -10,6 +10,8 @@ import numpy as np
 import prairielearn as pl
 from prairielearn.to_precision import to_precision
 
+PARSED_ELEMENT = True
+
 
 class DisplayType(Enum):
     INLINE = "inline"
@@ -50,8 +52,7 @@ NUMBER_INPUT_MUSTACHE_TEMPLATE_NAME = "pl-number-input.mustache"
 SCHEMA_PATH = pathlib.Path(__file__).parent / "schemas" / "pl-number-input.json"
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     pl.validate_element(element, SCHEMA_PATH)
     name = pl.get_string_attrib(element, "answers-name")
     pl.check_answers_names(data, name)
@@ -174,8 +175,7 @@ def get_string_decimal_digits(number_string: str) -> int:
     return 0  # no decimal separator means there are no decimal digits
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
-    element = lxml.html.fragment_fromstring(element_html)
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     name = pl.get_string_attrib(element, "answers-name")
     label = pl.get_string_attrib(element, "label", LABEL_DEFAULT)
     aria_label = pl.get_string_attrib(element, "aria-label", ARIA_LABEL_DEFAULT)
@@ -201,8 +201,7 @@ def render(element_html: str, data: pl.QuestionData) -> str:
         )
     partial_score = data["partial_scores"].get(name, {"score": None})
     score = partial_score.get("score", None)
-    with open(NUMBER_INPUT_MUSTACHE_TEMPLATE_NAME, encoding="utf-8") as f:
-        template = f.read()
+    template = pl.load_template(NUMBER_INPUT_MUSTACHE_TEMPLATE_NAME)
 
     if data["panel"] == "question":
         editable = data["editable"]
@@ -397,12 +396,10 @@ def get_format_string(
         "allow_fractions": allow_fractions,
         "format_error_message": message,
     }
-    with open(NUMBER_INPUT_MUSTACHE_TEMPLATE_NAME, encoding="utf-8") as f:
-        return chevron.render(f, params).strip()
+    return pl.render_template(NUMBER_INPUT_MUSTACHE_TEMPLATE_NAME, params).strip()
 
 
-def parse(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def parse(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
     allow_complex = pl.get_boolean_attrib(
         element, "allow-complex", ALLOW_COMPLEX_DEFAULT
@@ -435,8 +432,7 @@ def parse(element_html: str, data: pl.QuestionData) -> None:
             data["submitted_answers"][name] = None
 
 
-def grade(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def grade(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
 
     # Get weight
@@ -567,8 +563,7 @@ def grade(element_html: str, data: pl.QuestionData) -> None:
     pl.grade_answer_parameterized(data, name, grade_function, weight=weight)
 
 
-def test(element_html: str, data: pl.ElementTestData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def test(element: lxml.html.HtmlElement, data: pl.ElementTestData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
     weight = pl.get_integer_attrib(element, "weight", WEIGHT_DEFAULT)
     allow_blank = pl.get_boolean_attrib(element, "allow-blank", ALLOW_BLANK_DEFAULT)
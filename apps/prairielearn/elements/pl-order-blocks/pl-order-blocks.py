@@ -7,7 +7,6 @@ from collections import defaultdict
 from copy import deepcopy
 from typing import NotRequired, TypedDict, assert_never
 
-import chevron
 import lxml.html
 import prairielearn as pl
 from dag_checker import (
@@ -36,6 +35,8 @@ from order_blocks_options_parsing import (
     SourceBlocksOrderType,
 )
 
+PARSED_ELEMENT = True
+
 
 class OrderBlocksAnswerData(TypedDict):
     inner_html: str
@@ -206,10 +207,8 @@ def solve_problem(
         assert_never(grading_method)
 
 
-def prepare(html: str, data: pl.QuestionData) -> None:
-    html_element = lxml.html.fragment_fromstring(html)
-
-    order_blocks_options = OrderBlocksOptions(html_element)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
+    order_blocks_options = OrderBlocksOptions(element)
     order_blocks_options.validate()
 
     correct_answers: list[OrderBlocksAnswerData] = []
@@ -302,7 +301,7 @@ def prepare(html: str, data: pl.QuestionData) -> None:
         order_blocks_options.answers_name: deepcopy(correct_answers)
     }
     data_copy["partial_scores"] = {}
-    grade(html, data_copy)
+    grade(element, data_copy)
 
     if (
         data_copy["partial_scores"][order_blocks_options.answers_name]["score"] != 1
@@ -325,8 +324,7 @@ def get_distractors(
     ]
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
-    element = lxml.html.fragment_fromstring(element_html)
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     order_blocks_options = OrderBlocksOptions(element)
     answer_name = order_blocks_options.answers_name
     inline = order_blocks_options.inline
@@ -439,8 +437,7 @@ def render(element_html: str, data: pl.QuestionData) -> str:
         }
         html_params.update(score_params)
 
-        with open("pl-order-blocks.mustache", encoding="utf-8") as f:
-            html = chevron.render(f, html_params)
+        html = pl.render_template("pl-order-blocks.mustache", html_params)
         return html
 
     elif data["panel"] == "submission":
@@ -494,8 +491,7 @@ def render(element_html: str, data: pl.QuestionData) -> str:
         }
         html_params.update(score_params)
 
-        with open("pl-order-blocks.mustache", encoding="utf-8") as f:
-            html = chevron.render(f, html_params)
+        html = pl.render_template("pl-order-blocks.mustache", html_params)
         return html
 
     elif data["panel"] == "answer":
@@ -569,16 +565,14 @@ def render(element_html: str, data: pl.QuestionData) -> str:
                 else "pl-order-blocks-right"
             ),
         }
-        with open("pl-order-blocks.mustache", encoding="utf-8") as f:
-            html = chevron.render(f, html_params)
+        html = pl.render_template("pl-order-blocks.mustache", html_params)
         return html
 
     else:
         assert_never(data["panel"])
 
 
-def parse(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def parse(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     order_block_options = OrderBlocksOptions(element)
     answer_name = order_block_options.answers_name
     answer_raw_name = answer_name + "-input"
@@ -696,8 +690,7 @@ def construct_feedback(
         return feedback
 
 
-def grade(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def grade(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     order_blocks_options = OrderBlocksOptions(element)
     answer_name = order_blocks_options.answers_name
     student_answer = data["submitted_answers"][answer_name]
@@ -846,8 +839,7 @@ def get_default_partial_credit_type(
     )
 
 
-def test(element_html: str, data: pl.ElementTestData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def test(element: lxml.html.HtmlElement, data: pl.ElementTestData) -> None:
     order_block_options = OrderBlocksOptions(element)
     grading_method = order_block_options.grading_method
     answer_name = order_block_options.answers_name
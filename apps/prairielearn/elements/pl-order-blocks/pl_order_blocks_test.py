@@ -161,11 +161,11 @@ def test_omitted_indent_defaults_to_ungraded_when_indentation_enabled() -> None:
     assert order_block_options.answer_options[1].indent == 1
 
     data = make_question_data()
-    pl_order_blocks.prepare(question, data)
+    pl_order_blocks.prepare(lxml.html.fragment_fromstring(question), data)
     answer = deepcopy(data["correct_answers"]["test"])
     answer[0]["indent"] = 3
     data["submitted_answers"]["test"] = answer
-    pl_order_blocks.grade(question, data)
+    pl_order_blocks.grade(lxml.html.fragment_fromstring(question), data)
 
     assert data["partial_scores"]["test"]["score"] == 1
 
@@ -189,12 +189,12 @@ def test_stored_none_indent_is_treated_as_ungraded() -> None:
         inner_html=build_tag("pl-answer", {}, inner_html="First"),
     )
     data = make_question_data()
-    pl_order_blocks.prepare(question, data)
+    pl_order_blocks.prepare(lxml.html.fragment_fromstring(question), data)
     data["correct_answers"]["test"][0]["indent"] = None
     answer = deepcopy(data["correct_answers"]["test"])
     answer[0]["indent"] = 2
     data["submitted_answers"]["test"] = answer
-    pl_order_blocks.grade(question, data)
+    pl_order_blocks.grade(lxml.html.fragment_fromstring(question), data)
 
     assert data["partial_scores"]["test"]["score"] == 1
 
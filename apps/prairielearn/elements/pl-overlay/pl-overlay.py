@@ -1,9 +1,10 @@
 from itertools import count
 
-import chevron
 import lxml.html
 import prairielearn as pl
 
+PARSED_ELEMENT = True
+
 VALIGN_DEFAULT = "middle"
 HALIGN_DEFAULT = "center"
 CLIP_DEFAULT = True
@@ -22,8 +23,7 @@ ALIGNMENT_TO_PERC = {
 }
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     num_backgrounds = 0
     for child in element:
         if isinstance(child, lxml.html.HtmlComment):
@@ -77,8 +77,7 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
         )
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
-    element = lxml.html.fragment_fromstring(element_html)
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     width = pl.get_float_attrib(element, "width", None)
     height = pl.get_float_attrib(element, "height", None)
     background = None
@@ -143,5 +142,4 @@ def render(element_html: str, data: pl.QuestionData) -> str:
         "clip": pl.get_boolean_attrib(element, "clip", CLIP_DEFAULT),
     }
 
-    with open("pl-overlay.mustache", encoding="utf-8") as f:
-        return chevron.render(f, html_params).strip()
+    return pl.render_template("pl-overlay.mustache", html_params).strip()
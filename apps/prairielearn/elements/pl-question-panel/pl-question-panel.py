@@ -1,15 +1,17 @@
 import lxml.html
 import prairielearn as pl
 
+PARSED_ELEMENT = True
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     pl.check_attribs(element, required_attribs=[], optional_attribs=[])
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
+def render(
+    element: lxml.html.HtmlElement, data: pl.QuestionData
+) -> str | list[str | lxml.html.HtmlElement]:
     if data["panel"] == "question":
-        element = lxml.html.fragment_fromstring(element_html)
-        return pl.inner_html(element)
+        return pl.inner_elements(element)
 
     return ""
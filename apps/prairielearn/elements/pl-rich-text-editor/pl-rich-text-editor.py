@@ -7,10 +7,11 @@ import re
 from enum import Enum
 from typing import assert_never
 
-import chevron
 import lxml.html
 import prairielearn as pl
 
+PARSED_ELEMENT = True
+
 
 class Counter(Enum):
     NONE = "none"
@@ -66,8 +67,7 @@ def count_words_from_html_base64(file_contents_b64: str) -> int:
     return len(tokens)
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     required_attribs = []
     optional_attribs = [
         "file-name",
@@ -140,11 +140,10 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
         )
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     if data["panel"] == "answer":
         return ""
 
-    element = lxml.html.fragment_fromstring(element_html)
     file_name = pl.get_string_attrib(element, "file-name", FILE_NAME_DEFAULT)
     answer_name = get_answer_name(file_name)
     quill_theme = pl.get_string_attrib(element, "quill-theme", QUILL_THEME_DEFAULT)
@@ -266,14 +265,12 @@ def render(element_html: str, data: pl.QuestionData) -> str:
             ).decode()
 
         html_params["question"] = data["panel"] == "question"
-        with open("pl-rich-text-editor.mustache", encoding="utf-8") as f:
-            return chevron.render(f, html_params).strip()
+        return pl.render_template("pl-rich-text-editor.mustache", html_params).strip()
 
     assert_never(data["panel"])
 
 
-def parse(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def parse(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     allow_blank = pl.get_boolean_attrib(element, "allow-blank", ALLOW_BLANK_DEFAULT)
     file_name = pl.get_string_attrib(element, "file-name", FILE_NAME_DEFAULT)
     answer_name = get_answer_name(file_name)
@@ -323,8 +320,7 @@ def parse(element_html: str, data: pl.QuestionData) -> None:
             return
 
 
-def test(element_html: str, data: pl.ElementTestData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def test(element: lxml.html.HtmlElement, data: pl.ElementTestData) -> None:
     file_name = pl.get_string_attrib(element, "file-name", FILE_NAME_DEFAULT)
     answer_name = get_answer_name(file_name)
     allow_blank = pl.get_boolean_attrib(element, "allow-blank", ALLOW_BLANK_DEFAULT)
@@ -6,7 +6,6 @@ import re
 import string
 from typing import Any, Literal, NotRequired, TypedDict, cast
 
-import chevron
 import lxml.html
 import prairielearn as pl
 from pl_sketch_grading import grade_submission
@@ -20,6 +19,8 @@ from sketchresponse.types import (
 )
 from sketchresponse.utils import format_drawing, parse_function_string
 
+PARSED_ELEMENT = True
+
 
 class _AxesLabel(TypedDict):
     value: str
@@ -98,8 +99,7 @@ OVERLAY_SOLUTION_DEFAULT = True
 ALLOW_BLANK_DEFAULT = False
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     required_attribs = ["answers-name"]
     optional_attribs = [
         "weight",
@@ -871,8 +871,7 @@ def _parse_drawing_coordinates(drawing_coords: str, tool_name: str) -> list[floa
     return coords
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
-    element = lxml.html.fragment_fromstring(element_html)
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     name = pl.get_string_attrib(element, "answers-name")
 
     params: SketchAnswerParams = data["params"][name]
@@ -983,12 +982,10 @@ def render(element_html: str, data: pl.QuestionData) -> str:
         ).decode("utf-8")
         html_params["overlay_solution"] = json.dumps(overlay_displayed)
 
-    with open("pl-sketch.mustache") as f:
-        return chevron.render(f, html_params).strip()
+    return pl.render_template("pl-sketch.mustache", html_params).strip()
 
 
-def parse(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def parse(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
 
     # check if the question is marked as read-only
@@ -1126,8 +1123,7 @@ def parse(element_html: str, data: pl.QuestionData) -> None:
                     break
 
 
-def grade(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def grade(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
     # return if read-only
     read_only = pl.get_boolean_attrib(element, "read-only", READ_ONLY_DEFAULT)
@@ -1228,8 +1224,7 @@ def _grade_with_staging(name: str, data: pl.QuestionData, weight: int) -> Partia
     }
 
 
-def test(element_html: str, data: pl.ElementTestData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def test(element: lxml.html.HtmlElement, data: pl.ElementTestData) -> None:
     readonly = pl.get_boolean_attrib(element, "read-only", READ_ONLY_DEFAULT)
 
     if readonly:
@@ -9,6 +9,8 @@ import chevron
 import lxml.html
 import prairielearn as pl
 
+PARSED_ELEMENT = True
+
 
 class DisplayType(Enum):
     INLINE = "inline"
@@ -55,8 +57,7 @@ STRING_INPUT_MUSTACHE_TEMPLATE_NAME = "pl-string-input.mustache"
 SCHEMA_PATH = pathlib.Path(__file__).parent / "schemas" / "pl-string-input.json"
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     pl.validate_element(element, SCHEMA_PATH)
 
     name = pl.get_string_attrib(element, "answers-name")
@@ -88,8 +89,7 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
                 ) from exc
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
-    element = lxml.html.fragment_fromstring(element_html)
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     name = pl.get_string_attrib(element, "answers-name")
     label = pl.get_string_attrib(element, "label", LABEL_DEFAULT)
     aria_label = pl.get_string_attrib(element, "aria-label", ARIA_LABEL_DEFAULT)
@@ -127,8 +127,7 @@ def render(element_html: str, data: pl.QuestionData) -> str:
     )
 
     # Get template
-    with open(STRING_INPUT_MUSTACHE_TEMPLATE_NAME, encoding="utf-8") as f:
-        template = f.read()
+    template = pl.load_template(STRING_INPUT_MUSTACHE_TEMPLATE_NAME)
 
     if data["panel"] == "question":
         editable = data["editable"]
@@ -242,8 +241,7 @@ def render(element_html: str, data: pl.QuestionData) -> str:
     assert_never(data["panel"])
 
 
-def parse(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def parse(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
     # Get allow-blank option
     allow_blank = pl.get_boolean_attrib(element, "allow-blank", ALLOW_BLANK_DEFAULT)
@@ -290,8 +288,7 @@ def parse(element_html: str, data: pl.QuestionData) -> None:
         data["submitted_answers"][name] = pl.to_json(a_sub)
 
 
-def grade(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def grade(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
 
     # Get weight
@@ -371,8 +368,7 @@ def grade(element_html: str, data: pl.QuestionData) -> None:
     pl.grade_answer_parameterized(data, name, grade_function, weight=weight)
 
 
-def test(element_html: str, data: pl.ElementTestData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def test(element: lxml.html.HtmlElement, data: pl.ElementTestData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
     weight = pl.get_integer_attrib(element, "weight", WEIGHT_DEFAULT)
     allow_blank = pl.get_boolean_attrib(element, "allow-blank", ALLOW_BLANK_DEFAULT)
@@ -1,9 +1,12 @@
+import contextlib
+import hashlib
+import json
 import pathlib
 import random
 import re
 from enum import Enum
 from sys import get_int_max_str_digits
-from typing import assert_never
+from typing import Any, assert_never
 
 import chevron
 import lxml.html
@@ -11,6 +14,8 @@ import prairielearn as pl
 import prairielearn.sympy_utils as psu
 import sympy
 
+PARSED_ELEMENT = True
+
 
 class DisplayType(Enum):
     INLINE = "inline"
@@ -45,6 +50,8 @@ SYMBOLIC_INPUT_MUSTACHE_TEMPLATE_NAME = "pl-symbolic-input.mustache"
 SYMPY_TIMEOUT = 3
 
 SCHEMA_PATH = pathlib.Path(__file__).parent / "schemas" / "pl-symbolic-input.json"
+# Key in data["params"] for the LaTeX of correct answers and initial values, by answers-name
+DISPLAY_LATEX_PARAMS_KEY = "_pl_symbolic_input_latex"
 
 
 def _get_variables_with_fallback(
@@ -63,11 +70,89 @@ def _get_variables_with_fallback(
 
 
 def _replace_imaginary_for_display(
-    expr: sympy.Expr, imaginary_unit: str
+    expr: sympy.Basic, imaginary_unit: str
 ) -> sympy.Basic:
     return expr.subs(sympy.I, sympy.Symbol(imaginary_unit))
 
 
+def _get_display_latex(
+    expr: sympy.Basic | str, imaginary_unit: str, *, display_log_as_ln: bool
+) -> str:
+    if isinstance(expr, sympy.Basic):
+        expr = _replace_imaginary_for_display(expr, imaginary_unit)
+        if display_log_as_ln:
+            expr = expr.replace(sympy.log, sympy.Function("ln"))
+    return sympy.latex(expr)
+
+
+def _get_display_latex_source(element: lxml.html.HtmlElement, *values: Any) -> str:
+    """Return a hash of the element's attributes and `values`, which stored LaTeX was computed from.
+
+    Stored LaTeX is only used while this hash stays the same, since the
+    question can change the attributes, and `server.py` can change the
+    correct answer, after the LaTeX was computed.
+    """
+    encoded = json.dumps([dict(element.attrib), *values], sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _get_correct_answer_latex(
+    element: lxml.html.HtmlElement, data: pl.QuestionData, name: str
+) -> str | None:
+    """Return the LaTeX shown for the correct answer, or `None` if there is none."""
+    a_tru = data["correct_answers"].get(name)
+    if a_tru is None:
+        return None
+
+    allow_complex = pl.get_boolean_attrib(
+        element, "allow-complex", ALLOW_COMPLEX_DEFAULT
+    )
+    allow_trig = pl.get_boolean_attrib(
+        element, "allow-trig-functions", ALLOW_TRIG_FUNCTIONS_DEFAULT
+    )
+    allow_sets = pl.get_boolean_attrib(element, "allow-sets", ALLOW_SETS_DEFAULT)
+    simplify_expression = pl.get_boolean_attrib(
+        element, "display-simplified-expression", DISPLAY_SIMPLIFIED_EXPRESSION_DEFAULT
+    )
+
+    if isinstance(a_tru, str):
+        if a_tru != "":
+            # this is so instructors can specify the true answer simply as a string
+            a_tru = psu.convert_string_to_sympy(
+                a_tru,
+                psu.get_items_list(
+                    pl.get_string_attrib(element, "variables", VARIABLES_DEFAULT)
+                ),
+                allow_complex=allow_complex,
+                allow_sets=allow_sets,
+                allow_trig_functions=allow_trig,
+                custom_functions=psu.get_items_list(
+                    pl.get_string_attrib(
+                        element, "custom-functions", CUSTOM_FUNCTIONS_DEFAULT
+                    )
+                ),
+                simplify_expression=simplify_expression,
+            )
+    else:
+        a_tru = psu.json_to_sympy(
+            a_tru,
+            allow_complex=allow_complex,
+            allow_sets=allow_sets,
+            allow_trig_functions=allow_trig,
+            simplify_expression=simplify_expression,
+        )
+
+    return _get_display_latex(
+        a_tru,
+        pl.get_string_attrib(
+            element, "imaginary-unit-for-display", IMAGINARY_UNIT_FOR_DISPLAY_DEFAULT
+        ),
+        display_log_as_ln=pl.get_boolean_attrib(
+            element, "display-log-as-ln", DISPLAY_LOG_AS_LN_DEFAULT
+        ),
+    )
+
+
 # Additional simplifications supported by SymPy
 SYMPY_ADDITIONAL_SIMPLIFICATIONS = {
     "expand": sympy.expand,
@@ -77,8 +162,7 @@ SYMPY_ADDITIONAL_SIMPLIFICATIONS = {
 }
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     pl.validate_element(element, SCHEMA_PATH)
     name = pl.get_string_attrib(element, "answers-name")
 
@@ -155,9 +239,10 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
     )
     # Don't parse the initial value if it's not a formula editor, so that you can prefill
     # partial inputs.
+    initial_parsed = None
     if formula_editor and initial_value is not None and initial_value.strip() != "":
         try:
-            psu.convert_string_to_sympy(
+            initial_parsed = psu.convert_string_to_sympy(
                 initial_value,
                 variables,
                 allow_complex=allow_complex,
@@ -195,9 +280,28 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
             "The 'additional-simplifications' contain one of more unsupported simplification(s). Please see the documentation for a full list of supported simplifications."
         )
 
+    # Compute the LaTeX for display once here, so that render() doesn't need to
+    # parse the correct answer and initial value again for every view.
+    display_log_as_ln = pl.get_boolean_attrib(
+        element, "display-log-as-ln", DISPLAY_LOG_AS_LN_DEFAULT
+    )
+    display_latex: dict[str, str] = {
+        "source": _get_display_latex_source(element, data["correct_answers"].get(name))
+    }
+    # Correct answers from server.py have not been checked yet, and only cause an
+    # error once they are displayed or graded.
+    with contextlib.suppress(psu.BaseSympyError):
+        a_tru_latex = _get_correct_answer_latex(element, data, name)
+        if a_tru_latex is not None:
+            display_latex["correct_answer"] = a_tru_latex
+    if initial_parsed is not None:
+        display_latex["initial_value"] = _get_display_latex(
+            initial_parsed, imaginary_unit, display_log_as_ln=display_log_as_ln
+        )
+    data["params"].setdefault(DISPLAY_LATEX_PARAMS_KEY, {})[name] = display_latex
+
 
-def render(element_html: str, data: pl.QuestionData) -> str:
-    element = lxml.html.fragment_fromstring(element_html)
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     name = pl.get_string_attrib(element, "answers-name")
     label = pl.get_string_attrib(element, "label", LABEL_DEFAULT)
     aria_label = pl.get_string_attrib(element, "aria-label", ARIA_LABEL_DEFAULT)
@@ -252,8 +356,7 @@ def render(element_html: str, data: pl.QuestionData) -> str:
         "allow_sets": allow_sets,
     }
 
-    with open(SYMBOLIC_INPUT_MUSTACHE_TEMPLATE_NAME, encoding="utf-8") as f:
-        template = f.read()
+    template = pl.load_template(SYMBOLIC_INPUT_MUSTACHE_TEMPLATE_NAME)
 
     info = chevron.render(template, info_params).strip()
 
@@ -265,11 +368,18 @@ def render(element_html: str, data: pl.QuestionData) -> str:
         a_sub = data["submitted_answers"][name]
 
         if isinstance(a_sub, str) and a_sub.strip() == "":
-            a_sub_parsed = ""
-        elif isinstance(a_sub, str):
-            # this is for backward-compatibility
-            a_sub_parsed = _replace_imaginary_for_display(
-                psu.convert_string_to_sympy(
+            a_sub_converted = ""
+        elif (
+            psu.is_sympy_json(a_sub)
+            and "_latex" in a_sub
+            and a_sub.get("_latex_source") == _get_display_latex_source(element)
+        ):
+            a_sub_converted = a_sub["_latex"]
+        else:
+            # Submissions whose LaTeX is out of date or was never stored with
+            # them (or, for backward-compatibility, that were stored as strings)
+            if isinstance(a_sub, str):
+                a_sub_parsed = psu.convert_string_to_sympy(
                     a_sub,
                     variables,
                     allow_complex=allow_complex,
@@ -277,24 +387,18 @@ def render(element_html: str, data: pl.QuestionData) -> str:
                     custom_functions=custom_functions,
                     allow_trig_functions=allow_trig,
                     simplify_expression=simplify_expression,
-                ),
-                imaginary_unit,
-            )
-        else:
-            a_sub_parsed = _replace_imaginary_for_display(
-                psu.json_to_sympy(
+                )
+            else:
+                a_sub_parsed = psu.json_to_sympy(
                     a_sub,
                     allow_complex=allow_complex,
                     allow_sets=allow_sets,
                     allow_trig_functions=allow_trig,
                     simplify_expression=simplify_expression,
-                ),
-                imaginary_unit,
+                )
+            a_sub_converted = _get_display_latex(
+                a_sub_parsed, imaginary_unit, display_log_as_ln=display_log_as_ln
             )
-
-        if display_log_as_ln and a_sub_parsed != "":
-            a_sub_parsed = a_sub_parsed.replace(sympy.log, sympy.Function("ln"))
-        a_sub_converted = "" if a_sub_parsed == "" else sympy.latex(a_sub_parsed)
     elif name not in data["submitted_answers"]:
         missing_input = True
         parse_error = None
@@ -317,27 +421,37 @@ def render(element_html: str, data: pl.QuestionData) -> str:
     raw_submitted_answer = data["raw_submitted_answers"].get(name, None)
     if raw_submitted_answer is None:
         raw_submitted_answer = initial_value
+    # Variants prepared before the LaTeX was stored in params, and variants whose
+    # correct answer changed after prepare(), fall back to parsing here
+    display_latex: dict[str, str] | None = (
+        data["params"].get(DISPLAY_LATEX_PARAMS_KEY, {}).get(name)
+    )
+    if display_latex is not None and display_latex.get(
+        "source"
+    ) != _get_display_latex_source(element, data["correct_answers"].get(name)):
+        display_latex = None
     if (
         raw_submitted_answer_latex is None
         and initial_value is not None
         and initial_value.strip() != ""
         and formula_editor
     ):
-        initial_parsed = _replace_imaginary_for_display(
-            psu.convert_string_to_sympy(
-                initial_value,
-                _get_variables_with_fallback(element, data, name),
-                allow_complex=allow_complex,
-                allow_sets=allow_sets,
-                custom_functions=custom_functions,
-                allow_trig_functions=allow_trig,
-                simplify_expression=simplify_expression,
-            ),
-            imaginary_unit,
-        )
-        if display_log_as_ln:
-            initial_parsed = initial_parsed.replace(sympy.log, sympy.Function("ln"))
-        raw_submitted_answer_latex = sympy.latex(initial_parsed)
+        if display_latex is not None and "initial_value" in display_latex:
+            raw_submitted_answer_latex = display_latex["initial_value"]
+        else:
+            raw_submitted_answer_latex = _get_display_latex(
+                psu.convert_string_to_sympy(
+                    initial_value,
+                    _get_variables_with_fallback(element, data, name),
+                    allow_complex=allow_complex,
+                    allow_sets=allow_sets,
+                    custom_functions=custom_functions,
+                    allow_trig_functions=allow_trig,
+                    simplify_expression=simplify_expression,
+                ),
+                imaginary_unit,
+                display_log_as_ln=display_log_as_ln,
+            )
 
     score = data["partial_scores"].get(name, {}).get("score")
 
@@ -403,45 +517,18 @@ def render(element_html: str, data: pl.QuestionData) -> str:
         return chevron.render(template, html_params).strip()
 
     elif data["panel"] == "answer":
-        a_tru = data["correct_answers"].get(name)
-        if a_tru is None:
-            return ""
-
-        elif isinstance(a_tru, str):
-            if a_tru != "":
-                # this is so instructors can specify the true answer simply as a string
-                a_tru = _replace_imaginary_for_display(
-                    psu.convert_string_to_sympy(
-                        a_tru,
-                        variables,
-                        allow_complex=allow_complex,
-                        allow_sets=allow_sets,
-                        allow_trig_functions=allow_trig,
-                        custom_functions=custom_functions,
-                        simplify_expression=simplify_expression,
-                    ),
-                    imaginary_unit,
-                )
+        if display_latex is not None and "correct_answer" in display_latex:
+            a_tru_latex = display_latex["correct_answer"]
         else:
-            a_tru = _replace_imaginary_for_display(
-                psu.json_to_sympy(
-                    a_tru,
-                    allow_complex=allow_complex,
-                    allow_sets=allow_sets,
-                    allow_trig_functions=allow_trig,
-                    simplify_expression=simplify_expression,
-                ),
-                imaginary_unit,
-            )
-
-        if display_log_as_ln and a_tru != "":
-            a_tru = a_tru.replace(sympy.log, sympy.Function("ln"))
+            a_tru_latex = _get_correct_answer_latex(element, data, name)
+        if a_tru_latex is None:
+            return ""
 
         html_params = {
             "answer": True,
             "label": label,
             "suffix": suffix,
-            "a_tru": sympy.latex(a_tru),
+            "a_tru": a_tru_latex,
             display.value: True,
         }
         return chevron.render(template, html_params).strip()
@@ -449,8 +536,7 @@ def render(element_html: str, data: pl.QuestionData) -> str:
     assert_never(data["panel"])
 
 
-def parse(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def parse(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
     formula_editor = pl.get_boolean_attrib(
         element, "formula-editor", SHOW_FORMULA_EDITOR_DEFAULT
@@ -548,13 +634,24 @@ def parse(element_html: str, data: pl.QuestionData) -> None:
         )
 
         # Convert safely to sympy
-        psu.json_to_sympy(
+        a_sub_display = psu.json_to_sympy(
             a_sub_json,
             allow_complex=allow_complex,
             allow_sets=allow_sets,
             simplify_expression=simplify_expression,
         )
 
+        # Store the LaTeX for display with the submission, so that render()
+        # doesn't need to parse it again for every view.
+        a_sub_json["_latex"] = _get_display_latex(
+            a_sub_display,
+            imaginary_unit,
+            display_log_as_ln=pl.get_boolean_attrib(
+                element, "display-log-as-ln", DISPLAY_LOG_AS_LN_DEFAULT
+            ),
+        )
+        a_sub_json["_latex_source"] = _get_display_latex_source(element)
+
         # Finally, store the result
         data["submitted_answers"][name] = a_sub_json
     except Exception:
@@ -801,8 +898,7 @@ def _add_multiplication_spaces(text: str, protected_tokens: list[str]) -> str:
     return "".join(result)
 
 
-def grade(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def grade(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
     variables = psu.get_items_list(
         pl.get_string_attrib(element, "variables", VARIABLES_DEFAULT)
@@ -896,7 +992,9 @@ def grade(element_html: str, data: pl.QuestionData) -> None:
         if isinstance(a_tru_sympy, sympy.Set) or isinstance(a_sub_sympy, sympy.Set):
             return a_tru_sympy == a_sub_sympy, None
 
-        return a_tru_sympy.equals(a_sub_sympy) is True, None
+        # This compares the expressions numerically before falling back to
+        # `equals()`, which can take seconds to simplify their difference.
+        return psu.expressions_equal(a_tru_sympy, a_sub_sympy), None
 
     try:
         pl.grade_answer_parameterized(
@@ -924,8 +1022,7 @@ def grade(element_html: str, data: pl.QuestionData) -> None:
             raise
 
 
-def test(element_html: str, data: pl.ElementTestData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def test(element: lxml.html.HtmlElement, data: pl.ElementTestData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
     variables = psu.get_items_list(
         pl.get_string_attrib(element, "variables", VARIABLES_DEFAULT)
@@ -3,6 +3,7 @@ import string
 from pathlib import Path
 from typing import Any
 
+import lxml.html
 import prairielearn.sympy_utils as psu
 import pytest
 import sympy
@@ -38,6 +39,7 @@ def make_question_data(
         ),
         "correct_answers": correct_answers or {},
         "answers_names": answers_names or {},
+        "params": {},
         "format_errors": {},
         "partial_scores": {},
         "panel": panel,
@@ -94,8 +96,8 @@ def test_set_union_submission_parses_when_set_notation_is_enabled() -> None:
     )
     data = make_question_data(submitted_answers={"test": "{1} | {2}"})
 
-    symbolic_input.prepare(element_html, data)
-    symbolic_input.parse(element_html, data)
+    symbolic_input.prepare(lxml.html.fragment_fromstring(element_html), data)
+    symbolic_input.parse(lxml.html.fragment_fromstring(element_html), data)
 
     assert "test" not in data["format_errors"]
     assert isinstance(data["submitted_answers"]["test"], dict)
@@ -204,7 +206,7 @@ def test_parse_without_variables_attribute_with_assumptions() -> None:
     )
 
     # This should NOT raise HasInvalidAssumptionError
-    symbolic_input.parse(element_html, data)
+    symbolic_input.parse(lxml.html.fragment_fromstring(element_html), data)
 
     # Verify the submission was parsed successfully
     assert "test" not in data["format_errors"]
@@ -230,7 +232,7 @@ def test_implicit_complex_rejected_with_no_simplify(a_sub: str) -> None:
         correct_answers={"test": correct_answer},
     )
 
-    symbolic_input.parse(element_html, data)
+    symbolic_input.parse(lxml.html.fragment_fromstring(element_html), data)
 
     assert "test" in data["format_errors"]
     assert "complex number" in data["format_errors"]["test"]
@@ -254,7 +256,7 @@ def test_complex_from_real_assumptions_produces_format_error(a_sub: str) -> None
         correct_answers={"test": correct_answer},
     )
 
-    symbolic_input.parse(element_html, data)
+    symbolic_input.parse(lxml.html.fragment_fromstring(element_html), data)
 
     assert "test" in data["format_errors"]
     assert "complex number" in data["format_errors"]["test"]
@@ -284,7 +286,7 @@ def test_trig_no_crash_with_no_simplify(a_sub: str) -> None:
         correct_answers={"test": correct_answer},
     )
 
-    symbolic_input.parse(element_html, data)
+    symbolic_input.parse(lxml.html.fragment_fromstring(element_html), data)
 
     assert "test" not in data["format_errors"], (
         f"Unexpected format error: {data['format_errors'].get('test')}"
@@ -304,8 +306,8 @@ def test_formula_editor_initial_value_respects_display_log_as_ln(
     )
     data = make_question_data()
 
-    symbolic_input.prepare(element_html, data)
-    rendered = symbolic_input.render(element_html, data)
+    symbolic_input.prepare(lxml.html.fragment_fromstring(element_html), data)
+    rendered = symbolic_input.render(lxml.html.fragment_fromstring(element_html), data)
 
     assert "\\ln{\\left(x \\right)}" in rendered
     assert "\\log{\\left(x \\right)}" not in rendered
@@ -337,10 +339,10 @@ def test_interval_endpoints_support_trig_and_arithmetic_expressions(
     )
     data = make_question_data(submitted_answers={"test": answer})
 
-    symbolic_input.prepare(element_html, data)
+    symbolic_input.prepare(lxml.html.fragment_fromstring(element_html), data)
     assert data["correct_answers"]["test"] == answer
 
-    symbolic_input.parse(element_html, data)
+    symbolic_input.parse(lxml.html.fragment_fromstring(element_html), data)
     assert "test" not in data["format_errors"]
     assert isinstance(data["submitted_answers"]["test"], dict)
     assert data["submitted_answers"]["test"]["_type"] == "sympy"
@@ -349,7 +351,7 @@ def test_interval_endpoints_support_trig_and_arithmetic_expressions(
         == expected_expr
     )
 
-    symbolic_input.grade(element_html, data)
+    symbolic_input.grade(lxml.html.fragment_fromstring(element_html), data)
     assert data["partial_scores"]["test"]["score"] == 1
 
 
@@ -363,8 +365,8 @@ def test_interval_correct_answer_renders(
     )
     data = make_question_data(panel="answer", editable=False)
 
-    symbolic_input.prepare(element_html, data)
-    rendered = symbolic_input.render(element_html, data)
+    symbolic_input.prepare(lxml.html.fragment_fromstring(element_html), data)
+    rendered = symbolic_input.render(lxml.html.fragment_fromstring(element_html), data)
 
     assert "\\left[1, 2\\right] \\cup \\left[3, 4\\right]" in rendered
 
@@ -376,8 +378,8 @@ def test_empty_set_submission_round_trips_when_set_notation_is_enabled() -> None
     )
     data = make_question_data(submitted_answers={"test": "{}"})
 
-    symbolic_input.prepare(element_html, data)
-    symbolic_input.parse(element_html, data)
+    symbolic_input.prepare(lxml.html.fragment_fromstring(element_html), data)
+    symbolic_input.parse(lxml.html.fragment_fromstring(element_html), data)
 
     assert "test" not in data["format_errors"]
     assert isinstance(data["submitted_answers"]["test"], dict)
@@ -386,7 +388,7 @@ def test_empty_set_submission_round_trips_when_set_notation_is_enabled() -> None
         == sympy.EmptySet
     )
 
-    symbolic_input.grade(element_html, data)
+    symbolic_input.grade(lxml.html.fragment_fromstring(element_html), data)
     assert data["partial_scores"]["test"]["score"] == 1
 
 
@@ -401,4 +403,113 @@ def test_additional_simplifications_cannot_be_used_with_set_notation() -> None:
     with pytest.raises(
         ValueError, match=(r"'additional-simplifications'.*'allow-sets'")
     ):
-        symbolic_input.prepare(element_html, data)
+        symbolic_input.prepare(lxml.html.fragment_fromstring(element_html), data)
+
+
+@pytest.mark.parametrize(
+    ("attributes", "a_sub", "expected"),
+    [
+        (('variables="x"',), "x^2 + 2x", "x^{2} + 2 x"),
+        (('variables="x"', 'display-log-as-ln="true"'), "log(x)", "\\ln{\\left(x"),
+        (
+            ('allow-complex="true"', 'imaginary-unit-for-display="j"'),
+            "3 + 4i",
+            "4 j + 3",
+        ),
+        (('allow-sets="true"',), "[1, 2] U {3}", "\\left[1, 2\\right] \\cup"),
+    ],
+)
+def test_render_uses_latex_stored_at_parse_and_prepare(
+    monkeypatch: pytest.MonkeyPatch,
+    attributes: tuple[str, ...],
+    a_sub: str,
+    expected: str,
+) -> None:
+    monkeypatch.chdir(Path(__file__).parent)
+    monkeypatch.setattr(symbolic_input.pl, "get_uuid", lambda: "uuid")
+    element_html = build_element_html(*attributes, f'correct-answer="{a_sub}"')
+    data = make_question_data(
+        submitted_answers={"test": a_sub}, raw_submitted_answers={"test": a_sub}
+    )
+
+    symbolic_input.prepare(lxml.html.fragment_fromstring(element_html), data)
+    symbolic_input.parse(lxml.html.fragment_fromstring(element_html), data)
+    assert "test" not in data["format_errors"]
+    assert expected in data["submitted_answers"]["test"]["_latex"]
+
+    # Renders that only fill in the template must not need SymPy at all.
+    def fail(*args: Any, **kwargs: Any) -> None:
+        raise AssertionError("render() should not parse or format expressions")
+
+    with monkeypatch.context() as m:
+        m.setattr(psu, "json_to_sympy", fail)
+        m.setattr(psu, "convert_string_to_sympy", fail)
+        m.setattr(sympy, "latex", fail)
+        cached = {}
+        for panel in ("submission", "answer"):
+            data["panel"] = panel
+            cached[panel] = symbolic_input.render(
+                lxml.html.fragment_fromstring(element_html), data
+            )
+            assert expected in cached[panel]
+
+    # Submissions and variants from before the LaTeX was stored are rendered the same.
+    del data["submitted_answers"]["test"]["_latex"]
+    del data["params"][symbolic_input.DISPLAY_LATEX_PARAMS_KEY]
+    for panel in ("submission", "answer"):
+        data["panel"] = panel
+        rendered = symbolic_input.render(
+            lxml.html.fragment_fromstring(element_html), data
+        )
+        assert rendered == cached[panel]
+
+
+def test_render_ignores_stale_stored_latex(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(Path(__file__).parent)
+    monkeypatch.setattr(symbolic_input.pl, "get_uuid", lambda: "uuid")
+    element_html = build_element_html('variables="x"', 'correct-answer="log(x)"')
+    data = make_question_data(submitted_answers={"test": "log(x)"})
+    symbolic_input.prepare(lxml.html.fragment_fromstring(element_html), data)
+    symbolic_input.parse(lxml.html.fragment_fromstring(element_html), data)
+
+    # `server.py` runs its `prepare()` after the elements, and `parse()` and
+    # `grade()` may also change the correct answer.
+    data["correct_answers"]["test"] = "x^2"
+    data["panel"] = "answer"
+    rendered = symbolic_input.render(lxml.html.fragment_fromstring(element_html), data)
+    assert "x^{2}" in rendered
+
+    # The question may change how expressions are displayed after the variant
+    # was prepared and the answer was submitted.
+    element_html = build_element_html(
+        'variables="x"', 'correct-answer="log(x)"', 'display-log-as-ln="true"'
+    )
+    data["correct_answers"]["test"] = "log(x)"
+    for panel in ("submission", "answer"):
+        data["panel"] = panel
+        rendered = symbolic_input.render(
+            lxml.html.fragment_fromstring(element_html), data
+        )
+        assert "\\ln{\\left(x" in rendered
+
+
+@pytest.mark.parametrize(
+    ("a_tru", "a_sub", "score"),
+    [
+        (sympy.oo, "infty", 1),
+        (-sympy.oo, "-infty", 1),
+        (sympy.Symbol("x") + sympy.oo, "x + infty", 1),
+        (sympy.oo, "-infty", 0),
+    ],
+)
+def test_grade_infinities(a_tru: sympy.Expr, a_sub: str, score: float) -> None:
+    element = lxml.html.fragment_fromstring(build_element_html('variables="x"'))
+    data = make_question_data(
+        submitted_answers={"test": a_sub},
+        correct_answers={"test": psu.sympy_to_json(a_tru)},
+    )
+
+    symbolic_input.parse(element, data)
+    symbolic_input.grade(element, data)
+
+    assert data["partial_scores"]["test"]["score"] == score
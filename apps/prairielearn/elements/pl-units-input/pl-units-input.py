@@ -8,6 +8,8 @@ import prairielearn as pl
 import unit_utils as uu
 from pint import UnitRegistry, errors
 
+PARSED_ELEMENT = True
+
 
 class DisplayType(Enum):
     INLINE = "inline"
@@ -62,8 +64,7 @@ def get_with_units_atol(
     return f"{ATOL_DEFAULT} {correct_answer_units}"
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     required_attribs = ["answers-name"]
     optional_attribs = [
         "weight",
@@ -121,7 +122,7 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
             f"Number of digits specified must be at least 1, not {digits}."
         )
 
-    ureg = pl.get_unit_registry()
+    ureg = uu.get_shared_unit_registry()
 
     grading_mode = pl.get_enum_attrib(
         element, "grading-mode", GradingMode, GRADING_MODE_DEFAULT
@@ -167,8 +168,7 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
             )
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
-    element = lxml.html.fragment_fromstring(element_html)
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     name = pl.get_string_attrib(element, "answers-name")
     label = pl.get_string_attrib(element, "label", LABEL_DEFAULT)
     aria_label = pl.get_string_attrib(element, "aria-label", ARIA_LABEL_DEFAULT)
@@ -198,10 +198,9 @@ def render(element_html: str, data: pl.QuestionData) -> str:
     score = partial_scores.get("score")
 
     parse_error = data["format_errors"].get(name)
-    ureg = pl.get_unit_registry()
+    ureg = uu.get_shared_unit_registry()
 
-    with open(UNITS_INPUT_MUSTACHE_TEMPLATE_NAME, encoding="utf-8") as f:
-        template = f.read()
+    template = pl.load_template(UNITS_INPUT_MUSTACHE_TEMPLATE_NAME)
 
     if data["panel"] == "question":
         editable = data["editable"]
@@ -334,8 +333,7 @@ def render(element_html: str, data: pl.QuestionData) -> str:
     assert_never(data["panel"])
 
 
-def parse(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def parse(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
     allow_blank = pl.get_boolean_attrib(element, "allow-blank", ALLOW_BLANK_DEFAULT)
 
@@ -366,7 +364,7 @@ def parse(element_html: str, data: pl.QuestionData) -> None:
             data["submitted_answers"][name] = None
             return
 
-    ureg = pl.get_unit_registry()
+    ureg = uu.get_shared_unit_registry()
 
     # checks for invalids by parsing as a dimensionful quantity
     try:
@@ -410,8 +408,7 @@ def parse(element_html: str, data: pl.QuestionData) -> None:
         data["submitted_answers"][name] = str(a_sub_parsed)
 
 
-def grade(element_html: str, data: pl.QuestionData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def grade(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
     weight = pl.get_integer_attrib(element, "weight", WEIGHT_DEFAULT)
     grading_mode = pl.get_enum_attrib(
@@ -425,7 +422,7 @@ def grade(element_html: str, data: pl.QuestionData) -> None:
 
     # Store cache on system. Needed to prevent slow grading / parsing times
     # due to object creation
-    ureg = pl.get_unit_registry()
+    ureg = uu.get_shared_unit_registry()
 
     if a_sub == "" or a_tru == "":
         grading_fn = uu.get_blank_grading_function(correct_ans=a_tru)
@@ -458,8 +455,7 @@ def grade(element_html: str, data: pl.QuestionData) -> None:
     pl.grade_answer_parameterized(data, name, grading_fn, weight)
 
 
-def test(element_html: str, data: pl.ElementTestData) -> None:
-    element = lxml.html.fragment_fromstring(element_html)
+def test(element: lxml.html.HtmlElement, data: pl.ElementTestData) -> None:
     name = pl.get_string_attrib(element, "answers-name")
     weight = pl.get_integer_attrib(element, "weight", WEIGHT_DEFAULT)
     result = data["test_type"]
@@ -475,7 +471,7 @@ def test(element_html: str, data: pl.ElementTestData) -> None:
     grading_mode = pl.get_enum_attrib(
         element, "grading-mode", GradingMode, GRADING_MODE_DEFAULT
     )
-    ureg = pl.get_unit_registry()
+    ureg = uu.get_shared_unit_registry()
     if result == "correct":
         if (
             isinstance(a_tru, str)
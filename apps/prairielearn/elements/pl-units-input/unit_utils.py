@@ -1,3 +1,4 @@
+import functools
 from collections.abc import Callable
 from enum import Enum
 from typing import Any, assert_never
@@ -18,6 +19,17 @@ INCORRECT_UNITS_AND_MAGNITUDE_FEEDBACK = (
 INCORRECT_FEEDBACK = "Your answer is incorrect."
 
 
+@functools.cache
+def get_shared_unit_registry() -> UnitRegistry:
+    """Return the unit registry that this element uses, which is built once per process.
+
+    The zygote builds it before forking workers, so that they inherit it.
+    Question code gets its own registries from `pl.get_unit_registry()`, so
+    units that it defines never reach this one.
+    """
+    return pl.get_unit_registry()
+
+
 class ComparisonType(Enum):
     RELABS = "relabs"
     SIGFIG = "sigfig"
@@ -2,6 +2,7 @@ import importlib
 from pathlib import Path
 from typing import Any
 
+import lxml.html
 import pytest
 
 variable_output = importlib.import_module("pl-variable-output")
@@ -18,8 +19,8 @@ def render_variable_output(
     monkeypatch.chdir(Path(__file__).parent)
     data = make_question_data()
 
-    variable_output.prepare(element_html, data)
-    return variable_output.render(element_html, data)
+    variable_output.prepare(lxml.html.fragment_fromstring(element_html), data)
+    return variable_output.render(lxml.html.fragment_fromstring(element_html), data)
 
 
 @pytest.mark.parametrize("default_tab", ["numpy", "python"])
@@ -85,4 +86,6 @@ def test_show_numpy_and_show_python_cannot_both_be_set(
         ValueError,
         match='Cannot set both "show-numpy" and "show-python" attributes',
     ):
-        variable_output.render(element_html, make_question_data())
+        variable_output.render(
+            lxml.html.fragment_fromstring(element_html), make_question_data()
+        )
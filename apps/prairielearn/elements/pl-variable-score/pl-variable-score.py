@@ -3,22 +3,22 @@ import math
 import lxml.html
 import prairielearn as pl
 
+PARSED_ELEMENT = True
+
 use_pl_variable_score = False
 
 
-def prepare(element_html: str, data: pl.QuestionData) -> None:
+def prepare(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     if not use_pl_variable_score:
         return
 
-    element = lxml.html.fragment_fromstring(element_html)
     pl.check_attribs(element, required_attribs=["answers-name"], optional_attribs=[])
 
 
-def render(element_html: str, data: pl.QuestionData) -> str:
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     if not use_pl_variable_score:
         return ""
 
-    element = lxml.html.fragment_fromstring(element_html)
     name = pl.get_string_attrib(element, "answers-name")
 
     if data["panel"] == "answer":
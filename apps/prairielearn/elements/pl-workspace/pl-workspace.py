@@ -1,8 +1,10 @@
-import chevron
+import lxml.html
 import prairielearn as pl
 
+PARSED_ELEMENT = True
 
-def render(element_html: str, data: pl.QuestionData) -> str:
+
+def render(element: lxml.html.HtmlElement, data: pl.QuestionData) -> str:
     if data["panel"] != "question":
         return ""
 
@@ -16,11 +18,10 @@ def render(element_html: str, data: pl.QuestionData) -> str:
 
     # Create and return html
     html_params = {"workspace_url": workspace_url}
-    with open("pl-workspace.mustache", encoding="utf-8") as f:
-        return chevron.render(f, html_params).strip()
+    return pl.render_template("pl-workspace.mustache", html_params).strip()
 
 
-def parse(element_html: str, data: pl.QuestionData) -> None:
+def parse(element: lxml.html.HtmlElement, data: pl.QuestionData) -> None:
     workspace_required_file_names = data["params"].get(
         "_workspace_required_file_names", []
     )
@@ -0,0 +1,137 @@
+"""Measure the cost of checking that elements don't illegally modify `data`.
+
+`question_phases.process()` used to deep-copy `data` up front and compare every
+prop that can't be modified in the current phase after each element. It now
+replaces those props with read-only copies instead. This runs the `parse`,
+`grade`, and `test` phases of a synthetic page with many `pl-number-input`
+elements and a large `params`, and prints:
+
+- the cost of the checks alone, with the previous and the current approach;
+- the time `process()` takes for the whole page.
+
+Usage:
+
+    uv run python apps/prairielearn/python/benchmarks/data_checks.py
+"""
+
+import copy
+import os
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prairielearn.internal import question_phases
+from prairielearn.internal.check_data import Phase, check_data, protect_data
+
+ELEMENT_COUNTS = [10, 50, 100]
+PHASES: list[Phase] = ["parse", "grade", "test"]
+MATRIX_SIZE = 100
+REPEAT = 5
+
+
+def make_data(num_elements: int, phase: Phase) -> dict[str, Any]:
+    names = [f"x{i}" for i in range(num_elements)]
+    matrix = [[float(i * j) for j in range(MATRIX_SIZE)] for i in range(MATRIX_SIZE)]
+    data: dict[str, Any] = {
+        "params": {"matrix": matrix, "labels": [str(i) for i in range(1000)]},
+        "correct_answers": dict.fromkeys(names, 1.5),
+        "variant_seed": 1,
+        "options": {"question_path": "/question", "course_path": "/course"},
+        "preferences": {},
+        "submitted_answers": dict.fromkeys(names, "1.5" if phase == "parse" else 1.5),
+        "format_errors": {},
+        "raw_submitted_answers": dict.fromkeys(names, "1.5"),
+        "partial_scores": {},
+        "score": 0,
+        "feedback": {},
+        "gradable": True,
+    }
+    if phase == "parse":
+        for key in ("partial_scores", "score"):
+            del data[key]
+    if phase == "test":
+        del data["submitted_answers"]
+        data["test_type"] = "correct"
+    return data
+
+
+def make_context(num_elements: int) -> question_phases.RenderContext:
+    return {
+        "html": "".join(
+            f'<pl-number-input answers-name="x{i}"></pl-number-input>'
+            for i in range(num_elements)
+        ),
+        "elements": {
+            "pl-number-input": {
+                "name": "pl-number-input",
+                "controller": "pl-number-input.py",
+                "type": "core",
+            }
+        },
+        "element_extensions": {},
+        "course_path": "/course",
+    }
+
+
+def legacy_checks(data: dict[str, Any], phase: Phase, num_elements: int) -> None:
+    original_data = copy.deepcopy(data)
+    for _ in range(num_elements):
+        data["extensions"] = original_data["extensions"] = {}
+        check_data(original_data, data, phase)
+        del data["extensions"], original_data["extensions"]
+
+
+def current_checks(data: dict[str, Any], phase: Phase, num_elements: int) -> None:
+    protected_values = protect_data(data, phase)
+    original_data = dict(data)
+    for _ in range(num_elements):
+        data["extensions"] = original_data["extensions"] = {}
+        check_data(original_data, data, phase)
+        del data["extensions"], original_data["extensions"]
+    data.update(protected_values)
+
+
+def best_time(fn: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(phase: Phase, num_elements: int) -> tuple[float, float, float]:
+    """Return the cost of the legacy and current checks, and the time for `process()`."""
+    setup = best_time(lambda: make_data(num_elements, phase))
+    legacy = best_time(
+        lambda: legacy_checks(make_data(num_elements, phase), phase, num_elements)
+    )
+    current = best_time(
+        lambda: current_checks(make_data(num_elements, phase), phase, num_elements)
+    )
+    context = make_context(num_elements)
+    process = best_time(
+        lambda: question_phases.process(phase, make_data(num_elements, phase), context)
+    )
+    return legacy - setup, current - setup, process - setup
+
+
+def main() -> None:
+    print(
+        f"{'phase':<6} {'elements':>8} {'legacy checks (ms)':>19} "
+        f"{'checks (ms)':>12} {'process() (ms)':>15}"
+    )
+    for phase in PHASES:
+        for num_elements in ELEMENT_COUNTS:
+            legacy, current, process = measure(phase, num_elements)
+            print(
+                f"{phase:<6} {num_elements:>8} {legacy * 1000:19.2f} "
+                f"{current * 1000:12.2f} {process * 1000:15.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Report the startup cost and per-request benefit of preloading core element controllers.
+
+The zygote compiles every core element controller before forking, and executes
+those selected by `PRELOAD_CORE_ELEMENTS`. This prints:
+
+- the time spent on each element in the zygote, in the order the zygote loads
+  them, along with how many `exampleCourse` questions use that element;
+- zygote startup time and mean request latency on `exampleCourse` questions
+  with nothing executed, and with every controller executed.
+
+Usage:
+
+    uv run python apps/prairielearn/python/benchmarks/element_preload.py [--limit N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from zygote_client import (
+    EXAMPLE_COURSE_PATH,
+    PYTHON_PATH,
+    QuestionRunner,
+    Zygote,
+    find_working_questions,
+    run_question,
+)
+
+MODES = {"compile only": "", "execute all": "all"}
+
+# Mirrors the modules that `zygote.py` preloads, then times each element.
+ELEMENT_TIMINGS_SCRIPT = """
+import warnings
+warnings.simplefilter("ignore")
+import chevron, lxml.html, matplotlib, nltk, numpy, pint, prairielearn, sklearn
+from prairielearn.internal import question_phases
+names = question_phases.get_core_element_controllers()
+for name, seconds in question_phases.preload_core_elements(names).items():
+    print(name, seconds)
+"""
+
+
+def count_element_usage() -> dict[str, int]:
+    usage: dict[str, int] = {}
+    for path in (EXAMPLE_COURSE_PATH / "questions").glob("**/question.html"):
+        html = path.read_text()
+        for name in set(html.split("<")[1:]):
+            tag = name.split(maxsplit=1)[0].rstrip(">/") if name.strip() else ""
+            if tag.startswith("pl-"):
+                usage[tag] = usage.get(tag, 0) + 1
+    return usage
+
+
+def report_element_timings() -> None:
+    output = subprocess.run(
+        [sys.executable, "-c", ELEMENT_TIMINGS_SCRIPT],
+        cwd=PYTHON_PATH,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    usage = count_element_usage()
+
+    print(f"{'element':<32} {'load (ms)':>10} {'questions':>10}")
+    total = 0.0
+    for line in output.splitlines():
+        name, seconds = line.split()
+        total += float(seconds)
+        print(f"{name:<32} {float(seconds) * 1000:10.1f} {usage.get(name, 0):10}")
+    print(f"{'total':<32} {total * 1000:10.1f}")
+
+
+def measure(preload: str, runners: list[QuestionRunner]) -> tuple[float, float]:
+    """Return the zygote startup time and the mean request latency, in seconds."""
+    start = time.perf_counter()
+    zygote = Zygote({"PRELOAD_CORE_ELEMENTS": preload})
+    zygote.send({"file": None, "fcn": "ping", "args": []})
+    startup = time.perf_counter() - start
+
+    latencies: list[float] = []
+    for runner in runners:
+        start = time.perf_counter()
+        for _ in run_question(zygote, runner, 1):
+            latencies.append(time.perf_counter() - start)
+            start = time.perf_counter()
+
+    zygote.close()
+    return startup, statistics.mean(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+
+    report_element_timings()
+    print()
+
+    runners = find_working_questions(args.limit)
+    print(f"questions: {len(runners)}")
+    os.environ.pop("PRELOAD_CORE_ELEMENTS", None)
+    for name, preload in MODES.items():
+        startup, latency = measure(preload, runners)
+        print(
+            f"{name:<14} startup: {startup * 1000:8.1f} ms"
+            f"   request latency: {latency * 1000:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
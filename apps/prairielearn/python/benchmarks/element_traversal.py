@@ -0,0 +1,133 @@
+"""Measure how long the non-render phases take on long, text-heavy questions.
+
+Each synthetic question has a few input elements inside `pl-question-panel`
+and `pl-answer-panel`, surrounded by paragraphs of text with inline markup,
+like a long reading or case study. For each question size, this prints the
+best time to parse the question and visit every element (what `process()`
+used to do in every phase other than `render`), to visit only the elements
+with a tag in the `elements` map, and to run the `prepare`, `parse`, and
+`grade` phases, in which the panels are skipped since they don't implement
+them.
+
+Usage:
+
+    uv run python apps/prairielearn/python/benchmarks/element_traversal.py [--rounds N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prairielearn.internal import question_phases
+from prairielearn.internal.traverse import iterate_elements
+
+PARAGRAPH_COUNTS = [10, 100, 1000]
+
+PARAGRAPH = (
+    "<p>The <b>quick</b> brown fox <i>jumps</i> over the lazy dog, and "
+    '<a href="#">the dog</a> doesn\'t mind at all. <code>x = 1</code>; '
+    "<span>then</span> the <em>fox</em> runs <strong>away</strong>.</p>"
+)
+
+INPUTS = (
+    '<pl-number-input answers-name="a" label="$a =$"></pl-number-input>'
+    '<pl-number-input answers-name="b" label="$b =$"></pl-number-input>'
+    '<pl-string-input answers-name="c" label="$c =$"></pl-string-input>'
+)
+
+
+def make_context(num_paragraphs: int) -> question_phases.RenderContext:
+    half = PARAGRAPH * (num_paragraphs // 2)
+    elements: dict[str, question_phases.ElementInfo] = {}
+    for name, controller_path in question_phases.get_core_element_controllers().items():
+        info: question_phases.ElementInfo = {
+            "name": name,
+            "controller": controller_path.name,
+            "type": "core",
+        }
+        elements[name] = info
+        elements[name.replace("-", "_")] = info
+    return {
+        "html": f"<pl-question-panel>{half}{INPUTS}{half}</pl-question-panel>"
+        f"<pl-answer-panel>{half}</pl-answer-panel>",
+        "elements": elements,
+        "element_extensions": {},
+        "course_path": "/course",
+    }
+
+
+def make_data() -> dict[str, Any]:
+    return {
+        "params": {},
+        "correct_answers": {},
+        "variant_seed": 1,
+        "options": {},
+        "preferences": {},
+        "answers_names": {},
+    }
+
+
+def run_phases(context: question_phases.RenderContext) -> None:
+    data = make_data()
+    question_phases.process("prepare", data, context)
+    data.pop("answers_names")
+    data["correct_answers"] = {"a": 1, "b": 2, "c": "x"}
+    data.update({
+        "submitted_answers": {"a": "1", "b": "3", "c": "x"},
+        "raw_submitted_answers": {"a": "1", "b": "3", "c": "x"},
+        "format_errors": {},
+        "gradable": True,
+    })
+    question_phases.process("parse", data, context)
+    data.update({"partial_scores": {}, "score": 0, "feedback": {}})
+    question_phases.process("grade", data, context)
+    assert data["partial_scores"]["b"]["score"] == 0
+
+
+def best_time(fn: Callable[[], object], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(num_paragraphs: int, rounds: int) -> tuple[float, float, float]:
+    context = make_context(num_paragraphs)
+    html, elements = context["html"], context["elements"]
+    # Execute the controllers once, like a worker forked from the zygote.
+    run_phases(context)
+
+    all_nodes = best_time(lambda: sum(1 for _ in iterate_elements(html)), rounds)
+    only_elements = best_time(
+        lambda: sum(1 for _ in iterate_elements(html, elements)), rounds
+    )
+    phases = best_time(lambda: run_phases(context), rounds)
+    return all_nodes, only_elements, phases
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    print(
+        f"{'paragraphs':>10} {'all nodes (ms)':>15} {'elements (ms)':>14} "
+        f"{'prepare+parse+grade (ms)':>25}"
+    )
+    for num_paragraphs in PARAGRAPH_COUNTS:
+        all_nodes, only_elements, phases = measure(num_paragraphs, args.rounds)
+        print(
+            f"{num_paragraphs:>10} {all_nodes * 1000:15.2f} "
+            f"{only_elements * 1000:14.2f} {phases * 1000:25.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Compare newline-delimited and length-prefixed framing between the code caller and the zygote.
+
+For each payload size, this times round trips through a zygote worker in both
+protocols:
+
+- `request`: a `prepare()` call whose `data` carries a string of that size,
+  which the worker must read, decode, and echo back;
+- `file`: a `file()` call that returns that many random bytes, which the line
+  protocol sends as base64 and the framed protocol sends as a raw body.
+
+Times include decoding the response on the client side, including base64
+decoding for the line protocol. For each call, this also reports how much a
+single call raised the peak RSS of a fresh worker, read from `VmHWM` in
+`/proc/<pid>/status`, so it only runs on Linux.
+
+Usage:
+
+    uv run python apps/prairielearn/python/benchmarks/framing.py [--repeat N]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from zygote_client import Zygote
+
+SIZES_MB = [1, 10, 50]
+
+SERVER_PY = """
+import os
+
+def generate(data):
+    data["params"]["pid"] = os.getpid()
+
+def prepare(data):
+    data["params"]["echo"] = data["params"]["payload"]
+
+def file(data):
+    return os.urandom(data["params"]["size"])
+"""
+
+
+def make_data(fcn: str, size: int) -> dict[str, Any]:
+    payload = "x" * size if fcn == "prepare" else ""
+    return {"params": {"size": size, "payload": payload}, "options": {}}
+
+
+def check_result(fcn: str, size: int, result: Any) -> None:
+    if fcn == "file":
+        assert len(result) == size
+    else:
+        assert len(result["params"]["echo"]) == size
+
+
+def time_calls(zygote: Zygote, cwd: Path, fcn: str, size: int, repeat: int) -> float:
+    """Return the median time of a `server.py` call, in seconds."""
+    data = make_data(fcn, size)
+    times: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = zygote.call("server", fcn, [data], cwd)
+        times.append(time.perf_counter() - start)
+        check_result(fcn, size, result)
+    return statistics.median(times)
+
+
+def read_peak_rss(pid: int) -> int:
+    """Return the peak RSS of a process, in bytes."""
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if line.startswith("VmHWM:"):
+            return int(line.split()[1]) * 1024
+    raise RuntimeError(f"/proc/{pid}/status has no VmHWM")
+
+
+def measure_peak_rss(zygote: Zygote, cwd: Path, fcn: str, size: int) -> int:
+    """Return how much one `server.py` call raises the peak RSS of a new worker, in bytes."""
+    zygote.restart()
+    data = zygote.call("server", "generate", [make_data("generate", 0)], cwd)
+    pid = data["params"]["pid"]
+    data = make_data(fcn, size)
+    before = read_peak_rss(pid)
+    check_result(fcn, size, zygote.call("server", fcn, [data], cwd))
+    return read_peak_rss(pid) - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as question_dir:
+        cwd = Path(question_dir)
+        (cwd / "server.py").write_text(SERVER_PY)
+
+        zygotes = {"line": Zygote(), "framed": Zygote(framed=True)}
+        for zygote in zygotes.values():
+            zygote.send({"file": None, "fcn": "ping", "args": []})
+
+        print(
+            f"{'call':<8} {'size':>6} {'line (ms)':>10} {'framed (ms)':>12} {'speedup':>8}"
+            f" {'line RSS (MB)':>14} {'framed RSS (MB)':>16}"
+        )
+        for fcn, name in [("prepare", "request"), ("file", "file")]:
+            for size_mb in SIZES_MB:
+                size = size_mb * 1024 * 1024
+                line, framed = (
+                    time_calls(zygote, cwd, fcn, size, args.repeat)
+                    for zygote in zygotes.values()
+                )
+                line_rss, framed_rss = (
+                    measure_peak_rss(zygote, cwd, fcn, size) / 1024 / 1024
+                    for zygote in zygotes.values()
+                )
+                print(
+                    f"{name:<8} {size_mb:>4}MB {line * 1000:10.1f} "
+                    f"{framed * 1000:12.1f} {line / framed:7.2f}x"
+                    f" {line_rss:14.1f} {framed_rss:16.1f}"
+                )
+
+        for zygote in zygotes.values():
+            zygote.close()
+
+
+if __name__ == "__main__":
+    main()
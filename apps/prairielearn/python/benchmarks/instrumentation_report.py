@@ -0,0 +1,138 @@
+"""Summarize a log of zygote instrumentation blocks into a "slowest elements" report.
+
+Run the zygote with `ZYGOTE_INSTRUMENTATION=rss` (or `tracemalloc`) and
+`ZYGOTE_INSTRUMENTATION_LOG` pointing to a file, use PrairieLearn as usual,
+and then pass that file to this script. It prints:
+
+- the element and question functions with the most total wall time, grouped
+  by name and phase, with their call counts, mean, 95th percentile, and
+  maximum wall time, total CPU time, and maximum memory;
+- the modules with the most total compile and execution time;
+- the hit rate of each cache, like the file cache, by file;
+- the total time spent decoding requests and encoding responses.
+
+Usage:
+
+    uv run python apps/prairielearn/python/benchmarks/instrumentation_report.py LOG [--top N] [--by-source]
+"""
+
+import argparse
+import json
+import statistics
+from collections import defaultdict
+from typing import Any
+
+
+def percentile(values: list[float], p: float) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[round(p) - 1]
+
+
+def read_blocks(paths: list[str]) -> list[dict[str, Any]]:
+    blocks: list[dict[str, Any]] = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            blocks.extend(json.loads(line) for line in f if line.strip())
+    return blocks
+
+
+def report_calls(blocks: list[dict[str, Any]], top: int, *, by_source: bool) -> None:
+    calls: dict[tuple[str, str], list[dict[str, Any]]] = defaultdict(list)
+    for block in blocks:
+        for call in block["calls"]:
+            name = call["source"] if by_source and call["source"] else call["name"]
+            calls[name, call["phase"]].append(call)
+
+    rows = sorted(
+        calls.items(),
+        key=lambda item: sum(call["wall_time"] for call in item[1]),
+        reverse=True,
+    )[:top]
+    metrics = {block["memory_metric"] for block in blocks}
+    print(f"Slowest calls (memory: {', '.join(sorted(metrics)) or 'none'})")
+    print(
+        f"{'name':<48} {'phase':<8} {'calls':>6} {'total (ms)':>11} "
+        f"{'mean':>8} {'p95':>8} {'max':>8} {'cpu (ms)':>9} {'memory (KiB)':>13}"
+    )
+    for (name, phase), group in rows:
+        wall = [call["wall_time"] * 1000 for call in group]
+        cpu = sum(call["cpu_time"] for call in group) * 1000
+        memory = max(call["memory"] for call in group) / 1024
+        print(
+            f"{name[:48]:<48} {phase:<8} {len(group):>6} {sum(wall):11.1f} "
+            f"{statistics.mean(wall):8.2f} {percentile(wall, 95):8.2f} "
+            f"{max(wall):8.2f} {cpu:9.1f} {memory:13.0f}"
+        )
+
+
+def report_modules(blocks: list[dict[str, Any]], top: int) -> None:
+    modules: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for block in blocks:
+        for module in block["modules"]:
+            modules[module["path"]].append(module)
+
+    rows = sorted(
+        modules.items(),
+        key=lambda item: sum(m["compile_time"] + m["exec_time"] for m in item[1]),
+        reverse=True,
+    )[:top]
+    print("Slowest module loads")
+    print(f"{'path':<64} {'loads':>6} {'compile (ms)':>13} {'exec (ms)':>10}")
+    for path, group in rows:
+        compile_time = sum(m["compile_time"] for m in group) * 1000
+        exec_time = sum(m["exec_time"] for m in group) * 1000
+        print(
+            f"{path[-64:]:<64} {len(group):>6} {compile_time:13.1f} {exec_time:10.1f}"
+        )
+
+
+def report_caches(blocks: list[dict[str, Any]], top: int) -> None:
+    counts: dict[tuple[str, str], dict[str, int]] = defaultdict(
+        lambda: {"hits": 0, "misses": 0}
+    )
+    # Blocks written before caches were instrumented don't have this field.
+    for block in blocks:
+        for cache, names in block.get("caches", {}).items():
+            for name, name_counts in names.items():
+                for outcome, count in name_counts.items():
+                    counts[cache, name][outcome] += count
+
+    rows = sorted(counts.items(), key=lambda item: sum(item[1].values()), reverse=True)
+    print("Cache lookups")
+    print(f"{'cache':<8} {'name':<48} {'lookups':>8} {'hits':>6} {'hit rate':>9}")
+    for (cache, name), group in rows[:top]:
+        lookups = sum(group.values())
+        hit_rate = group["hits"] / lookups
+        print(
+            f"{cache:<8} {name[:48]:<48} {lookups:>8} {group['hits']:>6} {hit_rate:9.1%}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("logs", nargs="+", help="files written by the zygote")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument(
+        "--by-source",
+        action="store_true",
+        help="group element calls by their opening tag instead of their name",
+    )
+    args = parser.parse_args()
+
+    blocks = read_blocks(args.logs)
+    print(f"{len(blocks)} instrumented requests")
+    print()
+    report_calls(blocks, args.top, by_source=args.by_source)
+    print()
+    report_modules(blocks, args.top)
+    print()
+    report_caches(blocks, args.top)
+    print()
+    decode = sum(block["json_decode_time"] for block in blocks) * 1000
+    encode = sum(block["json_encode_time"] for block in blocks) * 1000
+    print(f"JSON decode: {decode:.1f} ms, encode: {encode:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Compare the JSON serializers that the zygote can use on realistic question data.
+
+Payloads are the `question.html` render requests that `freeform.ts` would send
+for `exampleCourse` questions, built from each question's generated and prepared
+data, plus two questions whose `params` hold a 300x300 matrix of floats or of
+integers. For each
+serializer, this prints the total time to decode and encode every payload, with
+the previous implementation (a `parse_int` callback while decoding, a full walk
+of the object before encoding) as the baseline.
+
+Usage:
+
+    uv run python apps/prairielearn/python/benchmarks/json_serializer.py [--limit N]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+from zygote_client import PYTHON_PATH, QuestionRunner, Zygote, find_working_questions
+
+sys.path.insert(0, str(PYTHON_PATH))
+
+import prairielearn.internal.zygote_utils as zu
+
+
+def baseline_loads(data: bytes) -> Any:
+    return json.loads(data, parse_int=zu.safe_parse_int)
+
+
+def baseline_dumps(obj: Any) -> bytes:
+    zu.assert_all_integers_within_limits(obj)
+    return json.dumps(obj, allow_nan=False).encode()
+
+
+def collect_payloads(runners: list[QuestionRunner]) -> list[Any]:
+    payloads: list[Any] = []
+    zygote = Zygote()
+    for runner in runners:
+        data = runner.generate(zygote, 1)
+        data = runner.prepare(zygote, data)
+        zygote.restart()
+        payloads.append({
+            "file": "question.html",
+            "fcn": "render",
+            "args": [
+                {
+                    "html": runner.template,
+                    "elements": runner.elements,
+                    "element_extensions": runner.extensions,
+                    "course_path": str(runner.course_path),
+                },
+                data,
+            ],
+        })
+    zygote.close()
+
+    for value in [lambda: random.uniform(-1, 1), lambda: random.randint(-99, 99)]:
+        matrix = [[value() for _ in range(300)] for _ in range(300)]
+        large = json.loads(json.dumps(payloads[0]))
+        large["args"][1]["params"]["matrix"] = matrix
+        large["args"][1]["correct_answers"]["matrix"] = matrix
+        payloads.append(large)
+    return payloads
+
+
+def time_total(fn: Callable[[Any], Any], items: list[Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payloads = collect_payloads(find_working_questions(args.limit))
+    encoded = [json.dumps(payload).encode() for payload in payloads]
+    print(
+        f"payloads: {len(payloads)} "
+        f"({sum(map(len, encoded)) / len(encoded) / 1024:.1f} KiB mean, "
+        f"{max(map(len, encoded)) / 1024:.1f} KiB max)"
+    )
+
+    serializers: dict[str, tuple[Callable[[bytes], Any], Callable[[Any], bytes]]] = {
+        "baseline": (baseline_loads, baseline_dumps)
+    }
+    for name in ["json", "orjson"]:
+        serializer = zu.get_json_serializer(name)
+        if serializer.name == name:
+            serializers[name] = (serializer.loads, serializer.dumps)
+
+    print(f"{'serializer':<10} {'decode (ms)':>12} {'encode (ms)':>12}")
+    for name, (loads, dumps) in serializers.items():
+        decode = time_total(loads, encoded, args.repeat)
+        encode = time_total(dumps, payloads, args.repeat)
+        print(f"{name:<10} {decode * 1000:12.2f} {encode * 1000:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
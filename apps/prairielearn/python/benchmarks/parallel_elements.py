@@ -0,0 +1,123 @@
+"""Compare processing `pl-symbolic-input` elements one after another and in parallel.
+
+This runs the `parse` and `grade` phases of a synthetic page with 1, 4, and 16
+`pl-symbolic-input` elements, whose submitted answers are expanded forms of
+the correct answers, once with the element pool disabled and once with
+`PROCESSES` helpers. As in a worker, the helpers are forked the first time
+they are needed and shut down after the submission has been graded, so the
+parallel times include forking them. Prints the best time for each case.
+Parallel processing only pays off on machines with more than one CPU.
+
+Usage:
+
+    uv run python apps/prairielearn/python/benchmarks/parallel_elements.py
+"""
+
+import copy
+import os
+import sys
+import time
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prairielearn.internal import element_pool, question_phases
+
+ELEMENT_COUNTS = [1, 4, 16]
+PROCESSES = 4
+REPEAT = 3
+CORRECT_ANSWER = "(x + y + 1)**5"
+SUBMITTED_ANSWER = "(x^2 + 2x*y + y^2 + 2x + 2y + 1)^2 * (x + y + 1)"
+
+
+def make_context(num_elements: int) -> question_phases.RenderContext:
+    return {
+        "html": "".join(
+            f'<pl-symbolic-input answers-name="x{i}" variables="x, y">'
+            "</pl-symbolic-input>"
+            for i in range(num_elements)
+        ),
+        "elements": {
+            "pl-symbolic-input": {
+                "name": "pl-symbolic-input",
+                "controller": "pl-symbolic-input.py",
+                "type": "core",
+            }
+        },
+        "element_extensions": {},
+        "course_path": "/course",
+    }
+
+
+def prepare(
+    num_elements: int, context: question_phases.RenderContext
+) -> dict[str, Any]:
+    data: dict[str, Any] = {
+        "params": {},
+        "correct_answers": dict.fromkeys(
+            (f"x{i}" for i in range(num_elements)), CORRECT_ANSWER
+        ),
+        "variant_seed": 1,
+        "options": {},
+        "preferences": {},
+        "answers_names": {},
+    }
+    question_phases.process("prepare", data, context)
+    return data
+
+
+def submit(prepared: dict[str, Any], context: question_phases.RenderContext) -> None:
+    data: dict[str, Any] = {
+        "params": copy.deepcopy(prepared["params"]),
+        "correct_answers": copy.deepcopy(prepared["correct_answers"]),
+        "variant_seed": 1,
+        "options": {},
+        "preferences": {},
+        "submitted_answers": dict.fromkeys(
+            prepared["correct_answers"], SUBMITTED_ANSWER
+        ),
+        "format_errors": {},
+        "raw_submitted_answers": {},
+        "gradable": True,
+    }
+    question_phases.process("parse", data, context)
+    data.update({"partial_scores": {}, "score": 0, "feedback": {}})
+    question_phases.process("grade", data, context)
+    assert all(s["score"] == 1 for s in data["partial_scores"].values())
+    element_pool.shutdown()
+
+
+def best_time(
+    prepared: dict[str, Any], context: question_phases.RenderContext
+) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        submit(prepared, context)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    # Parallel processing can only pay off with more than one CPU.
+    print(f"CPUs: {os.cpu_count()}")
+    print(
+        f"{'elements':>8} {'serial (ms)':>12} "
+        f"{f'{PROCESSES} processes (ms)':>19} {'speedup':>8}"
+    )
+    for num_elements in ELEMENT_COUNTS:
+        context = make_context(num_elements)
+        prepared = prepare(num_elements, context)
+        element_pool.configure(0)
+        serial = best_time(prepared, context)
+        element_pool.configure(PROCESSES)
+        parallel = best_time(prepared, context)
+        element_pool.configure(0)
+        print(
+            f"{num_elements:>8} {serial * 1000:12.1f} {parallel * 1000:19.1f} "
+            f"{serial / parallel:7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Measure how much of a page render is spent serializing and re-parsing elements.
+
+Core element functions used to receive each element as an HTML string, which
+they parsed again, and panel elements returned their contents as a string that
+`question_phases.process()` parsed once more. They now opt in to receiving a
+copy of the already parsed element and can return parsed contents. This renders a synthetic page
+with many `pl-number-input` elements inside a `pl-question-panel`, with the
+core controllers as they are and wrapped to go through strings as before, and
+prints the best time for `process()` in both cases.
+
+Usage:
+
+    uv run python apps/prairielearn/python/benchmarks/render_pipeline.py
+"""
+
+import os
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+import lxml.html
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prairielearn.internal import question_phases
+
+ELEMENT_COUNTS = [10, 50, 100]
+ELEMENTS = ["pl-question-panel", "pl-number-input"]
+PHASES = ["prepare", "render"]
+REPEAT = 20
+
+
+def make_context(num_elements: int) -> question_phases.RenderContext:
+    inputs = "".join(
+        f"<p>Compute <b>x{i}</b>.</p>"
+        f'<pl-number-input answers-name="x{i}" label="$x_{{{i}}} =$"></pl-number-input>'
+        for i in range(num_elements)
+    )
+    return {
+        "html": f"<pl-question-panel>{inputs}</pl-question-panel>",
+        "elements": {
+            name: {"name": name, "controller": f"{name}.py", "type": "core"}
+            for name in ELEMENTS
+        },
+        "element_extensions": {},
+        "course_path": "/course",
+    }
+
+
+def make_prepare_data(num_elements: int) -> dict[str, Any]:
+    return {
+        "params": {},
+        "correct_answers": {f"x{i}": 1.5 for i in range(num_elements)},
+        "variant_seed": 1,
+        "options": {"question_path": "/question", "course_path": "/course"},
+        "preferences": {},
+        "answers_names": {},
+    }
+
+
+def make_render_data(prepared: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "params": prepared["params"],
+        "correct_answers": prepared["correct_answers"],
+        "variant_seed": 1,
+        "options": {
+            **prepared["options"],
+            "course_element_files_url": "/elements",
+            "course_element_extension_files_url": "/elementExtensions",
+        },
+        "preferences": {},
+        "submitted_answers": {},
+        "format_errors": {},
+        "raw_submitted_answers": {},
+        "partial_scores": {},
+        "score": 0,
+        "feedback": {},
+        "editable": True,
+        "manual_grading": False,
+        "ai_grading": False,
+        "panel": "question",
+        "correct_answer_shown": False,
+        "num_valid_submissions": 0,
+    }
+
+
+def to_string_api(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap an element function so that it takes and returns HTML strings."""
+
+    def wrapper(element_html: str, data: dict[str, Any]) -> Any:
+        result = fn(lxml.html.fragment_fromstring(element_html), data)
+        if isinstance(result, list):
+            return "".join(
+                content
+                if isinstance(content, str)
+                else str(lxml.html.tostring(content, encoding="unicode"))
+                for content in result
+            )
+        return result
+
+    return wrapper
+
+
+def use_string_api() -> None:
+    for path, mod in question_phases._controller_cache.items():
+        question_phases._controller_cache[path] = {
+            **mod,
+            **{phase: to_string_api(mod[phase]) for phase in PHASES if phase in mod},
+            "PARSED_ELEMENT": False,
+        }
+
+
+def best_time(fn: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(num_elements: int) -> float:
+    context = make_context(num_elements)
+    data = make_prepare_data(num_elements)
+    question_phases.process("prepare", data, context)
+    return best_time(
+        lambda: question_phases.process("render", make_render_data(data), context)
+    )
+
+
+def main() -> None:
+    # Load the controllers so that they can be wrapped.
+    measure(1)
+    parsed = {n: measure(n) for n in ELEMENT_COUNTS}
+    use_string_api()
+    strings = {n: measure(n) for n in ELEMENT_COUNTS}
+
+    print(f"{'elements':>8} {'strings (ms)':>13} {'parsed (ms)':>12} {'speedup':>8}")
+    for n in ELEMENT_COUNTS:
+        print(
+            f"{n:>8} {strings[n] * 1000:13.2f} {parsed[n] * 1000:12.2f} "
+            f"{strings[n] / parsed[n]:7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Measure how fast `pl-symbolic-input` grades with and without the numeric comparison.
+
+For every question in `exampleCourse` that uses `pl-symbolic-input`, this runs
+the question with several variant seeds the same way `course_runner.py` does,
+grading a correct and an incorrect submission generated by the elements'
+`test()` functions. This is done once with `sympy_utils.numerically_equal`
+disabled, so that every comparison uses SymPy's `equals()`, and once with it
+enabled. Prints the time spent in the `grade` phase per submission, and any
+difference in the test results between the two runs.
+
+The generated submissions are the correct answer itself, or the correct answer
+plus a constant, which SymPy tells apart without simplifying anything. So this
+also compares pairs of expressions that look like real submissions, correct
+ones that are written differently and incorrect ones that are close, with
+`expressions_equal()` and with `equals()` alone.
+
+Usage:
+
+    uv run python apps/prairielearn/python/benchmarks/symbolic_grading.py [--seeds N] [--rounds N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import prairielearn.sympy_utils as psu
+import sympy
+from prairielearn.internal import course_runner
+from zygote_client import EXAMPLE_COURSE_PATH
+
+TEST_TYPES: tuple[course_runner.TestType, ...] = ("correct", "incorrect")
+
+SUBMISSIONS = [
+    ("(x + 1)^5", "x^5 + 5x^4 + 10x^3 + 10x^2 + 5x + 1"),
+    ("(x + 1)^5", "x^5 + 5x^4 + 10x^3 + 10x^2 + 4x + 1"),
+    ("sin(2x)", "2 sin(x) cos(x)"),
+    ("sin(x)^2", "(1 - cos(2x))/2"),
+    ("tan(x)^2 + 1", "sec(x)^2"),
+    ("cos(x)^4 - sin(x)^4", "cos(2x)"),
+    ("cos(x)^4 - sin(x)^4", "cos(x)^2"),
+    ("x/(x^2 - 1)", "1/(2(x - 1)) + 1/(2(x + 1))"),
+    ("x/(x^2 - 1)", "1/(2(x - 1)) - 1/(2(x + 1))"),
+    ("(x^2 - y^2)/(x - y)", "x - y"),
+    ("sqrt(x + 1) - sqrt(x)", "1/(sqrt(x + 1) + sqrt(x))"),
+    ("x exp(x^2)", "x exp(2x)"),
+    ("log(x^2)", "2 log(x)"),
+    ("atan(x) + atan(1/x)", "pi/2"),
+    ("sinh(x)^2", "(cosh(2x) - 1)/2"),
+]
+
+_numerically_equal = psu.numerically_equal
+
+
+def _inconclusive(*_args: Any, **_kwargs: Any) -> None:
+    return None
+
+
+def symbolic_questions() -> list[course_runner.Question]:
+    return [
+        question
+        for question in course_runner.find_questions(EXAMPLE_COURSE_PATH)
+        if "<pl-symbolic-input"
+        in (question.path / "question.html").read_text(encoding="utf-8")
+    ]
+
+
+def grade_times(
+    question: course_runner.Question, seeds: int
+) -> tuple[float, list[list[str]]]:
+    """Return the time per graded submission, and the failures of each run."""
+    cwd = os.getcwd()
+    path = sys.path
+    psu.clear_sympy_cache()
+    psu._lambdify.cache_clear()
+    total = 0.0
+    failures: list[list[str]] = []
+    try:
+        for seed in range(1, seeds + 1):
+            result = course_runner.run_question(
+                EXAMPLE_COURSE_PATH, question, seed, TEST_TYPES, timeout=60
+            )
+            total += result.times["grade"]
+            failures.append(result.failures)
+    finally:
+        os.chdir(cwd)
+        sys.path = path
+    return total / (seeds * len(TEST_TYPES)), failures
+
+
+def compare_time(a: sympy.Expr, b: sympy.Expr, rounds: int) -> tuple[float, bool]:
+    """Return the best time to compare two expressions, and the result."""
+    best = float("inf")
+    result = False
+    for _ in range(rounds):
+        # Both comparisons would otherwise reuse SymPy's cached results.
+        sympy.core.cache.clear_cache()
+        psu._lambdify.cache_clear()
+        start = time.perf_counter()
+        result = psu.expressions_equal(a, b)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def compare_submissions(rounds: int) -> None:
+    print(
+        f"{'correct answer':<22} {'submission':<36} {'equal':>5} "
+        f"{'equals() (ms)':>14} {'numeric (ms)':>13}"
+    )
+    for a_tru, a_sub in SUBMISSIONS:
+        a = psu.convert_string_to_sympy(a_tru, ["x", "y"])
+        b = psu.convert_string_to_sympy(a_sub, ["x", "y"])
+        psu.numerically_equal = _inconclusive
+        symbolic, expected = compare_time(a, b, rounds)
+        psu.numerically_equal = _numerically_equal
+        numeric, result = compare_time(a, b, rounds)
+        assert result == expected
+        print(
+            f"{a_tru:<22} {a_sub:<36} {result!s:>5} "
+            f"{symbolic * 1000:14.2f} {numeric * 1000:13.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seeds", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    # Warm up the imports for `lambdify()` and SymPy's printers.
+    x = sympy.Symbol("x")
+    compare_time(sympy.sin(2 * x), 2 * sympy.sin(x) * sympy.cos(x), 1)
+
+    print(f"{'question':<40} {'equals() (ms)':>14} {'numeric (ms)':>13} {'speedup':>8}")
+    for question in symbolic_questions():
+        # Warm up imports and the controllers of the question's elements.
+        grade_times(question, 1)
+
+        psu.numerically_equal = _inconclusive
+        symbolic, symbolic_failures = grade_times(question, args.seeds)
+        psu.numerically_equal = _numerically_equal
+        numeric, numeric_failures = grade_times(question, args.seeds)
+
+        print(
+            f"{question.qid:<40} {symbolic * 1000:14.2f} {numeric * 1000:13.2f} "
+            f"{symbolic / numeric:7.2f}x"
+        )
+        for seed, (before, after) in enumerate(
+            zip(symbolic_failures, numeric_failures, strict=True), start=1
+        ):
+            if before != after:
+                print(f"  seed {seed}: {before} != {after}")
+
+    print()
+    compare_submissions(args.rounds)
+
+
+if __name__ == "__main__":
+    main()
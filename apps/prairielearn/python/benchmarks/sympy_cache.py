@@ -0,0 +1,151 @@
+"""Measure how much the conversion cache in `sympy_utils` saves for `pl-symbolic-input`.
+
+`pl-symbolic-input` converts the same correct answer to a SymPy expression in
+every phase and for every panel. This renders the question, submission, and
+answer panels of a synthetic page with 1, 10, and 50 `pl-symbolic-input`
+elements and then parses and grades a submission, once with the cache
+disabled and once with it enabled. The cache is cleared before each request,
+as it would be in a freshly forked worker. Prints the best time for each
+case and the cache hits and misses of one request.
+
+Usage:
+
+    uv run python apps/prairielearn/python/benchmarks/sympy_cache.py
+"""
+
+import copy
+import functools
+import os
+import sys
+import time
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import prairielearn.sympy_utils as psu
+from prairielearn.internal import question_phases
+
+ELEMENT_COUNTS = [1, 10, 50]
+PANELS = ["question", "submission", "answer"]
+REPEAT = 5
+CORRECT_ANSWER = "(x + y + 1)**3 + sin(x)/cos(y)"
+SUBMITTED_ANSWER = "(x^2 + 2x*y + y^2 + 2x + 2y + 1)*(x + y + 1) + sin(x)*sec(y)"
+
+_cached = psu._convert_string_to_sympy_cached
+_uncached = functools.lru_cache(maxsize=0)(_cached.__wrapped__)
+
+
+def make_context(num_elements: int) -> question_phases.RenderContext:
+    return {
+        "html": "".join(
+            f'<pl-symbolic-input answers-name="x{i}" variables="x, y">'
+            "</pl-symbolic-input>"
+            for i in range(num_elements)
+        ),
+        "elements": {
+            "pl-symbolic-input": {
+                "name": "pl-symbolic-input",
+                "controller": "pl-symbolic-input.py",
+                "type": "core",
+            }
+        },
+        "element_extensions": {},
+        "course_path": "/course",
+    }
+
+
+def prepare(
+    num_elements: int, context: question_phases.RenderContext
+) -> dict[str, Any]:
+    data: dict[str, Any] = {
+        "params": {},
+        "correct_answers": dict.fromkeys(
+            (f"x{i}" for i in range(num_elements)), CORRECT_ANSWER
+        ),
+        "variant_seed": 1,
+        "options": {},
+        "preferences": {},
+        "answers_names": {},
+    }
+    question_phases.process("prepare", data, context)
+    return data
+
+
+def submit(
+    prepared: dict[str, Any], context: question_phases.RenderContext
+) -> dict[str, Any]:
+    data: dict[str, Any] = {
+        "params": copy.deepcopy(prepared["params"]),
+        "correct_answers": copy.deepcopy(prepared["correct_answers"]),
+        "variant_seed": 1,
+        "options": {},
+        "preferences": {},
+        "submitted_answers": dict.fromkeys(
+            prepared["correct_answers"], SUBMITTED_ANSWER
+        ),
+        "format_errors": {},
+        "raw_submitted_answers": {},
+        "gradable": True,
+    }
+    question_phases.process("parse", data, context)
+    data.update({"partial_scores": {}, "score": 0, "feedback": {}})
+    question_phases.process("grade", data, context)
+    assert all(s["score"] == 1 for s in data["partial_scores"].values())
+    return data
+
+
+def render(submitted: dict[str, Any], context: question_phases.RenderContext) -> None:
+    for panel in PANELS:
+        data = {
+            **copy.deepcopy(submitted),
+            "options": {
+                "course_element_files_url": "/elements",
+                "course_element_extension_files_url": "/elementExtensions",
+            },
+            "editable": True,
+            "manual_grading": False,
+            "ai_grading": False,
+            "panel": panel,
+            "correct_answer_shown": True,
+            "num_valid_submissions": 1,
+        }
+        question_phases.process("render", data, context)
+
+
+def request(prepared: dict[str, Any], context: question_phases.RenderContext) -> None:
+    psu.clear_sympy_cache()
+    render(submit(prepared, context), context)
+
+
+def best_time(
+    prepared: dict[str, Any], context: question_phases.RenderContext
+) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        request(prepared, context)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    print(
+        f"{'elements':>8} {'uncached (ms)':>14} {'cached (ms)':>12} "
+        f"{'speedup':>8} {'hits':>6} {'misses':>7}"
+    )
+    for num_elements in ELEMENT_COUNTS:
+        context = make_context(num_elements)
+        prepared = prepare(num_elements, context)
+        psu._convert_string_to_sympy_cached = _uncached
+        uncached = best_time(prepared, context)
+        psu._convert_string_to_sympy_cached = _cached
+        cached = best_time(prepared, context)
+        info = psu.sympy_cache_info()
+        print(
+            f"{num_elements:>8} {uncached * 1000:14.1f} {cached * 1000:12.1f} "
+            f"{uncached / cached:7.2f}x {info.hits:>6} {info.misses:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Measure how long `sympy_utils.sympy_check` takes to validate large expressions.
+
+`sympy_check` runs on every expression that `pl-symbolic-input` parses, and
+walks the whole expression tree. This builds expressions with about 10^2,
+10^3, and 10^4 nodes in a few shapes and prints the best time to validate
+each of them, with and without complex numbers allowed:
+
+- `wide`: a polynomial in two variables, i.e. a sum of many short products.
+- `deep`: nested function calls and powers, so that subtrees are large.
+- `shared`: a sum of copies of the same subexpression with small changes,
+  which is how expanded submissions tend to look.
+
+Usage:
+
+    uv run python apps/prairielearn/python/benchmarks/sympy_check.py [--rounds N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections.abc import Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import prairielearn.sympy_utils as psu
+import sympy
+
+SIZES = [10**2, 10**3, 10**4]
+
+X, Y = sympy.symbols("x y")
+LOCALS: psu.LocalsForEval = {
+    "variables": {"x": X, "y": Y},
+    "functions": {},
+    "helpers": {},
+}
+
+
+def num_nodes(expr: sympy.Basic) -> int:
+    return sum(1 for _ in sympy.preorder_traversal(expr))
+
+
+def wide(size: int) -> sympy.Expr:
+    terms = size // 7
+    return sympy.Add(
+        *(
+            sympy.Integer(k + 1) * X ** (k % 7 + 1) * Y ** (k // 7 + 1)
+            for k in range(terms)
+        )
+    )
+
+
+def deep(size: int) -> sympy.Expr:
+    expr: sympy.Expr = X
+    k = 0
+    while num_nodes(expr) < size:
+        k += 1
+        expr = sympy.sin(expr) * (Y + k) + sympy.cos(X * expr) ** 2
+    return expr
+
+
+def shared(size: int) -> sympy.Expr:
+    term = (X + 1) ** 3 * sympy.exp(Y) / (X**2 + Y**2 + 1)
+    terms = size // num_nodes(term)
+    return sympy.Add(*(term * (X + k) for k in range(terms)))
+
+
+SHAPES: dict[str, Callable[[int], sympy.Expr]] = {
+    "wide": wide,
+    "deep": deep,
+    "shared": shared,
+}
+
+
+def best_time(expr: sympy.Expr, rounds: int, *, allow_complex: bool) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        # The assumptions of every subexpression are cached on the expression
+        # itself, so rebuild it to measure a freshly parsed submission.
+        sympy.core.cache.clear_cache()
+        fresh = sympy.sympify(sympy.srepr(expr))
+        start = time.perf_counter()
+        psu.sympy_check(fresh, LOCALS, allow_complex=allow_complex, allow_sets=False)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'shape':<8} {'nodes':>7} {'complex allowed (ms)':>21} "
+        f"{'complex rejected (ms)':>22}"
+    )
+    for name, make in SHAPES.items():
+        for size in SIZES:
+            expr = make(size)
+            allowed = best_time(expr, args.rounds, allow_complex=True)
+            rejected = best_time(expr, args.rounds, allow_complex=False)
+            print(
+                f"{name:<8} {num_nodes(expr):>7} {allowed * 1000:21.2f} "
+                f"{rejected * 1000:22.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
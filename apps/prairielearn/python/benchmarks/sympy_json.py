@@ -0,0 +1,94 @@
+"""Measure the round-trip throughput of SymPy expressions through JSON.
+
+`pl-symbolic-input` stores correct and submitted answers with
+`sympy_to_json()` and loads them with `json_to_sympy()` in every phase. This
+converts expressions of several sizes to JSON and back, once from the string
+in `_value` (the only encoding before `_tree` was added, and the fallback for
+old data) and once from the tree in `_tree`. SymPy's cache and the conversion
+cache in `sympy_utils` are cleared before each round trip, as they would be in
+a freshly forked worker. Prints the round trips per second, and the
+conversions from JSON per second, which happen far more often than the
+conversions to JSON.
+
+Usage:
+
+    uv run python apps/prairielearn/python/benchmarks/sympy_json.py [--rounds N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import cast
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import prairielearn.sympy_utils as psu
+import sympy
+
+X, Y = sympy.symbols("x y")
+P = sympy.Symbol("p", positive=True)
+
+EXPRESSIONS: dict[str, sympy.Expr | sympy.Set] = {
+    "small": X**2 + 3 * X - 1,
+    "trig": sympy.sin(2 * X) * sympy.cos(Y) / (1 + sympy.tan(X) ** 2),
+    "assumptions": sympy.sqrt(P) * sympy.exp(-P * X) / 3 - sympy.log(P, 2),
+    "polynomial": sympy.expand((X + Y + 1) ** 8),
+    "sets": sympy.Union(sympy.Interval.Lopen(X, 2), sympy.FiniteSet(3, Y, sympy.pi)),
+}
+
+
+def encode(expr: sympy.Expr | sympy.Set, *, allow_sets: bool) -> psu.SympyJson:
+    return json.loads(json.dumps(psu.sympy_to_json(expr, allow_sets=allow_sets)))
+
+
+def decode(encoded: psu.SympyJson, *, use_tree: bool, allow_sets: bool) -> sympy.Basic:
+    if not use_tree:
+        encoded = cast(
+            psu.SympyJson,
+            {k: v for k, v in encoded.items() if not k.startswith("_tree")},
+        )
+    return psu.json_to_sympy(encoded, allow_sets=allow_sets)
+
+
+def throughput(
+    expr: sympy.Expr | sympy.Set, rounds: int, *, use_tree: bool, allow_sets: bool
+) -> tuple[float, float]:
+    """Return the round trips per second, and the conversions from JSON per second."""
+    encode_time = 0.0
+    decode_time = 0.0
+    for _ in range(rounds):
+        sympy.core.cache.clear_cache()
+        psu.clear_sympy_cache()
+        start = time.perf_counter()
+        encoded = encode(expr, allow_sets=allow_sets)
+        middle = time.perf_counter()
+        result = decode(encoded, use_tree=use_tree, allow_sets=allow_sets)
+        decode_time += time.perf_counter() - middle
+        encode_time += middle - start
+        assert result == expr
+    return rounds / (encode_time + decode_time), rounds / decode_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    print(
+        f"{'expression':<12} {'round trip, string (/s)':>24} {'tree (/s)':>10} "
+        f"{'from JSON, string (/s)':>23} {'tree (/s)':>10} {'speedup':>8}"
+    )
+    for name, expr in EXPRESSIONS.items():
+        allow_sets = isinstance(expr, sympy.Set)
+        string = throughput(expr, args.rounds, use_tree=False, allow_sets=allow_sets)
+        tree = throughput(expr, args.rounds, use_tree=True, allow_sets=allow_sets)
+        print(
+            f"{name:<12} {string[0]:24.0f} {tree[0]:10.0f} "
+            f"{string[1]:23.0f} {tree[1]:10.0f} {tree[1] / string[1]:7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
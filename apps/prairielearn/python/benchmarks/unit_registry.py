@@ -0,0 +1,89 @@
+"""Measure the per-phase cost of obtaining a Pint unit registry inside a forked worker.
+
+Each question phase runs in a worker forked from the zygote. This compares the
+previous behavior (a new registry with a PID-specific cache folder for every call)
+with registries built from the cache that the parent populates before forking.
+
+Usage:
+
+    uv run python apps/prairielearn/python/benchmarks/unit_registry.py
+"""
+
+import os
+import shutil
+import statistics
+import sys
+import time
+import warnings
+from collections.abc import Callable
+
+from pint import UnitRegistry
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import prairielearn as pl
+
+# pyarrow's native threads are safe to fork with; see the same filter in `zygote.py`.
+warnings.filterwarnings(
+    "ignore",
+    category=DeprecationWarning,
+    message=r".*multi-threaded.*fork\(\).*",
+)
+PHASES = ("prepare", "render", "parse", "grade", "test")
+NUM_REQUESTS = 10
+
+
+def legacy_get_unit_registry() -> UnitRegistry:
+    return UnitRegistry(cache_folder=f"/tmp/pint_{os.getpid()}")
+
+
+def time_in_forked_worker(get_registry: Callable[[], UnitRegistry]) -> float:
+    """Fork a worker that obtains a registry once per phase; return the elapsed seconds."""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        start = time.perf_counter()
+        for _ in PHASES:
+            ureg = get_registry()
+            ureg.Quantity("9.8 m/s^2").to("ft/s^2")
+        elapsed = time.perf_counter() - start
+        shutil.rmtree(f"/tmp/pint_{os.getpid()}", ignore_errors=True)
+        os.write(write_fd, repr(elapsed).encode())
+        os._exit(0)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        elapsed = float(f.read())
+    os.waitpid(pid, 0)
+    return elapsed
+
+
+def report(name: str, samples: list[float]) -> None:
+    per_phase_ms = [s / len(PHASES) * 1000 for s in samples]
+    print(
+        f"{name:<10} per request: {statistics.median(samples) * 1000:8.1f} ms"
+        f"   per phase: {statistics.median(per_phase_ms):8.2f} ms"
+    )
+
+
+def main() -> None:
+    # Populate the on-disk cache in the parent, as `zygote.py` does.
+    start = time.perf_counter()
+    pl.get_unit_registry()
+    print(
+        f"first registry built in parent: {(time.perf_counter() - start) * 1000:.1f} ms"
+    )
+
+    report(
+        "before",
+        [time_in_forked_worker(legacy_get_unit_registry) for _ in range(NUM_REQUESTS)],
+    )
+    report(
+        "after",
+        [time_in_forked_worker(pl.get_unit_registry) for _ in range(NUM_REQUESTS)],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""A minimal stand-in for the Node code caller, used to drive `zygote.py` from benchmarks.
+
+It speaks the same protocol as `code-caller-native.ts`: JSON requests on stdin,
+JSON responses on file descriptor 3, and restart confirmations on file
+descriptor 4. Messages are newline-delimited unless `framed=True` is given, in
+which case they use the length-prefixed framing from `zygote_utils`.
+`QuestionRunner` mirrors the calls that `freeform.ts` makes for the `generate`, `prepare`, and `render` phases of a question.
+"""
+
+import base64
+import json
+import os
+import pathlib
+import struct
+import subprocess
+import sys
+from collections.abc import Iterator
+from typing import Any
+
+import chevron
+
+PYTHON_PATH = pathlib.Path(__file__).resolve().parent.parent
+ZYGOTE_PATH = PYTHON_PATH / "zygote.py"
+CORE_ELEMENTS_PATH = PYTHON_PATH.parent / "elements"
+REPOSITORY_ROOT_PATH = PYTHON_PATH.parent.parent.parent
+EXAMPLE_COURSE_PATH = REPOSITORY_ROOT_PATH / "exampleCourse"
+
+
+class WorkerCrashedError(Exception):
+    pass
+
+
+class Zygote:
+    """A running `zygote.py` process."""
+
+    def __init__(
+        self, env: dict[str, str] | None = None, *, framed: bool = False
+    ) -> None:
+        self.framed = framed
+        data_read, data_write = os.pipe()
+        exit_read, exit_write = os.pipe()
+
+        def setup_fds() -> None:
+            # Duplicate first so that the pipes can't clobber each other.
+            data_fd, exit_fd = os.dup(data_write), os.dup(exit_write)
+            os.dup2(data_fd, 3)
+            os.dup2(exit_fd, 4)
+
+        self.process = subprocess.Popen(
+            [sys.executable, "-B", str(ZYGOTE_PATH)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            pass_fds=(3, 4),
+            preexec_fn=setup_fds,  # ruff:ignore[subprocess-popen-preexec-fn]
+            env={**os.environ, "PYTHONIOENCODING": "utf-8", **(env or {})},
+            cwd=PYTHON_PATH,
+        )
+        os.close(data_write)
+        os.close(exit_write)
+        self.data = os.fdopen(data_read, "rb")
+        self.exits = os.fdopen(exit_read, encoding="utf-8")
+
+    def _read_exactly(self, size: int) -> bytes:
+        data = self.data.read(size)
+        if len(data) != size:
+            raise WorkerCrashedError
+        return data
+
+    def send(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Send a request and return the response, with any file data decoded to bytes."""
+        assert self.process.stdin is not None
+        payload = json.dumps(request).encode()
+        if self.framed:
+            self.process.stdin.write(b"\x00" + struct.pack(">I", len(payload)))
+            self.process.stdin.write(payload)
+        else:
+            self.process.stdin.write(payload + b"\n")
+        self.process.stdin.flush()
+
+        if not self.framed:
+            line = self.data.readline()
+            if not line:
+                raise WorkerCrashedError
+            response = json.loads(line)
+            if request.get("fcn") == "file" and response.get("present"):
+                if request.get("file") == "question.html":
+                    response["val"]["file"] = base64.b64decode(response["val"]["file"])
+                else:
+                    response["val"] = base64.b64decode(response["val"])
+            return response
+
+        (size,) = struct.unpack(">I", self._read_exactly(4))
+        response = json.loads(self._read_exactly(size))
+        (size,) = struct.unpack(">I", self._read_exactly(4))
+        body = self._read_exactly(size)
+        if response.get("body") == "val":
+            response["val"] = body
+        elif response.get("body") == "file":
+            response["val"]["file"] = body
+        return response
+
+    def call(
+        self,
+        file: str,
+        fcn: str,
+        args: list[Any],
+        cwd: str | os.PathLike[str],
+        paths: list[str] | None = None,
+    ) -> Any:
+        """Call a function and return its value, or `None` if the function is missing."""
+        result = self.send({
+            "file": file,
+            "fcn": fcn,
+            "args": args,
+            "cwd": str(cwd),
+            "paths": [str(PYTHON_PATH), *(paths or [])],
+            "forbidden_modules": [],
+        })
+        return result["val"] if result["present"] else None
+
+    def restart(self) -> None:
+        self.send({"file": None, "fcn": "restart", "args": []})
+        if json.loads(self.exits.readline()) != {"exited": True}:
+            raise WorkerCrashedError
+
+    def close(self) -> None:
+        self.process.terminate()
+        self.process.wait()
+        self.data.close()
+        self.exits.close()
+
+
+def _load_elements(
+    elements_path: pathlib.Path, element_type: str
+) -> dict[str, dict[str, str]]:
+    elements: dict[str, dict[str, str]] = {}
+    if not elements_path.is_dir():
+        return elements
+    for info_path in sorted(elements_path.glob("*/info.json")):
+        name = info_path.parent.name
+        info = json.loads(info_path.read_text())
+        elements[name] = {
+            "name": name,
+            "controller": info["controller"],
+            "type": element_type,
+        }
+        if element_type == "core":
+            elements[name.replace("-", "_")] = elements[name]
+    return elements
+
+
+def _load_extensions(extensions_path: pathlib.Path) -> dict[str, dict[str, Any]]:
+    extensions: dict[str, dict[str, Any]] = {}
+    if not extensions_path.is_dir():
+        return extensions
+    for info_path in sorted(extensions_path.glob("*/*/info.json")):
+        element, name = info_path.parent.parent.name, info_path.parent.name
+        extensions.setdefault(element, {})[name] = {
+            "name": name,
+            "directory": str(info_path.parent),
+            **json.loads(info_path.read_text()),
+        }
+    return extensions
+
+
+class QuestionRunner:
+    """Runs the phases of a single question the same way `freeform.ts` does."""
+
+    def __init__(self, course_path: pathlib.Path, qid: str) -> None:
+        self.course_path = course_path
+        self.qid = qid
+        self.question_path = course_path / "questions" / qid
+        self.template = (self.question_path / "question.html").read_text()
+        self.has_server = (self.question_path / "server.py").is_file()
+        self.elements = {
+            **_load_elements(CORE_ELEMENTS_PATH, "core"),
+            **_load_elements(course_path / "elements", "course"),
+        }
+        self.extensions = _load_extensions(course_path / "elementExtensions")
+        self.options = {
+            "question_path": str(self.question_path),
+            "client_files_question_path": str(
+                self.question_path / "clientFilesQuestion"
+            ),
+            "client_files_course_path": str(course_path / "clientFilesCourse"),
+            "server_files_course_path": str(course_path / "serverFilesCourse"),
+            "course_extensions_path": str(course_path / "elementExtensions"),
+        }
+
+    def _server(self, zygote: Zygote, phase: str, args: list[Any]) -> Any:
+        if not self.has_server:
+            return None
+        return zygote.call(
+            "server",
+            phase,
+            args,
+            self.question_path,
+            [str(self.course_path / "serverFilesCourse")],
+        )
+
+    def _html(self, zygote: Zygote, phase: str, data: dict[str, Any]) -> Any:
+        context = {
+            "html": chevron.render(self.template, data),
+            "elements": self.elements,
+            "element_extensions": self.extensions,
+            "course_path": str(self.course_path),
+        }
+        return zygote.call(
+            "question.html",
+            phase,
+            [context, data],
+            self.question_path,
+            [str(self.course_path / "serverFilesCourse")],
+        )
+
+    def generate(self, zygote: Zygote, variant_seed: int) -> dict[str, Any]:
+        data = {
+            "params": {},
+            "correct_answers": {},
+            "variant_seed": variant_seed,
+            "options": dict(self.options),
+            "preferences": {},
+        }
+        return self._server(zygote, "generate", [data]) or data
+
+    def prepare(self, zygote: Zygote, data: dict[str, Any]) -> dict[str, Any]:
+        data = {**data, "answers_names": {}}
+        data = self._html(zygote, "prepare", data)["data"]
+        return self._server(zygote, "prepare", [data]) or data
+
+    def render(self, zygote: Zygote, data: dict[str, Any]) -> str:
+        data = {
+            "params": data["params"],
+            "correct_answers": data["correct_answers"],
+            "variant_seed": data["variant_seed"],
+            "options": {
+                **self.options,
+                "client_files_question_url": "/clientFilesQuestion",
+                "client_files_course_url": "/clientFilesCourse",
+                "client_files_question_dynamic_url": "/generatedFilesQuestion",
+                "course_element_files_url": "/elements",
+                "course_element_extension_files_url": "/elementExtensions",
+                "submission_files_url": None,
+                "variant_id": "1",
+                "external_image_capture_url": None,
+                "base_url": "/",
+                "workspace_url": None,
+            },
+            "preferences": data["preferences"],
+            "submitted_answers": {},
+            "format_errors": {},
+            "raw_submitted_answers": {},
+            "partial_scores": {},
+            "score": 0,
+            "feedback": {},
+            "editable": True,
+            "manual_grading": False,
+            "ai_grading": False,
+            "panel": "question",
+            "correct_answer_shown": False,
+            "num_valid_submissions": 0,
+        }
+        html = self._html(zygote, "render", data)["html"]
+        return self._server(zygote, "render", [data, html]) or html
+
+
+def find_questions(course_path: pathlib.Path = EXAMPLE_COURSE_PATH) -> list[str]:
+    """Return the QIDs of all v3 questions in a course."""
+    questions_path = course_path / "questions"
+    qids: list[str] = []
+    for info_path in sorted(questions_path.glob("**/info.json")):
+        info = json.loads(info_path.read_text())
+        if info.get("type", "v3") != "v3" or "workspaceOptions" in info:
+            continue
+        if (info_path.parent / "question.html").is_file():
+            qids.append(info_path.parent.relative_to(questions_path).as_posix())
+    return qids
+
+
+def run_question(zygote: Zygote, runner: QuestionRunner, seed: int) -> Iterator[None]:
+    """Run one question, yielding after each request."""
+    data = runner.generate(zygote, seed)
+    zygote.restart()
+    yield
+    data = runner.prepare(zygote, data)
+    zygote.restart()
+    yield
+    runner.render(zygote, data)
+    zygote.restart()
+    yield
+
+
+def find_working_questions(limit: int | None) -> list[QuestionRunner]:
+    """Return runners for the questions that can run in this environment."""
+    runners: list[QuestionRunner] = []
+    zygote = Zygote()
+    for qid in find_questions():
+        runner = QuestionRunner(EXAMPLE_COURSE_PATH, qid)
+        try:
+            for _ in run_question(zygote, runner, 1):
+                pass
+        except (WorkerCrashedError, KeyError, TypeError):
+            # Most likely a dependency that isn't installed here.
+            zygote.close()
+            zygote = Zygote()
+            continue
+        runners.append(runner)
+        if limit is not None and len(runners) >= limit:
+            break
+    zygote.close()
+    return runners
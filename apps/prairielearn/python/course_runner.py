@@ -0,0 +1,8 @@
+"""Run the phases of every question in a course; see `prairielearn.internal.course_runner`."""
+
+import sys
+
+from prairielearn.internal.course_runner import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,31 @@
-"""A collection of utilities for writing custom questions and elements in PrairieLearn."""
-
-from prairielearn.conversion_utils import *  # ruff:ignore[undefined-local-with-import-star]
-from prairielearn.element_schemas import validate_element as validate_element
-from prairielearn.element_schemas import validate_element_tree as validate_element_tree
-from prairielearn.extension_utils import *  # ruff:ignore[undefined-local-with-import-star]
-from prairielearn.grading_utils import *  # ruff:ignore[undefined-local-with-import-star]
-from prairielearn.html_utils import *  # ruff:ignore[undefined-local-with-import-star]
-from prairielearn.misc_utils import *  # ruff:ignore[undefined-local-with-import-star]
-from prairielearn.question_utils import *  # ruff:ignore[undefined-local-with-import-star]
+"""A collection of utilities for writing custom questions and elements in PrairieLearn.
+
+Submodules are imported on first use of one of their names, so importing the
+package itself doesn't pull in libraries like `numpy`, `pandas`, or `sympy`.
+"""
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from prairielearn.conversion_utils import *  # ruff:ignore[undefined-local-with-import-star]
+    from prairielearn.element_schemas import validate_element as validate_element
+    from prairielearn.element_schemas import (
+        validate_element_tree as validate_element_tree,
+    )
+    from prairielearn.extension_utils import *  # ruff:ignore[undefined-local-with-import-star]
+    from prairielearn.grading_utils import *  # ruff:ignore[undefined-local-with-import-star]
+    from prairielearn.html_utils import *  # ruff:ignore[undefined-local-with-import-star]
+    from prairielearn.misc_utils import *  # ruff:ignore[undefined-local-with-import-star]
+    from prairielearn.question_utils import *  # ruff:ignore[undefined-local-with-import-star]
+    from prairielearn.template_utils import *  # ruff:ignore[undefined-local-with-import-star]
+else:
+    # Type checkers see the names above, so that they can still report names
+    # that don't exist.
+    from prairielearn.internal.lazy_exports import STAR_EXPORTS as _STAR_EXPORTS
+    from prairielearn.internal.lazy_exports import __dir__ as __dir__
+    from prairielearn.internal.lazy_exports import __getattr__ as __getattr__
+
+    __all__ = list(_STAR_EXPORTS)
 
 # TODO: Update this in a future PR
 # from prairielearn.colors import *
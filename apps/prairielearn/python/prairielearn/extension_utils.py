@@ -16,6 +16,14 @@ from typing import Any, TypeVar
 
 from prairielearn.question_utils import QuestionData
 
+# Loaded extensions are cached, since elements such as `pl-drawing` load their
+# extensions once for every element on the page. Extensions are course code, so
+# like the controllers of course elements, the cache is cleared at the end of
+# every `process()` call (see `question_phases.clear_course_element_cache()`).
+# Entries are keyed by extension name and controller path, and store the
+# modification time of the controller so that edits are picked up.
+_extension_cache: dict[tuple[str, str], tuple[int, Any]] = {}
+
 
 def clean_identifier_name(name: str) -> str:
     """Escapes a string so that it becomes a valid Python identifier.
@@ -35,6 +43,10 @@ def load_extension(data: QuestionData, extension_name: str) -> Any:
     """
     Load a single specific extension by name for an element.
 
+    The extension's controller is only executed again if it has changed since
+    it was last loaded, so the returned functions and variables may be shared
+    with earlier calls for the same phase of the question.
+
     Returns:
         A dictionary of defined variables and functions.
 
@@ -51,6 +63,12 @@ def load_extension(data: QuestionData, extension_name: str) -> Any:
         # Nothing to load, just return an empty dict
         return {}
 
+    script = os.path.join(ext_info["directory"], ext_info["controller"])
+    mtime = os.stat(script).st_mtime_ns
+    cached = _extension_cache.get((extension_name, script))
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
     T = TypeVar("T")
 
     # wrap extension functions so that they execute in their own directory
@@ -69,7 +87,6 @@ def load_extension(data: QuestionData, extension_name: str) -> Any:
         return wrapped_function
 
     # Load any Python functions and variables from the defined controller
-    script = os.path.join(ext_info["directory"], ext_info["controller"])
     loaded = {}
     spec = importlib.util.spec_from_file_location(f"{extension_name}-{script}", script)
     if not spec or not spec.loader:
@@ -84,7 +101,9 @@ def load_extension(data: QuestionData, extension_name: str) -> Any:
 
     # Return functions and variables as a namedtuple, so we get the nice dot access syntax
     module_tuple = namedtuple(clean_identifier_name(extension_name), loaded.keys())  # ruff:ignore[collections-named-tuple] # pyright: ignore[reportUntypedNamedTuple]
-    return module_tuple(**loaded)
+    extension = module_tuple(**loaded)
+    _extension_cache[extension_name, script] = (mtime, extension)
+    return extension
 
 
 def load_all_extensions(data: QuestionData) -> dict[str, Any]:
@@ -12,7 +12,6 @@ from typing import Any, overload
 
 import lxml.html
 
-from prairielearn.colors import PLColor
 from prairielearn.misc_utils import escape_unicode_string
 
 __all__ = [
@@ -25,6 +24,7 @@ __all__ = [
     "get_integer_attrib",
     "get_string_attrib",
     "has_attrib",
+    "inner_elements",
     "inner_html",
     "is_boolean_value",
     "is_float_value",
@@ -440,6 +440,9 @@ def get_color_attrib(
     Raises:
         ValueError: If the attribute is not a valid CSS color string.
     """
+    # `coloraide` takes a while to import, so it's only imported when it's needed.
+    from prairielearn.colors import PLColor
+
     (val, is_default) = _get_attrib(element, name, *args)
     if is_default:
         # Allow for `None` default
@@ -475,6 +478,23 @@ def inner_html(element: lxml.html.HtmlElement) -> str:
     return inner
 
 
+def inner_elements(element: lxml.html.HtmlElement) -> list[str | lxml.html.HtmlElement]:
+    """Get the contents of an lxml element as its leading text followed by its children.
+
+    An element's `render()` function that receives the parsed element can return
+    this instead of `inner_html(element)`, so that the contents don't have to be
+    serialized and parsed again. As when parsing the inner HTML, leading text that
+    is only whitespace is left out.
+
+    Returns:
+        The leading text of the element, if any, and its children.
+    """
+    contents: list[str | lxml.html.HtmlElement] = list(element)
+    if element.text is not None and element.text.strip():
+        contents.insert(0, element.text)
+    return contents
+
+
 def escape_invalid_string(string: str) -> str:
     """Wrap and escape string in `<code>` tags.
 
@@ -1,4 +1,5 @@
-from typing import Any, Literal, TypedDict
+from collections.abc import Callable, Iterable
+from typing import Any, Literal, NoReturn, TypedDict
 
 Phase = Literal["generate", "prepare", "render", "parse", "grade", "test", "file"]
 
@@ -15,6 +16,16 @@ all_phases: frozenset[Phase] = frozenset({
 })
 
 
+class DataModificationError(ValueError):
+    """
+    Raised when element code modifies a prop of `data` that it may not modify
+    in the current phase.
+
+    This is a `ValueError`, like the errors that `check_data()` used to raise
+    for modifications, so existing handlers still catch it.
+    """
+
+
 class PropInfo(TypedDict):
     type: ValueType
     present_phases: frozenset[Phase]
@@ -159,9 +170,14 @@ def check_prop(
     if value_type == "object" and not isinstance(new_value, dict):
         raise ValueError(f'Expected data["{prop}"] to be an object')
 
-    # Check the value.
-    if phase not in edit_phases and old_value != new_value:
-        raise ValueError(f'data["{prop}"] has been illegally modified')
+    # Check the value. Values from `protect_data()` can't be modified, so if
+    # they are still in place, there's no need to compare them.
+    if (
+        phase not in edit_phases
+        and old_value is not new_value
+        and old_value != new_value
+    ):
+        raise DataModificationError(f'data["{prop}"] has been illegally modified')
 
 
 def check_data(
@@ -192,3 +208,156 @@ def check_data(
             prop_info["edit_phases"],
             phase,
         )
+
+
+class _ReadOnly:
+    """Methods shared by `_ReadOnlyDict` and `_ReadOnlyList`."""
+
+    __slots__ = ()
+    _prop: str
+
+    def _modify(self) -> NoReturn:
+        raise DataModificationError(f'data["{self._prop}"] has been illegally modified')
+
+    def _copy(self) -> dict[Any, Any] | list[Any]:
+        raise NotImplementedError
+
+    def _apply(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Apply a modifying method to a copy and raise if that changes the value.
+
+        Writes that leave the value as it was, like assigning an equal value or
+        sorting a sorted list, are allowed, since comparing `data` after the
+        element ran wouldn't have noticed them either. They aren't applied, so
+        the value stays read-only.
+
+        Returns:
+            The return value of the method.
+        """
+        copy = self._copy()
+        result = getattr(copy, method)(*args, **kwargs)
+        if copy != self:
+            self._modify()
+        return result
+
+
+def _unless_unchanged(method: str) -> Callable[..., Any]:
+    def apply(self: _ReadOnly, *args: Any, **kwargs: Any) -> Any:
+        return self._apply(method, *args, **kwargs)
+
+    return apply
+
+
+def _in_place_unless_unchanged(method: str) -> Callable[..., Any]:
+    def apply(self: _ReadOnly, *args: Any, **kwargs: Any) -> Any:
+        self._apply(method, *args, **kwargs)
+        return self
+
+    return apply
+
+
+# These have to be actual dicts and lists so that element code can use them
+# like any other data, e.g. check them with `isinstance()` or serialize them.
+class _ReadOnlyDict(_ReadOnly, dict[Any, Any]):
+    """A dict that raises the same error as `check_data()` when it is modified."""
+
+    __slots__ = ("_prop",)
+
+    def __init__(self, items: Iterable[tuple[Any, Any]], prop: str) -> None:
+        super().__init__(items)
+        self._prop = prop
+
+    # Copies are ordinary, modifiable dicts.
+    def __reduce__(self) -> tuple[type[dict[Any, Any]], tuple[dict[Any, Any]]]:
+        return dict, (dict(self),)
+
+    def _copy(self) -> dict[Any, Any]:
+        return dict(self)
+
+    __setitem__ = _unless_unchanged("__setitem__")
+    __delitem__ = _unless_unchanged("__delitem__")
+    clear = _unless_unchanged("clear")
+    pop = _unless_unchanged("pop")
+    popitem = _unless_unchanged("popitem")
+    setdefault = _unless_unchanged("setdefault")
+    update = _unless_unchanged("update")
+    __ior__ = _in_place_unless_unchanged("__ior__")
+
+
+class _ReadOnlyList(_ReadOnly, list[Any]):
+    """A list that raises the same error as `check_data()` when it is modified."""
+
+    __slots__ = ("_prop",)
+
+    def __init__(self, items: Iterable[Any], prop: str) -> None:
+        super().__init__(items)
+        self._prop = prop
+
+    # Copies are ordinary, modifiable lists.
+    def __reduce__(self) -> tuple[type[list[Any]], tuple[list[Any]]]:
+        return list, (list(self),)
+
+    def _copy(self) -> list[Any]:
+        return list(self)
+
+    __setitem__ = _unless_unchanged("__setitem__")
+    __delitem__ = _unless_unchanged("__delitem__")
+    append = _unless_unchanged("append")
+    clear = _unless_unchanged("clear")
+    extend = _unless_unchanged("extend")
+    insert = _unless_unchanged("insert")
+    pop = _unless_unchanged("pop")
+    remove = _unless_unchanged("remove")
+    reverse = _unless_unchanged("reverse")
+    sort = _unless_unchanged("sort")
+    __iadd__ = _in_place_unless_unchanged("__iadd__")
+    __imul__ = _in_place_unless_unchanged("__imul__")
+
+
+def make_read_only(value: Any, prop: str) -> Any:
+    """
+    Return a copy of a JSON-like value in which every dict and list raises the
+    same error as `check_data()` for `prop` when it is modified.
+
+    Read-only dicts and lists are still instances of `dict` and `list`, so they
+    can be used and serialized like the originals, and copying them with
+    `copy.copy()` or `copy.deepcopy()` gives ordinary dicts and lists.
+
+    Returns:
+        The read-only copy.
+    """
+    if isinstance(value, dict):
+        return _ReadOnlyDict(
+            ((k, make_read_only(v, prop)) for k, v in value.items()),
+            prop,
+        )
+    if isinstance(value, list):
+        return _ReadOnlyList((make_read_only(v, prop) for v in value), prop)
+    return value
+
+
+def protect_data(data: dict[str, Any], phase: Phase) -> dict[str, Any]:
+    """
+    Replace every prop of `data` that may not be modified in `phase` with a
+    read-only copy from `make_read_only()`.
+
+    Rather than comparing these props after every element, which means
+    deep-copying `data` up front and walking all of it once per element,
+    modifications are reported as soon as they happen. As long as the copies
+    are still in place, `check_data()` doesn't compare them.
+
+    Returns:
+        The original values of the props that were replaced.
+    """
+    originals: dict[str, Any] = {}
+    for key, value in data.items():
+        prop_info = PROPS.get(key)
+        if (
+            prop_info is None
+            or phase not in prop_info["present_phases"]
+            or phase in prop_info["edit_phases"]
+        ):
+            continue
+        originals[key] = value
+        data[key] = make_read_only(value, key)
+    return originals
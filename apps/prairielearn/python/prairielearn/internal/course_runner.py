@@ -0,0 +1,731 @@
+"""Run the phases of every question in a course outside of the web app.
+
+For each question and variant seed, this runs `generate`, `prepare`, and
+`render` the way `freeform.ts` does, then submits the answer that `test()`
+produces through `parse` and `grade` and checks that the grade matches what
+`test()` expected, like the question tester in the web app. Each run happens in
+a fresh process forked from one that has preloaded the core elements, like a
+worker forked from the zygote.
+
+The report has the latency percentiles of each phase, the peak RSS of the
+processes that ran the question, and any failures, as JSON or CSV. The exit
+status is nonzero if any run failed or a question exceeded `--max-p90-ms`, so
+that the runner can be used in CI:
+
+```sh
+python apps/prairielearn/python/course_runner.py exampleCourse --seeds 5 --format csv --output report.csv
+```
+"""
+
+import argparse
+import copy
+import csv
+import io
+import json
+import math
+import multiprocessing
+import multiprocessing.connection
+import os
+import pathlib
+import random
+import resource
+import signal
+import sys
+import time
+import traceback
+import types
+from collections.abc import Callable, Iterator, Sequence
+from multiprocessing.connection import Connection
+from typing import TYPE_CHECKING, Any, Literal, NamedTuple, TypedDict, cast
+
+import chevron
+
+from prairielearn.internal import question_phases
+from prairielearn.internal.check_data import Phase, check_data
+from prairielearn.internal.zygote_utils import get_module_function
+
+if TYPE_CHECKING:
+    from multiprocessing.process import BaseProcess
+
+PHASES: tuple[Phase, ...] = ("generate", "prepare", "render", "test", "parse", "grade")
+"""The phases that are run and timed, in order."""
+
+PERCENTILES = (50, 90, 99)
+
+TestType = Literal["correct", "incorrect", "invalid"]
+
+
+class Question(NamedTuple):
+    qid: str
+    path: pathlib.Path
+    partial_credit: bool
+    grading_method: str
+    has_workspace: bool
+
+
+class RunResult(NamedTuple):
+    """The result of running one question with one variant seed."""
+
+    qid: str
+    seed: int
+    times: dict[str, float]
+    """The time spent in each phase, in seconds."""
+    peak_rss: int
+    """The peak resident memory of the process that ran the question, in bytes."""
+    failures: list[str]
+
+
+class Latency(TypedDict):
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+class Failure(TypedDict):
+    seed: int
+    error: str
+
+
+class QuestionReport(TypedDict):
+    qid: str
+    runs: int
+    failed_runs: int
+    total: Latency
+    phases: dict[str, Latency]
+    peak_rss: int
+    failures: list[Failure]
+
+
+class PhaseError(Exception):
+    """An error in a phase of a question, with the phase that it happened in."""
+
+    def __init__(self, phase: str, message: str) -> None:
+        super().__init__(f"{phase}: {message}")
+
+
+def find_questions(course_path: pathlib.Path) -> list[Question]:
+    """Return the v3 questions of a course, sorted by QID."""
+    questions_path = course_path / "questions"
+    questions: list[Question] = []
+    for info_path in sorted(questions_path.glob("**/info.json")):
+        with open(info_path, encoding="utf-8") as f:
+            info = json.load(f)
+        if info.get("type", "v3") != "v3":
+            continue
+        if not (info_path.parent / "question.html").is_file():
+            continue
+        questions.append(
+            Question(
+                qid=info_path.parent.relative_to(questions_path).as_posix(),
+                path=info_path.parent,
+                partial_credit=info.get("partialCredit", True),
+                grading_method=info.get("gradingMethod", "Internal"),
+                has_workspace="workspaceOptions" in info,
+            )
+        )
+    return questions
+
+
+def _load_elements(
+    elements_path: pathlib.Path, element_type: Literal["core", "course"]
+) -> dict[str, question_phases.ElementInfo]:
+    elements: dict[str, question_phases.ElementInfo] = {}
+    for info_path in sorted(elements_path.glob("*/info.json")):
+        with open(info_path, encoding="utf-8") as f:
+            info = json.load(f)
+        name = info_path.parent.name
+        elements[name] = {
+            "name": name,
+            "controller": info["controller"],
+            "type": element_type,
+        }
+        if element_type == "core":
+            # Core elements can also be written with underscores.
+            elements[name.replace("-", "_")] = elements[name]
+    return elements
+
+
+def _load_extensions(course_path: pathlib.Path) -> dict[str, dict[str, dict[Any, Any]]]:
+    extensions: dict[str, dict[str, dict[Any, Any]]] = {}
+    for info_path in sorted((course_path / "elementExtensions").glob("*/*/info.json")):
+        with open(info_path, encoding="utf-8") as f:
+            info = json.load(f)
+        element, name = info_path.parent.parent.name, info_path.parent.name
+        extensions.setdefault(element, {})[name] = {
+            "name": name,
+            "directory": str(info_path.parent),
+            **info,
+        }
+    return extensions
+
+
+def _parse_js_float(value: str) -> float:
+    # JavaScript has no separate integer type, so `6.0` comes back as `6`.
+    number = float(value)
+    if number.is_integer() and abs(number) <= 2**53:
+        return int(number)
+    return number
+
+
+def _round_trip(data: dict[str, Any], phase: str) -> dict[str, Any]:
+    # The web app stores `data` as JSON between phases.
+    try:
+        return json.loads(
+            json.dumps(data, allow_nan=False), parse_float=_parse_js_float
+        )
+    except (TypeError, ValueError) as exc:
+        raise PhaseError(phase, f"data can't be encoded as JSON: {exc}") from exc
+
+
+def _compute_score(partial_scores: dict[str, Any], *, partial_credit: bool) -> float:
+    # This mirrors how `freeform.ts` computes the score from the partial scores.
+    def values(value: Any) -> tuple[float, float]:
+        value = value if isinstance(value, dict) else {}
+        score = value.get("score")
+        weight = value.get("weight")
+        return (
+            score if isinstance(score, int | float) else 0,
+            weight if isinstance(weight, int | float) else 1,
+        )
+
+    scores = [values(value) for value in partial_scores.values()]
+    if partial_credit:
+        total_weight = sum(weight for _, weight in scores)
+        return sum(score * weight for score, weight in scores) / (total_weight or 1)
+    return float(bool(scores) and all(score >= 1 for score, _ in scores))
+
+
+class _QuestionRun:
+    """Runs the phases of one question in the current process."""
+
+    def __init__(
+        self, course_path: pathlib.Path, question: Question, seed: int
+    ) -> None:
+        self.course_path = course_path
+        self.question = question
+        self.seed = seed
+        self.template = (question.path / "question.html").read_text(encoding="utf-8")
+        self.context_base = {
+            "elements": {
+                **_load_elements(question_phases.CORE_ELEMENTS_PATH, "core"),
+                **_load_elements(course_path / "elements", "course"),
+            },
+            "element_extensions": _load_extensions(course_path),
+            "course_path": str(course_path),
+        }
+        self.options = {
+            "question_path": str(question.path),
+            "client_files_question_path": str(question.path / "clientFilesQuestion"),
+            "client_files_course_path": str(course_path / "clientFilesCourse"),
+            "server_files_course_path": str(course_path / "serverFilesCourse"),
+            "course_extensions_path": str(course_path / "elementExtensions"),
+        }
+        self.server: dict[str, Any] = {}
+        self.times: dict[str, float] = dict.fromkeys(PHASES, 0.0)
+
+    def _set_up_question_environment(self) -> None:
+        # Element processing changes the working directory and `sys.path`.
+        os.chdir(self.question.path)
+        sys.path = [
+            str(self.question.path),
+            str(self.course_path / "serverFilesCourse"),
+            *question_phases.SAVED_PATH,
+        ]
+
+    def _load_server(self) -> None:
+        server_path = self.question.path / "server.py"
+        if not server_path.is_file():
+            return
+        self.server = {"__file__": str(server_path)}
+        code = compile(server_path.read_text(encoding="utf-8"), server_path, "exec")
+        exec(code, self.server)
+
+    def _run_phase(
+        self, phase: Phase, data: dict[str, Any]
+    ) -> tuple[dict[str, Any], str | None]:
+        """Run a phase for the question's elements and then its `server.py`.
+
+        Returns:
+            The new `data`, and the rendered HTML for `render`.
+
+        Raises:
+            PhaseError: If the phase failed.
+        """
+        start = time.perf_counter()
+        html = None
+        try:
+            if phase != "generate":
+                context: question_phases.RenderContext = {
+                    "html": chevron.render(self.template, data),
+                    **self.context_base,  # pyright: ignore[reportAssignmentType]
+                }
+                result, _ = question_phases.process(phase, data, context)
+                if phase == "render":
+                    html = str(result)
+                if phase in ("grade", "test"):
+                    data["score"] = _compute_score(
+                        data["partial_scores"],
+                        partial_credit=self.question.partial_credit,
+                    )
+
+            self._set_up_question_environment()
+            if phase == "generate":
+                self._load_server()
+            method = get_module_function(self.server, phase)
+            if method is not None:
+                original_data = copy.deepcopy(data)
+                if phase == "render":
+                    html = method(data, html) or html
+                else:
+                    data = method(data) or data
+                    check_data(original_data, data, phase)
+        except PhaseError:
+            raise
+        except Exception as exc:
+            raise PhaseError(phase, _describe_exception(exc)) from exc
+        finally:
+            self.times[phase] += time.perf_counter() - start
+
+        return _round_trip(data, phase), html
+
+    def run(self, test_types: Sequence[TestType]) -> None:
+        """Run every phase, raising a `PhaseError` for the first failure."""
+        random.seed(self.seed)
+        _seed_numpy(self.seed)
+
+        data, _ = self._run_phase(
+            "generate",
+            {
+                "params": {},
+                "correct_answers": {},
+                "variant_seed": self.seed,
+                "options": dict(self.options),
+                "preferences": {},
+            },
+        )
+        variant, _ = self._run_phase("prepare", {**data, "answers_names": {}})
+        variant.pop("answers_names", None)
+
+        self._run_phase(
+            "render",
+            {
+                **variant,
+                "options": {
+                    **variant["options"],
+                    "client_files_question_url": "/clientFilesQuestion",
+                    "client_files_course_url": "/clientFilesCourse",
+                    "client_files_question_dynamic_url": "/generatedFilesQuestion",
+                    "course_element_files_url": "/elements",
+                    "course_element_extension_files_url": "/elementExtensions",
+                    "submission_files_url": None,
+                    "variant_id": "1",
+                    "external_image_capture_url": None,
+                    "base_url": "/",
+                    "workspace_url": "/workspace"
+                    if self.question.has_workspace
+                    else None,
+                },
+                "submitted_answers": {},
+                "format_errors": {},
+                "raw_submitted_answers": {},
+                "partial_scores": {},
+                "score": 0,
+                "feedback": {},
+                "editable": True,
+                "manual_grading": False,
+                "ai_grading": False,
+                "panel": "question",
+                "correct_answer_shown": False,
+                "num_valid_submissions": 0,
+            },
+        )
+
+        for test_type in test_types:
+            self._test(variant, test_type)
+
+    def _test(self, variant: dict[str, Any], test_type: TestType) -> None:
+        # This mirrors `testVariant()` in `question-testing.ts`.
+        expected, _ = self._run_phase(
+            "test",
+            {
+                **variant,
+                "format_errors": {},
+                "partial_scores": {},
+                "score": 0,
+                "feedback": {},
+                "raw_submitted_answers": {},
+                "gradable": True,
+                "test_type": test_type,
+            },
+        )
+        if expected["format_errors"]:
+            expected["gradable"] = False
+
+        submission, _ = self._run_phase(
+            "parse",
+            {
+                **variant,
+                "submitted_answers": copy.deepcopy(expected["raw_submitted_answers"]),
+                "feedback": {},
+                "format_errors": {},
+                "raw_submitted_answers": expected["raw_submitted_answers"],
+                "gradable": True,
+            },
+        )
+        if submission["format_errors"]:
+            submission["gradable"] = False
+        elif self.question.grading_method == "Internal":
+            submission, _ = self._run_phase(
+                "grade",
+                {**submission, "partial_scores": {}, "score": 0},
+            )
+            if submission["format_errors"]:
+                submission["gradable"] = False
+
+        mismatches = [
+            f"{name} mismatch: expected {json.dumps(expected_value)} but got {json.dumps(value)}"
+            for name, expected_value, value in self._compare(expected, submission)
+            if expected_value != value
+        ]
+        if mismatches:
+            raise PhaseError(f"test ({test_type})", "; ".join(mismatches))
+
+    def _compare(
+        self, expected: dict[str, Any], submission: dict[str, Any]
+    ) -> Iterator[tuple[str, Any, Any]]:
+        yield "gradable", expected["gradable"], submission["gradable"]
+        yield (
+            "format_errors keys",
+            sorted(expected["format_errors"]),
+            sorted(submission["format_errors"]),
+        )
+        if (
+            expected["gradable"]
+            and submission["gradable"]
+            and self.question.grading_method == "Internal"
+        ):
+            yield (
+                "partial_scores",
+                expected["partial_scores"],
+                submission["partial_scores"],
+            )
+            yield "score", expected["score"], submission["score"]
+
+
+def _seed_numpy(seed: int) -> None:
+    if "numpy" in sys.modules:
+        sys.modules["numpy"].random.seed(seed)
+
+
+def _describe_exception(exc: BaseException) -> str:
+    # The last frame is usually the most helpful part of a traceback.
+    frames = traceback.extract_tb(exc.__traceback__)
+    location = f" ({frames[-1].filename}:{frames[-1].lineno})" if frames else ""
+    return f"{type(exc).__name__}: {exc}{location}"
+
+
+def _raise_timeout(_signum: int, _frame: types.FrameType | None) -> None:
+    raise TimeoutError("the question used too much CPU time")
+
+
+def run_question(
+    course_path: pathlib.Path,
+    question: Question,
+    seed: int,
+    test_types: Sequence[TestType],
+    timeout: float,
+) -> RunResult:
+    """Run every phase of a question with one variant seed.
+
+    This changes the working directory, `sys.path`, and the state of the PRNGs,
+    so it's meant to be run in a process of its own.
+
+    Returns:
+        The time spent in each phase, the peak RSS, and any failure.
+    """
+    run = _QuestionRun(course_path, question, seed)
+    failures: list[str] = []
+    # `prairielearn.timeout_utils` uses `SIGALRM`, so this counts CPU time instead.
+    signal.signal(signal.SIGVTALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_VIRTUAL, timeout)
+    try:
+        run.run(test_types)
+    except PhaseError as exc:
+        failures.append(str(exc))
+    finally:
+        signal.setitimer(signal.ITIMER_VIRTUAL, 0)
+    return RunResult(
+        question.qid,
+        seed,
+        run.times,
+        # `ru_maxrss` is in kilobytes on Linux.
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        failures,
+    )
+
+
+def _run_in_child(
+    sender: Connection,
+    course_path: pathlib.Path,
+    question: Question,
+    seed: int,
+    test_types: Sequence[TestType],
+    timeout: float,
+) -> None:
+    # Questions often print, which would mix with the report on stdout.
+    sys.stdout = sys.stderr
+    sender.send(run_question(course_path, question, seed, test_types, timeout))
+    sender.close()
+
+
+def run_course(
+    course_path: pathlib.Path,
+    questions: Sequence[Question],
+    seeds: Sequence[int],
+    *,
+    processes: int,
+    test_types: Sequence[TestType] = ("correct",),
+    timeout: float = 60,
+    on_result: Callable[[RunResult], None] | None = None,
+) -> list[RunResult]:
+    """Run every question with every seed, each in a new process forked from this one.
+
+    A fresh process for every run means that no run sees modules or global state
+    left behind by another question, and that the peak RSS belongs to one run.
+
+    Returns:
+        The result of each run, ordered by question and then seed.
+    """
+    # Like the zygote, preload the core elements so that every fork inherits them.
+    question_phases.preload_core_elements(
+        question_phases.get_core_element_controllers()
+    )
+
+    context = multiprocessing.get_context("fork")
+    tasks = [(question, seed) for question in questions for seed in seeds]
+    running: dict[int, tuple[Question, int, Connection, BaseProcess]] = {}
+    results: list[RunResult] = []
+    while tasks or running:
+        while tasks and len(running) < processes:
+            question, seed = tasks.pop(0)
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_run_in_child,
+                args=(sender, course_path, question, seed, test_types, timeout),
+            )
+            process.start()
+            sender.close()
+            running[process.sentinel] = (question, seed, receiver, process)
+
+        for sentinel in multiprocessing.connection.wait(list(running)):
+            question, seed, receiver, process = running.pop(cast("int", sentinel))
+            try:
+                result = receiver.recv()
+            except EOFError:
+                # The process died, for example because it ran out of memory.
+                result = RunResult(
+                    question.qid,
+                    seed,
+                    {},
+                    0,
+                    [f"the process exited with status {process.exitcode}"],
+                )
+            receiver.close()
+            process.join()
+            if on_result is not None:
+                on_result(result)
+            results.append(result)
+    order = {question.qid: index for index, question in enumerate(questions)}
+    return sorted(results, key=lambda result: (order[result.qid], result.seed))
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """Return the nearest-rank percentile of `values`, or NaN if there are none."""
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    rank = math.ceil(percent / 100 * len(ordered))
+    return ordered[max(rank, 1) - 1]
+
+
+def _latency(seconds: Sequence[float]) -> Latency:
+    p50, p90, p99 = (percentile(seconds, percent) * 1000 for percent in PERCENTILES)
+    return {
+        "p50_ms": p50,
+        "p90_ms": p90,
+        "p99_ms": p99,
+        "max_ms": max(seconds, default=math.nan) * 1000,
+    }
+
+
+def summarize(results: Sequence[RunResult]) -> list[QuestionReport]:
+    """Group run results by question and compute latency percentiles.
+
+    Only runs that completed every phase count towards the latency of the
+    whole question, since failed runs skip the later phases.
+
+    Returns:
+        One report per question, in the order of `results`.
+    """
+    by_question: dict[str, list[RunResult]] = {}
+    for result in results:
+        by_question.setdefault(result.qid, []).append(result)
+
+    reports: list[QuestionReport] = []
+    for qid, runs in by_question.items():
+        complete = [run for run in runs if not run.failures]
+        reports.append({
+            "qid": qid,
+            "runs": len(runs),
+            "failed_runs": len(runs) - len(complete),
+            "total": _latency([sum(run.times.values()) for run in complete]),
+            "phases": {
+                phase: _latency([
+                    run.times[phase] for run in runs if phase in run.times
+                ])
+                for phase in PHASES
+            },
+            "peak_rss": max(run.peak_rss for run in runs),
+            "failures": [
+                {"seed": run.seed, "error": failure}
+                for run in runs
+                for failure in run.failures
+            ],
+        })
+    return reports
+
+
+def format_json(reports: Sequence[QuestionReport]) -> str:
+    # NaN isn't valid JSON, so percentiles without any runs become `null`.
+    def clean(value: Any) -> Any:
+        if isinstance(value, float) and math.isnan(value):
+            return None
+        if isinstance(value, dict):
+            return {key: clean(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [clean(item) for item in value]
+        return value
+
+    return json.dumps({"questions": clean(list(reports))}, indent=2) + "\n"
+
+
+def format_csv(reports: Sequence[QuestionReport]) -> str:
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow([
+        "qid",
+        "runs",
+        "failed_runs",
+        *(f"total_{key}" for key in Latency.__annotations__),
+        *(f"{phase}_p50_ms" for phase in PHASES),
+        "peak_rss_mib",
+        "first_failure",
+    ])
+    for report in reports:
+        writer.writerow([
+            report["qid"],
+            report["runs"],
+            report["failed_runs"],
+            *(f"{value:.2f}" for value in report["total"].values()),
+            *(f"{report['phases'][phase]['p50_ms']:.2f}" for phase in PHASES),
+            f"{report['peak_rss'] / 2**20:.1f}",
+            report["failures"][0]["error"] if report["failures"] else "",
+        ])
+    return output.getvalue()
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Run the phases of every question in a course and report their latency, memory use, and failures."
+    )
+    parser.add_argument("course", type=pathlib.Path, help="the course directory")
+    parser.add_argument(
+        "--questions",
+        nargs="+",
+        metavar="QID",
+        help="only run these questions (default: every v3 question)",
+    )
+    parser.add_argument(
+        "--seeds", type=int, default=3, help="variant seeds per question (default: 3)"
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="questions to run at once (default: the number of CPUs)",
+    )
+    parser.add_argument(
+        "--test-types",
+        default="correct",
+        help="comma-separated test types to submit: correct, incorrect, invalid (default: correct)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=60,
+        help="CPU seconds allowed per question and seed (default: 60)",
+    )
+    parser.add_argument("--format", choices=("json", "csv"), default="json")
+    parser.add_argument(
+        "--output", type=pathlib.Path, help="write the report here instead of stdout"
+    )
+    parser.add_argument(
+        "--max-p90-ms",
+        type=float,
+        help="fail if the p90 latency of any question is higher than this",
+    )
+    args = parser.parse_args(argv)
+
+    course_path = args.course.resolve()
+    test_types: list[TestType] = []
+    for test_type in args.test_types.split(","):
+        if test_type not in ("correct", "incorrect", "invalid"):
+            parser.error(f"unknown test type: {test_type}")
+        test_types.append(test_type)
+
+    questions = find_questions(course_path)
+    if args.questions:
+        questions = [q for q in questions if q.qid in set(args.questions)]
+        missing = set(args.questions) - {q.qid for q in questions}
+        if missing:
+            parser.error(f"no such questions: {', '.join(sorted(missing))}")
+
+    def report_failure(result: RunResult) -> None:
+        for failure in result.failures:
+            print(f"{result.qid} (seed {result.seed}): {failure}", file=sys.stderr)
+
+    # Matplotlib can't open windows in worker processes.
+    os.environ.setdefault("MPLBACKEND", "PDF")
+    results = run_course(
+        course_path,
+        questions,
+        range(1, args.seeds + 1),
+        processes=args.processes,
+        test_types=test_types,
+        timeout=args.timeout,
+        on_result=report_failure,
+    )
+    reports = summarize(results)
+    output = format_csv(reports) if args.format == "csv" else format_json(reports)
+    if args.output is None:
+        sys.stdout.write(output)
+    else:
+        args.output.write_text(output, encoding="utf-8")
+
+    failed = [report["qid"] for report in reports if report["failures"]]
+    slow = [
+        report["qid"]
+        for report in reports
+        if args.max_p90_ms is not None
+        and not report["total"]["p90_ms"] <= args.max_p90_ms
+        and report["runs"] > report["failed_runs"]
+    ]
+    print(
+        f"{len(reports)} questions, {len(failed)} with failures"
+        + (f", {len(slow)} over {args.max_p90_ms} ms at p90" if slow else ""),
+        file=sys.stderr,
+    )
+    for qid in slow:
+        print(f"too slow: {qid}", file=sys.stderr)
+    return 1 if failed or slow else 0
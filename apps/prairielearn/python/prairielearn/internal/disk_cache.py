@@ -0,0 +1,78 @@
+"""A size-bounded cache of bytes in a directory that several workers can share.
+
+Each entry is a file named after its key, which must be a hex digest. Entries
+are written to a temporary file and renamed into place, so readers never see a
+partial entry, and reading an entry updates its modification time, so that
+pruning removes the least recently used entries first. Workers don't
+coordinate with each other, so the directory may briefly grow past its bound
+until the next write that prunes it.
+"""
+
+import contextlib
+import os
+import pathlib
+import tempfile
+
+# Pruning scans the whole directory, so only writes whose key starts with this
+# prefix prune. Keys are hashes, so that's about one write in sixteen, without
+# keeping any state between workers.
+_PRUNE_KEY_PREFIX = "0"
+
+
+class DiskCache:
+    def __init__(self, directory: str | os.PathLike[str], max_bytes: int) -> None:
+        self.directory = pathlib.Path(directory)
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> pathlib.Path:
+        # Two-character subdirectories keep the directories small.
+        return self.directory / key[:2] / key
+
+    def get(self, key: str) -> bytes | None:
+        """Return the value stored for `key`, or `None` if there is none."""
+        path = self._path(key)
+        try:
+            value = path.read_bytes()
+        except OSError:
+            return None
+        # Another worker may have pruned the entry since it was read.
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        """Store `value` for `key`, ignoring errors like a full or read-only disk."""
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(value)
+                os.replace(temp_path, path)
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    os.unlink(temp_path)
+                raise
+        except OSError:
+            return
+        if key.startswith(_PRUNE_KEY_PREFIX):
+            self.prune()
+
+    def prune(self) -> None:
+        """Remove the least recently used entries until the cache fits in `max_bytes`."""
+        entries: list[tuple[float, int, pathlib.Path]] = []
+        with contextlib.suppress(OSError):
+            for path in self.directory.glob("*/*"):
+                if path.name.startswith("."):
+                    continue
+                with contextlib.suppress(OSError):
+                    stat = path.stat()
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            with contextlib.suppress(OSError):
+                path.unlink()
+            total -= size
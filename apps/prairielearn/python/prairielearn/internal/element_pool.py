@@ -0,0 +1,264 @@
+"""A small pool of forked helper processes for running elements in parallel.
+
+During the `parse` and `grade` phases, elements only read and write the keys
+for their own answers, so independent elements can be processed by separate
+processes. Each helper works on its own copy of `data` and reports which keys
+of the props that may be modified in the phase it changed. The changes are
+merged back into the worker's `data` in document order, unless two elements
+changed the same key, in which case the result could depend on the order in
+which the elements ran.
+
+The pool is opt-in with [`configure`][prairielearn.internal.element_pool.configure].
+Helpers are forked the first time the pool is needed, so they inherit the
+modules, controllers, and state that the worker has set up for the current
+request, and are then reused until the worker shuts the pool down.
+"""
+
+import os
+import signal
+import traceback
+from collections.abc import Callable, Iterable, Sequence
+from multiprocessing.connection import Connection, Pipe, wait
+from typing import Any, NamedTuple
+
+
+class DataChange(NamedTuple):
+    """A change that an element made to one prop of `data`."""
+
+    prop: str
+    key: str | None
+    """The changed key of a dict prop, or `None` if the whole prop was changed."""
+    deleted: bool
+    value: Any
+
+
+def diff_data(before: dict[str, Any], after: dict[str, Any]) -> list[DataChange]:
+    """Return the changes to the props in `before` that were made in `after`.
+
+    Dict props are compared key by key, so that elements that only change their
+    own keys of the same prop don't conflict with each other.
+
+    Returns:
+        The changes, in the order of the props and keys in `before` and `after`.
+    """
+    changes: list[DataChange] = []
+    for prop, old in before.items():
+        new = after[prop]
+        if isinstance(old, dict) and isinstance(new, dict):
+            for key in old:
+                if key not in new:
+                    changes.append(DataChange(prop, key, deleted=True, value=None))
+                elif _changed(old[key], new[key]):
+                    changes.append(DataChange(prop, key, deleted=False, value=new[key]))
+            changes.extend(
+                DataChange(prop, key, deleted=False, value=value)
+                for key, value in new.items()
+                if key not in old
+            )
+        elif _changed(old, new):
+            changes.append(DataChange(prop, None, deleted=False, value=new))
+    return changes
+
+
+def _changed(old: Any, new: Any) -> bool:
+    return type(old) is not type(new) or old != new
+
+
+def _describe(prop: str, key: str | None) -> str:
+    return f'data["{prop}"]' if key is None else f'data["{prop}"]["{key}"]'
+
+
+def find_conflicts(changes: Sequence[Sequence[DataChange]]) -> list[str]:
+    """Find the props and keys that were changed by more than one element.
+
+    Returns:
+        A description of each conflicting prop or key, like `data["params"]["x"]`.
+    """
+    writers: dict[tuple[str, str | None], set[int]] = {}
+    for index, element_changes in enumerate(changes):
+        for change in element_changes:
+            writers.setdefault((change.prop, change.key), set()).add(index)
+
+    conflicts: list[str] = []
+    for (prop, key), indices in writers.items():
+        elements = indices
+        if key is None:
+            # Replacing a prop as a whole conflicts with any other change to it.
+            elements = set[int]().union(
+                *(
+                    other
+                    for (other_prop, _), other in writers.items()
+                    if other_prop == prop
+                )
+            )
+        if len(elements) > 1:
+            conflicts.append(_describe(prop, key))
+    return conflicts
+
+
+def apply_changes(data: dict[str, Any], changes: Iterable[DataChange]) -> None:
+    """Apply changes from [`diff_data`][prairielearn.internal.element_pool.diff_data] to `data`."""
+    for change in changes:
+        if change.key is None:
+            data[change.prop] = change.value
+        elif change.deleted:
+            data[change.prop].pop(change.key, None)
+        else:
+            data[change.prop][change.key] = change.value
+
+
+class ElementPool:
+    """Forked helper processes that run functions and send back the results.
+
+    Each helper is connected to the worker by a pipe. Helpers exit as soon as
+    the worker closes its end, including when the worker itself exits.
+    """
+
+    def __init__(self, processes: int) -> None:
+        self._connections: list[Connection] = []
+        self._pids: list[int] = []
+        self.broken = False
+        for _ in range(processes):
+            parent_connection, child_connection = Pipe()
+            pid = os.fork()
+            if pid == 0:
+                _run_helper(child_connection, [parent_connection, *self._connections])
+            child_connection.close()
+            self._connections.append(parent_connection)
+            self._pids.append(pid)
+
+    def map(
+        self, fn: Callable[..., Any], args_list: Sequence[tuple[Any, ...]]
+    ) -> list[Any]:
+        """Call `fn` with each of `args_list` in the helpers.
+
+        All calls are run to completion, even if some of them fail, and then
+        the exception raised by the first call that failed, in the order of
+        `args_list`, is re-raised. `fn` must be a module-level function so that
+        it can be pickled.
+
+        Returns:
+            The return values of the calls, in the same order as `args_list`.
+        """
+        # Calls that never complete because their helper exited fail with this.
+        exited = RuntimeError("An element pool process exited unexpectedly")
+        outcomes: list[tuple[bool, Any]] = [(False, exited)] * len(args_list)
+        pending = iter(enumerate(args_list))
+        busy: dict[Connection, int] = {}
+
+        def dispatch(connection: Connection) -> None:
+            task = next(pending, None)
+            if task is not None:
+                connection.send((fn, task[1]))
+                busy[connection] = task[0]
+
+        for connection in self._connections:
+            dispatch(connection)
+
+        while busy:
+            for connection in wait(list(busy)):
+                assert isinstance(connection, Connection)
+                index = busy.pop(connection)
+                try:
+                    outcomes[index] = connection.recv()
+                except EOFError:
+                    # The remaining calls are dispatched to the other helpers.
+                    self.broken = True
+                    continue
+                except Exception as exc:
+                    # The result could not be unpickled.
+                    outcomes[index] = (False, exc)
+                dispatch(connection)
+
+        for succeeded, value in outcomes:
+            if not succeeded:
+                raise value
+        return [value for _, value in outcomes]
+
+    def close(self) -> None:
+        """Stop all helpers and wait for them to exit."""
+        for connection in self._connections:
+            connection.close()
+        for pid in self._pids:
+            # Helpers hold no state worth keeping, so there's no need to wait
+            # for them to finish whatever they're doing.
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self._connections.clear()
+        self._pids.clear()
+
+
+def _run_helper(connection: Connection, parent_connections: list[Connection]) -> None:
+    try:
+        # Helpers must never fork helpers of their own.
+        _state.processes = 0
+        _state.pool = None
+        for parent_connection in parent_connections:
+            parent_connection.close()
+
+        while True:
+            try:
+                fn, args = connection.recv()
+            except EOFError:
+                break
+            try:
+                outcome = (True, fn(*args))
+            except BaseException as exc:
+                # The traceback doesn't survive pickling.
+                exc.add_note("".join(traceback.format_exception(exc)).rstrip())
+                outcome = (False, exc)
+            try:
+                connection.send(outcome)
+            except Exception as exc:
+                connection.send((
+                    False,
+                    RuntimeError(
+                        f"Could not send the result of {fn.__name__}(): {exc}"
+                    ),
+                ))
+    finally:
+        # Never return into the worker's code.
+        os._exit(0)
+
+
+class _PoolState:
+    processes = 0
+    pool: ElementPool | None = None
+
+
+_state = _PoolState()
+
+
+def configure(processes: int) -> None:
+    """Set the number of helper processes. Zero or less disables the pool."""
+    shutdown()
+    _state.processes = processes
+
+
+def is_enabled() -> bool:
+    return _state.processes > 0
+
+
+def get_pool() -> ElementPool | None:
+    """Return the pool, forking its helpers if needed.
+
+    Returns:
+        The pool, or `None` if it is disabled.
+    """
+    if _state.processes <= 0:
+        return None
+    if _state.pool is not None and _state.pool.broken:
+        shutdown()
+    if _state.pool is None:
+        _state.pool = ElementPool(_state.processes)
+    return _state.pool
+
+
+def shutdown() -> None:
+    """Stop the helpers, if any. They are forked again when the pool is next needed."""
+    if _state.pool is not None:
+        _state.pool.close()
+        _state.pool = None
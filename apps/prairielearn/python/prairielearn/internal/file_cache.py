@@ -0,0 +1,138 @@
+"""A disk cache of the files that questions generate with `file()` in `server.py`.
+
+Generating a file like a `matplotlib` plot is often the slowest thing a
+question does, and the same file is requested again every time a page that
+shows it is loaded. When the cache is configured, the worker looks up the
+output of a `file()` call before loading `server.py` at all, keyed by the
+course (as identified by the caller, since every course is at the same path in
+a container), the question directory, the contents of `server.py`, the file
+name, the variant seed, and the parts of `data` that `file()` may depend on:
+`params`, `correct_answers`, `submitted_answers`, and `options`.
+
+Other files of the course that `server.py` reads, like data files or modules
+in `serverFilesCourse`, aren't part of the key, so files generated by a
+`server.py` that read any of them aren't stored. The worker records the files
+that are opened while it loads `server.py` and calls `file()` to find out.
+
+This assumes that `file()` depends on nothing else, like the current user or
+the time, which is why the cache is opt-in. Question code that can write to
+the directory can also replace the cached files of other courses. The zygote
+doesn't use the cache when questions run as a separate user, but otherwise
+question code runs as the same user as the zygote, so the cache should only be
+used when all courses are trusted.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import pathlib
+import sys
+from collections.abc import Generator, Iterable
+from typing import Any
+
+from prairielearn.internal.disk_cache import DiskCache
+
+
+class _FileCacheState:
+    cache: DiskCache | None = None
+    # The files opened since `record_opened_files()` was entered, if it was.
+    opened_files: list[str] | None = None
+    audit_hook_added = False
+
+
+_state = _FileCacheState()
+
+
+def _record_open(event: str, args: tuple[Any, ...]) -> None:
+    if event == "open" and _state.opened_files is not None:
+        path = args[0]
+        if isinstance(path, (str, bytes, os.PathLike)):
+            _state.opened_files.append(os.path.abspath(os.fsdecode(path)))
+
+
+def configure(directory: str | None, max_bytes: int = 256 * 1024 * 1024) -> None:
+    """Store generated files in `directory`, or turn the cache off if it is `None`."""
+    _state.cache = DiskCache(directory, max_bytes) if directory else None
+    if _state.cache is not None and not _state.audit_hook_added:
+        # Audit hooks can't be removed, so there is only ever one.
+        sys.addaudithook(_record_open)
+        _state.audit_hook_added = True
+
+
+def current() -> DiskCache | None:
+    """Return the file cache, or `None` if generated files aren't cached."""
+    return _state.cache
+
+
+def make_key(
+    server_path: str, data: dict[str, Any], course_id: str | None
+) -> str | None:
+    """Return the cache key for calling `file()` in `server_path`, or `None` if the call can't be cached."""
+    if course_id is None:
+        return None
+    try:
+        source = pathlib.Path(server_path).read_bytes()
+        encoded = json.dumps(
+            [
+                course_id,
+                str(pathlib.Path(server_path).parent),
+                hashlib.sha256(source).hexdigest(),
+                data.get("filename"),
+                data.get("variant_seed"),
+                data.get("params"),
+                data.get("correct_answers"),
+                data.get("submitted_answers"),
+                data.get("options"),
+            ],
+            sort_keys=True,
+            allow_nan=False,
+        )
+    except (OSError, TypeError, ValueError):
+        return None
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@contextlib.contextmanager
+def record_opened_files() -> Generator[list[str]]:
+    """Yield a list of the absolute paths of the files opened inside the `with` block.
+
+    Files are only recorded once the cache is configured.
+    """
+    opened_files: list[str] = []
+    _state.opened_files = opened_files
+    try:
+        yield opened_files
+    finally:
+        _state.opened_files = None
+
+
+def _course_root(server_path: str) -> pathlib.Path | None:
+    question_path = pathlib.Path(server_path).resolve().parent
+    for parent in question_path.parents:
+        if parent.name == "questions":
+            return parent.parent
+    return None
+
+
+def reads_course_files(server_path: str, opened_files: Iterable[str]) -> bool:
+    """Return whether `server_path` may have read files of its course other than itself.
+
+    Those are the files in `opened_files` and the imported modules that are
+    in the course. A `server.py` outside of a course's `questions` directory
+    counts as reading course files, since the course isn't known.
+    """
+    course_root = _course_root(server_path)
+    if course_root is None:
+        return True
+    server = pathlib.Path(server_path).resolve()
+    module_files = [
+        getattr(module, "__file__", None) for module in list(sys.modules.values())
+    ]
+    for path in [*opened_files, *module_files]:
+        if path is None:
+            continue
+        resolved = pathlib.Path(path).resolve()
+        if resolved != server and resolved.is_relative_to(course_root):
+            return True
+    return False
@@ -0,0 +1,171 @@
+"""Opt-in timing and memory measurements for the calls made by a worker.
+
+When a request is instrumented, the worker records the wall time, CPU time,
+and memory used by each element or question function that it calls, how long
+it took to compile and execute modules that weren't cached yet, and how long
+it took to decode the request and encode the response. These measurements
+are added to the response as an `instrumentation` block and can be appended
+to a log file, which `benchmarks/instrumentation_report.py` summarizes. Lookups
+in caches, like the file cache, are counted too.
+
+Nothing is measured unless [`start`][prairielearn.internal.instrumentation.start]
+has been called, so code that records measurements only has to check whether
+[`current`][prairielearn.internal.instrumentation.current] returns `None`.
+"""
+
+import contextlib
+import resource
+import time
+import tracemalloc
+from collections.abc import Generator
+from typing import Any, Literal, TypedDict
+
+MemoryMetric = Literal["rss", "tracemalloc"]
+
+CacheOutcome = Literal["hit", "miss"]
+
+
+class CallRecord(TypedDict):
+    name: str
+    """The element name, or the file that the function was loaded from."""
+
+    source: str | None
+    """The opening tag of the element, if the call was for an element."""
+
+    phase: str
+    wall_time: float
+    cpu_time: float
+    memory: int
+    """The peak of newly allocated memory or the growth of the peak RSS, in bytes."""
+
+
+class ModuleRecord(TypedDict):
+    path: str
+    compile_time: float
+    exec_time: float
+
+
+class CacheCounts(TypedDict):
+    hits: int
+    misses: int
+
+
+class Instrumentation:
+    """The measurements for a single request."""
+
+    def __init__(self, *, trace_memory: bool = False) -> None:
+        self.memory_metric: MemoryMetric = "tracemalloc" if trace_memory else "rss"
+        self.calls: list[CallRecord] = []
+        self.modules: list[ModuleRecord] = []
+        self.caches: dict[str, dict[str, CacheCounts]] = {}
+        """Cache lookups, counted by cache and then by element or file name."""
+        self.json_decode_time = 0.0
+        self.json_encode_time = 0.0
+
+    def _memory(self) -> int:
+        if self.memory_metric == "tracemalloc":
+            return tracemalloc.get_traced_memory()[0]
+        # `ru_maxrss` is reported in kilobytes on Linux.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    @contextlib.contextmanager
+    def measure_call(
+        self, name: str, phase: str, source: str | None = None
+    ) -> Generator[None]:
+        """Record the time and memory used by the body of the `with` statement.
+
+        The call is recorded even if the body raises an exception.
+        """
+        memory_before = self._memory()
+        if self.memory_metric == "tracemalloc":
+            tracemalloc.reset_peak()
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - wall_start
+            cpu_time = time.process_time() - cpu_start
+            if self.memory_metric == "tracemalloc":
+                memory = tracemalloc.get_traced_memory()[1] - memory_before
+            else:
+                memory = self._memory() - memory_before
+            self.calls.append({
+                "name": name,
+                "source": source,
+                "phase": phase,
+                "wall_time": wall_time,
+                "cpu_time": cpu_time,
+                "memory": max(memory, 0),
+            })
+
+    def record_module(self, path: str, compile_time: float, exec_time: float) -> None:
+        """Record that a module had to be compiled (unless it was cached) and executed."""
+        self.modules.append({
+            "path": path,
+            "compile_time": compile_time,
+            "exec_time": exec_time,
+        })
+
+    def record_cache(self, cache: str, name: str, outcome: CacheOutcome) -> None:
+        """Count a lookup in a cache, like the file cache, for a file."""
+        counts = self.caches.setdefault(cache, {}).setdefault(
+            name, {"hits": 0, "misses": 0}
+        )
+        if outcome == "hit":
+            counts["hits"] += 1
+        else:
+            counts["misses"] += 1
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "memory_metric": self.memory_metric,
+            "calls": self.calls,
+            "modules": self.modules,
+            "caches": self.caches,
+            "json_decode_time": self.json_decode_time,
+            "json_encode_time": self.json_encode_time,
+        }
+
+
+class _InstrumentationState:
+    current: Instrumentation | None = None
+    started_tracemalloc = False
+
+
+_state = _InstrumentationState()
+
+
+def start(*, trace_memory: bool = False) -> Instrumentation:
+    """Start instrumenting calls, replacing any measurements that weren't stopped.
+
+    Tracing memory allocations with `tracemalloc` is much more precise than
+    looking at the RSS, but slows down all Python code considerably.
+
+    Returns:
+        The object that collects the measurements.
+    """
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _state.started_tracemalloc = True
+    _state.current = Instrumentation(trace_memory=trace_memory)
+    return _state.current
+
+
+def stop() -> Instrumentation | None:
+    """Stop instrumenting calls.
+
+    Returns:
+        The measurements since the last call to `start`, or `None` if there are none.
+    """
+    instrumentation = _state.current
+    _state.current = None
+    if _state.started_tracemalloc:
+        tracemalloc.stop()
+        _state.started_tracemalloc = False
+    return instrumentation
+
+
+def current() -> Instrumentation | None:
+    """Return the measurements of the current request, or `None` if calls aren't instrumented."""
+    return _state.current
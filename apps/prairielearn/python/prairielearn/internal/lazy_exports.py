@@ -0,0 +1,222 @@
+"""Lazy loading of the names that the `prairielearn` package exports.
+
+The package re-exports the public names of its submodules. Importing all of
+them up front would import `numpy`, `pandas`, `sympy`, `networkx`, and more,
+which takes seconds, so the package instead uses this module's
+[`__getattr__`][prairielearn.internal.lazy_exports.__getattr__] to import a
+submodule the first time one of its names is used.
+"""
+
+import importlib
+import sys
+from typing import Any
+
+# The public names of each submodule, in the order in which the package used to
+# star-import them. `test/lazy_exports_test.py` checks that this matches the
+# submodules.
+_SUBMODULE_EXPORTS: dict[str, tuple[str, ...]] = {
+    "conversion_utils": (
+        "from_json",
+        "is_int_json_serializable",
+        "latex_from_2darray",
+        "numpy_to_matlab",
+        "numpy_to_matlab_sf",
+        "string_fraction_to_number",
+        "string_from_2darray",
+        "string_from_number_sigfig",
+        "string_from_numpy",
+        "string_partition_first_interval",
+        "string_partition_outer_interval",
+        "string_to_2darray",
+        "string_to_integer",
+        "string_to_number",
+        "to_json",
+    ),
+    "element_schemas": ("validate_element", "validate_element_tree"),
+    "extension_utils": (
+        "clean_identifier_name",
+        "load_all_extensions",
+        "load_extension",
+        "load_host_script",
+    ),
+    "grading_utils": (
+        "check_answers_names",
+        "determine_score_params",
+        "grade_answer_parameterized",
+        "is_correct_ndarray2D_dd",
+        "is_correct_ndarray2D_ra",
+        "is_correct_ndarray2D_sf",
+        "is_correct_ndarray2d_dd",
+        "is_correct_ndarray2d_ra",
+        "is_correct_ndarray2d_sf",
+        "is_correct_scalar_dd",
+        "is_correct_scalar_ra",
+        "is_correct_scalar_sf",
+    ),
+    "html_utils": (
+        "check_attribs",
+        "escape_invalid_string",
+        "get_boolean_attrib",
+        "get_color_attrib",
+        "get_enum_attrib",
+        "get_float_attrib",
+        "get_integer_attrib",
+        "get_string_attrib",
+        "has_attrib",
+        "inner_elements",
+        "inner_html",
+        "is_boolean_value",
+        "is_float_value",
+        "is_integer_value",
+    ),
+    "misc_utils": (
+        "escape_unicode_string",
+        "full_unidecode",
+        "get_unit_registry",
+        "get_uuid",
+        "index2key",
+        "iter_keys",
+        "partition",
+    ),
+    "question_utils": (
+        "ElementTestData",
+        "PartialScore",
+        "QuestionData",
+        "add_files_format_error",
+        "add_submitted_file",
+        "all_partial_scores_correct",
+        "set_all_or_nothing_score_data",
+        "set_weighted_score_data",
+    ),
+    "template_utils": ("load_template", "render_template"),
+}
+
+_EXPORTS = {
+    name: submodule for submodule, names in _SUBMODULE_EXPORTS.items() for name in names
+}
+
+# The submodules without an `__all__`, whose star imports also exported the names
+# that they import from elsewhere (like `np`), latest star import first so that
+# the same module wins as before. Some code may still rely on these names.
+_LEAKY_SUBMODULES = (
+    "template_utils",
+    "question_utils",
+    "misc_utils",
+    "grading_utils",
+    "extension_utils",
+    "conversion_utils",
+)
+
+# The submodules that `from prairielearn import *` used to export because the
+# package had imported them.
+_SUBMODULES = (
+    "colors",
+    "conversion_utils",
+    "element_schemas",
+    "extension_utils",
+    "grading_utils",
+    "html_utils",
+    "misc_utils",
+    "question_utils",
+    "sympy_utils",
+    "timeout_utils",
+    "to_precision",
+)
+
+# Names that the submodules no longer import at runtime, with the module that
+# they came from.
+_EXTERNAL_EXPORTS = {"UnitRegistry": "pint"}
+
+# The names that the leaky submodules' star imports exported, as of when the
+# package stopped importing its submodules eagerly.
+_LEAKED_EXPORTS = (
+    "Any",
+    "ArrayLike",
+    "Callable",
+    "Generator",
+    "Iterable",
+    "Literal",
+    "ModuleType",
+    "NotRequired",
+    "SignalTimeout",
+    "StringIO",
+    "TimeoutState",
+    "TypeVar",
+    "TypedDict",
+    "assert_never",
+    "base64",
+    "cast",
+    "collections",
+    "convert_string_to_sympy",
+    "importlib",
+    "is_sympy_json",
+    "it",
+    "json",
+    "json_to_sympy",
+    "math",
+    "namedtuple",
+    "np",
+    "npt",
+    "numbers",
+    "nx",
+    "os",
+    "overload",
+    "pd",
+    "random",
+    "re",
+    "string",
+    "sympy",
+    "sympy_to_json",
+    "unicodedata",
+    "unidecode",
+    "uuid",
+)
+
+STAR_EXPORTS = (
+    "TYPE_CHECKING",
+    *_EXPORTS,
+    *_SUBMODULES,
+    *_EXTERNAL_EXPORTS,
+    *_LEAKED_EXPORTS,
+)
+"""The names that `from prairielearn import *` exports, which imports all of the submodules that define them."""
+
+
+def _find_submodule(name: str) -> str | None:
+    if name in _EXPORTS:
+        return _EXPORTS[name]
+    if name.startswith("_"):
+        return None
+    for submodule in _LEAKY_SUBMODULES:
+        if hasattr(importlib.import_module(f"prairielearn.{submodule}"), name):
+            return submodule
+    return None
+
+
+def __getattr__(name: str) -> Any:
+    """Import the submodule of the `prairielearn` package that defines `name`.
+
+    Returns:
+        The value of `name` in that submodule.
+
+    Raises:
+        AttributeError: If no submodule defines `name`.
+    """
+    if name in _SUBMODULES:
+        # Importing a submodule also sets it as an attribute of the package.
+        return importlib.import_module(f"prairielearn.{name}")
+    if name in _EXTERNAL_EXPORTS:
+        value = getattr(importlib.import_module(_EXTERNAL_EXPORTS[name]), name)
+    else:
+        submodule = _find_submodule(name)
+        if submodule is None:
+            raise AttributeError(f"module 'prairielearn' has no attribute {name!r}")
+        value = getattr(importlib.import_module(f"prairielearn.{submodule}"), name)
+    # Later lookups of the name no longer go through this function.
+    setattr(sys.modules["prairielearn"], name, value)
+    return value
+
+
+def __dir__() -> list[str]:
+    """Return the names in the `prairielearn` package, including the ones that haven't been imported yet."""
+    return sorted(set(vars(sys.modules["prairielearn"])) | set(STAR_EXPORTS))
@@ -0,0 +1,218 @@
+"""Modules and warm-up calls that the zygote runs once, before it forks workers.
+
+Anything the zygote imports or initializes is inherited by every worker it
+forks, so a module that questions commonly import costs startup time and
+memory in the zygote but saves that import in every request that uses it.
+Operators can add modules and warm-up calls with a manifest and use the
+startup report to see what each one costs.
+
+A manifest is a JSON file like this:
+
+```json
+{
+  "modules": ["sympy", "pandas", "networkx"],
+  "warmups": [
+    "networkx:Graph",
+    {"callable": "sympy:sympify", "args": ["sin(x)**2 + cos(x)**2"]}
+  ]
+}
+```
+
+Each warm-up is a `module:attribute` reference to a callable, optionally with
+positional arguments, that is called once after the modules are imported.
+"""
+
+import importlib
+import json
+import sys
+import time
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any, Literal, NamedTuple
+
+import psutil
+
+DEFAULT_MODULES = (
+    "chevron",
+    "lxml.html",
+    "matplotlib",
+    "nltk",
+    "numpy",
+    "pint",
+    # The package only imports its submodules when they're used.
+    "prairielearn.colors",
+    "prairielearn.conversion_utils",
+    "prairielearn.element_schemas",
+    "prairielearn.grading_utils",
+    "prairielearn.html_utils",
+    "prairielearn.misc_utils",
+    "prairielearn.question_utils",
+    "prairielearn.sympy_utils",
+    "prairielearn.template_utils",
+    "sklearn",
+)
+"""The modules that the zygote always preloads."""
+
+
+class Warmup(NamedTuple):
+    callable: str
+    """A `module:attribute` reference to the function to call."""
+
+    args: tuple[Any, ...] = ()
+
+
+class Manifest(NamedTuple):
+    modules: list[str]
+    warmups: list[Warmup]
+
+
+class PreloadResult(NamedTuple):
+    kind: Literal["import", "warmup", "elements"]
+    name: str
+    seconds: float
+    rss_growth: int
+    """The growth of the zygote's resident memory, in bytes."""
+    error: str | None = None
+    already_imported: bool = False
+    """Whether the module had already been imported by an earlier module."""
+
+
+def load_manifest(path: str | None = None, modules: str | None = None) -> Manifest:
+    """Read a preload manifest from a JSON file and/or a comma-separated list of modules.
+
+    Returns:
+        The modules and warm-up calls from both sources.
+
+    Raises:
+        ValueError: If the manifest is malformed.
+    """
+    manifest = Manifest(modules=[], warmups=[])
+    if path:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if (
+            not isinstance(data, dict)
+            or not set(data) <= {"modules", "warmups"}
+            or not isinstance(data.get("modules", []), list)
+            or not all(isinstance(module, str) for module in data.get("modules", []))
+            or not isinstance(data.get("warmups", []), list)
+        ):
+            raise ValueError(
+                f'{path}: a preload manifest must be an object with a "modules" '
+                'list of module names and a "warmups" list'
+            )
+        manifest.modules.extend(data.get("modules", []))
+        for warmup in data.get("warmups", []):
+            manifest.warmups.append(_parse_warmup(warmup, path))
+    if modules:
+        manifest.modules.extend(
+            module.strip() for module in modules.split(",") if module.strip()
+        )
+    return manifest
+
+
+def _parse_warmup(warmup: Any, path: str) -> Warmup:
+    if isinstance(warmup, str):
+        warmup = {"callable": warmup}
+    if (
+        not isinstance(warmup, dict)
+        or not isinstance(warmup.get("callable"), str)
+        or ":" not in warmup["callable"]
+        or not isinstance(warmup.get("args", []), list)
+    ):
+        raise ValueError(
+            f'{path}: a warm-up must be "module:attribute" or an object with '
+            f'"callable" and "args": {warmup!r}'
+        )
+    return Warmup(warmup["callable"], tuple(warmup.get("args", [])))
+
+
+def measure(
+    kind: Literal["import", "warmup", "elements"],
+    name: str,
+    fn: Callable[[], object],
+) -> PreloadResult:
+    """Call `fn`, measuring how long it takes and how much the resident memory grows.
+
+    Returns:
+        The measurements, including the error if `fn` raised one.
+    """
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+    start = time.perf_counter()
+    error = None
+    try:
+        fn()
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+    return PreloadResult(
+        kind,
+        name,
+        time.perf_counter() - start,
+        max(process.memory_info().rss - rss_before, 0),
+        error,
+    )
+
+
+def _import(module: str) -> PreloadResult:
+    already_imported = module in sys.modules
+    result = measure("import", module, lambda: importlib.import_module(module))
+    return result._replace(already_imported=already_imported)
+
+
+def _call_warmup(warmup: Warmup) -> None:
+    module_name, _, attribute = warmup.callable.partition(":")
+    fn: Any = importlib.import_module(module_name)
+    for part in attribute.split("."):
+        fn = getattr(fn, part)
+    fn(*warmup.args)
+
+
+def preload(
+    modules: Iterable[str], warmups: Sequence[Warmup] = ()
+) -> list[PreloadResult]:
+    """Import each module and then run each warm-up call, measuring each one.
+
+    Modules that were already imported, for example by an earlier module,
+    take no time and are marked as such. Failures are reported
+    in the results and on stderr, but don't stop the remaining modules from
+    being preloaded, since a worker will raise the same error if a question
+    uses the module.
+
+    Returns:
+        The result of each import and warm-up call, in order.
+    """
+    results = [_import(module) for module in modules]
+    results.extend(
+        measure("warmup", warmup.callable, lambda w=warmup: _call_warmup(w))
+        for warmup in warmups
+    )
+    for result in results:
+        if result.error is not None:
+            print(
+                f"Could not preload {result.kind} {result.name}: {result.error}",
+                file=sys.stderr,
+            )
+    return results
+
+
+def format_report(results: Iterable[PreloadResult]) -> str:
+    """Format preload results as a table, with totals.
+
+    Returns:
+        The report, one line per result.
+    """
+    results = list(results)
+    lines = [f"{'kind':<8} {'name':<40} {'time (ms)':>10} {'RSS (MiB)':>10}"]
+    lines.extend(
+        f"{result.kind:<8} {result.name[:40]:<40} {result.seconds * 1000:10.1f} "
+        f"{result.rss_growth / 2**20:10.1f}"
+        + (f"  failed: {result.error}" if result.error is not None else "")
+        + ("  (already imported)" if result.already_imported else "")
+        for result in results
+    )
+    total_seconds = sum(result.seconds for result in results)
+    total_rss = sum(result.rss_growth for result in results)
+    lines.append(
+        f"{'total':<8} {'':<40} {total_seconds * 1000:10.1f} {total_rss / 2**20:10.1f}"
+    )
+    return "\n".join(lines)
@@ -0,0 +1,133 @@
+"""A statistical profiler that samples the Python stack on `SIGPROF`.
+
+While the profiler is running, the kernel sends the worker `SIGPROF` every
+time it has used `interval` seconds of CPU time, and the signal handler
+records the current Python stack. Time spent waiting (for example, on I/O or
+a subprocess) isn't sampled. The samples are reported as folded stacks, one
+line per distinct stack with frames separated by semicolons and followed by
+the number of samples, which tools like `flamegraph.pl`, speedscope, and
+inferno turn into flamegraphs.
+
+`SIGALRM` is left alone, since [`prairielearn.timeout_utils`][prairielearn.timeout_utils]
+uses it for timeouts.
+"""
+
+import os
+import signal
+import sys
+import types
+from collections import Counter
+from typing import Any
+
+DEFAULT_INTERVAL = 0.005
+"""The default sampling interval, in seconds of CPU time."""
+
+
+class SamplingProfiler:
+    """Collects stack samples between [`start`][prairielearn.internal.profiler.SamplingProfiler.start] and [`stop`][prairielearn.internal.profiler.SamplingProfiler.stop]."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL) -> None:
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._labels: dict[int, str] = {}
+        self._previous_handler: Any = None
+        self._running = False
+
+    def start(self) -> None:
+        self._previous_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        self._running = True
+
+    def stop(self) -> None:
+        if not self._running:
+            return
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+        self._running = False
+
+    def label_caller(self, label: str) -> "_Label":
+        """Return a context manager that adds `label` to stacks below the calling frame.
+
+        This shows which element a call belongs to when the same function is
+        used for many elements.
+        """
+        # Semicolons separate the frames of folded stacks.
+        return _Label(self, sys._getframe(1), label.replace(";", ","))
+
+    def _sample(self, _signum: int, frame: types.FrameType | None) -> None:
+        stack: list[str] = []
+        while frame is not None:
+            label = self._labels.get(id(frame))
+            if label is not None:
+                stack.append(label)
+            code = frame.f_code
+            stack.append(
+                f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            )
+            frame = frame.f_back
+        self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self, root: str | None = None) -> str:
+        """Return the samples as folded stacks.
+
+        Returns:
+            One line per stack, with `root` prepended as the outermost frame if given.
+        """
+        prefix = f"{root};" if root else ""
+        return "".join(
+            f"{prefix}{stack} {count}\n" for stack, count in self.samples.most_common()
+        )
+
+
+class _Label:
+    def __init__(
+        self, profiler: SamplingProfiler, frame: types.FrameType, label: str
+    ) -> None:
+        self._profiler = profiler
+        self._key = id(frame)
+        self._label = label
+        # Keep the frame alive so that its id can't be reused while labeled.
+        self._frame = frame
+
+    def __enter__(self) -> None:
+        self._profiler._labels[self._key] = self._label
+
+    def __exit__(self, *_args: object) -> None:
+        self._profiler._labels.pop(self._key, None)
+
+
+class _ProfilerState:
+    current: SamplingProfiler | None = None
+
+
+_state = _ProfilerState()
+
+
+def start(interval: float = DEFAULT_INTERVAL) -> SamplingProfiler:
+    """Start sampling the stack of the current process, stopping any profiler that is running.
+
+    Returns:
+        The profiler.
+    """
+    stop()
+    _state.current = SamplingProfiler(interval)
+    _state.current.start()
+    return _state.current
+
+
+def stop() -> SamplingProfiler | None:
+    """Stop sampling.
+
+    Returns:
+        The profiler that was running, or `None` if there was none.
+    """
+    profiler = _state.current
+    _state.current = None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+def current() -> SamplingProfiler | None:
+    """Return the running profiler, or `None` if the process isn't being profiled."""
+    return _state.current
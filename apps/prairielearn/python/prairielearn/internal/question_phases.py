@@ -1,17 +1,31 @@
 import base64
+import contextlib
 import copy
 import io
+import json
 import os
 import pathlib
 import sys
+import time
+import types
+from collections.abc import Callable, Collection
 from inspect import signature
-from typing import Any, Literal, TypedDict, assert_never
+from typing import Any, Literal, TypedDict, assert_never, get_args
 
 import lxml.html
 
-from prairielearn.internal.check_data import Phase, check_data
+from prairielearn import extension_utils
+from prairielearn.internal import element_pool, instrumentation, profiler
+from prairielearn.internal.check_data import (
+    PROPS,
+    Phase,
+    check_data,
+    make_read_only,
+    protect_data,
+)
 from prairielearn.internal.traverse import (
     get_source_definition,
+    iterate_elements,
     traverse_and_execute,
     traverse_and_replace,
 )
@@ -21,6 +35,184 @@ PYTHON_PATH = pathlib.Path(__file__).parent.parent.parent.resolve()
 CORE_ELEMENTS_PATH = (PYTHON_PATH.parent / "elements").resolve()
 SAVED_PATH = copy.copy(sys.path)
 
+# Phases in which elements may be processed in parallel by the element pool.
+PARALLEL_PHASES: frozenset[Phase] = frozenset({"parse", "grade"})
+
+ALL_PHASES: frozenset[Phase] = frozenset(get_args(Phase))
+
+
+# We'll cache instantiated controller modules for two reasons:
+# - This allows us to avoid re-reading/compiling/executing them if the same
+#   element is used multiple times.
+# - This allows element code to maintain state across multiple calls. This is useful
+#   specifically for elements that want to maintain a cache of expensive-to-compute data.
+# Core element controllers are cached for the lifetime of the worker. Course
+# element controllers are only cached for a single call of `process()`, so that
+# their module state doesn't carry over from one phase to the next.
+_controller_cache: dict[pathlib.Path, dict[str, Any]] = {}
+
+# Compiled controller code. The zygote fills this for all core elements before
+# forking, so workers never have to read and compile core controllers themselves.
+_code_cache: dict[pathlib.Path, types.CodeType] = {}
+
+# Modules that live next to a cached controller and were imported by it, like
+# `pl-drawing/elements.py`. These are put back into `sys.modules` whenever the
+# controller is used, since extensions look them up by name with
+# `load_host_script()` and must get the same module object as the controller.
+_controller_modules: dict[pathlib.Path, dict[str, types.ModuleType]] = {}
+
+# The phases that each executed controller implements. Once a controller has
+# been executed, its elements are skipped in the phases that it doesn't
+# implement without setting up the element environment first.
+_controller_phases: dict[pathlib.Path, frozenset[Phase]] = {}
+
+
+def clear_course_element_cache() -> None:
+    """Drop the executed controllers of course elements and all loaded extensions.
+
+    Their compiled code and the phases that they implement are kept, since these
+    don't hold any state.
+    """
+    for path in list(_controller_cache):
+        if not path.is_relative_to(CORE_ELEMENTS_PATH):
+            del _controller_cache[path]
+            _controller_modules.pop(path, None)
+    # Extensions always belong to a course.
+    extension_utils._extension_cache.clear()
+
+
+def set_up_element_environment(
+    element_path: pathlib.Path, *, course_path: str | None = None
+) -> None:
+    """Set the working directory and `sys.path` for running an element's code.
+
+    For course elements, `course_path` must be given so that `serverFilesCourse`
+    is importable.
+    """
+    # Set the element directory as the current working directory.
+    os.chdir(element_path)
+
+    # Update the path to include the appropriate directories.
+    sys.path = copy.copy(SAVED_PATH)
+    sys.path.insert(0, str(PYTHON_PATH))
+    if course_path is not None:
+        sys.path.insert(0, str(pathlib.Path(course_path) / "serverFilesCourse"))
+    sys.path.insert(0, str(element_path))
+
+
+def load_controller(controller_path: pathlib.Path) -> dict[str, Any]:
+    """Return the module dict of an element controller, executing it if needed.
+
+    The element environment must already be set up with
+    [`set_up_element_environment`][prairielearn.internal.question_phases.set_up_element_environment].
+
+    Returns:
+        The globals of the executed controller.
+    """
+    mod = _controller_cache.get(controller_path)
+    if mod is not None:
+        sys.modules.update(_controller_modules.get(controller_path, {}))
+        return mod
+
+    start = time.perf_counter()
+    code = _code_cache.get(controller_path)
+    if code is None:
+        with open(controller_path, encoding="utf-8") as inf:
+            # Use `compile` to associate filename with code object, so the
+            # filename appears in the traceback if there is an error:
+            # https://stackoverflow.com/a/437857
+            code = compile(inf.read(), controller_path, "exec")
+        _code_cache[controller_path] = code
+    compiled = time.perf_counter()
+
+    mod = {"__file__": str(controller_path)}
+    modules_before = set(sys.modules)
+    exec(code, mod)
+
+    instr = instrumentation.current()
+    if instr is not None:
+        instr.record_module(
+            str(controller_path),
+            compile_time=compiled - start,
+            exec_time=time.perf_counter() - compiled,
+        )
+
+    element_path = controller_path.parent
+    _controller_modules[controller_path] = {
+        name: module
+        for name, module in sys.modules.items()
+        if name not in modules_before
+        and (file := getattr(module, "__file__", None)) is not None
+        and pathlib.Path(file).parent == element_path
+    }
+    _controller_phases[controller_path] = frozenset(
+        phase for phase in ALL_PHASES if get_module_function(mod, phase) is not None
+    )
+    _controller_cache[controller_path] = mod
+    return mod
+
+
+def get_core_element_controllers() -> dict[str, pathlib.Path]:
+    """Return the controller path of every core element, keyed by element name."""
+    controllers: dict[str, pathlib.Path] = {}
+    for info_path in sorted(CORE_ELEMENTS_PATH.glob("*/info.json")):
+        with open(info_path, encoding="utf-8") as f:
+            info = json.load(f)
+        controllers[info_path.parent.name] = info_path.parent / info["controller"]
+    return controllers
+
+
+def get_core_element_module(
+    element_name: str, module_name: str
+) -> types.ModuleType | None:
+    """Return a module that an executed core controller imported from its directory.
+
+    This is how the zygote gets at helper modules like `pl-units-input/unit_utils.py`
+    after [`preload_core_elements`][prairielearn.internal.question_phases.preload_core_elements]
+    executed their controllers.
+
+    Returns:
+        The module, or `None` if the controller wasn't executed or didn't import it.
+    """
+    controller_path = get_core_element_controllers()[element_name]
+    return _controller_modules.get(controller_path, {}).get(module_name)
+
+
+def preload_core_elements(execute: Collection[str] = ()) -> dict[str, float]:
+    """Compile every core element controller, and execute the ones named in `execute`.
+
+    This is meant to be called in the zygote before forking, so that workers
+    inherit the compiled code and executed controllers. Controllers that fail
+    to execute are skipped; the error will surface when a worker uses them.
+    The working directory, `sys.path`, and `sys.modules` are left as they were,
+    apart from any third-party modules imported by the executed controllers.
+
+    Returns:
+        The time in seconds spent compiling and executing each element's controller.
+    """
+    cwd = os.getcwd()
+    path = sys.path
+    timings: dict[str, float] = {}
+    try:
+        for name, controller_path in get_core_element_controllers().items():
+            start = time.perf_counter()
+            with open(controller_path, encoding="utf-8") as inf:
+                code = compile(inf.read(), controller_path, "exec")
+            _code_cache[controller_path] = code
+
+            if name in execute:
+                set_up_element_environment(controller_path.parent)
+                with contextlib.suppress(Exception):
+                    load_controller(controller_path)
+                # Workers put these back when the controller is used.
+                for module_name in _controller_modules.get(controller_path, {}):
+                    sys.modules.pop(module_name, None)
+            timings[name] = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+        sys.path = path
+    return timings
+
 
 class ElementInfo(TypedDict):
     name: str
@@ -42,7 +234,7 @@ class RenderContext(TypedDict):
     """The path to the course directory."""
 
 
-def filelike_to_string(filelike: Any) -> str:
+def filelike_to_bytes(filelike: Any) -> bytes:
     # if val is None, replace it with empty string
     if filelike is None:
         filelike = ""
@@ -58,12 +250,84 @@ def filelike_to_string(filelike: Any) -> str:
 
     # if this next call does not work, it will throw an error, because
     # the thing returned by file() does not have the correct format
-    return base64.b64encode(filelike).decode()
+    return filelike if isinstance(filelike, bytes) else bytes(memoryview(filelike))
+
+
+def filelike_to_string(filelike: Any) -> str:
+    return base64.b64encode(filelike_to_bytes(filelike)).decode()
+
+
+def get_controller_path(element_info: ElementInfo, course_path: str) -> pathlib.Path:
+    """Return the path of an element's controller."""
+    element_type = element_info["type"]
+    element_name = element_info["name"]
+    if element_type == "core":
+        element_path = CORE_ELEMENTS_PATH / element_name
+    elif element_type == "course":
+        element_path = pathlib.Path(course_path) / "elements" / element_name
+    else:
+        assert_never(element_type)
+    return element_path / element_info["controller"]
+
+
+def may_implement_phase(controller_path: pathlib.Path, phase: Phase) -> bool:
+    """Return whether a controller implements a phase, or might, if it hasn't been executed yet."""
+    return phase in _controller_phases.get(controller_path, ALL_PHASES)
+
+
+def load_element_controller(
+    element_info: ElementInfo, course_path: str
+) -> dict[str, Any]:
+    """Set up the environment for an element and return the globals of its controller."""
+    controller_path = get_controller_path(element_info, course_path)
+    set_up_element_environment(
+        controller_path.parent,
+        course_path=course_path if element_info["type"] == "course" else None,
+    )
+    return load_controller(controller_path)
 
 
 def process(
-    phase: Phase, data: dict[str, Any], context: RenderContext
-) -> tuple[str | None, set[str]]:
+    phase: Phase,
+    data: dict[str, Any],
+    context: RenderContext,
+    *,
+    element_indices: Collection[int] | None = None,
+) -> tuple[str | bytes | None, set[str]]:
+    """Run a phase for all elements in the question.
+
+    If `element_indices` is given, only the elements at these positions (in
+    document order, counting only the elements in `context["elements"]`) are
+    processed. This is how the element pool processes single elements.
+
+    Returns:
+        The rendered HTML for `render`, the file data for `file`, or `None`,
+        and the names of all elements that were processed.
+    """
+    try:
+        return _process(phase, data, context, element_indices)
+    finally:
+        clear_course_element_cache()
+
+
+def _process(
+    phase: Phase,
+    data: dict[str, Any],
+    context: RenderContext,
+    element_indices: Collection[int] | None,
+) -> tuple[str | bytes | None, set[str]]:
+    # Profiled requests are processed serially, since the helpers of the
+    # element pool aren't profiled.
+    if (
+        element_indices is None
+        and phase in PARALLEL_PHASES
+        and element_pool.is_enabled()
+        and profiler.current() is None
+    ):
+        parallel_elements = process_in_parallel(phase, data, context)
+        if parallel_elements is not None:
+            return None, parallel_elements
+
     html = context["html"]
     elements = context["elements"]
     course_path = context["course_path"]
@@ -76,19 +340,32 @@ def process(
     # Otherwise, this will remain `None`.
     result = None
 
-    # Copying data is potentially expensive, and most of it won't change as we
-    # process all the elements, so we'll make a deep copy of the data once and
-    # use that for future comparisons. For the few pieces of data that do
-    # change based on the element, we'll add and then delete them from
-    # `original_data` as needed.
-    original_data = copy.deepcopy(data)
-
-    # We'll cache instantiated modules for two reasons:
-    # - This allows us to avoid re-reading/compiling/executing them if the same
-    #   element is used multiple times.
-    # - This allows element code to maintain state across multiple calls. This is useful
-    #   specifically for elements that want to maintain a cache of expensive-to-compute data.
-    mod_cache: dict[pathlib.Path, dict[str, Any]] = {}
+    # For legacy reasons, we don't validate `data` during the `render` or
+    # `file` phases, since the old question processor didn't either. These
+    # phases will never produce new data that's stored anywhere, so this should
+    # technically be fine, though the lack of an error could mislead
+    # instructors into thinking that any changed data will be persisted.
+    #
+    # TODO: Once we have a system for reporting warnings to instructors,
+    # we should restore this check and emit a warning if it fails.
+    # See https://github.com/PrairieLearn/PrairieLearn/issues/7337
+    validate_data = phase not in ("render", "file")
+
+    instr = instrumentation.current()
+    prof = profiler.current()
+
+    # Comparing all of `data` after every element is expensive, so the props
+    # that elements may not modify in this phase are replaced with read-only
+    # copies that raise an error as soon as they are modified. The remaining
+    # checks only look at the top level of `data`, so a shallow copy is enough
+    # to compare against. For the few pieces of data that change based on the
+    # element, we'll add and then delete them from `original_data` as needed.
+    protected_values = protect_data(data, phase) if validate_data else {}
+    original_data = dict(data)
+
+    # Read-only copies of the extensions of each element, shared by all
+    # elements with the same tag.
+    extension_views: dict[str, dict[str, Any]] = {}
 
     def process_element(
         element: lxml.html.HtmlElement,
@@ -105,82 +382,66 @@ def process(
             processed_elements.add(element.tag)
 
             element_info = elements[element.tag]
-            element_type = element_info["type"]
-            element_name = element_info["name"]
-            if element_type == "core":
-                element_path = CORE_ELEMENTS_PATH / element_name
-            elif element_type == "course":
-                element_path = pathlib.Path(course_path) / "elements" / element_name
-            else:
-                assert_never(element_type)
             element_controller = element_info["controller"]
-            element_controller_path = element_path / element_controller
-
-            # Set the element directory as the current working directory.
-            os.chdir(element_path)
-
-            # Update the path to include the appropriate directories.
-            sys.path = copy.copy(SAVED_PATH)
-            sys.path.insert(0, str(PYTHON_PATH))
-            if element_info["type"] == "course":
-                sys.path.insert(0, str(pathlib.Path(course_path) / "serverFilesCourse"))
-            sys.path.insert(0, str(element_path))
-
-            mod = mod_cache.get(element_controller_path)
-            if mod is None:
-                mod = {"__file__": str(element_controller_path)}
-
-                with open(element_controller_path, encoding="utf-8") as inf:
-                    # Use `compile` to associate filename with code object, so the
-                    # filename appears in the traceback if there is an error:
-                    # https://stackoverflow.com/a/437857
-                    code = compile(inf.read(), element_controller_path, "exec")
-
-                exec(code, mod)
-                mod_cache[element_controller_path] = mod
+            if not may_implement_phase(
+                get_controller_path(element_info, course_path), phase
+            ):
+                return None
+            mod = load_element_controller(element_info, course_path)
 
             method = get_module_function(mod, phase)
             if method is None:
                 return None
 
             # Add element-specific or phase-specific information to the data.
-            prepare_data(phase, data, context, element.tag)
-            prepare_data(phase, original_data, context, element.tag)
+            prepare_data(
+                phase, data, context, element.tag, extension_views=extension_views
+            )
+            original_data["extensions"] = data["extensions"]
 
             # Temporarily strip tail text from the element; the `parse_fragment`
             # function will choke on it.
             temp_tail = element.tail
             element.tail = None
 
-            args: list[Any] = [lxml.html.tostring(element), data]
+            if mod.get("PARSED_ELEMENT") is True:
+                # Controllers that set `PARSED_ELEMENT = True` get a copy of the
+                # already-parsed element instead of its HTML, which is cheaper
+                # than serializing and parsing it again. Since it's a copy,
+                # `render()` may return the element or its descendants so that
+                # they don't have to be parsed again either.
+                args: list[Any] = [copy.deepcopy(element), data]
+            else:
+                args = [lxml.html.tostring(element), data]
 
-            # We need to support legacy element functions, which take three arguments.
-            # The second argument is `element_index`; we'll pass `None`. This is
-            # consistent with the same backwards-compatibility logic in `zygote.py`.
-            arg_names = list(signature(method).parameters.keys())
-            if arg_names == ["element_html", "element_index", "data"]:
-                args.insert(1, None)
+                # We need to support legacy element functions, which take three arguments.
+                # The second argument is `element_index`; we'll pass `None`. This is
+                # consistent with the same backwards-compatibility logic in `zygote.py`.
+                arg_names = list(signature(method).parameters.keys())
+                if arg_names == ["element_html", "element_index", "data"]:
+                    args.insert(1, None)
 
-            element_value = method(*args)
+            if instr is None and prof is None:
+                element_value = method(*args)
+            else:
+                element_value = _call_measured(
+                    method,
+                    args,
+                    element,
+                    element_info["name"],
+                    phase,
+                    instr=instr,
+                    prof=prof,
+                )
             # Restore the tail text.
             element.tail = temp_tail
 
-            if phase not in ("render", "file"):
-                # For legacy reasons, we don't validate `data` during the,
-                # `render` or `file` phases, since the old question processor
-                # didn't either. These phases will never produce new data
-                # that's stored anywhere, so this should technically be fine,
-                # though the lack of an error could mislead instructors into
-                # thinking that any changed data will be persisted.
-                #
-                # TODO: Once we have a system for reporting warnings to instructors,
-                # we should restore this check and emit a warning if it fails.
-                # See https://github.com/PrairieLearn/PrairieLearn/issues/7337
+            if validate_data:
                 check_data(original_data, data, phase)
 
             # Clean up changes to `data` and `original_data` for the next iteration.
             restore_data(data)
-            restore_data(original_data)
+            original_data.pop("extensions", None)
 
             if phase == "render":
                 # TODO: validate that return value was a string?
@@ -199,44 +460,196 @@ def process(
                     + "In the future, returning a different object will trigger a fatal error."
                 )
         except Exception as exc:
-            source = get_source_definition(
-                element,
-                # Only display attributes that are useful for locating the element in the source code.
-                attribute_filter=(
-                    "answers-name",
-                    "file-name",
-                    "params-name",
-                    "submitted-file-name",
-                ),
-            )
-            # We can't easily show the line number because
-            # the line-number is in the post-mustache processed HTML.
-            exc.add_note(f"Error occurred while processing element {source}")
+            _add_element_note(exc, element)
             raise
 
-    def process_element_return_none(element: lxml.html.HtmlElement) -> None:
-        process_element(element)
+    element_index = -1
 
-    if phase == "render":
-        result = traverse_and_replace(html, process_element)
-    else:
-        traverse_and_execute(html, process_element_return_none)
+    def process_element_return_none(element: lxml.html.HtmlElement) -> None:
+        nonlocal element_index
+        element_index += 1
+        if element_indices is None or element_index in element_indices:
+            process_element(element)
+
+    try:
+        if phase == "render":
+            result = traverse_and_replace(html, process_element)
+        else:
+            # Other phases don't change the HTML, so only the elements are visited.
+            traverse_and_execute(html, process_element_return_none, elements)
+    finally:
+        # The read-only copies are equal to the original values, which have not
+        # been exposed to element code, so we can hand back the originals.
+        data.update(protected_values)
 
     if phase == "file":
-        result = filelike_to_string(result)
+        result = filelike_to_bytes(result)
 
     return result, processed_elements
 
 
+def _call_measured(
+    method: Callable[..., Any],
+    args: list[Any],
+    element: lxml.html.HtmlElement,
+    name: str,
+    phase: Phase,
+    *,
+    instr: instrumentation.Instrumentation | None,
+    prof: profiler.SamplingProfiler | None,
+) -> Any:
+    """Call an element function, measuring it and labeling its profile samples with the element.
+
+    Returns:
+        The return value of the element function.
+    """
+    source = _describe_element(element)
+    with contextlib.ExitStack() as stack:
+        if instr is not None:
+            stack.enter_context(instr.measure_call(name, phase, source=source))
+        if prof is not None:
+            stack.enter_context(prof.label_caller(source))
+        return method(*args)
+
+
+def _describe_element(element: lxml.html.HtmlElement) -> str:
+    """Return the opening tag of an element with the attributes that identify it."""
+    return get_source_definition(
+        element,
+        # Only display attributes that are useful for locating the element in the source code.
+        attribute_filter=(
+            "answers-name",
+            "file-name",
+            "params-name",
+            "submitted-file-name",
+        ),
+    )
+
+
+def _add_element_note(exc: Exception, element: lxml.html.HtmlElement) -> None:
+    """Add a note to an exception that says which element it was raised for."""
+    # We can't easily show the line number because
+    # the line-number is in the post-mustache processed HTML.
+    exc.add_note(
+        f"Error occurred while processing element {_describe_element(element)}"
+    )
+
+
+def process_in_parallel(
+    phase: Phase, data: dict[str, Any], context: RenderContext
+) -> set[str] | None:
+    """Process the elements of the question with the element pool.
+
+    Each element that implements `phase` is processed in a helper process, and
+    the changes that the elements made to `data` are merged back in document
+    order. If two elements changed the same key, nothing is merged, since
+    processing them one after another could give a different result.
+
+    Returns:
+        The names of all elements that were processed, or `None` if the elements
+        must be processed one after another instead.
+    """
+    processed_elements: set[str] = set()
+    element_indices: list[int] = []
+    elements = context["elements"]
+    for index, element in enumerate(iterate_elements(context["html"], elements)):
+        assert isinstance(element.tag, str)
+        processed_elements.add(element.tag)
+        element_info = elements[element.tag]
+        if not may_implement_phase(
+            get_controller_path(element_info, context["course_path"]), phase
+        ):
+            continue
+        try:
+            mod = load_element_controller(element_info, context["course_path"])
+        except Exception as exc:
+            _add_element_note(exc, element)
+            raise
+        if get_module_function(mod, phase) is not None:
+            element_indices.append(index)
+
+    # Forking isn't worth it for a single element.
+    if len(element_indices) < 2:
+        return None
+
+    pool = element_pool.get_pool()
+    if pool is None:
+        return None
+
+    # Elements are measured in the helpers, which send back their measurements.
+    instr = instrumentation.current()
+    memory_metric = instr.memory_metric if instr is not None else None
+    results = pool.map(
+        _process_element,
+        [(phase, data, context, index, memory_metric) for index in element_indices],
+    )
+    changes = [element_changes for element_changes, _ in results]
+    if instr is not None:
+        for _, element_instr in results:
+            assert element_instr is not None
+            instr.calls.extend(element_instr.calls)
+            instr.modules.extend(element_instr.modules)
+
+    conflicts = element_pool.find_conflicts(changes)
+    if conflicts:
+        sys.stderr.write(
+            f"Elements changed the same data in {phase}(): {', '.join(conflicts)}. "
+            "Processing them one after another instead.\n"
+        )
+        return None
+
+    for element_changes in changes:
+        element_pool.apply_changes(data, element_changes)
+    return processed_elements
+
+
+def _process_element(
+    phase: Phase,
+    data: dict[str, Any],
+    context: RenderContext,
+    element_index: int,
+    memory_metric: instrumentation.MemoryMetric | None,
+) -> tuple[list[element_pool.DataChange], instrumentation.Instrumentation | None]:
+    """Process a single element in a helper process of the element pool.
+
+    Returns:
+        The changes that the element made to `data`, and the measurements for
+        the element if `memory_metric` is given.
+    """
+    before = {
+        key: copy.deepcopy(value)
+        for key, value in data.items()
+        if key in PROPS and phase in PROPS[key]["edit_phases"]
+    }
+    if memory_metric is not None:
+        instrumentation.start(trace_memory=memory_metric == "tracemalloc")
+    try:
+        process(phase, data, context, element_indices={element_index})
+    finally:
+        instr = instrumentation.stop()
+    return element_pool.diff_data(before, data), instr
+
+
 def prepare_data(
-    phase: Phase, data: dict[str, Any], context: RenderContext, element_tag: str
+    phase: Phase,
+    data: dict[str, Any],
+    context: RenderContext,
+    element_tag: str,
+    *,
+    extension_views: dict[str, dict[str, Any]],
 ) -> None:
     element_extensions = context["element_extensions"]
     element_info = context["elements"][element_tag]
 
-    # Make a deep copy of the data so that question/element code can't
-    # modify the source data.
-    data["extensions"] = copy.deepcopy(element_extensions.get(element_tag, {}))
+    # Give element code a read-only copy of its extensions so that it can't
+    # modify the source data. Since the copy can't change, it is only made
+    # once for each element tag and then kept in `extension_views`.
+    extensions = extension_views.get(element_tag)
+    if extensions is None:
+        extensions = extension_views[element_tag] = make_read_only(
+            element_extensions.get(element_tag, {}), "extensions"
+        )
+    data["extensions"] = extensions
 
     # `*_url` options are only present during the render phase.
     if phase == "render":
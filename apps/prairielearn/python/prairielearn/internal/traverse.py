@@ -1,11 +1,13 @@
 from collections import deque
-from collections.abc import Callable, Sequence
+from collections.abc import Callable, Collection, Iterator, Sequence
 from html import escape as html_escape
 from itertools import chain
 
 import lxml.html
 
-ElementReplacement = str | lxml.html.HtmlElement | list[lxml.html.HtmlElement] | None
+ElementReplacement = (
+    str | lxml.html.HtmlElement | list[str | lxml.html.HtmlElement] | None
+)
 
 # https://developer.mozilla.org/en-US/docs/Glossary/Void_element
 VOID_ELEMENTS = frozenset({
@@ -27,18 +29,37 @@ VOID_ELEMENTS = frozenset({
 UNESCAPED_ELEMENTS = frozenset({"script", "style"})
 
 
-def traverse_and_execute(
-    html: str, fn: Callable[[lxml.html.HtmlElement], None]
-) -> None:
+def iterate_elements(
+    html: str, tags: Collection[str] | None = None
+) -> Iterator[lxml.html.HtmlElement]:
+    """Parse HTML and iterate over its elements in document order.
+
+    If `tags` is given, only elements with one of these tags are returned. The
+    filtering happens inside `lxml`, which is much faster than looking at every
+    element of a question that is mostly text and markup.
+    """
     elements = lxml.html.fragments_fromstring(html)
+    # An empty `tags` would match everything.
+    if tags is not None and not tags:
+        return iter(())
+    tag_filter = () if tags is None else tuple(tags)
 
-    for e in chain.from_iterable(
-        element.iter()
+    return chain.from_iterable(
+        element.iter(*tag_filter)
         for element in elements
         # If there's leading text, the first element of the array will be a string.
         # We can just discard that.
         if isinstance(element, lxml.html.HtmlElement)
-    ):
+    )
+
+
+def traverse_and_execute(
+    html: str,
+    fn: Callable[[lxml.html.HtmlElement], None],
+    tags: Collection[str] | None = None,
+) -> None:
+    """Call `fn` for each element of the HTML, or only for those with one of `tags`."""
+    for e in iterate_elements(html, tags):
         fn(e)
 
 
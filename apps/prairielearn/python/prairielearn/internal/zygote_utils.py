@@ -1,7 +1,83 @@
-from typing import Any
+import importlib
+import json
+import marshal
+import math
+import struct
+import sys
+from typing import IO, Any, NoReturn
 
 import prairielearn as pl
 
+# A framed request starts with this byte, followed by the length of the JSON
+# payload as a 4-byte big-endian unsigned integer, and then the payload itself.
+# Newline-delimited JSON never starts with a zero byte, so both kinds of
+# requests can be told apart without any state.
+#
+# A framed response is the length-prefixed JSON payload followed by a
+# length-prefixed binary body, which is empty unless the response carries
+# raw file data. Responses use the same framing as the request they answer.
+FRAME_MARKER = b"\x00"
+_FRAME_LENGTH = struct.Struct(">I")
+
+
+def _read_exactly(stream: IO[bytes], size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise EOFError("Input ended in the middle of a framed request")
+    return data
+
+
+def read_request(stream: IO[bytes]) -> tuple[bytes, bool]:
+    """
+    Read a single request, which may be framed or newline-delimited.
+
+    Returns:
+        The JSON payload and whether the request was framed. The payload is
+        empty if the input has ended, and a single newline for blank lines.
+    """
+    first = stream.read(1)
+    if first != FRAME_MARKER:
+        return first + stream.readline() if first else b"", False
+
+    (size,) = _FRAME_LENGTH.unpack(_read_exactly(stream, _FRAME_LENGTH.size))
+    return _read_exactly(stream, size), True
+
+
+def write_response(
+    stream: IO[bytes], payload: str | bytes, *, framed: bool, body: bytes = b""
+) -> None:
+    """Write a JSON response, and for framed responses, a raw binary body."""
+    encoded = payload.encode("utf-8") if isinstance(payload, str) else payload
+    if framed:
+        stream.write(_FRAME_LENGTH.pack(len(encoded)))
+        stream.write(encoded)
+        stream.write(_FRAME_LENGTH.pack(len(body)))
+        stream.write(body)
+    else:
+        assert not body, "Unframed responses can't have a body"
+        stream.write(encoded)
+        stream.write(b"\n")
+    stream.flush()
+
+
+def add_response_field(response: bytes, name: str, value: bytes) -> bytes:
+    """Add a field to an encoded JSON object without decoding it.
+
+    This lets the worker add measurements that include the time it took to
+    encode the response itself.
+
+    Returns:
+        The encoded object with the additional field.
+
+    Raises:
+        ValueError: If the response isn't an encoded JSON object.
+    """
+    body = response.rstrip()
+    if not body.endswith(b"}"):
+        raise ValueError("The response must be a JSON object")
+    separator = b"" if body[:-1].rstrip().endswith(b"{") else b","
+    return body[:-1] + separator + json.dumps(name).encode() + b":" + value + b"}"
+
 
 def safe_parse_int(int_str: str) -> int | float:
     """
@@ -45,6 +121,165 @@ def assert_all_integers_within_limits(item: Any) -> None:
             item_stack.extend(next_item.values())
 
 
+# Any JSON integer that might not be representable as a JavaScript number has
+# at least 16 digits. To find those quickly, we map digits to "0", characters
+# that can precede the digits of a fraction or exponent to "x", and everything
+# else to " ", and then search for " " followed by 16 zeros. Digits in strings
+# can match too, so a match only means that a closer look is needed.
+_DIGIT_TABLE = bytes(
+    ord("0") if c in b"0123456789" else ord("x") if c in b".eE+" else ord(" ")
+    for c in range(256)
+)
+_LONG_DIGIT_RUN = b"0" * 16
+
+
+def _might_contain_oversized_integers(data: bytes) -> bool:
+    digits = data.translate(_DIGIT_TABLE)
+    return digits.startswith(_LONG_DIGIT_RUN) or b" " + _LONG_DIGIT_RUN in digits
+
+
+def _contains_non_finite_float(obj: Any) -> bool:
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float):
+            if not math.isfinite(item):
+                return True
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return False
+
+
+class JsonSerializer:
+    """
+    Encodes and decodes the JSON exchanged with the code caller using the `json`
+    module.
+
+    Rather than checking every integer with a Python callback, the encoded JSON
+    is scanned for long runs of digits, and only JSON that contains them gets
+    the slower, exact treatment. The results are the same as
+    `assert_all_integers_within_limits()` and `safe_parse_int()`.
+    """
+
+    name = "json"
+
+    def loads(self, data: bytes) -> Any:
+        """
+        Decode JSON, parsing integers that are too large for JavaScript as floats.
+
+        Returns:
+            The decoded object.
+        """
+        if not _might_contain_oversized_integers(data):
+            return json.loads(data)
+        return json.loads(data, parse_int=safe_parse_int)
+
+    def dumps(
+        self, obj: Any, *, sort_keys: bool = False, allow_nan: bool = False
+    ) -> bytes:
+        """
+        Encode an object as UTF-8 JSON, checking its integers with
+        `assert_all_integers_within_limits()`.
+
+        Returns:
+            The encoded JSON.
+        """
+        encoded = self._encode(obj, sort_keys=sort_keys, allow_nan=allow_nan)
+        if _might_contain_oversized_integers(encoded):
+            assert_all_integers_within_limits(obj)
+        return encoded
+
+    def _encode(self, obj: Any, *, sort_keys: bool, allow_nan: bool) -> bytes:
+        return json.dumps(obj, sort_keys=sort_keys, allow_nan=allow_nan).encode()
+
+
+def _reject_type(obj: Any) -> NoReturn:
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class OrjsonSerializer(JsonSerializer):
+    """
+    Encodes and decodes JSON with `orjson`, using the `json` module whenever
+    `orjson` can't produce the same result.
+
+    Anything `orjson` refuses to encode, including integers that are too large
+    for JavaScript, is encoded again with the `json` module so that errors are
+    reported the same way. `orjson` also encodes dates, times, dataclasses,
+    enums, and UUIDs, which the `json` module rejects. It is told to refuse the
+    first three, and the object is passed to `marshal.dumps()`, which only
+    accepts built-in types, to find the others. `orjson` encodes NaN and
+    infinite floats as `null`, so if the output contains `null`, the object is
+    checked for them, and encoded again with the `json` module if any are found.
+    """
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        self._orjson = importlib.import_module("orjson")
+
+    def loads(self, data: bytes) -> Any:
+        if not _might_contain_oversized_integers(data):
+            try:
+                return self._orjson.loads(data)
+            except json.JSONDecodeError:
+                # `orjson` rejects some input that the `json` module accepts,
+                # such as NaN.
+                pass
+        return super().loads(data)
+
+    def _encode(self, obj: Any, *, sort_keys: bool, allow_nan: bool) -> bytes:
+        option = (
+            self._orjson.OPT_STRICT_INTEGER
+            | self._orjson.OPT_NON_STR_KEYS
+            | self._orjson.OPT_PASSTHROUGH_DATETIME
+            | self._orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+        if sort_keys:
+            option |= self._orjson.OPT_SORT_KEYS
+        try:
+            encoded = self._orjson.dumps(obj, default=_reject_type, option=option)
+            # `orjson` can't be told to refuse enums and UUIDs, in values or in
+            # keys. `marshal` raises a `ValueError` for them, like for any other
+            # object that isn't of a built-in type, and is about as fast as
+            # `orjson`, unlike walking the object in Python.
+            marshal.dumps(obj)
+        except (TypeError, ValueError):
+            # `orjson.JSONEncodeError` is a subclass of `TypeError`.
+            return super()._encode(obj, sort_keys=sort_keys, allow_nan=allow_nan)
+        if b"null" not in encoded or not _contains_non_finite_float(obj):
+            return encoded
+        return super()._encode(obj, sort_keys=sort_keys, allow_nan=allow_nan)
+
+
+def get_json_serializer(name: str) -> JsonSerializer:
+    """
+    Return the serializer with the given name, either `json` or `orjson`.
+
+    If `orjson` is requested but isn't installed, the `json` serializer is
+    returned instead.
+
+    Returns:
+        The serializer.
+
+    Raises:
+        ValueError: If the name is not recognized.
+    """
+    if name == JsonSerializer.name:
+        return JsonSerializer()
+    if name == OrjsonSerializer.name:
+        try:
+            return OrjsonSerializer()
+        except ImportError:
+            print(
+                "orjson is not installed, falling back to the json module",
+                file=sys.stderr,
+            )
+            return JsonSerializer()
+    raise ValueError(f"Unknown JSON serializer: {name}")
+
+
 def get_module_function(mod: dict[str, Any], fcn: str) -> Any:
     if fcn not in mod:
         return None
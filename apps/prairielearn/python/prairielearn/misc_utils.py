@@ -8,14 +8,20 @@ from prairielearn import ...
 import itertools as it
 import os
 import random
+import shutil
+import stat
 import string
+import tempfile
 import unicodedata
 import uuid
 from collections.abc import Callable, Generator, Iterable
+from typing import TYPE_CHECKING
 
-from pint import UnitRegistry
 from text_unidecode import unidecode
 
+if TYPE_CHECKING:
+    from pint import UnitRegistry
+
 
 def iter_keys() -> Generator[str]:
     """A continuous alphabetic list of the form `['a', 'b', ..., 'z', 'aa', 'ab', ..., 'zz', 'aaa', 'aab', ...]`.
@@ -42,17 +48,79 @@ def index2key(i: int) -> str:
     return next(it.islice(iter_keys(), i, None))
 
 
-def get_unit_registry() -> UnitRegistry:
-    """Get a unit registry using cache folder valid on production machines.
+def _get_unit_registry_cache_dir() -> str:
+    import pint
+
+    # The cache contents only depend on the Pint version, so the directory can be
+    # shared by every process owned by the same user. Including the uid keeps
+    # users from sharing a directory, and `_is_private_dir()` is checked before
+    # loading it.
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join(tempfile.gettempdir(), f"pint_{uid}_{pint.__version__}")
+
+
+def _is_private_dir(path: str) -> bool:
+    # Pint unpickles the files in its cache, so we only use a directory that we
+    # own and that nobody else can write to. Since anyone can create files in a
+    # shared `/tmp`, the name of the directory alone doesn't guarantee that.
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(st.st_mode)
+        and (not hasattr(os, "getuid") or st.st_uid == os.getuid())
+        and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    )
+
+
+def _populate_unit_registry_cache(cache_dir: str) -> None:
+    # Pint writes cache files non-atomically, so concurrently starting processes
+    # could observe a half-written pickle. Instead, we build the cache in a private
+    # directory and atomically move it into place; whoever loses the race discards
+    # their copy, which is identical.
+    from pint import UnitRegistry
+
+    staging_dir = tempfile.mkdtemp(prefix="pint_staging_")
+    try:
+        UnitRegistry(cache_folder=staging_dir)
+        os.rename(staging_dir, cache_dir)
+    except OSError:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def get_unit_registry() -> "UnitRegistry":
+    """Get a unit registry using a cache folder valid on production machines.
+
+    Each call returns a new registry, so question code may define its own units
+    and contexts on it. The parsed unit definitions are cached on disk, in a
+    directory shared by all processes of the same user and Pint version, so
+    building a registry only takes a few milliseconds. If the
+    `UNIT_REGISTRY_CACHE` environment variable is `0`, the registry is built in
+    memory instead, which takes a few hundred milliseconds.
 
     <https://pint.readthedocs.io/en/stable/index.html>
 
     Returns:
-        A process-specific unit registry.
+        A new unit registry.
     """
-    pid = os.getpid()
-    cache_dir = f"/tmp/pint_{pid}"
-    return UnitRegistry(cache_folder=cache_dir)
+    # Pint takes a while to import, so it's only imported when it's needed.
+    from pint import UnitRegistry
+
+    # The zygote turns the cache off when it runs question code as the
+    # `executor` user. The workers of every course run as that user, so question
+    # code could put a pickle in the cache that another course would then load.
+    if os.environ.get("UNIT_REGISTRY_CACHE") == "0":
+        return UnitRegistry()
+
+    cache_dir = _get_unit_registry_cache_dir()
+    if not os.path.lexists(cache_dir):
+        _populate_unit_registry_cache(cache_dir)
+    if _is_private_dir(cache_dir):
+        return UnitRegistry(cache_folder=cache_dir)
+    # We couldn't create the shared cache (e.g. `/tmp` isn't writable), or
+    # someone else created it.
+    return UnitRegistry()
 
 
 def full_unidecode(input_str: str) -> str:
@@ -6,8 +6,10 @@ from prairielearn.sympy_utils import ...
 """
 
 import ast
-import copy
+import contextlib
+import functools
 import html
+import math
 import operator
 import re
 import string
@@ -15,7 +17,6 @@ from collections import deque
 from collections.abc import Callable, Iterable, Sequence
 from dataclasses import dataclass
 from enum import Enum
-from functools import wraps
 from tokenize import NAME, NUMBER, OP, TokenError
 from types import CodeType
 from types import MappingProxyType as FrozenDict
@@ -23,13 +24,17 @@ from typing import (
     Any,
     Final,
     Literal,
+    NamedTuple,
     NotRequired,
     TypedDict,
     TypeGuard,
     cast,
 )
 
+import numpy as np
+import numpy.typing as npt
 import sympy
+from sympy.core.function import UndefinedFunction
 from sympy.parsing import sympy_parser
 from sympy.parsing.sympy_parser import DICT, TOKEN, TRANS
 from sympy.printing.str import StrPrinter
@@ -39,6 +44,12 @@ from prairielearn.misc_utils import full_unidecode
 STANDARD_OPERATORS = ("( )", "+", "-", "*", "/", "^", "**", "!")
 SET_NOTATION_OPERATORS = ("U", "&", "{ }", "[ , ]", "( , ]", "[ , )", "( , )")
 
+SYMPY_CACHE_SIZE = 1024
+"""The maximum number of conversions cached by [convert_string_to_sympy][prairielearn.sympy_utils.convert_string_to_sympy]."""
+
+NUMERIC_EQUALITY_POINTS = 16
+"""The number of random points at which [numerically_equal][prairielearn.sympy_utils.numerically_equal] evaluates expressions."""
+
 SympyMapT = dict[str, sympy.Basic | complex]
 _FrozenSympyMapT = FrozenDict[str, sympy.Basic | complex]
 _FrozenSympyFunctionMapT = FrozenDict[str, Callable[..., Any]]
@@ -62,6 +73,10 @@ class SympyJson(TypedDict):
     _variables: list[str]
     _assumptions: NotRequired[AssumptionsDictT]
     _custom_functions: NotRequired[list[str]]
+    _tree: NotRequired[list[Any]]
+    _tree_evaluated: NotRequired[bool]
+    _latex: NotRequired[str]
+    _latex_source: NotRequired[str]
 
 
 @dataclass(frozen=True, slots=True)
@@ -90,6 +105,10 @@ def is_sympy_json(json: Any) -> TypeGuard[SympyJson]:
         and isinstance(json.get("_variables"), list)
         and isinstance(json.get("_assumptions", {}), dict)
         and isinstance(json.get("_custom_functions", []), list)
+        and isinstance(json.get("_tree", []), list)
+        and isinstance(json.get("_tree_evaluated", False), bool)
+        and isinstance(json.get("_latex", ""), str)
+        and isinstance(json.get("_latex_source", ""), str)
     )
 
 
@@ -327,6 +346,33 @@ class HasInvalidVariableError(BaseSympyError):
     text: str
 
 
+@dataclass
+class HasExcessiveComplexityError(BaseSympyError):
+    reason: str
+    offset: int = -1
+
+
+class ComplexityBudget(NamedTuple):
+    """Limits on the expressions that are evaluated, checked before evaluating them.
+
+    Without these, expressions like `2^(20000*x)` or `1000000!` take seconds to
+    evaluate, or fail with an error about converting a large integer to a string.
+    """
+
+    max_nodes: int = 5000
+    """The maximum number of nodes in the syntax tree of the expression."""
+    max_depth: int = 150
+    """The maximum nesting depth of the syntax tree of the expression."""
+    max_digits: float = 4300
+    """The maximum number of decimal digits of numbers that evaluating the
+    expression may produce, estimated by treating every variable as 1. The
+    default is Python's limit for converting integers to strings."""
+
+
+DEFAULT_COMPLEXITY_BUDGET = ComplexityBudget()
+"""The default limits on expressions, used by [evaluate_with_source][prairielearn.sympy_utils.evaluate_with_source]."""
+
+
 class ASTSympyType(Enum):
     SCALAR = "number"
     SET = "set"
@@ -399,6 +445,7 @@ class CheckAST(ast.NodeVisitor):
         functions: SympyFunctionMapT,
         *,
         allow_sets: bool = False,
+        complexity_budget: ComplexityBudget = DEFAULT_COMPLEXITY_BUDGET,
     ) -> None:
         self.whitelist = whitelist
         self.variables = variables
@@ -406,6 +453,7 @@ class CheckAST(ast.NodeVisitor):
         self.__parents = {}
         self.__type_cache = {}
         self.allow_sets = allow_sets
+        self.complexity_budget = complexity_budget
 
     def visit(self, node: ast.AST) -> ASTSympyType | None:
         if not isinstance(node, self.whitelist):
@@ -442,6 +490,10 @@ class CheckAST(ast.NodeVisitor):
             offset = exc.offset if exc.offset is not None else -1
             raise HasParseError(offset) from exc
 
+        # This also keeps the recursive checks below from hitting the recursion
+        # limit on deeply nested expressions.
+        check_complexity(root, expr, self.complexity_budget)
+
         # Link each node to its parent
         self.__parents = {
             id(child): node
@@ -603,12 +655,107 @@ class CheckAST(ast.NodeVisitor):
                 return None
 
 
+_LOG10_2 = math.log10(2)
+_LOG10_OF_NAMES: Final[FrozenDict[str, float]] = FrozenDict({
+    "pi": math.log10(math.pi),
+    "E": math.log10(math.e),
+})
+
+
+def _estimate_factorial_digits(log10_n: float) -> float:
+    if log10_n > 300:
+        return math.inf
+    return math.lgamma(10**log10_n + 1) / math.log(10)
+
+
+def _estimate_power_digits(log10_base: float, log10_exponent: float) -> float:
+    if log10_base == 0:
+        return 0
+    if log10_exponent > 300:
+        return math.inf
+    return 10**log10_exponent * log10_base
+
+
+def check_complexity(root: ast.AST, expr: str, budget: ComplexityBudget) -> None:
+    """Check that evaluating the parsed expression `expr` stays within `budget`.
+
+    This walks the syntax tree once, without recursion, and estimates the
+    number of decimal digits of every intermediate number as if all variables
+    were 1. For example, `2**(20000*x)` makes SymPy compute `2**20000`, which
+    has 6021 digits.
+
+    Raises:
+        HasExcessiveComplexityError: If the expression exceeds the budget. The
+            offset is the column of the offending node in `expr`.
+    """
+    # Collect the nodes in pre-order, so that every node comes after its parent.
+    nodes: list[ast.AST] = []
+    stack: list[tuple[ast.AST, int]] = [(root, 1)]
+    while stack:
+        node, depth = stack.pop()
+        nodes.append(node)
+        if len(nodes) > budget.max_nodes:
+            raise HasExcessiveComplexityError(
+                "it is too long", getattr(node, "col_offset", -1)
+            )
+        if depth > budget.max_depth:
+            raise HasExcessiveComplexityError(
+                "it is too long or nested too deeply", getattr(node, "col_offset", -1)
+            )
+        # Skip the operators and contexts, which are nodes too.
+        stack.extend(
+            (child, depth + 1)
+            for child in ast.iter_child_nodes(node)
+            if isinstance(child, ast.expr)
+        )
+
+    # log10 of the largest magnitude of each node, if all variables were 1.
+    # Visiting the nodes in reverse visits every node after its children.
+    magnitudes: dict[ast.AST, float] = {}
+    for node in reversed(nodes):
+        magnitude = 0.0
+        offset = -1
+        match node:
+            case ast.Constant(value=int(value)) if not isinstance(value, bool):
+                magnitude = abs(value).bit_length() * _LOG10_2
+            case ast.Name(id=name):
+                magnitude = _LOG10_OF_NAMES.get(name, 0.0)
+            case ast.UnaryOp(operand=operand):
+                magnitude = magnitudes[operand]
+            case ast.BinOp(left=left, op=ast.Pow(), right=right):
+                # Point at the operator rather than at the base.
+                offset = expr.find("**", left.end_col_offset or 0)
+                magnitude = _estimate_power_digits(magnitudes[left], magnitudes[right])
+            case ast.BinOp(left=left, op=ast.Mult() | ast.Div(), right=right):
+                magnitude = magnitudes[left] + magnitudes[right]
+            case ast.BinOp(left=left, right=right):
+                magnitude = max(magnitudes[left], magnitudes[right]) + _LOG10_2
+            case ast.Call(func=ast.Name(id="Integer"), args=[arg]):
+                magnitude = magnitudes[arg]
+            case ast.Call(func=ast.Name(id="factorial"), args=[arg]):
+                offset = arg.col_offset
+                magnitude = _estimate_factorial_digits(magnitudes[arg])
+            case _:
+                # Other functions, like `sin`, don't make numbers larger.
+                pass
+        if magnitude > budget.max_digits:
+            raise HasExcessiveComplexityError(
+                "it contains numbers that are too large", offset
+            )
+        magnitudes[node] = magnitude
+
+
 def ast_check_str(
-    expr: str, locals_for_eval: LocalsForEval, *, allow_sets: bool = False
+    expr: str,
+    locals_for_eval: LocalsForEval,
+    *,
+    allow_sets: bool = False,
+    complexity_budget: ComplexityBudget = DEFAULT_COMPLEXITY_BUDGET,
 ) -> None:
     """Check the AST of the expression for security, whitelisting only certain nodes.
 
-    This prevents the user from executing arbitrary code through `eval_expr`.
+    This prevents the user from executing arbitrary code through `eval_expr`,
+    and rejects expressions that exceed `complexity_budget`.
     """
     # Disallow AST nodes that are not in whitelist
     #
@@ -646,6 +793,7 @@ def ast_check_str(
         locals_for_eval["variables"],
         locals_for_eval["helpers"] | locals_for_eval["functions"],
         allow_sets=allow_sets,
+        complexity_budget=complexity_budget,
     ).check_expression(expr)
 
 
@@ -662,22 +810,31 @@ def sympy_check(
         *(cast(SympyMapT, inner_dict).keys() for inner_dict in locals_for_eval.values())
     )
 
+    # Printing a node takes time proportional to the size of its subtree, so
+    # only symbols are printed. Subexpressions that occur more than once are
+    # only checked once, which also queries their assumptions only once.
+    seen: set[sympy.Basic] = set()
     work_stack: deque[sympy.Basic] = deque([expr])
 
     while work_stack:
         item = work_stack.pop()
-        str_item = str(item)
-
-        if (
-            not allow_extra_symbols
-            and isinstance(item, sympy.Symbol)
-            and str_item not in valid_symbols
-        ):
-            raise HasInvalidSymbolError(str_item)
-        if isinstance(item, sympy.Float):
-            raise HasFloatError(float(str_item))
-        if not allow_sets and isinstance(item, sympy.Set):
+        if item in seen:
+            continue
+        seen.add(item)
+
+        if isinstance(item, sympy.Symbol):
+            if not allow_extra_symbols:
+                name = str(item)
+                if name not in valid_symbols:
+                    raise HasInvalidSymbolError(name)
+        elif isinstance(item, sympy.Float):
+            raise HasFloatError(float(str(item)))
+        elif isinstance(item, sympy.Rational | sympy.NumberSymbol):
+            # These are real numbers without any arguments.
+            continue
+        elif not allow_sets and isinstance(item, sympy.Set):
             raise HasSetNotationError
+
         # Detect complex numbers both in simplified form (sympy.I) and in
         # unevaluated form (e.g. sqrt(-2) kept as Pow(-2, 1/2) by evaluateFalse).
         # The is_finite guard excludes zoo (complex infinity from 1/0) and similar
@@ -776,6 +933,36 @@ def _regex_sub_expr_and_map_offsets(
     return "".join(parts), new_offsets
 
 
+@functools.cache
+def _get_global_dict() -> dict[str, Any]:
+    # This is only evaluated once, and the dict is shared by all conversions.
+    # Evaluating an expression never assigns to its globals, so it isn't modified.
+    global_dict: dict[str, Any] = {}
+    exec("from sympy import *", global_dict)
+    return global_dict
+
+
+@functools.cache
+def _get_transformations(*, allow_sets: bool) -> tuple[TRANS, ...]:
+    transformations = (
+        *sympy_parser.standard_transformations,
+        sympy_parser.implicit_multiplication_application,
+    )
+    if allow_sets:
+        return (
+            _unmangle_infix_binops_transformation(_Constants.set_operators.keys()),
+            _set_literal_transformation,
+            _set_operation_transformation,
+            _interval_transformation,
+            *transformations,
+        )
+    # check for open intervals
+    return (
+        _err_on_transform(_interval_transformation, HasSetNotationError),
+        *transformations,
+    )
+
+
 def evaluate_with_source(
     expr: str,
     locals_for_eval: LocalsForEval,
@@ -784,9 +971,13 @@ def evaluate_with_source(
     allow_sets: bool = False,
     simplify_expression: bool = True,
     allow_extra_symbols: bool = False,
+    complexity_budget: ComplexityBudget = DEFAULT_COMPLEXITY_BUDGET,
 ) -> tuple[sympy.Expr, str | CodeType]:
     """Evaluate a SymPy expression string with a given set of locals.
 
+    Expressions that exceed `complexity_budget` are rejected before SymPy
+    evaluates them.
+
     Returns:
         A tuple of the SymPy expression and the code that was used to generate it.
 
@@ -797,6 +988,7 @@ def evaluate_with_source(
         HasArgumentTypeError: If an expression is given the wrong types.
         HasFunctionArityError: If a function is given the wrong number of args.
         HasParseError: If the expression cannot be parsed.
+        HasExcessiveComplexityError: If the expression exceeds `complexity_budget`.
         BaseSympyError: If the expression cannot be evaluated.
     """
     normalized_expr, char_offsets = _normalize_expr(expr)
@@ -861,27 +1053,8 @@ def evaluate_with_source(
     # Global dict is set up to be very permissive for parsing purposes
     # (makes it cleaner to call this function with a custom locals dict).
     # This line shouldn't be dangerous, as it's just loading the global dict.
-    global_dict = {}
-    exec("from sympy import *", global_dict)
-
-    transformations = (
-        *sympy_parser.standard_transformations,
-        sympy_parser.implicit_multiplication_application,
-    )
-    if allow_sets:
-        transformations = (
-            _unmangle_infix_binops_transformation(_Constants.set_operators.keys()),
-            _set_literal_transformation,
-            _set_operation_transformation,
-            _interval_transformation,
-            *transformations,
-        )
-    else:
-        # check for open intervals
-        transformations = (
-            _err_on_transform(_interval_transformation, HasSetNotationError),
-            *transformations,
-        )
+    global_dict = _get_global_dict()
+    transformations = _get_transformations(allow_sets=allow_sets)
 
     try:
         code = sympy_parser.stringify_expr(
@@ -893,8 +1066,13 @@ def evaluate_with_source(
         # caller receives a normal syntax error rather than an unexpected error.
         raise HasParseError(-1) from exc
 
-    # First do AST check, mainly for security
-    parsed_locals_to_eval = copy.deepcopy(locals_for_eval)
+    # First do AST check, mainly for security. The check only reads the
+    # locals, so copying the inner dicts is enough.
+    parsed_locals_to_eval: LocalsForEval = {
+        "functions": dict(locals_for_eval["functions"]),
+        "variables": dict(locals_for_eval["variables"]),
+        "helpers": dict(locals_for_eval["helpers"]),
+    }
 
     # Add locals that appear after sympy stringification
     # This check is only for safety, so won't change what gets parsed
@@ -913,7 +1091,15 @@ def evaluate_with_source(
     )
 
     try:
-        ast_check_str(code, parsed_locals_to_eval, allow_sets=allow_sets)
+        ast_check_str(
+            code,
+            parsed_locals_to_eval,
+            allow_sets=allow_sets,
+            complexity_budget=complexity_budget,
+        )
+    except HasExcessiveComplexityError as exc:
+        exc.offset = _map_code_offset(code, exc.offset, normalized_expr, char_offsets)
+        raise
     except (HasArgumentTypeError, HasFunctionArityError) as exc:
         index = _find_type_error_offset(
             normalized_expr, char_offsets, exc.as_type_error()
@@ -1026,8 +1212,159 @@ def convert_string_to_sympy_with_source(
     the variables and functions that can be used. If the string is invalid,
     raise an exception with a message that can be displayed to the user.
 
+    Successful conversions are cached, keyed on `expr` and all of the options,
+    since elements like `pl-symbolic-input` convert the same correct answer in
+    every phase. See [sympy_cache_info][prairielearn.sympy_utils.sympy_cache_info].
+
+    Returns:
+        A tuple of the sympy expression and the source code that was used to generate it.
+    """
+    variables = tuple(variables) if variables is not None else None
+    custom_functions = tuple(custom_functions) if custom_functions is not None else None
+    options = _ConversionOptions(
+        variables=variables,
+        allow_hidden=allow_hidden,
+        allow_complex=allow_complex,
+        allow_sets=allow_sets,
+        allow_trig_functions=allow_trig_functions,
+        simplify_expression=simplify_expression,
+        custom_functions=custom_functions,
+        assumptions=_freeze_assumptions(assumptions),
+        allow_extra_symbols=allow_extra_symbols,
+    )
+    try:
+        hash(options)
+    except TypeError:
+        # Assumption values that can't be hashed can't be part of a cache key.
+        return _convert_string_to_sympy_uncached(
+            expr,
+            variables,
+            allow_hidden=allow_hidden,
+            allow_complex=allow_complex,
+            allow_sets=allow_sets,
+            allow_trig_functions=allow_trig_functions,
+            simplify_expression=simplify_expression,
+            custom_functions=custom_functions,
+            assumptions=assumptions,
+            allow_extra_symbols=allow_extra_symbols,
+        )
+    return _convert_string_to_sympy_cached(expr, options)
+
+
+class _ConversionOptions(NamedTuple):
+    variables: tuple[str, ...] | None
+    allow_hidden: bool
+    allow_complex: bool
+    allow_sets: bool
+    allow_trig_functions: bool
+    simplify_expression: bool
+    custom_functions: tuple[str, ...] | None
+    assumptions: tuple[tuple[str, tuple[tuple[str, Any], ...]], ...] | None
+    allow_extra_symbols: bool
+
+
+def _freeze_assumptions(
+    assumptions: AssumptionsDictT | None,
+) -> tuple[tuple[str, tuple[tuple[str, Any], ...]], ...] | None:
+    if assumptions is None:
+        return None
+    return tuple(
+        (name, tuple(var_assumptions.items()))
+        for name, var_assumptions in assumptions.items()
+    )
+
+
+@functools.lru_cache(maxsize=SYMPY_CACHE_SIZE)
+def _convert_string_to_sympy_cached(
+    expr: str, options: _ConversionOptions
+) -> tuple[sympy.Expr, str | CodeType]:
+    # SymPy expressions and code objects are immutable, so the cached
+    # result can be shared between callers.
+    return _convert_string_to_sympy_uncached(
+        expr,
+        options.variables,
+        allow_hidden=options.allow_hidden,
+        allow_complex=options.allow_complex,
+        allow_sets=options.allow_sets,
+        allow_trig_functions=options.allow_trig_functions,
+        simplify_expression=options.simplify_expression,
+        custom_functions=options.custom_functions,
+        assumptions=(
+            {name: dict(items) for name, items in options.assumptions}
+            if options.assumptions is not None
+            else None
+        ),
+        allow_extra_symbols=options.allow_extra_symbols,
+    )
+
+
+def sympy_cache_info() -> functools._CacheInfo:
+    """Return the hit and miss counters of the cache used by [convert_string_to_sympy][prairielearn.sympy_utils.convert_string_to_sympy].
+
+    Returns:
+        The number of hits and misses, the maximum size, and the current size of the cache.
+    """
+    return _convert_string_to_sympy_cached.cache_info()
+
+
+def clear_sympy_cache() -> None:
+    """Clear the cache used by [convert_string_to_sympy][prairielearn.sympy_utils.convert_string_to_sympy] and reset its counters."""
+    _convert_string_to_sympy_cached.cache_clear()
+
+
+def _convert_string_to_sympy_uncached(
+    expr: str,
+    variables: Iterable[str] | None,
+    *,
+    allow_hidden: bool,
+    allow_complex: bool,
+    allow_sets: bool,
+    allow_trig_functions: bool,
+    simplify_expression: bool,
+    custom_functions: Iterable[str] | None,
+    assumptions: AssumptionsDictT | None,
+    allow_extra_symbols: bool,
+) -> tuple[sympy.Expr, str | CodeType]:
+    """Convert a string to a sympy expression without using the cache.
+
     Returns:
         A tuple of the sympy expression and the source code that was used to generate it.
+    """
+    locals_for_eval = _build_locals_for_eval(
+        variables,
+        allow_hidden=allow_hidden,
+        allow_complex=allow_complex,
+        allow_sets=allow_sets,
+        allow_trig_functions=allow_trig_functions,
+        custom_functions=custom_functions,
+        assumptions=assumptions,
+    )
+
+    # Do the conversion
+    return evaluate_with_source(
+        expr,
+        locals_for_eval,
+        allow_complex=allow_complex,
+        allow_sets=allow_sets,
+        simplify_expression=simplify_expression,
+        allow_extra_symbols=allow_extra_symbols,
+    )
+
+
+def _build_locals_for_eval(
+    variables: Iterable[str] | None,
+    *,
+    allow_hidden: bool,
+    allow_complex: bool,
+    allow_sets: bool,
+    allow_trig_functions: bool,
+    custom_functions: Iterable[str] | None,
+    assumptions: AssumptionsDictT | None,
+) -> LocalsForEval:
+    """Build the variables and functions that an expression may use.
+
+    Returns:
+        The locals for [evaluate_with_source][prairielearn.sympy_utils.evaluate_with_source].
 
     Raises:
         HasInvalidAssumptionError: If the assumptions are not valid.
@@ -1093,15 +1430,7 @@ def convert_string_to_sympy_with_source(
         else:
             locals_for_eval["functions"][name] = sympy.Function(name)
 
-    # Do the conversion
-    return evaluate_with_source(
-        expr,
-        locals_for_eval,
-        allow_complex=allow_complex,
-        allow_sets=allow_sets,
-        simplify_expression=simplify_expression,
-        allow_extra_symbols=allow_extra_symbols,
-    )
+    return locals_for_eval
 
 
 def point_to_error(expr: str, ind: int, w: int = 5) -> str:
@@ -1162,6 +1491,201 @@ def _find_type_error_offset(expr: str, offsets: list[int], exc: TypeError) -> in
     return -1
 
 
+_CODE_TOKEN_PATTERN = re.compile(
+    r"\*\*|Integer \((\d+) \)|Symbol \('(\w+)' \)|[A-Za-z_]\w*|\S"
+)
+_EXPR_TOKEN_PATTERN = re.compile(r"\*\*|\d+|[A-Za-z_]\w*|\S")
+
+
+def _map_code_offset(code: str, offset: int, expr: str, offsets: list[int]) -> int:
+    """Return the offset in expr of the token at `offset` in the code that SymPy generated for it.
+
+    SymPy wraps numbers and variables, e.g. `2**x` becomes
+    `Integer (2 )**Symbol ('x' )`, and may insert tokens like `*` for implicit
+    multiplication. The token is matched by text and by how many times the same
+    text appeared before it, which is approximate but good enough for pointing
+    at the error.
+    """
+    if offset < 0:
+        return -1
+
+    code_tokens = [
+        (match.start(), match.group(1) or match.group(2) or match.group(0))
+        for match in _CODE_TOKEN_PATTERN.finditer(code)
+    ]
+    index = next(
+        (i for i, (start, _) in enumerate(code_tokens) if start >= offset), None
+    )
+    if index is None:
+        return -1
+
+    token = code_tokens[index][1]
+    occurrence = sum(text == token for _, text in code_tokens[:index])
+    for match in _EXPR_TOKEN_PATTERN.finditer(expr):
+        if match.group(0) == token:
+            if occurrence == 0:
+                return offsets[match.start()]
+            occurrence -= 1
+    return -1
+
+
+_TREE_CONSTANTS: Final[FrozenDict[str, sympy.Basic]] = FrozenDict({
+    "pi": sympy.pi,
+    "E": sympy.E,
+    "I": sympy.I,
+    "oo": sympy.oo,
+    "-oo": sympy.S.NegativeInfinity,
+    "zoo": sympy.zoo,
+    "EmptySet": sympy.S.EmptySet,
+})
+_TREE_CONSTANT_NAMES: Final[FrozenDict[sympy.Basic, str]] = FrozenDict({
+    value: name for name, value in _TREE_CONSTANTS.items()
+})
+_TREE_OPERATORS: Final[FrozenDict[str, Callable[..., sympy.Basic]]] = FrozenDict({
+    "Add": sympy.Add,
+    "Mul": sympy.Mul,
+    "Pow": sympy.Pow,
+})
+_TREE_SET_OPERATORS: Final[FrozenDict[str, Callable[..., sympy.Basic]]] = FrozenDict({
+    "FiniteSet": sympy.FiniteSet,
+    "Union": sympy.Union,
+    "Intersection": sympy.Intersection,
+    "Complement": sympy.Complement,
+})
+# The classes of the builtin functions, by name. These are looked up in the
+# locals when decoding, so that e.g. trig functions are only rebuilt if they
+# are allowed.
+_TREE_FUNCTIONS: Final[frozenset[str]] = frozenset(
+    function.__name__
+    for function in (
+        *_Constants.functions.values(),
+        *_Constants.trig_functions.values(),
+    )
+    if isinstance(function, type)
+)
+
+
+class _UnsupportedTreeNodeError(Exception):
+    pass
+
+
+def _sympy_to_tree(a: sympy.Basic) -> list[Any]:
+    """Encode an expression as nested lists of the form `[node type, *args]`.
+
+    Returns:
+        The encoded expression.
+
+    Raises:
+        _UnsupportedTreeNodeError: If the expression contains a node that
+            can't be encoded, like a float.
+    """
+    if isinstance(a, sympy.Integer):
+        # As strings, since JSON can't represent large integers exactly.
+        return ["Integer", str(a.p)]
+    if isinstance(a, sympy.Rational):
+        return ["Rational", str(a.p), str(a.q)]
+    if isinstance(a, sympy.Symbol):
+        return ["Symbol", a.name]
+    if not a.args and a in _TREE_CONSTANT_NAMES:
+        return [_TREE_CONSTANT_NAMES[a]]
+    if isinstance(a, sympy.Interval):
+        return [
+            "Interval",
+            _sympy_to_tree(a.start),
+            _sympy_to_tree(a.end),
+            bool(a.left_open),
+            bool(a.right_open),
+        ]
+
+    name = type(a).__name__
+    if isinstance(a.func, UndefinedFunction):
+        return ["Function", name, *map(_sympy_to_tree, a.args)]
+    if (
+        name in _TREE_OPERATORS
+        or name in _TREE_SET_OPERATORS
+        or name in _TREE_FUNCTIONS
+    ) and type(a).__module__.startswith("sympy."):
+        return [name, *map(_sympy_to_tree, a.args)]
+    raise _UnsupportedTreeNodeError(name)
+
+
+def _is_evaluated(a: sympy.Basic) -> bool:
+    """Return whether evaluating the nodes of an expression would leave it unchanged.
+
+    Expressions like `Add(x, x, evaluate=False)` are not evaluated. If an
+    expression is, it can be rebuilt without evaluating it again, which is
+    several times faster.
+    """
+    return all(
+        node.func(*node.args) == node
+        for node in sympy.preorder_traversal(a)
+        if node.args
+    )
+
+
+def _tree_to_sympy(
+    tree: Any,
+    locals_for_eval: LocalsForEval,
+    *,
+    allow_sets: bool,
+    evaluate: bool,
+) -> sympy.Basic:
+    """Rebuild an expression encoded by `_sympy_to_tree`.
+
+    Only the constructors in the tables above and the variables and functions
+    in `locals_for_eval` are used, so this never evaluates code.
+
+    Returns:
+        The SymPy expression.
+
+    Raises:
+        HasInvalidSymbolError: If a variable is not in `locals_for_eval`.
+        HasInvalidFunctionError: If a function is not in `locals_for_eval`.
+        HasSetNotationError: If the expression is a set and `allow_sets` is `False`.
+        ValueError: If the tree is malformed.
+    """
+
+    def build(node: Any) -> sympy.Basic:
+        return _tree_to_sympy(
+            node, locals_for_eval, allow_sets=allow_sets, evaluate=evaluate
+        )
+
+    match tree:
+        case ["Integer", str(p)]:
+            return sympy.Integer(int(p))
+        case ["Rational", str(p), str(q)]:
+            return sympy.Rational(int(p), int(q))
+        case ["Symbol", str(name)]:
+            if name not in locals_for_eval["variables"]:
+                raise HasInvalidSymbolError(name)
+            return cast(sympy.Basic, locals_for_eval["variables"][name])
+        case [str(name)] if name in _TREE_CONSTANTS:
+            if not allow_sets and name == "EmptySet":
+                raise HasSetNotationError
+            return _TREE_CONSTANTS[name]
+        case ["Interval", start, end, bool(left_open), bool(right_open)]:
+            if not allow_sets:
+                raise HasSetNotationError
+            return sympy.Interval(build(start), build(end), left_open, right_open)
+        case [str(name), *args] if name in _TREE_SET_OPERATORS:
+            if not allow_sets:
+                raise HasSetNotationError
+            return _TREE_SET_OPERATORS[name](*map(build, args), evaluate=evaluate)
+        case [str(name), *args] if name in _TREE_OPERATORS:
+            return _TREE_OPERATORS[name](*map(build, args), evaluate=evaluate)
+        case ["Function", str(name), *args] | [str(name), *args] if (
+            tree[0] == "Function" or name in _TREE_FUNCTIONS
+        ):
+            # Custom functions, and builtin functions like `sin`.
+            if name not in locals_for_eval["functions"]:
+                raise HasInvalidFunctionError(-1, name)
+            return locals_for_eval["functions"][name](
+                *map(build, args), evaluate=evaluate
+            )
+        case _:
+            raise ValueError(f"Invalid SymPy JSON tree node: {tree!r}")
+
+
 def sympy_to_json(
     a: sympy.Expr | sympy.Set,
     *,
@@ -1171,6 +1695,11 @@ def sympy_to_json(
 ) -> SympyJson:
     """Convert a SymPy expression to a JSON-seralizable dictionary.
 
+    The expression is stored as a string in `_value`, and unless it contains
+    nodes other than numbers, variables, arithmetic, builtin and custom
+    functions, and sets, also as a tree of nodes in `_tree`. The tree can be
+    converted back without parsing the string.
+
     Returns:
         A JSON-serializable representation of the SymPy expression.
 
@@ -1211,13 +1740,18 @@ def sympy_to_json(
     functions_set = {str(func_obj.func) for func_obj in a.atoms(sympy.Function)}
     custom_functions = list(functions_set - reserved)
 
-    return {
+    result: SympyJson = {
         "_type": "sympy",
         "_value": _SympyJsonStrPrinter().doprint(a_sub),
         "_variables": variables,
         "_assumptions": assumptions_dict,
         "_custom_functions": custom_functions,
     }
+    # Expressions with other nodes, like floats, are only stored as a string.
+    with contextlib.suppress(_UnsupportedTreeNodeError):
+        result["_tree"] = _sympy_to_tree(a)
+        result["_tree_evaluated"] = _is_evaluated(a)
+    return result
 
 
 def json_to_sympy(
@@ -1230,6 +1764,10 @@ def json_to_sympy(
 ) -> sympy.Expr:
     """Convert a json-seralizable dictionary created by [sympy_to_json][prairielearn.sympy_utils.sympy_to_json] to a SymPy expression.
 
+    If the dictionary has a `_tree`, the expression is rebuilt from it directly,
+    which is much faster than parsing `_value`. Dictionaries without it, like
+    those stored by older versions, are parsed as before.
+
     Returns:
         A SymPy expression.
 
@@ -1245,6 +1783,32 @@ def json_to_sympy(
     if "_variables" not in sympy_expr_dict:
         sympy_expr_dict["_variables"] = None
 
+    if "_tree" in sympy_expr_dict:
+        locals_for_eval = _build_locals_for_eval(
+            sympy_expr_dict["_variables"],
+            allow_hidden=True,
+            allow_complex=allow_complex,
+            allow_sets=allow_sets,
+            allow_trig_functions=allow_trig_functions,
+            custom_functions=sympy_expr_dict.get("_custom_functions"),
+            assumptions=sympy_expr_dict.get("_assumptions"),
+        )
+        expr = _tree_to_sympy(
+            sympy_expr_dict["_tree"],
+            locals_for_eval,
+            allow_sets=allow_sets,
+            evaluate=simplify_expression
+            and not sympy_expr_dict.get("_tree_evaluated", False),
+        )
+        # The same checks as for a parsed string, e.g. for complex numbers.
+        sympy_check(
+            cast(sympy.Expr, expr),
+            locals_for_eval,
+            allow_complex=allow_complex,
+            allow_sets=allow_sets,
+        )
+        return cast(sympy.Expr, expr)
+
     return convert_string_to_sympy(
         sympy_expr_dict["_value"],
         sympy_expr_dict["_variables"],
@@ -1363,6 +1927,14 @@ def try_parse_string_as_sympy(
                 "Note that the location of the syntax error is approximate."
             )
         return SympyParseFailure(error_text)
+    except HasExcessiveComplexityError as exc:
+        error_text = f"Your answer is too complex to evaluate, because {exc.reason}."
+        if exc.offset != -1:
+            return SympyParseFailure(
+                f"{error_text} <br><br><pre>{point_to_error(expr, exc.offset)}</pre>"
+                "Note that the location of the error is approximate."
+            )
+        return SympyParseFailure(error_text)
     except HasParseError as exc:
         # Special case where there is no error offset to point at. In practice, this is almost always a missing closing
         # parenthesis that SymPy only catches at the end of parsing, so try to give a slightly more helpful error message.
@@ -1461,6 +2033,226 @@ def validate_string_as_sympy(
     return None
 
 
+# Functions that NumPy evaluates like SymPy for complex arguments. Expressions
+# with any other function, like `Max` or a custom function, aren't compared
+# numerically.
+_NUMERIC_FUNCTIONS: tuple[type[sympy.Basic], ...] = (
+    sympy.exp,
+    sympy.log,
+    sympy.Abs,
+    sympy.sign,
+    sympy.sin,
+    sympy.cos,
+    sympy.tan,
+    sympy.sec,
+    sympy.cot,
+    sympy.csc,
+    sympy.sinh,
+    sympy.cosh,
+    sympy.tanh,
+    sympy.asin,
+    sympy.acos,
+    sympy.atan,
+    sympy.asinh,
+    sympy.acosh,
+    sympy.atanh,
+)
+_NUMERIC_NODES: tuple[type[sympy.Basic], ...] = (
+    sympy.Symbol,
+    sympy.Number,
+    sympy.NumberSymbol,
+    sympy.core.numbers.ImaginaryUnit,
+    sympy.Add,
+    sympy.Mul,
+    sympy.Pow,
+    *_NUMERIC_FUNCTIONS,
+)
+
+
+def _sample_symbol(
+    symbol: sympy.Symbol, rng: np.random.Generator, num_points: int
+) -> npt.NDArray[np.complex128] | None:
+    """Draw random values for `symbol` that respect its assumptions.
+
+    Values stay away from zero, where many expressions are undefined.
+
+    Returns:
+        The values, or `None` if the assumptions are too specific to sample.
+    """
+    if symbol.is_zero or symbol.is_prime or symbol.is_composite or symbol.is_infinite:
+        return None
+
+    if symbol.is_integer:
+        magnitudes = rng.integers(1, 10, num_points).astype(np.float64)
+        if symbol.is_even:
+            magnitudes *= 2
+        elif symbol.is_odd:
+            magnitudes = 2 * magnitudes - 1
+    else:
+        magnitudes = rng.uniform(0.5, 3, num_points)
+
+    if symbol.is_nonnegative:
+        values = magnitudes
+    elif symbol.is_nonpositive:
+        values = -magnitudes
+    else:
+        values = magnitudes * rng.choice([-1.0, 1.0], num_points)
+
+    if symbol.is_integer or symbol.is_extended_real:
+        return values.astype(np.complex128)
+    if symbol.is_imaginary:
+        return (values * 1j).astype(np.complex128)
+    # Symbols without assumptions are complex, which is also how `equals()`
+    # treats them.
+    angles = rng.uniform(-np.pi, np.pi, num_points)
+    return (magnitudes * np.exp(1j * angles)).astype(np.complex128)
+
+
+@functools.lru_cache(maxsize=256)
+def _lambdify(
+    symbols: tuple[sympy.Symbol, ...], expr: sympy.Expr
+) -> Callable[..., Any]:
+    # The correct answer is usually compared to several submissions, so its
+    # compiled function is cached like the conversion from a string.
+    return sympy.lambdify(symbols, expr, modules="numpy")
+
+
+def _evaluate_at_points(
+    expr: sympy.Expr,
+    symbols: tuple[sympy.Symbol, ...],
+    points: list[npt.NDArray[np.complex128]],
+) -> npt.NDArray[np.complex128] | None:
+    try:
+        with np.errstate(all="ignore"):
+            values = _lambdify(symbols, expr)(*points)
+            return np.broadcast_to(
+                np.asarray(values, dtype=np.complex128), points[0].shape
+            )
+    except (ArithmeticError, TypeError, ValueError, NameError):
+        return None
+
+
+def _differ_precisely(
+    a: sympy.Expr, b: sympy.Expr, point: dict[sympy.Symbol, complex]
+) -> bool | None:
+    """Check whether two expressions differ at `point` with 50 digits of precision.
+
+    Returns:
+        Whether the expressions differ, or `None` if they can't be evaluated.
+    """
+    # Python floats would only be substituted with 15 digits of precision.
+    subs: dict[sympy.Basic, sympy.Basic | float] = {
+        symbol: sympy.Float(value.real, 50) + sympy.I * sympy.Float(value.imag, 50)
+        for symbol, value in point.items()
+    }
+    try:
+        a_value = a.evalf(50, subs=subs)
+        b_value = b.evalf(50, subs=subs)
+        difference = abs(complex((a_value - b_value).evalf(50)))
+        scale = max(abs(complex(a_value)), abs(complex(b_value)), 1)
+    except (ArithmeticError, TypeError, ValueError):
+        return None
+    if not (math.isfinite(difference) and math.isfinite(scale)):
+        return None
+    return difference > 1e-40 * scale
+
+
+def numerically_equal(
+    a: sympy.Expr,
+    b: sympy.Expr,
+    *,
+    num_points: int = NUMERIC_EQUALITY_POINTS,
+    seed: int = 0,
+) -> bool | None:
+    """Look for a point at which two expressions differ by evaluating them at random points.
+
+    Each free symbol is sampled from the domain given by its assumptions, e.g.
+    positive integers for a symbol that is assumed to be a positive integer,
+    and complex numbers for a symbol without assumptions. The points are drawn
+    from a generator seeded with `seed`, so the result is reproducible.
+
+    A mismatch at one of the points is only reported once it has been
+    confirmed by evaluating both expressions at that point with 50 digits of
+    precision, so rounding errors don't make equal expressions different.
+    Agreeing at every point doesn't prove that the expressions are equal,
+    since they may only differ outside of the sampled values, like
+    `acos(cos(x))` and `x`, or by less than the precision, like `x` and
+    `x + exp(-100)`.
+
+    Returns:
+        `True` if the expressions are identical or their difference simplifies
+        to zero, `False` if they clearly differ at one of the points, and `None`
+        otherwise.
+    """
+    if a == b:
+        return True
+    # SymPy's automatic simplification often reduces the difference of two
+    # expressions to a number, like for `x + 1` and `x + 2`. The difference of
+    # infinities is `nan`, which says nothing about whether they're equal.
+    exact_difference = a - b
+    if exact_difference.is_Number:
+        return exact_difference == 0 if exact_difference.is_finite else None
+
+    for expr in (a, b):
+        if not all(
+            isinstance(node, _NUMERIC_NODES) for node in sympy.preorder_traversal(expr)
+        ):
+            return None
+
+    rng = np.random.default_rng(seed)
+    symbols: list[sympy.Symbol] = []
+    points: list[npt.NDArray[np.complex128]] = []
+    for symbol in sorted(a.free_symbols | b.free_symbols, key=sympy.default_sort_key):
+        if not isinstance(symbol, sympy.Symbol):
+            return None
+        values = _sample_symbol(symbol, rng, num_points)
+        if values is None:
+            return None
+        symbols.append(symbol)
+        points.append(values)
+    if not symbols:
+        symbols.append(sympy.Dummy())
+        points.append(np.zeros(num_points, dtype=np.complex128))
+
+    a_values = _evaluate_at_points(a, tuple(symbols), points)
+    b_values = _evaluate_at_points(b, tuple(symbols), points)
+    if a_values is None or b_values is None:
+        return None
+
+    defined = np.isfinite(a_values) & np.isfinite(b_values)
+    a_values, b_values = a_values[defined], b_values[defined]
+    difference = np.abs(a_values - b_values)
+    scale = np.maximum(np.abs(a_values), np.abs(b_values))
+
+    defined_indices = np.flatnonzero(defined)
+    for index in defined_indices[difference > 1e-6 * scale + 1e-9][:3]:
+        point = {
+            symbol: complex(values[index])
+            for symbol, values in zip(symbols, points, strict=True)
+        }
+        if _differ_precisely(a, b, point):
+            return False
+    return None
+
+
+def expressions_equal(a: sympy.Expr, b: sympy.Expr) -> bool:
+    """Check whether two expressions are equal.
+
+    This gives the same answer as `a.equals(b) is True`, but first compares
+    the expressions with
+    [numerically_equal][prairielearn.sympy_utils.numerically_equal], which is
+    much faster than the symbolic simplification in `equals()` at finding a
+    point where they differ. `equals()` is only used if no such point is found.
+
+    Returns:
+        `True` if the expressions are equal.
+    """
+    result = numerically_equal(a, b)
+    if result is not None:
+        return result
+    return a.equals(b) is True
+
+
 def get_items_list(items_string: str | None) -> list[str]:
     """Return a list of items from a comma-separated string."""
     if items_string is None:
@@ -1559,7 +2351,7 @@ def _try_rewrite_interval_literal(
 
 
 def _err_on_transform(trans: TRANS, exc: type[BaseSympyError]) -> TRANS:
-    @wraps(trans)
+    @functools.wraps(trans)
     def _raise_on_transform(
         in_tokens: list[TOKEN], local_dict: DICT, global_dict: DICT
     ) -> list[TOKEN]:
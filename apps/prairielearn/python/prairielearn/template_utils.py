@@ -0,0 +1,65 @@
+"""Utilities for rendering Mustache templates.
+
+```python
+from prairielearn import ...
+```
+"""
+
+import os
+from typing import Any
+
+import chevron
+from chevron.tokenizer import tokenize
+
+TemplateTokens = list[tuple[str, str]]
+"""A pre-parsed Mustache template, as produced by Chevron's tokenizer."""
+
+# Maps the absolute path of a template to its modification time and its tokens.
+_template_cache: dict[str, tuple[int, TemplateTokens]] = {}
+
+
+def load_template(template_path: str | os.PathLike[str]) -> TemplateTokens:
+    """Load and tokenize a Mustache template.
+
+    Templates are cached for the lifetime of the process, keyed by their absolute
+    path and modification time, so each template is read and tokenized only once
+    no matter how many times it is rendered. Relative paths are resolved against
+    the current working directory, which is the element directory for element code.
+
+    Returns:
+        The tokenized template, which can be passed directly to `chevron.render`.
+    """
+    path = os.path.abspath(template_path)
+    mtime = os.stat(path).st_mtime_ns
+
+    cached = _template_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, encoding="utf-8") as f:
+        tokens = list(tokenize(f.read()))
+
+    _template_cache[path] = (mtime, tokens)
+    return tokens
+
+
+def render_template(
+    template_path: str | os.PathLike[str],
+    data: dict[str, Any] | None = None,
+    **kwargs: Any,
+) -> str:
+    """Render a Mustache template file with the given data.
+
+    This is a cached equivalent of `chevron.render(open(template_path), data, ...)`;
+    see [`load_template`][prairielearn.template_utils.load_template].
+    Any keyword arguments are passed through to `chevron.render`. For example,
+    an element's `render()` function can use:
+
+    ```python
+    html = pl.render_template("pl-card.mustache", {"title": "Hello"})
+    ```
+
+    Returns:
+        The rendered template.
+    """
+    return chevron.render(load_template(template_path), data or {}, **kwargs)
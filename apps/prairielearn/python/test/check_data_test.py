@@ -1,7 +1,13 @@
+import copy
 from typing import Any
 
 import pytest
-from prairielearn.internal.check_data import check_data
+from prairielearn.internal.check_data import (
+    DataModificationError,
+    check_data,
+    make_read_only,
+    protect_data,
+)
 
 
 def test_check_data_extra_props() -> None:
@@ -48,14 +54,14 @@ def test_check_data_invalid_type(
 
 def test_check_data_invalid_modification() -> None:
     with pytest.raises(
-        ValueError, match=r'data\["panel"\] has been illegally modified'
+        DataModificationError, match=r'data\["panel"\] has been illegally modified'
     ):
         check_data({"panel": "question"}, {"panel": "submission"}, "render")
 
 
 def test_check_data_invalid_modification_nested() -> None:
     with pytest.raises(
-        ValueError, match=r'data\["params"\] has been illegally modified'
+        DataModificationError, match=r'data\["params"\] has been illegally modified'
     ):
         check_data({"params": {"foo": "bar"}}, {"params": {"foo": "baz"}}, "test")
 
@@ -67,3 +73,71 @@ def test_check_data_number_keys() -> None:
             {"panel": "question", 1: "data", 2: "more data"},
             "render",
         )
+
+
+def test_make_read_only() -> None:
+    value = make_read_only({"a": [1, {"b": 2}]}, "options")
+    assert value == {"a": [1, {"b": 2}]}
+    assert isinstance(value["a"][1], dict)
+    assert value.pop("missing", None) is None
+
+    for modify in [
+        lambda: value.update(c=3),
+        lambda: value["a"].append(3),
+        lambda: value["a"][1].setdefault("c", 3),
+        lambda: value["a"].__delitem__(0),
+    ]:
+        with pytest.raises(
+            DataModificationError,
+            match=r'data\["options"\] has been illegally modified',
+        ):
+            modify()
+
+    copied = copy.deepcopy(value)
+    copied["a"][1]["c"] = 3
+    assert type(copied["a"]) is list
+    assert value == {"a": [1, {"b": 2}]}
+
+
+def test_make_read_only_allows_unchanging_writes() -> None:
+    value = make_read_only({"a": [1, 2, 3], "b": {"c": 1}}, "correct_answers")
+
+    value["a"] = [1, 2, 3]
+    value.update({"b": {"c": 1}})
+    value |= {"a": [1, 2, 3]}
+    value["b"]["c"] = 1
+    value["a"].sort()
+    value["a"][0] = 1
+    value["a"] += []
+    assert value.setdefault("b") == {"c": 1}
+
+    assert value == {"a": [1, 2, 3], "b": {"c": 1}}
+    with pytest.raises(
+        DataModificationError,
+        match=r'data\["correct_answers"\] has been illegally modified',
+    ):
+        value["a"].sort(reverse=True)
+    assert value["a"] == [1, 2, 3]
+    with pytest.raises(KeyError):
+        del value["missing"]
+
+
+def test_data_modification_error_is_value_error() -> None:
+    value = make_read_only({"a": 1}, "params")
+    with pytest.raises(ValueError, match="illegally modified"):
+        value["a"] = 2
+
+
+def test_protect_data() -> None:
+    params = {"foo": "bar"}
+    data: dict[str, Any] = {"params": params, "options": {"baz": 1}}
+
+    originals = protect_data(data, "grade")
+
+    assert data["params"] is params
+    assert originals == {"options": {"baz": 1}}
+    with pytest.raises(
+        DataModificationError, match=r'data\["options"\] has been illegally modified'
+    ):
+        data["options"]["baz"] = 2
+    check_data(dict(data), data, "grade")
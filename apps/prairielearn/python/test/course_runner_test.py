@@ -0,0 +1,174 @@
+import csv
+import io
+import json
+import math
+from pathlib import Path
+
+import pytest
+from prairielearn.internal import course_runner
+
+# Other tests may leave threads running; the forked runs don't touch them.
+pytestmark = pytest.mark.filterwarnings("ignore:This process .* is multi-threaded")
+
+QUESTION_HTML = """
+<pl-question-panel>What is {{params.a}} + {{params.b}}?</pl-question-panel>
+<pl-integer-input answers-name="sum"></pl-integer-input>
+"""
+
+SERVER_PY = """
+import random
+
+def generate(data):
+    data["params"]["a"] = random.randint(1, 9)
+    data["params"]["b"] = random.randint(1, 9)
+    data["correct_answers"]["sum"] = data["params"]["a"] + data["params"]["b"]
+"""
+
+
+def write_question(
+    course: Path, qid: str, info: dict[str, object], server: str | None = SERVER_PY
+) -> None:
+    path = course / "questions" / qid
+    path.mkdir(parents=True)
+    (path / "info.json").write_text(json.dumps(info))
+    (path / "question.html").write_text(QUESTION_HTML)
+    if server is not None:
+        (path / "server.py").write_text(server)
+
+
+@pytest.fixture
+def course(tmp_path: Path) -> Path:
+    write_question(tmp_path, "sum", {"title": "Sum"})
+    write_question(
+        tmp_path,
+        "nested/broken",
+        {"title": "Broken"},
+        SERVER_PY + "\ndef prepare(data):\n    raise RuntimeError('oops')\n",
+    )
+    write_question(tmp_path, "legacy", {"title": "Legacy", "type": "Calculation"})
+    return tmp_path
+
+
+def test_find_questions(course: Path) -> None:
+    assert [q.qid for q in course_runner.find_questions(course)] == [
+        "nested/broken",
+        "sum",
+    ]
+
+
+def test_run_course(course: Path) -> None:
+    questions = course_runner.find_questions(course)
+    results = course_runner.run_course(course, questions, [1, 2], processes=2)
+
+    assert [(result.qid, result.seed) for result in results] == [
+        ("nested/broken", 1),
+        ("nested/broken", 2),
+        ("sum", 1),
+        ("sum", 2),
+    ]
+    for result in results[2:]:
+        assert result.failures == []
+        assert set(result.times) == set(course_runner.PHASES)
+        assert result.peak_rss > 0
+    assert results[0].failures[0].startswith("prepare: RuntimeError: oops")
+
+    reports = course_runner.summarize(results)
+    assert [(r["qid"], r["runs"], r["failed_runs"]) for r in reports] == [
+        ("nested/broken", 2, 2),
+        ("sum", 2, 0),
+    ]
+    assert math.isnan(reports[0]["total"]["p50_ms"])
+    assert reports[1]["total"]["p50_ms"] > 0
+
+    rows = list(csv.DictReader(io.StringIO(course_runner.format_csv(reports))))
+    assert rows[0]["first_failure"].startswith("prepare:")
+    assert rows[1]["first_failure"] == ""
+    report = json.loads(course_runner.format_json(reports))
+    assert report["questions"][0]["total"]["p50_ms"] is None
+
+
+def test_incorrect_answers_are_checked(course: Path) -> None:
+    questions = [q for q in course_runner.find_questions(course) if q.qid == "sum"]
+    [result] = course_runner.run_course(
+        course, questions, [1], processes=1, test_types=["incorrect", "invalid"]
+    )
+    assert result.failures == []
+
+
+def test_main(course: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    assert (
+        course_runner.main([
+            str(course),
+            "--questions",
+            "sum",
+            "--seeds",
+            "1",
+            "--format",
+            "csv",
+        ])
+        == 0
+    )
+    assert capsys.readouterr().out.startswith("qid,runs,failed_runs,")
+    assert course_runner.main([str(course), "--seeds", "1"]) == 1
+    assert (
+        course_runner.main([
+            str(course),
+            "--questions",
+            "sum",
+            "--seeds",
+            "1",
+            "--max-p90-ms",
+            "0",
+        ])
+        == 1
+    )
+
+
+@pytest.mark.parametrize(
+    ("values", "percent", "expected"),
+    [
+        ([3, 1, 2], 50, 2),
+        ([3, 1, 2], 0, 1),
+        ([3, 1, 2], 100, 3),
+        (list(range(1, 101)), 90, 90),
+        (list(range(1, 101)), 99, 99),
+        ([5], 99, 5),
+    ],
+)
+def test_percentile(values: list[float], percent: float, expected: float) -> None:
+    assert course_runner.percentile(values, percent) == expected
+
+
+def test_percentile_empty() -> None:
+    assert math.isnan(course_runner.percentile([], 50))
+
+
+@pytest.mark.parametrize(
+    ("partial_scores", "partial_credit", "expected"),
+    [
+        ({}, True, 0),
+        ({}, False, 0),
+        ({"a": {"score": 1}, "b": {"score": 0}}, True, 0.5),
+        ({"a": {"score": 1, "weight": 3}, "b": {"score": 0}}, True, 0.75),
+        ({"a": {"score": 1}, "b": {"score": None, "weight": 1}}, True, 0.5),
+        ({"a": {"score": 1}, "b": {"score": 0.5}}, False, 0),
+        ({"a": {"score": 1}, "b": {"score": 1}}, False, 1),
+    ],
+)
+def test_compute_score(
+    partial_scores: dict[str, object], *, partial_credit: bool, expected: float
+) -> None:
+    assert (
+        course_runner._compute_score(partial_scores, partial_credit=partial_credit)
+        == expected
+    )
+
+
+def test_round_trip_matches_javascript() -> None:
+    assert course_runner._round_trip({"a": 6.0, "b": 0.5, "c": 1e300}, "generate") == {
+        "a": 6,
+        "b": 0.5,
+        "c": 1e300,
+    }
+    with pytest.raises(course_runner.PhaseError, match="can't be encoded as JSON"):
+        course_runner._round_trip({"a": math.nan}, "generate")
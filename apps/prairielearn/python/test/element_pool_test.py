@@ -0,0 +1,232 @@
+import os
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from prairielearn.internal import element_pool, question_phases
+from prairielearn.internal.check_data import DataModificationError
+from prairielearn.internal.element_pool import DataChange
+
+
+@pytest.fixture
+def pool() -> Iterator[element_pool.ElementPool]:
+    element_pool.configure(2)
+    pool = element_pool.get_pool()
+    assert pool is not None
+    yield pool
+    element_pool.configure(0)
+
+
+@pytest.fixture
+def restore_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(os.getcwd())
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    monkeypatch.setattr(question_phases, "_controller_cache", {})
+    monkeypatch.setattr(question_phases, "_code_cache", {})
+    monkeypatch.setattr(question_phases, "_controller_modules", {})
+
+
+def square(x: int) -> int:
+    if x < 0:
+        raise ValueError(f"negative: {x}")
+    return x * x
+
+
+def exit_helper() -> None:
+    os._exit(1)
+
+
+def test_diff_data() -> None:
+    before = {
+        "partial_scores": {"a": {"score": 0}, "b": {"score": 1}, "c": None},
+        "format_errors": {},
+        "params": {"x": 1},
+        "score": 0,
+    }
+    after = {
+        "partial_scores": {"a": {"score": 1}, "c": None},
+        "format_errors": {"d": "Invalid"},
+        "params": {"x": 1.0},
+        "score": 1,
+    }
+
+    assert element_pool.diff_data(before, after) == [
+        DataChange("partial_scores", "a", deleted=False, value={"score": 1}),
+        DataChange("partial_scores", "b", deleted=True, value=None),
+        DataChange("format_errors", "d", deleted=False, value="Invalid"),
+        DataChange("params", "x", deleted=False, value=1.0),
+        DataChange("score", None, deleted=False, value=1),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("changes", "conflicts"),
+    [
+        ([[("partial_scores", "a")], [("partial_scores", "b")]], []),
+        (
+            [[("partial_scores", "a")], [("partial_scores", "a")]],
+            ['data["partial_scores"]["a"]'],
+        ),
+        (
+            [[("params", None)], [("params", "a"), ("format_errors", "a")]],
+            ['data["params"]'],
+        ),
+        ([[("score", None), ("partial_scores", "a")]], []),
+    ],
+)
+def test_find_conflicts(
+    changes: list[list[tuple[str, str | None]]], conflicts: list[str]
+) -> None:
+    element_changes = [
+        [DataChange(prop, key, deleted=False, value=1) for prop, key in element]
+        for element in changes
+    ]
+    assert element_pool.find_conflicts(element_changes) == conflicts
+
+
+def test_apply_changes() -> None:
+    data: dict[str, Any] = {"partial_scores": {"a": 0, "b": 1}, "score": 0}
+    element_pool.apply_changes(
+        data,
+        [
+            DataChange("partial_scores", "a", deleted=False, value=1),
+            DataChange("partial_scores", "b", deleted=True, value=None),
+            DataChange("score", None, deleted=False, value=1),
+        ],
+    )
+    assert data == {"partial_scores": {"a": 1}, "score": 1}
+
+
+def test_pool_map(pool: element_pool.ElementPool) -> None:
+    assert pool.map(square, [(i,) for i in range(5)]) == [0, 1, 4, 9, 16]
+
+    with pytest.raises(ValueError, match="negative: -1") as exc_info:
+        pool.map(square, [(1,), (-1,), (-2,)])
+    assert "Traceback" in exc_info.value.__notes__[0]
+
+    # The pool still works after a failed call.
+    assert pool.map(square, [(3,)]) == [9]
+
+
+def test_pool_helper_exit(pool: element_pool.ElementPool) -> None:
+    with pytest.raises(RuntimeError, match="exited unexpectedly"):
+        pool.map(exit_helper, [()])
+    assert pool.broken
+
+    new_pool = element_pool.get_pool()
+    assert new_pool is not pool
+    assert new_pool is not None
+    assert new_pool.map(square, [(2,)]) == [4]
+
+
+def make_context(
+    tmp_path: Path, controller: str, html: str
+) -> question_phases.RenderContext:
+    element_path = tmp_path / "elements" / "my-element"
+    element_path.mkdir(parents=True)
+    (element_path / "my-element.py").write_text(controller)
+    return {
+        "html": html,
+        "elements": {
+            "my-element": {
+                "name": "my-element",
+                "controller": "my-element.py",
+                "type": "course",
+            }
+        },
+        "element_extensions": {},
+        "course_path": str(tmp_path),
+    }
+
+
+def make_grade_data() -> dict[str, Any]:
+    return {
+        "params": {},
+        "correct_answers": {"a": 1, "b": 2},
+        "submitted_answers": {"a": 1, "b": 3},
+        "format_errors": {},
+        "partial_scores": {},
+        "score": 0,
+        "feedback": {},
+        "variant_seed": 1,
+        "options": {},
+        "raw_submitted_answers": {},
+        "gradable": True,
+    }
+
+
+@pytest.mark.usefixtures("restore_environment", "pool")
+def test_process_in_parallel(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    context = make_context(
+        tmp_path,
+        "import os\n"
+        "PARSED_ELEMENT = True\n"
+        "def grade(element, data):\n"
+        '    name = element.get("answers-name")\n'
+        '    correct = data["submitted_answers"][name] == data["correct_answers"][name]\n'
+        '    data["partial_scores"][name] = {"score": float(correct), "pid": os.getpid()}\n',
+        '<div><my-element answers-name="a"></my-element></div>'
+        '<my-element answers-name="b"></my-element>',
+    )
+
+    serial_data = make_grade_data()
+    element_pool.configure(0)
+    question_phases.process("grade", serial_data, context)
+
+    element_pool.configure(2)
+    data = make_grade_data()
+    _, processed_elements = question_phases.process("grade", data, context)
+
+    def scores(data: dict[str, Any]) -> dict[str, float]:
+        return {name: s["score"] for name, s in data["partial_scores"].items()}
+
+    assert processed_elements == {"my-element"}
+    assert scores(data) == scores(serial_data) == {"a": 1.0, "b": 0.0}
+    assert os.getpid() not in {s["pid"] for s in data["partial_scores"].values()}
+    assert capsys.readouterr().err == ""
+
+
+@pytest.mark.usefixtures("restore_environment", "pool")
+def test_process_in_parallel_conflict(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    context = make_context(
+        tmp_path,
+        "PARSED_ELEMENT = True\n"
+        "def grade(element, data):\n"
+        '    name = element.get("answers-name")\n'
+        '    data["partial_scores"][name] = {"score": 1}\n'
+        '    data["feedback"]["graded"] = data["feedback"].get("graded", 0) + 1\n',
+        '<my-element answers-name="a"></my-element>'
+        '<my-element answers-name="b"></my-element>',
+    )
+    data = make_grade_data()
+
+    question_phases.process("grade", data, context)
+
+    assert data["feedback"] == {"graded": 2}
+    assert 'data["feedback"]["graded"]' in capsys.readouterr().err
+
+
+@pytest.mark.usefixtures("restore_environment", "pool")
+def test_process_in_parallel_error(tmp_path: Path) -> None:
+    context = make_context(
+        tmp_path,
+        "PARSED_ELEMENT = True\n"
+        "def grade(element, data):\n"
+        '    if element.get("answers-name") == "b":\n'
+        '        data["options"]["foo"] = 1\n',
+        '<my-element answers-name="a"></my-element>'
+        '<my-element answers-name="b"></my-element>',
+    )
+
+    with pytest.raises(DataModificationError, match="illegally modified") as exc_info:
+        question_phases.process("grade", make_grade_data(), context)
+    assert (
+        'Error occurred while processing element <my-element answers-name="b">'
+        in exc_info.value.__notes__
+    )
@@ -0,0 +1,105 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+from prairielearn.internal import file_cache
+
+
+@pytest.fixture
+def server_path(tmp_path: Path) -> str:
+    path = tmp_path / "course" / "questions" / "question" / "server.py"
+    path.parent.mkdir(parents=True)
+    path.write_text("def file(data):\n    return 'x'\n")
+    return str(path)
+
+
+def make_file_data(**changes: Any) -> dict[str, Any]:
+    return {
+        "params": {"m": 1, "b": 2},
+        "correct_answers": {"x": 3},
+        "submitted_answers": {},
+        "variant_seed": 1,
+        "options": {},
+        "filename": "figure.png",
+        **changes,
+    }
+
+
+def test_key_is_stable(server_path: str) -> None:
+    key = file_cache.make_key(server_path, make_file_data(), "course")
+    assert key is not None
+    assert file_cache.make_key(server_path, make_file_data(), "course") == key
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"filename": "other.png"},
+        {"variant_seed": 2},
+        {"params": {"m": 1, "b": 3}},
+        {"correct_answers": {"x": 4}},
+        {"submitted_answers": {"x": 4}},
+        {"options": {"a": 1}},
+    ],
+)
+def test_key_depends_on_data(server_path: str, changes: dict[str, Any]) -> None:
+    assert file_cache.make_key(
+        server_path, make_file_data(**changes), "course"
+    ) != file_cache.make_key(server_path, make_file_data(), "course")
+
+
+def test_key_depends_on_server_source(server_path: str) -> None:
+    key = file_cache.make_key(server_path, make_file_data(), "course")
+    Path(server_path).write_text("def file(data):\n    return 'y'\n")
+    assert file_cache.make_key(server_path, make_file_data(), "course") != key
+
+
+def test_key_depends_on_course(server_path: str) -> None:
+    assert file_cache.make_key(
+        server_path, make_file_data(), "other"
+    ) != file_cache.make_key(server_path, make_file_data(), "course")
+    assert file_cache.make_key(server_path, make_file_data(), None) is None
+
+
+def test_uncacheable_calls(server_path: str, tmp_path: Path) -> None:
+    missing_path = str(tmp_path / "missing.py")
+    assert file_cache.make_key(missing_path, make_file_data(), "course") is None
+    nan_data = make_file_data(params={"m": float("nan")})
+    assert file_cache.make_key(server_path, nan_data, "course") is None
+
+
+def test_configure(tmp_path: Path) -> None:
+    try:
+        file_cache.configure(str(tmp_path))
+        cache = file_cache.current()
+        assert cache is not None
+        assert cache.directory == tmp_path
+    finally:
+        file_cache.configure(None)
+    assert file_cache.current() is None
+
+
+def test_reads_course_files(server_path: str, tmp_path: Path) -> None:
+    course_path = tmp_path / "course"
+    (course_path / "serverFilesCourse").mkdir()
+    data_path = course_path / "serverFilesCourse" / "data.csv"
+    data_path.write_text("1,2\n")
+
+    try:
+        file_cache.configure(str(tmp_path / "cache"))
+        with file_cache.record_opened_files() as opened_files:
+            Path(server_path).read_text()
+            (tmp_path / "outside.txt").write_text("")
+        assert not file_cache.reads_course_files(server_path, opened_files)
+
+        with file_cache.record_opened_files() as opened_files:
+            data_path.read_text()
+        assert file_cache.reads_course_files(server_path, opened_files)
+    finally:
+        file_cache.configure(None)
+
+
+def test_reads_course_files_outside_course(tmp_path: Path) -> None:
+    server_path = tmp_path / "server.py"
+    server_path.write_text("")
+    assert file_cache.reads_course_files(str(server_path), [])
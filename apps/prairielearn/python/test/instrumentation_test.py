@@ -0,0 +1,113 @@
+import os
+import sys
+import tracemalloc
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from prairielearn.internal import element_pool, instrumentation, question_phases
+
+
+@pytest.fixture(autouse=True)
+def restore_environment(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.chdir(os.getcwd())
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    monkeypatch.setattr(question_phases, "_controller_cache", {})
+    monkeypatch.setattr(question_phases, "_code_cache", {})
+    monkeypatch.setattr(question_phases, "_controller_modules", {})
+    yield
+    instrumentation.stop()
+
+
+def make_context(tmp_path: Path) -> question_phases.RenderContext:
+    element_path = tmp_path / "elements" / "my-element"
+    element_path.mkdir(parents=True)
+    (element_path / "my-element.py").write_text(
+        "PARSED_ELEMENT = True\n"
+        "def grade(element, data):\n"
+        '    name = element.get("answers-name")\n'
+        '    data["partial_scores"][name] = {"score": 1, "blob": [0] * 10000}\n'
+    )
+    return {
+        "html": '<my-element answers-name="a"></my-element>'
+        '<div><my-element answers-name="b"></my-element></div>',
+        "elements": {
+            "my-element": {
+                "name": "my-element",
+                "controller": "my-element.py",
+                "type": "course",
+            }
+        },
+        "element_extensions": {},
+        "course_path": str(tmp_path),
+    }
+
+
+def make_grade_data() -> dict[str, Any]:
+    return {
+        "params": {},
+        "correct_answers": {},
+        "submitted_answers": {},
+        "format_errors": {},
+        "partial_scores": {},
+        "score": 0,
+        "feedback": {},
+        "variant_seed": 1,
+        "options": {},
+        "raw_submitted_answers": {},
+        "gradable": True,
+    }
+
+
+def allocate_and_fail() -> None:
+    blob = [0] * 100000
+    raise ValueError(f"oops: {len(blob)}")
+
+
+def test_measure_call() -> None:
+    instr = instrumentation.Instrumentation(trace_memory=True)
+    tracemalloc.start()
+    try:
+        with pytest.raises(ValueError, match="oops"), instr.measure_call("f", "grade"):
+            allocate_and_fail()
+    finally:
+        tracemalloc.stop()
+
+    [call] = instr.calls
+    assert call["name"] == "f"
+    assert call["phase"] == "grade"
+    assert call["wall_time"] >= 0
+    assert call["memory"] > 500000
+
+
+def test_start_and_stop() -> None:
+    assert instrumentation.current() is None
+    instr = instrumentation.start(trace_memory=True)
+    assert instrumentation.current() is instr
+    assert tracemalloc.is_tracing()
+    assert instrumentation.stop() is instr
+    assert instrumentation.current() is None
+    assert not tracemalloc.is_tracing()
+
+
+def test_process_without_instrumentation(tmp_path: Path) -> None:
+    question_phases.process("grade", make_grade_data(), make_context(tmp_path))
+    assert instrumentation.current() is None
+
+
+@pytest.mark.parametrize("processes", [0, 2])
+def test_process_records_calls(tmp_path: Path, processes: int) -> None:
+    element_pool.configure(processes)
+    instr = instrumentation.start(trace_memory=True)
+    try:
+        question_phases.process("grade", make_grade_data(), make_context(tmp_path))
+    finally:
+        element_pool.configure(0)
+
+    assert [(call["name"], call["source"], call["phase"]) for call in instr.calls] == [
+        ("my-element", '<my-element answers-name="a">', "grade"),
+        ("my-element", '<my-element answers-name="b">', "grade"),
+    ]
+    assert all(call["memory"] > 50000 for call in instr.calls)
+    assert [Path(module["path"]).name for module in instr.modules] == ["my-element.py"]
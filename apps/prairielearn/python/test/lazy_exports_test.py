@@ -0,0 +1,222 @@
+import importlib
+import subprocess
+import sys
+from pathlib import Path
+
+import prairielearn
+import pytest
+from prairielearn.internal import lazy_exports
+
+# `import prairielearn` used to take over two seconds, almost all of it spent
+# importing libraries that most callers never use.
+IMPORT_TIME_BUDGET = 0.3
+"""The most time, in seconds, that importing the package and the names most elements use may take."""
+
+HEAVY_MODULES = ("coloraide", "networkx", "numpy", "pandas", "pint", "sympy")
+
+
+def submodule_public_names(submodule: str) -> set[str]:
+    module = importlib.import_module(f"prairielearn.{submodule}")
+    if hasattr(module, "__all__"):
+        return set(module.__all__)
+    return {
+        name
+        for name, value in vars(module).items()
+        if not name.startswith("_")
+        and getattr(value, "__module__", None) == module.__name__
+    }
+
+
+@pytest.mark.parametrize("submodule", lazy_exports._SUBMODULE_EXPORTS)
+def test_exports_match_submodules(submodule: str) -> None:
+    assert set(lazy_exports._SUBMODULE_EXPORTS[submodule]) == submodule_public_names(
+        submodule
+    )
+
+
+@pytest.mark.parametrize("submodule", lazy_exports._LEAKY_SUBMODULES)
+def test_star_imported_names_are_exported(submodule: str) -> None:
+    module = importlib.import_module(f"prairielearn.{submodule}")
+    for name, value in vars(module).items():
+        if not name.startswith("_"):
+            assert hasattr(prairielearn, name)
+            if name in lazy_exports._EXPORTS:
+                assert getattr(prairielearn, name) is value
+
+
+# The names that `from prairielearn import *` exported when the package
+# star-imported its submodules eagerly.
+EAGER_STAR_EXPORTS = {
+    "Any",
+    "ArrayLike",
+    "Callable",
+    "ElementTestData",
+    "Generator",
+    "Iterable",
+    "Literal",
+    "ModuleType",
+    "NotRequired",
+    "PartialScore",
+    "QuestionData",
+    "SignalTimeout",
+    "StringIO",
+    "TYPE_CHECKING",
+    "TimeoutState",
+    "TypeVar",
+    "TypedDict",
+    "UnitRegistry",
+    "add_files_format_error",
+    "add_submitted_file",
+    "all_partial_scores_correct",
+    "assert_never",
+    "base64",
+    "cast",
+    "check_answers_names",
+    "check_attribs",
+    "clean_identifier_name",
+    "collections",
+    "colors",
+    "conversion_utils",
+    "convert_string_to_sympy",
+    "determine_score_params",
+    "element_schemas",
+    "escape_invalid_string",
+    "escape_unicode_string",
+    "extension_utils",
+    "from_json",
+    "full_unidecode",
+    "get_boolean_attrib",
+    "get_color_attrib",
+    "get_enum_attrib",
+    "get_float_attrib",
+    "get_integer_attrib",
+    "get_string_attrib",
+    "get_unit_registry",
+    "get_uuid",
+    "grade_answer_parameterized",
+    "grading_utils",
+    "has_attrib",
+    "html_utils",
+    "importlib",
+    "index2key",
+    "inner_html",
+    "is_boolean_value",
+    "is_correct_ndarray2D_dd",
+    "is_correct_ndarray2D_ra",
+    "is_correct_ndarray2D_sf",
+    "is_correct_ndarray2d_dd",
+    "is_correct_ndarray2d_ra",
+    "is_correct_ndarray2d_sf",
+    "is_correct_scalar_dd",
+    "is_correct_scalar_ra",
+    "is_correct_scalar_sf",
+    "is_float_value",
+    "is_int_json_serializable",
+    "is_integer_value",
+    "is_sympy_json",
+    "it",
+    "iter_keys",
+    "json",
+    "json_to_sympy",
+    "latex_from_2darray",
+    "load_all_extensions",
+    "load_extension",
+    "load_host_script",
+    "math",
+    "misc_utils",
+    "namedtuple",
+    "np",
+    "npt",
+    "numbers",
+    "numpy_to_matlab",
+    "numpy_to_matlab_sf",
+    "nx",
+    "os",
+    "overload",
+    "partition",
+    "pd",
+    "question_utils",
+    "random",
+    "re",
+    "set_all_or_nothing_score_data",
+    "set_weighted_score_data",
+    "string",
+    "string_fraction_to_number",
+    "string_from_2darray",
+    "string_from_number_sigfig",
+    "string_from_numpy",
+    "string_partition_first_interval",
+    "string_partition_outer_interval",
+    "string_to_2darray",
+    "string_to_integer",
+    "string_to_number",
+    "sympy",
+    "sympy_to_json",
+    "sympy_utils",
+    "timeout_utils",
+    "to_json",
+    "to_precision",
+    "unicodedata",
+    "unidecode",
+    "uuid",
+    "validate_element",
+    "validate_element_tree",
+}
+
+
+def test_star_import() -> None:
+    namespace: dict[str, object] = {}
+    exec("from prairielearn import *", namespace)
+
+    assert set(namespace) >= EAGER_STAR_EXPORTS
+    assert set(namespace) >= set(lazy_exports._EXPORTS)
+    assert namespace["np"] is importlib.import_module("numpy")
+
+
+def test_missing_name() -> None:
+    with pytest.raises(AttributeError, match="has no attribute 'no_such_name'"):
+        prairielearn.no_such_name  # pyright: ignore[reportAttributeAccessIssue]  # ruff:ignore[useless-expression]
+
+
+def test_dir() -> None:
+    assert set(lazy_exports._EXPORTS) <= set(dir(prairielearn))
+
+
+def parse_import_times(stderr: str) -> dict[str, float]:
+    """Return the cumulative import time, in seconds, of each module that was imported at the top level."""
+    times: dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _self, cumulative, name = line.removeprefix("import time:").split("|")
+        if not name.startswith("  "):
+            times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def test_import_time() -> None:
+    code = (
+        "import sys\n"
+        "import prairielearn\n"
+        "prairielearn.get_uuid, prairielearn.get_string_attrib\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        # The directory that contains the `prairielearn` package.
+        cwd=Path(prairielearn.__file__).parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == ""
+    # Modules imported by the lazy `__getattr__` show up at the top level, so we
+    # add up everything after the interpreter's own startup.
+    times = parse_import_times(result.stderr)
+    names = list(times)
+    startup = names.index("site") + 1 if "site" in names else 0
+    total = sum(times[name] for name in names[startup:])
+    assert total < IMPORT_TIME_BUDGET, sorted(
+        times.items(), key=lambda item: item[1], reverse=True
+    )[:10]
@@ -2,6 +2,7 @@ import base64
 import itertools as it
 import json
 import math
+import os
 import string
 import time
 from collections.abc import Callable
@@ -13,11 +14,13 @@ import lxml.html
 import networkx as nx
 import numpy as np
 import pandas as pd
+import pint
 import prairielearn as pl
 import prairielearn.sympy_utils as psu
 import pytest
 import sympy
 from numpy.typing import ArrayLike
+from prairielearn import misc_utils
 
 
 def city_dataframe() -> pd.DataFrame:
@@ -188,6 +191,29 @@ def test_inner_html(inner_html_string: str) -> None:
     assert pl.inner_html(e) == inner_html_string
 
 
+@pytest.mark.parametrize(
+    "inner_html_string",
+    [
+        "<b>bold</b> text",
+        "  <b>bold</b> text",
+        "some loose text <pl>other <b>bold</b> text</pl>",
+        '<p>Some flavor text.</p> <pl-thing some-attribute="4">answers</pl-thing>',
+    ],
+)
+def test_inner_elements(inner_html_string: str) -> None:
+    e = lxml.html.fragment_fromstring(f"<div>{inner_html_string}</div>")
+
+    def serialize(contents: list[str | lxml.html.HtmlElement]) -> list[str]:
+        return [
+            c if isinstance(c, str) else lxml.html.tostring(c, encoding="unicode")
+            for c in contents
+        ]
+
+    assert serialize(pl.inner_elements(e)) == serialize(
+        lxml.html.fragments_fromstring(pl.inner_html(e))
+    )
+
+
 @pytest.mark.parametrize(
     ("weight_set_function", "score_1", "score_2", "score_3", "expected_score"),
     [
@@ -565,6 +591,54 @@ def test_get_uuid() -> None:
     assert pl_uuid[0] in set("abcdef")
 
 
+def test_get_unit_registry() -> None:
+    ureg = pl.get_unit_registry()
+    total: Any = ureg.Quantity("1 m") + ureg.Quantity("20 cm")
+    assert total.to("cm").magnitude == pytest.approx(120)
+
+    # Every call returns a new registry, which question code may extend.
+    other = pl.get_unit_registry()
+    assert other is not ureg
+    ureg.define("smoot = 1.7018 * meter")
+    assert ureg.Quantity("1 smoot").to("m").magnitude == pytest.approx(1.7018)
+    with pytest.raises(pint.UndefinedUnitError):
+        other.Quantity("1 smoot")
+
+
+@pytest.mark.parametrize(
+    ("mode", "used"), [(0o700, True), (0o770, False), (0o777, False)]
+)
+def test_get_unit_registry_only_uses_private_cache(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mode: int, *, used: bool
+) -> None:
+    cache_dir = tmp_path / "pint"
+    cache_dir.mkdir()
+    cache_dir.chmod(mode)
+    monkeypatch.setattr(
+        misc_utils, "_get_unit_registry_cache_dir", lambda: str(cache_dir)
+    )
+
+    ureg = pl.get_unit_registry()
+
+    assert ureg.Quantity("1 m").to("cm").magnitude == pytest.approx(100)
+    assert any(cache_dir.iterdir()) == used
+
+
+def test_get_unit_registry_without_cache(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache_dir = tmp_path / "pint"
+    monkeypatch.setattr(
+        misc_utils, "_get_unit_registry_cache_dir", lambda: str(cache_dir)
+    )
+    monkeypatch.setenv("UNIT_REGISTRY_CACHE", "0")
+
+    ureg = pl.get_unit_registry()
+
+    assert ureg.Quantity("1 m").to("cm").magnitude == pytest.approx(100)
+    assert not cache_dir.exists()
+
+
 @pytest.mark.parametrize(
     ("length", "expected_output"),
     [
@@ -1294,6 +1368,25 @@ def test_load_extension(question_data: pl.QuestionData) -> None:
         _ = exts["dummy"].__python_internal__
 
 
+def test_load_extension_is_cached(
+    question_data: pl.QuestionData, tmp_path: Path
+) -> None:
+    """Test that extensions are only executed again when their controller changes."""
+    script = tmp_path / "counter_extension.py"
+    script.write_text("VALUE = 1\n")
+    question_data["extensions"] = {
+        "counter": {"directory": str(tmp_path), "controller": script.name}
+    }
+
+    ext = pl.load_extension(question_data, "counter")
+    assert ext.VALUE == 1
+    assert pl.load_extension(question_data, "counter") is ext
+
+    script.write_text("VALUE = 2\n")
+    os.utime(script, ns=(0, script.stat().st_mtime_ns + 1_000_000_000))
+    assert pl.load_extension(question_data, "counter").VALUE == 2
+
+
 def test_add_files_format_error(question_data: pl.QuestionData) -> None:
     """Test basic functionality of add_files_format_error."""
     # Test adding first error
@@ -0,0 +1,93 @@
+import json
+from pathlib import Path
+
+import pytest
+from prairielearn.internal import preload
+
+
+def test_load_manifest(tmp_path: Path) -> None:
+    path = tmp_path / "manifest.json"
+    path.write_text(
+        json.dumps({
+            "modules": ["json", "csv"],
+            "warmups": ["json:dumps", {"callable": "json:loads", "args": ["[1]"]}],
+        })
+    )
+    manifest = preload.load_manifest(str(path), " decimal, ,fractions")
+    assert manifest.modules == ["json", "csv", "decimal", "fractions"]
+    assert manifest.warmups == [
+        preload.Warmup("json:dumps"),
+        preload.Warmup("json:loads", ("[1]",)),
+    ]
+
+
+def test_load_empty_manifest() -> None:
+    assert preload.load_manifest() == preload.Manifest(modules=[], warmups=[])
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        ["json"],
+        {"modules": "json"},
+        {"modules": [1]},
+        {"module": ["json"]},
+        {"warmups": ["json"]},
+        {"warmups": [{"callable": "json:dumps", "args": "x"}]},
+    ],
+)
+def test_load_malformed_manifest(tmp_path: Path, data: object) -> None:
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps(data))
+    with pytest.raises(ValueError, match=r"manifest\.json"):
+        preload.load_manifest(str(path))
+
+
+def test_preload(capsys: pytest.CaptureFixture[str]) -> None:
+    results = preload.preload(
+        ["json", "prairielearn_no_such_module"],
+        [
+            preload.Warmup("json:dumps", ([1, 2],)),
+            preload.Warmup("json:no_such_function"),
+        ],
+    )
+
+    assert [(result.kind, result.name) for result in results] == [
+        ("import", "json"),
+        ("import", "prairielearn_no_such_module"),
+        ("warmup", "json:dumps"),
+        ("warmup", "json:no_such_function"),
+    ]
+    assert results[0].already_imported
+    assert results[0].error is None
+    assert results[1].error is not None
+    assert results[1].error.startswith("ModuleNotFoundError")
+    assert results[2].error is None
+    assert results[3].error is not None
+    assert results[3].error.startswith("AttributeError")
+    stderr = capsys.readouterr().err
+    assert "Could not preload import prairielearn_no_such_module" in stderr
+    assert "Could not preload warmup json:no_such_function" in stderr
+
+
+def test_measure() -> None:
+    result = preload.measure("warmup", "allocate", lambda: [0] * 100000)
+    assert result.kind == "warmup"
+    assert result.name == "allocate"
+    assert result.seconds >= 0
+    assert result.rss_growth >= 0
+    assert result.error is None
+
+
+def test_format_report() -> None:
+    report = preload.format_report([
+        preload.PreloadResult("import", "numpy", 0.25, 2**21, already_imported=True),
+        preload.PreloadResult("warmup", "x:y", 0.5, 2**20, "ValueError: oops"),
+    ])
+    lines = report.splitlines()
+    assert len(lines) == 4
+    assert lines[1].startswith("import")
+    assert lines[1].endswith("(already imported)")
+    assert "250.0" in lines[1]
+    assert "failed: ValueError: oops" in lines[2]
+    assert lines[3].split() == ["total", "750.0", "3.0"]
@@ -0,0 +1,109 @@
+import os
+import signal
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from prairielearn.internal import element_pool, profiler, question_phases
+
+
+@pytest.fixture(autouse=True)
+def restore_environment(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.chdir(os.getcwd())
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    monkeypatch.setattr(question_phases, "_controller_cache", {})
+    monkeypatch.setattr(question_phases, "_code_cache", {})
+    monkeypatch.setattr(question_phases, "_controller_modules", {})
+    yield
+    profiler.stop()
+
+
+def busy_loop(seconds: float) -> None:
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        pass
+
+
+def labeled_busy_loop(prof: profiler.SamplingProfiler) -> None:
+    with prof.label_caller("<my-element;a>"):
+        busy_loop(0.05)
+
+
+def test_profiler_samples_stacks() -> None:
+    handler = signal.getsignal(signal.SIGPROF)
+    prof = profiler.start(0.001)
+    assert profiler.current() is prof
+    busy_loop(0.05)
+    labeled_busy_loop(prof)
+    assert profiler.stop() is prof
+    assert profiler.current() is None
+    assert signal.getsignal(signal.SIGPROF) == handler
+
+    lines = prof.folded(root="server:grade").splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert stack.startswith("server:grade;")
+        assert int(count) > 0
+    assert any("test_profiler_samples_stacks" in line for line in lines)
+    assert any(
+        "labeled_busy_loop" in line and ";<my-element,a>;busy_loop" in line
+        for line in lines
+    )
+
+
+def test_process_labels_elements(tmp_path: Path) -> None:
+    element_path = tmp_path / "elements" / "my-element"
+    element_path.mkdir(parents=True)
+    (element_path / "my-element.py").write_text(
+        "import os, time\n"
+        "PARSED_ELEMENT = True\n"
+        "def grade(element, data):\n"
+        "    end = time.process_time() + 0.05\n"
+        "    while time.process_time() < end:\n"
+        "        pass\n"
+        '    data["partial_scores"][element.get("answers-name")] = {"pid": os.getpid()}\n'
+    )
+    context: question_phases.RenderContext = {
+        "html": '<my-element answers-name="a"></my-element>'
+        '<my-element answers-name="b"></my-element>',
+        "elements": {
+            "my-element": {
+                "name": "my-element",
+                "controller": "my-element.py",
+                "type": "course",
+            }
+        },
+        "element_extensions": {},
+        "course_path": str(tmp_path),
+    }
+    data: dict[str, Any] = {
+        "params": {},
+        "correct_answers": {},
+        "submitted_answers": {},
+        "format_errors": {},
+        "partial_scores": {},
+        "score": 0,
+        "feedback": {},
+        "variant_seed": 1,
+        "options": {},
+        "raw_submitted_answers": {},
+        "gradable": True,
+    }
+
+    element_pool.configure(2)
+    prof = profiler.start(0.001)
+    try:
+        question_phases.process("grade", data, context)
+    finally:
+        profiler.stop()
+        element_pool.configure(0)
+
+    # Profiled requests don't use the element pool.
+    assert {s["pid"] for s in data["partial_scores"].values()} == {os.getpid()}
+    folded = prof.folded()
+    for name in ("a", "b"):
+        assert f'<my-element answers-name="{name}">;grade (my-element.py:3)' in folded
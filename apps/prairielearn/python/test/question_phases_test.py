@@ -0,0 +1,365 @@
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+from prairielearn import extension_utils
+from prairielearn.internal import question_phases
+from prairielearn.internal.check_data import DataModificationError
+
+
+@pytest.fixture(autouse=True)
+def restore_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(os.getcwd())
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    monkeypatch.setattr(question_phases, "_controller_cache", {})
+    monkeypatch.setattr(question_phases, "_code_cache", {})
+    monkeypatch.setattr(question_phases, "_controller_modules", {})
+    monkeypatch.setattr(question_phases, "_controller_phases", {})
+    monkeypatch.setattr(extension_utils, "_extension_cache", {})
+
+
+def test_load_controller_restores_helper_modules(tmp_path: Path) -> None:
+    (tmp_path / "my_element_helpers.py").write_text("REGISTRY = {}\n")
+    controller_path = tmp_path / "my-element.py"
+    controller_path.write_text("import my_element_helpers\n")
+
+    question_phases.set_up_element_environment(tmp_path)
+    mod = question_phases.load_controller(controller_path)
+    helpers = sys.modules.pop("my_element_helpers")
+
+    assert question_phases.load_controller(controller_path) is mod
+    assert sys.modules.pop("my_element_helpers") is helpers
+    assert mod["my_element_helpers"] is helpers
+
+
+def test_preload_core_elements(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Other tests may already have imported pl-drawing's helper module.
+    monkeypatch.delitem(sys.modules, "elements", raising=False)
+    cwd = os.getcwd()
+    controllers = question_phases.get_core_element_controllers()
+
+    timings = question_phases.preload_core_elements({"pl-drawing"})
+
+    assert timings.keys() == controllers.keys()
+    assert set(question_phases._code_cache) == set(controllers.values())
+    assert list(question_phases._controller_cache) == [controllers["pl-drawing"]]
+    assert "elements" in question_phases._controller_modules[controllers["pl-drawing"]]
+    assert (
+        question_phases.get_core_element_module("pl-drawing", "elements")
+        is question_phases._controller_modules[controllers["pl-drawing"]]["elements"]
+    )
+    assert question_phases.get_core_element_module("pl-checkbox", "elements") is None
+    assert "elements" not in sys.modules
+    assert os.getcwd() == cwd
+
+
+@pytest.mark.parametrize(
+    "modification",
+    ['data["options"]["foo"] = 2', 'data["options"] = {"foo": 2}'],
+)
+def test_process_illegal_modification(tmp_path: Path, modification: str) -> None:
+    element_path = tmp_path / "elements" / "my-element"
+    element_path.mkdir(parents=True)
+    (element_path / "my-element.py").write_text(
+        f"def grade(element_html, data):\n    {modification}\n"
+    )
+    options = {"foo": 1}
+    data: dict[str, Any] = {"params": {}, "correct_answers": {}, "options": options}
+    context: question_phases.RenderContext = {
+        "html": "<pl-question-panel><my-element></my-element></pl-question-panel>",
+        "elements": {
+            "my-element": {
+                "name": "my-element",
+                "controller": "my-element.py",
+                "type": "course",
+            }
+        },
+        "element_extensions": {},
+        "course_path": str(tmp_path),
+    }
+
+    with pytest.raises(
+        DataModificationError, match=r'data\["options"\] has been illegally modified'
+    ):
+        question_phases.process("grade", data, context)
+    assert data["options"] is options
+
+
+def test_process_restores_protected_data() -> None:
+    options = {"foo": 1}
+    data: dict[str, Any] = {"params": {}, "correct_answers": {}, "options": options}
+    context: question_phases.RenderContext = {
+        "html": "<p></p>",
+        "elements": {},
+        "element_extensions": {},
+        "course_path": "/course",
+    }
+
+    question_phases.process("grade", data, context)
+
+    assert data["options"] is options
+
+
+def test_process_passes_parsed_element(tmp_path: Path) -> None:
+    element_path = tmp_path / "elements" / "my-element"
+    element_path.mkdir(parents=True)
+    (element_path / "my-element.py").write_text(
+        "import prairielearn as pl\n"
+        "PARSED_ELEMENT = True\n"
+        "def render(element, data):\n"
+        "    return pl.inner_elements(element)\n"
+    )
+    data: dict[str, Any] = {
+        "params": {},
+        "correct_answers": {},
+        "options": {
+            "course_element_files_url": "/elements",
+            "course_element_extension_files_url": "/elementExtensions",
+        },
+    }
+    context: question_phases.RenderContext = {
+        "html": "<my-element>text <b>bold</b> <my-element><i>nested</i></my-element></my-element> tail",
+        "elements": {
+            "my-element": {
+                "name": "my-element",
+                "controller": "my-element.py",
+                "type": "course",
+            }
+        },
+        "element_extensions": {},
+        "course_path": str(tmp_path),
+    }
+
+    html, _ = question_phases.process("render", data, context)
+
+    assert html == "text <b>bold</b> <i>nested</i> tail"
+
+
+def test_process_passes_copy_of_parsed_element(tmp_path: Path) -> None:
+    element_path = tmp_path / "elements" / "my-element"
+    element_path.mkdir(parents=True)
+    (element_path / "my-element.py").write_text(
+        "PARSED_ELEMENT = True\n"
+        "def grade(element, data):\n"
+        '    data["partial_scores"][element.get("answers-name")] = {"score": 1}\n'
+        "    for child in element:\n"
+        '        child.set("answers-name", "c")\n'
+    )
+    context: question_phases.RenderContext = {
+        "html": '<my-element answers-name="a"><my-element answers-name="b"></my-element></my-element>',
+        "elements": {
+            "my-element": {
+                "name": "my-element",
+                "controller": "my-element.py",
+                "type": "course",
+            }
+        },
+        "element_extensions": {},
+        "course_path": str(tmp_path),
+    }
+    data: dict[str, Any] = {
+        "params": {},
+        "correct_answers": {},
+        "submitted_answers": {},
+        "format_errors": {},
+        "partial_scores": {},
+        "score": 0,
+        "feedback": {},
+        "options": {
+            "course_element_files_url": "/elements",
+            "course_element_extension_files_url": "/elementExtensions",
+        },
+    }
+
+    question_phases.process("grade", data, context)
+
+    assert data["partial_scores"] == {"a": {"score": 1}, "b": {"score": 1}}
+
+
+def test_process_skips_elements_without_phase(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    element_path = tmp_path / "elements" / "my-element"
+    element_path.mkdir(parents=True)
+    controller_path = element_path / "my-element.py"
+    controller_path.write_text(
+        "PARSED_ELEMENT = True\n"
+        "def grade(element, data):\n"
+        '    data["partial_scores"][element.get("answers-name")] = {"score": 1}\n'
+    )
+    context: question_phases.RenderContext = {
+        "html": "<p>Some <b>text</b></p>"
+        '<div><my-element answers-name="a"></my-element></div>'
+        '<my-element answers-name="b"></my-element>',
+        "elements": {
+            "my-element": {
+                "name": "my-element",
+                "controller": "my-element.py",
+                "type": "course",
+            }
+        },
+        "element_extensions": {},
+        "course_path": str(tmp_path),
+    }
+    data: dict[str, Any] = {
+        "params": {},
+        "correct_answers": {},
+        "submitted_answers": {},
+        "format_errors": {},
+        "partial_scores": {},
+        "score": 0,
+        "feedback": {},
+        "options": {},
+    }
+
+    # The first element executes the controller, which records its phases.
+    question_phases.process("parse", data, context)
+    assert question_phases._controller_phases[controller_path] == {"grade"}
+
+    setups: list[Path] = []
+    monkeypatch.setattr(
+        question_phases,
+        "set_up_element_environment",
+        lambda element_path, **_: setups.append(element_path),
+    )
+    _, processed = question_phases.process("parse", data, context)
+    assert processed == {"my-element"}
+    assert setups == []
+
+    question_phases.process("grade", data, context, element_indices={1})
+    assert data["partial_scores"] == {"b": {"score": 1}}
+    assert setups == [element_path]
+
+
+def test_process_shares_read_only_extensions(tmp_path: Path) -> None:
+    element_path = tmp_path / "elements" / "my-element"
+    element_path.mkdir(parents=True)
+    (element_path / "my-element.py").write_text(
+        "def render(element_html, data):\n"
+        "    if b'modify' in element_html:\n"
+        "        data['extensions']['ext']['foo'] = 2\n"
+        '    unchanged = data["extensions"] == {"ext": {"foo": 1}}\n'
+        "    return f'<p>{id(data[\"extensions\"])} {unchanged}</p>'\n"
+    )
+    extensions = {"my-element": {"ext": {"foo": 1}}}
+    data: dict[str, Any] = {
+        "params": {},
+        "correct_answers": {},
+        "options": {
+            "course_element_files_url": "/elements",
+            "course_element_extension_files_url": "/elementExtensions",
+        },
+    }
+    context: question_phases.RenderContext = {
+        "html": "<my-element modify></my-element>",
+        "elements": {
+            "my-element": {
+                "name": "my-element",
+                "controller": "my-element.py",
+                "type": "course",
+            }
+        },
+        "element_extensions": extensions,
+        "course_path": str(tmp_path),
+    }
+
+    with pytest.raises(
+        DataModificationError, match=r'data\["extensions"\] has been illegally modified'
+    ):
+        question_phases.process("render", data, context)
+    assert extensions == {"my-element": {"ext": {"foo": 1}}}
+
+    context["html"] = "<my-element></my-element>" * 2
+    html, _ = question_phases.process("render", data, context)
+    assert isinstance(html, str)
+    first, second = html.removeprefix("<p>").removesuffix("</p>").split("</p><p>")
+    assert first == second
+    assert first.endswith(" True")
+
+
+def test_process_only_caches_extensions_for_one_call(tmp_path: Path) -> None:
+    element_path = tmp_path / "elements" / "my-element"
+    element_path.mkdir(parents=True)
+    (element_path / "my-element.py").write_text(
+        "import prairielearn as pl\n"
+        "def render(element_html, data):\n"
+        "    return str(pl.load_extension(data, 'ext').count())\n"
+    )
+    extension_path = tmp_path / "elementExtensions" / "my-element" / "ext"
+    extension_path.mkdir(parents=True)
+    (extension_path / "ext.py").write_text(
+        "calls = 0\ndef count():\n    global calls\n    calls += 1\n    return calls\n"
+    )
+    data: dict[str, Any] = {
+        "options": {
+            "course_element_files_url": "/elements",
+            "course_element_extension_files_url": "/elementExtensions",
+        },
+    }
+    context: question_phases.RenderContext = {
+        "html": "<my-element></my-element>" * 2,
+        "elements": {
+            "my-element": {
+                "name": "my-element",
+                "controller": "my-element.py",
+                "type": "course",
+            }
+        },
+        "element_extensions": {
+            "my-element": {
+                "ext": {"directory": str(extension_path), "controller": "ext.py"}
+            }
+        },
+        "course_path": str(tmp_path),
+    }
+
+    assert question_phases.process("render", data, context)[0] == "12"
+    assert question_phases.process("render", data, context)[0] == "12"
+    assert extension_utils._extension_cache == {}
+
+
+def test_process_only_caches_course_controllers_for_one_call(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    core_path = tmp_path / "core"
+    course_path = tmp_path / "course"
+    monkeypatch.setattr(question_phases, "CORE_ELEMENTS_PATH", core_path)
+    controller = "calls = 0\ndef render(element_html, data):\n    global calls\n    calls += 1\n    return str(calls)\n"
+    for element_path in (
+        core_path / "core-element",
+        course_path / "elements" / "course-element",
+    ):
+        element_path.mkdir(parents=True)
+        (element_path / "controller.py").write_text(controller)
+    data: dict[str, Any] = {
+        "options": {
+            "course_element_files_url": "/elements",
+            "course_element_extension_files_url": "/elementExtensions",
+        },
+    }
+    elements: dict[str, question_phases.ElementInfo] = {
+        "core-element": {
+            "name": "core-element",
+            "controller": "controller.py",
+            "type": "core",
+        },
+        "course-element": {
+            "name": "course-element",
+            "controller": "controller.py",
+            "type": "course",
+        },
+    }
+    context: question_phases.RenderContext = {
+        "html": "<core-element></core-element> <course-element></course-element>" * 2,
+        "elements": elements,
+        "element_extensions": {},
+        "course_path": str(course_path),
+    }
+
+    assert question_phases.process("render", data, context)[0] == "1 12 2"
+    assert question_phases.process("render", data, context)[0] == "3 14 2"
+    assert list(question_phases._controller_cache) == [
+        core_path / "core-element" / "controller.py"
+    ]
@@ -545,6 +545,92 @@ class TestSympy:
 
         assert sympy_expr == json_converted_expr
 
+    @pytest.mark.parametrize(
+        ("a_pair", "custom_functions"),
+        list(
+            chain(
+                zip(EXPR_PAIRS, repeat(None)),
+                zip(CUSTOM_FUNCTION_PAIRS, repeat(FUNCTION_NAMES)),
+            )
+        ),
+    )
+    def test_json_conversion_without_tree(
+        self, a_pair: tuple[str, sympy.Expr], custom_functions: list[str] | None
+    ) -> None:
+        """JSON stored before `_tree` was added is still parsed from `_value`."""
+        sympy_expr = psu.convert_string_to_sympy(
+            a_pair[0],
+            self.SYMBOL_NAMES,
+            allow_complex=True,
+            custom_functions=custom_functions,
+        )
+        json_dict = psu.sympy_to_json(sympy_expr)
+        assert "_tree" in json_dict
+        del json_dict["_tree"]
+        del json_dict["_tree_evaluated"]
+
+        assert psu.json_to_sympy(json_dict) == sympy_expr
+
+    def test_json_tree(self) -> None:
+        expr = self.F(self.N) * sympy.sin(self.M) ** 2 * sympy.Rational(1, 3)
+        json_dict = psu.sympy_to_json(expr)
+        assert json_dict.get("_tree") == [
+            "Mul",
+            ["Rational", "1", "3"],
+            ["Pow", ["sin", ["Symbol", "m"]], ["Integer", "2"]],
+            ["Function", "f", ["Symbol", "n"]],
+        ]
+        assert json_dict.get("_tree_evaluated") is True
+        # The tree is used even if the string is invalid.
+        json_dict["_value"] = "("
+        assert psu.json_to_sympy(json_dict) == expr
+
+    def test_json_tree_unevaluated(self) -> None:
+        expr = sympy.Add(self.N, self.N, evaluate=False)
+        json_dict = psu.sympy_to_json(expr)
+        assert json_dict.get("_tree_evaluated") is False
+        assert psu.json_to_sympy(json_dict) == 2 * self.N
+        unevaluated = psu.json_to_sympy(json_dict, simplify_expression=False)
+        assert unevaluated.args == (self.N, self.N)
+
+    def test_json_without_tree_for_floats(self) -> None:
+        json_dict = psu.sympy_to_json(self.N + sympy.Float(0.5))
+        assert "_tree" not in json_dict
+        with pytest.raises(psu.HasFloatError):
+            psu.json_to_sympy(json_dict)
+
+    @pytest.mark.parametrize(
+        ("tree", "error"),
+        [
+            (["eval", ["Symbol", "n"]], ValueError),
+            (["Integer", 1], ValueError),
+            (["Symbol", "x"], psu.HasInvalidSymbolError),
+            (["Function", "g", ["Symbol", "n"]], psu.HasInvalidFunctionError),
+            (
+                ["Interval", ["Integer", "0"], ["Symbol", "n"], True, False],
+                psu.HasSetNotationError,
+            ),
+            (["I"], None),
+        ],
+    )
+    def test_json_tree_is_validated(
+        self, tree: list[Any], error: type[Exception] | None
+    ) -> None:
+        json_dict: psu.SympyJson = {
+            "_type": "sympy",
+            "_value": "n",
+            "_variables": ["n"],
+            "_tree": tree,
+        }
+        if error is None:
+            # Like a parsed string, but only if complex numbers are not allowed.
+            assert psu.json_to_sympy(json_dict) == sympy.I
+            with pytest.raises(psu.HasComplexError):
+                psu.json_to_sympy(json_dict, allow_complex=False)
+            return
+        with pytest.raises(error):
+            psu.json_to_sympy(json_dict)
+
     @pytest.mark.parametrize(
         ("assumptions", "expression_str"),
         [
@@ -640,6 +726,49 @@ class TestAllowExtraSymbols:
             psu.convert_string_to_sympy("3.5*n", allow_extra_symbols=True)
 
 
+class TestConversionCache:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self) -> None:
+        psu.clear_sympy_cache()
+
+    def test_hits_and_misses(self) -> None:
+        first = psu.convert_string_to_sympy("x**2 + y", ["x", "y"])
+        assert psu.convert_string_to_sympy("x**2 + y", ["x", "y"]) is first
+        info = psu.sympy_cache_info()
+        assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"variables": ["x", "y", "z"]},
+            {"simplify_expression": False},
+            {"allow_complex": True},
+            {"custom_functions": ["f"]},
+            {"assumptions": {"x": {"positive": True}}},
+        ],
+    )
+    def test_options_are_part_of_key(self, kwargs: dict[str, Any]) -> None:
+        kwargs = {"variables": ["x", "y"], **kwargs}
+        psu.convert_string_to_sympy("x + y", ["x", "y"])
+        result = psu.convert_string_to_sympy("x + y", **kwargs)
+        assert psu.sympy_cache_info().misses == 2
+        psu.clear_sympy_cache()
+        assert psu.convert_string_to_sympy("x + y", **kwargs) == result
+
+    def test_errors_are_not_cached(self) -> None:
+        for _ in range(2):
+            with pytest.raises(psu.HasInvalidSymbolError):
+                psu.convert_string_to_sympy("x + z", ["x"])
+        assert psu.sympy_cache_info().currsize == 0
+
+    def test_unhashable_assumptions(self) -> None:
+        result = psu.convert_string_to_sympy(
+            "x", ["x"], assumptions={"x": {"positive": [True]}}
+        )
+        assert result == sympy.Symbol("x", positive=True)
+        assert psu.sympy_cache_info().misses == 0
+
+
 class TestExceptions:
     VARIABLES: tuple[str] = ("n",)
 
@@ -819,6 +948,38 @@ class TestExceptions:
             simplify_expression=False,
         )
 
+    def test_sympy_check_shared_subexpressions(self) -> None:
+        """Subexpressions that occur many times are only checked once."""
+        n = sympy.Symbol("n")
+        locals_for_eval: psu.LocalsForEval = {
+            "variables": {"n": n},
+            "functions": {},
+            "helpers": {},
+        }
+        # A tree with 2**60 nodes, but only 61 distinct subexpressions.
+        expr: sympy.Expr = n
+        for _ in range(60):
+            expr = sympy.Mul(expr, expr, evaluate=False)
+        psu.sympy_check(expr, locals_for_eval, allow_complex=True, allow_sets=False)
+
+        with pytest.raises(psu.HasInvalidSymbolError, match="m"):
+            psu.sympy_check(
+                sympy.Add(expr, sympy.Symbol("m"), evaluate=False),
+                locals_for_eval,
+                allow_complex=True,
+                allow_sets=False,
+            )
+
+    def test_sympy_check_symbol_assumptions(self) -> None:
+        with pytest.raises(psu.HasComplexError):
+            psu.sympy_check(
+                sympy.Symbol("n") + sympy.Symbol("m", imaginary=True),
+                {"variables": {}, "functions": {}, "helpers": {}},
+                allow_complex=False,
+                allow_sets=False,
+                allow_extra_symbols=True,
+            )
+
     @pytest.mark.parametrize(
         "text",
         [
@@ -998,6 +1159,143 @@ class TestExceptions:
         assert error_msg is not None
         assert 'invalid symbol "m"' in error_msg
 
+    @pytest.mark.parametrize(
+        "caret_spec",
+        [
+            "2!^(20000 n)",
+            "2^2!^2^2^2",
+            "n + 2!^99999",
+            "(n + 1)!^(10^5)",
+        ],
+    )
+    def test_excessive_complexity_is_rejected(self, caret_spec: str) -> None:
+        expr, expected_caret = _caret_template(caret_spec)
+        error_msg = psu.validate_string_as_sympy(expr, self.VARIABLES)
+        assert error_msg is not None
+        assert "numbers that are too large" in error_msg
+        match = re.search(r"<pre>(.*?)</pre>", error_msg, re.DOTALL)
+        assert match is not None, f"error message has no caret: {error_msg}"
+        assert expected_caret == match.group(1)
+
+    @pytest.mark.parametrize(
+        ("a_sub", "reason"),
+        [
+            ("1000000!", "numbers that are too large"),
+            ("+".join(["n"] * 200), "too long or nested too deeply"),
+            ("sin(" * 200 + "n" + ")" * 200, "too long or nested too deeply"),
+        ],
+    )
+    def test_excessive_complexity_reason(self, a_sub: str, reason: str) -> None:
+        with pytest.raises(psu.HasExcessiveComplexityError):
+            psu.convert_string_to_sympy(a_sub, self.VARIABLES)
+        error_msg = psu.validate_string_as_sympy(a_sub, self.VARIABLES)
+        assert error_msg is not None
+        assert reason in error_msg
+
+    @pytest.mark.parametrize(
+        "a_sub", ["2^3000", "100!", "(n + 1)^100", "+".join(["n"] * 100)]
+    )
+    def test_complexity_within_budget(self, a_sub: str) -> None:
+        assert psu.validate_string_as_sympy(a_sub, self.VARIABLES) is None
+
+    def test_complexity_budget(self) -> None:
+        budget = psu.ComplexityBudget(max_nodes=5)
+        with pytest.raises(psu.HasExcessiveComplexityError):
+            psu.evaluate_with_source(
+                "n + n + n + n",
+                {"variables": {"n": sympy.Symbol("n")}, "functions": {}, "helpers": {}},
+                complexity_budget=budget,
+            )
+
+
+class TestNumericallyEqual:
+    VARIABLES = ("x", "y", "n")
+
+    def convert(self, expr: str) -> sympy.Expr:
+        return psu.convert_string_to_sympy(
+            expr, self.VARIABLES, assumptions={"n": {"integer": True}}
+        )
+
+    @pytest.mark.parametrize(
+        ("a", "b", "expected"),
+        [
+            # Agreeing at every point doesn't prove that expressions are equal.
+            ("x^2 - 1", "(x - 1)(x + 1)", None),
+            ("sin(x)^2 + cos(x)^2", "1", None),
+            ("(x + y + 1)^2", "x^2 + 2 x y + y^2 + 2 x + 2 y + 1", None),
+            # Some expressions are simplified to the same one when they're created.
+            ("sin(pi n)", "0", True),
+            ("(-1)^(2n)", "1", True),
+            ("x", "x + 1", False),
+            ("x", "x + exp(-40)", None),
+            # Symbols without assumptions are complex.
+            ("sqrt(x^2)", "x", False),
+            ("log(x y)", "log(x) + log(y)", False),
+            ("max(x, y)", "x", None),
+        ],
+    )
+    def test_numerically_equal(self, a: str, b: str, *, expected: bool | None) -> None:
+        assert psu.numerically_equal(self.convert(a), self.convert(b)) is expected
+
+    def test_assumptions(self) -> None:
+        x = sympy.Symbol("x", positive=True)
+        assert psu.numerically_equal(sympy.sqrt(x**2), x) is True
+        assert psu.numerically_equal(sympy.Abs(x), -x) is False
+
+    def test_differences_outside_of_sampled_values(self) -> None:
+        x = sympy.Symbol("x", positive=True)
+        z = sympy.Symbol("z")
+        for a, b in [
+            # These only differ for x > pi and |Im(z)| > pi, respectively.
+            (sympy.acos(sympy.cos(x)), x),
+            (sympy.log(sympy.exp(z)), z),
+            # This is below the precision of the numeric comparison.
+            (z, z + sympy.exp(-100)),
+        ]:
+            assert psu.numerically_equal(a, b) is None
+            assert psu.expressions_equal(a, b) is False
+
+    def test_inconclusive(self) -> None:
+        x = sympy.Symbol("x")
+        f = sympy.Function("f")
+        assert psu.numerically_equal(f(x), x) is None
+        assert psu.numerically_equal(1 / (x - x), x) is None
+        prime = sympy.Symbol("p", prime=True)
+        assert psu.numerically_equal(prime, prime + 0 * x) is True
+        assert psu.numerically_equal(prime, prime**2) is None
+
+    @pytest.mark.parametrize(
+        ("a", "b", "expected"),
+        [
+            ("infty", "infty", True),
+            ("-infty", "-infty", True),
+            ("x + infty", "x + infty", True),
+            ("infty", "-infty", None),
+            ("infty", "1", None),
+        ],
+    )
+    def test_infinities(self, a: str, b: str, *, expected: bool | None) -> None:
+        a_sympy, b_sympy = self.convert(a), self.convert(b)
+        assert psu.numerically_equal(a_sympy, b_sympy) is expected
+        assert psu.expressions_equal(a_sympy, b_sympy) is (a == b)
+
+    @pytest.mark.parametrize(
+        ("a", "b"),
+        [
+            ("x^2 - 1", "(x - 1)(x + 1)"),
+            ("x", "x + 1"),
+            ("max(x, y)", "x"),
+            ("infty", "infty"),
+            ("x + infty", "x + infty"),
+            ("infty", "-infty"),
+        ],
+    )
+    def test_expressions_equal(self, a: str, b: str) -> None:
+        a_sympy, b_sympy = self.convert(a), self.convert(b)
+        assert psu.expressions_equal(a_sympy, b_sympy) is (
+            a_sympy.equals(b_sympy) is True
+        )
+
 
 @pytest.mark.parametrize(
     ("input_str", "expected_output"),
@@ -0,0 +1,50 @@
+import os
+from pathlib import Path
+
+import chevron
+import pytest
+from prairielearn.template_utils import load_template, render_template
+
+TEMPLATE = """{{#items}}
+<li>{{name}}{{^last}},{{/last}}</li>
+{{/items}}
+{{{raw}}} {{escaped}}
+"""
+
+PARAMS = {
+    "items": [{"name": "a"}, {"name": "b", "last": True}],
+    "raw": "<b>bold</b>",
+    "escaped": "<i>",
+}
+
+
+@pytest.fixture
+def template_path(tmp_path: Path) -> Path:
+    path = tmp_path / "element.mustache"
+    path.write_text(TEMPLATE, encoding="utf-8")
+    return path
+
+
+def test_render_matches_chevron(template_path: Path) -> None:
+    assert render_template(template_path, PARAMS) == chevron.render(TEMPLATE, PARAMS)
+
+
+def test_load_template_is_cached(template_path: Path) -> None:
+    assert load_template(template_path) is load_template(str(template_path))
+
+
+def test_load_template_relative_path(
+    template_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(template_path.parent)
+    assert load_template(template_path.name) is load_template(template_path)
+
+
+def test_load_template_reloads_modified_file(template_path: Path) -> None:
+    assert render_template(template_path, PARAMS).startswith("<li>a,</li>")
+
+    template_path.write_text("updated {{escaped}}", encoding="utf-8")
+    stat = template_path.stat()
+    os.utime(template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert render_template(template_path, PARAMS) == "updated &lt;i&gt;"
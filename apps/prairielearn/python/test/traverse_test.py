@@ -3,6 +3,7 @@ from typing import TYPE_CHECKING
 import lxml.html
 from prairielearn.internal.traverse import (
     ElementReplacement,
+    iterate_elements,
     traverse_and_execute,
     traverse_and_replace,
 )
@@ -26,6 +27,20 @@ def test_traverse_and_execute() -> None:
     assert tags == ["p", "i", "strong"]
 
 
+def test_traverse_and_execute_with_tags() -> None:
+    tags: list[str | bytearray | bytes | QName] = []
+    traverse_and_execute(
+        "Text <p><pl-a><i>x</i><pl-b></pl-b></pl-a><!-- c --></p><pl-b></pl-b>",
+        lambda element: tags.append(element.tag),
+        {"pl-a", "pl-b"},
+    )
+    assert tags == ["pl-a", "pl-b", "pl-b"]
+
+
+def test_iterate_elements_without_tags() -> None:
+    assert list(iterate_elements("<p><i>Hello</i></p>", set())) == []
+
+
 def test_traverse_and_replace_text() -> None:
     html = traverse_and_replace("Hello", lambda _: "Goodbye")
     assert html == "Hello"
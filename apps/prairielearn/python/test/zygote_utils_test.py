@@ -1,4 +1,9 @@
+import dataclasses
+import datetime
+import enum
+import io
 import json
+import uuid
 from typing import Any
 
 import prairielearn.internal.zygote_utils as zu
@@ -56,3 +61,135 @@ def test_all_integers_within_limits_no_exception(item: Any) -> None:
 def test_all_integers_within_limits_raise_exception(item: Any) -> None:
     with pytest.raises(ValueError, match="oversized integer"):
         zu.assert_all_integers_within_limits(item)
+
+
+@pytest.fixture(params=["json", "orjson"])
+def json_serializer(request: pytest.FixtureRequest) -> zu.JsonSerializer:
+    return zu.get_json_serializer(request.param)
+
+
+def test_json_serializer_loads(json_serializer: zu.JsonSerializer) -> None:
+    data = b'{"a": [1, -9007199254740991, 9007199254740992, 0.30000000000000004], "b": "12345678901234567"}'
+    loaded = json_serializer.loads(data)
+    assert loaded == json.loads(data, parse_int=zu.safe_parse_int)
+    assert [type(item) for item in loaded["a"]] == [int, int, float, float]
+
+
+def test_json_serializer_dumps(json_serializer: zu.JsonSerializer) -> None:
+    item = {"a": [1, 9007199254740991, 0.1], "b": "99999999999999999", "c": None}
+    assert json.loads(json_serializer.dumps(item)) == item
+    assert json_serializer.dumps({"b": 1, "a": 2}, sort_keys=True).startswith(b'{"a"')
+
+
+@pytest.mark.parametrize(
+    "item",
+    [
+        999999999999999999999,
+        [1, 2, [1, 2, {99999999999999999: "4"}]],
+        [1, 2, [1, 2, {"4": [-999999999999999999999]}]],
+        ["9999999", 2, 8, 99999999999999999],
+    ],
+)
+def test_json_serializer_dumps_oversized_integers(
+    json_serializer: zu.JsonSerializer, item: Any
+) -> None:
+    with pytest.raises(ValueError, match="oversized integer"):
+        json_serializer.dumps(item)
+
+
+@pytest.mark.parametrize(
+    "item", [float("nan"), [1, {"a": float("inf")}], {"b": (None, float("-inf"))}]
+)
+def test_json_serializer_dumps_non_finite_floats(
+    json_serializer: zu.JsonSerializer, item: Any
+) -> None:
+    with pytest.raises(ValueError, match="Out of range float values"):
+        json_serializer.dumps(item)
+    assert json_serializer.dumps(item, allow_nan=True) == json.dumps(item).encode()
+
+
+class Color(enum.Enum):
+    RED = "red"
+
+
+class Size(enum.IntEnum):
+    SMALL = 1
+
+
+@dataclasses.dataclass
+class Point:
+    x: int
+
+
+@pytest.mark.parametrize(
+    "item",
+    [
+        datetime.date(2024, 1, 2),
+        {"a": [datetime.datetime(2024, 1, 2, tzinfo=datetime.UTC)]},
+        [datetime.time(3, 4)],
+        Color.RED,
+        {"a": uuid.UUID(int=1)},
+        [Point(1)],
+        {Color.RED: 1},
+        {datetime.date(2024, 1, 2): 1},
+        {uuid.UUID(int=1): 1},
+    ],
+)
+def test_json_serializer_dumps_unsupported_types(
+    json_serializer: zu.JsonSerializer, item: Any
+) -> None:
+    with pytest.raises(TypeError):
+        json.dumps(item)
+    with pytest.raises(TypeError):
+        json_serializer.dumps(item)
+
+
+@pytest.mark.parametrize(
+    "item", [Size.SMALL, {"a": [Size.SMALL]}, {Size.SMALL: 1}, {1: "a", 2.5: None}]
+)
+def test_json_serializer_dumps_builtin_subclasses(
+    json_serializer: zu.JsonSerializer, item: Any
+) -> None:
+    assert json.loads(json_serializer.dumps(item)) == json.loads(json.dumps(item))
+
+
+def test_read_request_unframed() -> None:
+    stream = io.BytesIO(b'{"fcn": "ping"}\n\n')
+    assert zu.read_request(stream) == (b'{"fcn": "ping"}\n', False)
+    assert zu.read_request(stream) == (b"\n", False)
+    assert zu.read_request(stream) == (b"", False)
+
+
+def test_read_request_framed() -> None:
+    payload = b'{"fcn": "ping", "args": ["\n"]}'
+    stream = io.BytesIO(zu.FRAME_MARKER + len(payload).to_bytes(4) + payload)
+    assert zu.read_request(stream) == (payload, True)
+
+    stream = io.BytesIO(zu.FRAME_MARKER + len(payload).to_bytes(4) + payload[:5])
+    with pytest.raises(EOFError):
+        zu.read_request(stream)
+
+
+def test_write_response() -> None:
+    stream = io.BytesIO()
+    zu.write_response(stream, '{"present": true}', framed=False)
+    assert stream.getvalue() == b'{"present": true}\n'
+
+    stream = io.BytesIO()
+    zu.write_response(stream, "{}", framed=True, body=b"\x00\xff")
+    assert stream.getvalue() == b"\x00\x00\x00\x02{}\x00\x00\x00\x02\x00\xff"
+
+
+@pytest.mark.parametrize(
+    ("response", "expected"),
+    [
+        (b'{"present": true, "val": {}}', {"present": True, "val": {}}),
+        (b"{}\n", {}),
+    ],
+)
+def test_add_response_field(response: bytes, expected: dict[str, Any]) -> None:
+    added = zu.add_response_field(response, "profile", b'{"calls": []}')
+    assert json.loads(added) == {**expected, "profile": {"calls": []}}
+
+    with pytest.raises(ValueError, match="JSON object"):
+        zu.add_response_field(b"[]", "profile", b"1")
@@ -12,11 +12,14 @@
 #
 # Input is formatted as JSON on STDIN
 # Output is formatted as JSON on file descriptor 3
+# Messages are newline-delimited, or length-prefixed if the caller negotiates
+# framing with a "ping"; framed responses carry file data as raw bytes
 # Anything written to STDOUT or STDERR will be captured and logged, but it has no meaning
 # Errors are signaled by exiting with non-zero exit code
 # Exceptions are not caught and so will trigger a process exit with non-zero exit code (signaling an error)
 
 import base64
+import contextlib
 import copy
 import io
 import json
@@ -30,14 +33,38 @@ import warnings
 from collections.abc import Iterable, Sequence
 from importlib.abc import MetaPathFinder
 from inspect import signature
-from typing import Any
+from typing import Any, cast
 
 import prairielearn.internal.zygote_utils as zu
+from prairielearn.internal import instrumentation, profiler
 
 saved_path = copy.copy(sys.path)
 
 drop_privileges = int(os.environ.get("DROP_PRIVILEGES", "0")) == 1
 
+# Requests and responses are encoded with the `json` module by default. Setting
+# `ZYGOTE_JSON_SERIALIZER=orjson` uses `orjson` instead, if it is installed.
+json_serializer = zu.get_json_serializer(
+    os.environ.get("ZYGOTE_JSON_SERIALIZER", "json")
+)
+
+# Instrumentation is opt-in. `ZYGOTE_INSTRUMENTATION` (or the "instrument" field
+# of a request) selects how the memory used by each call is measured: "rss" for
+# the growth of the peak RSS, or "tracemalloc" for the peak of new allocations,
+# which is more precise but much slower. Instrumented responses include an
+# "instrumentation" block, which is also appended as a line to the file named
+# by `ZYGOTE_INSTRUMENTATION_LOG`, if it is set.
+instrumentation_mode = os.environ.get("ZYGOTE_INSTRUMENTATION", "")
+instrumentation_log = os.environ.get("ZYGOTE_INSTRUMENTATION_LOG", "")
+
+# Profiling is opt-in, too. A request with a "profile" field (`true`, or the
+# sampling interval in milliseconds of CPU time), or any request if
+# `ZYGOTE_PROFILE_INTERVAL_MS` is set, runs under a sampling profiler. The
+# samples are returned as folded stacks in the "profile" field of the
+# response, or written to a file per request in `ZYGOTE_PROFILE_DIR`.
+profile_interval_ms = float(os.environ.get("ZYGOTE_PROFILE_INTERVAL_MS", "0"))
+profile_dir = os.environ.get("ZYGOTE_PROFILE_DIR", "")
+
 # If we're configured to drop privileges (that is, if we're running in a
 # Docker container), various tools like matplotlib and fontconfig will be
 # unable to write to their default config/cache directories. This is because
@@ -74,6 +101,12 @@ if drop_privileges:
     os.environ["TEXMFVAR"] = texmf_var_path
     os.environ["TEXMFHOME"] = texmf_home_path
 
+    # `prairielearn.get_unit_registry()` caches parsed unit definitions in a
+    # directory owned by the current user. Question code of every course would
+    # share that directory as `executor`, and Pint unpickles its files, so unit
+    # registries are built in memory instead, both here and in the workers.
+    os.environ["UNIT_REGISTRY_CACHE"] = "0"
+
 # Silence matplotlib's FontManager logs; these can cause trouble with our
 # expectation that code execution doesn't log anything to stdout/stderr.
 import logging
@@ -104,7 +137,12 @@ warnings.filterwarnings(
     message=r".*multi-threaded.*fork\(\).*",
 )
 
-# Pre-load commonly used modules
+# Pre-load commonly used modules. They're imported through `preload` first so
+# that the startup report below can show what each one costs.
+from prairielearn.internal import preload
+
+preload_results = preload.preload(preload.DEFAULT_MODULES)
+
 import html
 import math
 import random
@@ -120,8 +158,94 @@ import sklearn
 
 mpl.use("PDF")
 
-# Construct initial unit registry to create initial cache file.
-prairielearn.get_unit_registry()
+# Compile every core element controller so that workers inherit the code objects.
+# The controllers listed in `PRELOAD_CORE_ELEMENTS` (comma-separated element names,
+# or "all") are also executed here, which pre-imports their dependencies and saves
+# each worker from executing them again. This is opt-in, since it makes the
+# zygote import libraries that most questions never use.
+from prairielearn.internal import question_phases
+
+preload_core_elements = os.environ.get("PRELOAD_CORE_ELEMENTS", "")
+execute_core_elements = (
+    set(question_phases.get_core_element_controllers())
+    if preload_core_elements == "all"
+    else {name.strip() for name in preload_core_elements.split(",") if name.strip()}
+)
+# `pl-units-input` is always executed, since it parses every answer with a unit
+# registry that it builds once per process; see below.
+execute_core_elements.add("pl-units-input")
+preload_results.append(
+    preload.measure(
+        "elements",
+        "core element controllers",
+        lambda: question_phases.preload_core_elements(execute_core_elements),
+    )
+)
+
+
+# Build the unit registry of `pl-units-input` here, so that workers inherit it
+# instead of each building their own. Unless we drop privileges, this also
+# populates the on-disk cache of parsed unit definitions that
+# `prairielearn.get_unit_registry()` uses in workers, which run as our user.
+def build_units_input_registry() -> None:
+    unit_utils = question_phases.get_core_element_module("pl-units-input", "unit_utils")
+    if unit_utils is None:
+        raise RuntimeError("pl-units-input could not be executed")
+    unit_utils.get_shared_unit_registry()
+
+
+preload_results.append(
+    preload.measure(
+        "warmup",
+        "pl-units-input:get_shared_unit_registry",
+        build_units_input_registry,
+    )
+)
+
+# Processing elements in parallel is opt-in. When `PARALLEL_ELEMENT_PROCESSES`
+# is a positive number, the `parse` and `grade` phases of questions with more
+# than one gradable element are run by that many helper processes, which each
+# worker forks when it first needs them.
+from prairielearn.internal import element_pool
+
+element_pool.configure(int(os.environ.get("PARALLEL_ELEMENT_PROCESSES", "0")))
+
+# Caching the output of `file()` in `server.py` is opt-in, since it assumes that
+# the output only depends on the variant and submission. If `FILE_CACHE_DIR` is
+# set, files are stored there, bounded to `FILE_CACHE_DIR_MAX_MB`, and a cached
+# file is returned without loading `server.py`. Only requests whose caller
+# identifies the course are cached. Question code that can write to the
+# directory could replace the files of other courses. If we drop privileges,
+# the directory would have to be writable by the `executor` user, so the cache
+# isn't used. Otherwise, question code runs as our own user and can write to
+# it, so it should only be set when all courses are trusted.
+from prairielearn.internal import file_cache
+
+if os.environ.get("FILE_CACHE_DIR") and drop_privileges:
+    print(
+        "FILE_CACHE_DIR is ignored because question code runs as the executor user.",
+        file=sys.stderr,
+    )
+file_cache.configure(
+    None if drop_privileges else os.environ.get("FILE_CACHE_DIR") or None,
+    int(os.environ.get("FILE_CACHE_DIR_MAX_MB", "256")) * 1024 * 1024,
+)
+
+# Operators can preload more modules, like those that most of their questions
+# import, and run warm-up calls with a manifest (`ZYGOTE_PRELOAD_MANIFEST`, the
+# path to a JSON file described in `prairielearn.internal.preload`) and/or a
+# comma-separated list of modules (`ZYGOTE_PRELOAD_MODULES`). With
+# `ZYGOTE_PRELOAD_REPORT=1`, the time and memory spent on each preloaded module
+# and warm-up call is printed to stderr.
+preload_manifest = preload.load_manifest(
+    os.environ.get("ZYGOTE_PRELOAD_MANIFEST"),
+    os.environ.get("ZYGOTE_PRELOAD_MODULES"),
+)
+preload_results.extend(
+    preload.preload(preload_manifest.modules, preload_manifest.warmups)
+)
+if os.environ.get("ZYGOTE_PRELOAD_REPORT", "0") == "1":
+    print(preload.format_report(preload_results), file=sys.stderr)
 
 
 # We want to conditionally allow/block importing specific modules.
@@ -178,15 +302,58 @@ class FakerInitializeMetaPathFinder(MetaPathFinder):
 # helpful because the object - which contains something that cannot be converted
 # to JSON - would otherwise never be displayed to the developer, making it hard to
 # debug the problem.
-def try_dumps(obj: Any, *, sort_keys: bool = False, allow_nan: bool = False) -> str:
+def try_dumps(obj: Any, *, sort_keys: bool = False, allow_nan: bool = False) -> bytes:
     try:
-        zu.assert_all_integers_within_limits(obj)
-        return json.dumps(obj, sort_keys=sort_keys, allow_nan=allow_nan)
+        return json_serializer.dumps(obj, sort_keys=sort_keys, allow_nan=allow_nan)
     except Exception:
         print(f"Error converting this object to json:\n{obj}\n", file=sys.stderr)
         raise
 
 
+def start_profiler(profile: Any) -> None:
+    interval_ms = profile_interval_ms if profile is None else profile
+    if interval_ms is True:
+        interval_ms = profiler.DEFAULT_INTERVAL * 1000
+    if interval_ms:
+        profiler.start(float(interval_ms) / 1000)
+
+
+# Encode a response, adding the measurements for the request if it was
+# instrumented and the profile if it was profiled.
+def encode_response(outp: dict[str, Any], file: str, fcn: str) -> bytes:
+    prof = profiler.stop()
+    instr = instrumentation.stop()
+    if instr is None and prof is None:
+        return try_dumps(outp, allow_nan=False)
+
+    start = time.perf_counter()
+    json_outp = try_dumps(outp, allow_nan=False)
+
+    if instr is not None:
+        instr.json_encode_time = time.perf_counter() - start
+        block = instr.to_json()
+        if instrumentation_log:
+            with open(instrumentation_log, "ab") as f:
+                f.write(try_dumps({"file": file, "fcn": fcn, **block}) + b"\n")
+        json_outp = zu.add_response_field(
+            json_outp, "instrumentation", try_dumps(block)
+        )
+
+    if prof is not None:
+        folded = prof.folded(root=f"{file}:{fcn}")
+        if profile_dir:
+            profile_path = os.path.join(
+                profile_dir,
+                f"{time.time_ns()}-{os.getpid()}-{os.path.basename(file)}-{fcn}.folded",
+            )
+            with open(profile_path, "w", encoding="utf-8") as f:
+                f.write(folded)
+        else:
+            json_outp = zu.add_response_field(json_outp, "profile", try_dumps(folded))
+
+    return json_outp
+
+
 def worker_loop() -> None:
     from prairielearn.internal.traceback import make_rich_excepthook
 
@@ -205,11 +372,6 @@ def worker_loop() -> None:
         relative_to=os.path.dirname(os.path.dirname(__file__)),
     )
 
-    # The prairielearn.internal module is only needed in the worker process.
-    # Because it makes use of threading, we only import it after forking to
-    # avoid warnings about inheriting threads from the parent process.
-    from prairielearn.internal import question_phases
-
     # Whether the PRNGs have already been seeded in this worker_loop() call
     seeded = False
 
@@ -223,29 +385,201 @@ def worker_loop() -> None:
     #   specifically for elements that want to maintain a cache of expensive-to-compute data.
     mod_cache: dict[str, dict[str, Any]] = {}
 
+    # This is an experimental implementation of question processing that does
+    # all HTML parsing and rendering in Python. This should be much faster than
+    # the current implementation that does an IPC call for each element.
+    def call_question_html(
+        fcn: str,
+        context: Any,
+        data: dict[str, Any],
+        *,
+        framed: bool,
+    ) -> tuple[dict[str, Any], bytes | None]:
+        result, processed_elements = question_phases.process(
+            cast("question_phases.Phase", fcn), data, context
+        )
+        val = {
+            "html": result if fcn == "render" else None,
+            "file": None,
+            "data": data,
+            "processed_elements": list(processed_elements),
+        }
+        body = None
+        if isinstance(result, bytes):
+            # Framed responses carry file data as raw bytes.
+            if framed:
+                body = result
+            else:
+                val["file"] = base64.b64encode(result).decode()
+
+        outp: dict[str, Any] = {"present": True, "val": val}
+        if body is not None:
+            outp["body"] = "file"
+        return outp, body
+
+    # Build the response for the output of a `file()` function.
+    def file_response(
+        file_data: bytes, *, framed: bool
+    ) -> tuple[dict[str, Any], bytes | None]:
+        # Framed responses carry file data as raw bytes.
+        if framed:
+            return {"present": True, "val": None, "body": "val"}, file_data
+        return {
+            "present": True,
+            "val": question_phases.filelike_to_string(file_data),
+        }, None
+
+    def load_module(file_path: str) -> dict[str, Any]:
+        mod = mod_cache.get(file_path)
+        if mod is not None:
+            return mod
+        instr = instrumentation.current()
+        mod = {"__file__": file_path}
+
+        start = time.perf_counter()
+        with open(file_path, encoding="utf-8") as inf:
+            # Use `compile` to associate filename with code object, so the
+            # filename appears in the traceback if there is an error:
+            # https://stackoverflow.com/a/437857
+            code = compile(inf.read(), file_path, "exec")
+        compiled = time.perf_counter()
+
+        exec(code, mod)
+        mod_cache[file_path] = mod
+
+        if instr is not None:
+            instr.record_module(
+                file_path,
+                compile_time=compiled - start,
+                exec_time=time.perf_counter() - compiled,
+            )
+        return mod
+
+    # Call a function in a `server.py` file or an element controller.
+    def call_function(
+        cwd: str,
+        file: str,
+        fcn: str,
+        args: list[Any],
+        *,
+        framed: bool,
+        course_id: str | None,
+    ) -> tuple[dict[str, Any], bytes | None]:
+        instr = instrumentation.current()
+        file_path = os.path.join(cwd, file + ".py")
+
+        cache = file_cache.current() if fcn == "file" else None
+        cache_key = None
+        if cache is not None and args and isinstance(args[-1], dict):
+            cache_key = file_cache.make_key(file_path, args[-1], course_id)
+        if cache is not None and cache_key is not None:
+            cached = cache.get(cache_key)
+            if instr is not None:
+                instr.record_cache(
+                    "file",
+                    f"{file}.py:{args[-1].get('filename')}",
+                    "miss" if cached is None else "hit",
+                )
+            if cached is not None:
+                return file_response(cached, framed=framed)
+
+        # A generated file is only stored if `server.py` is loaded by this
+        # call, so that everything that it read is recorded.
+        val = None
+        with (
+            file_cache.record_opened_files()
+            if cache_key is not None and file_path not in mod_cache
+            else contextlib.nullcontext()
+        ) as opened_files:
+            mod = load_module(file_path)
+
+            # try to load and execute the desired function
+            method = zu.get_module_function(mod, fcn)
+            if method is not None:
+                # check if the desired function is a legacy element function - if
+                # so, we add an argument for element_index
+                arg_names = list(signature(method).parameters.keys())
+                if arg_names == ["element_html", "element_index", "data"]:
+                    args.insert(1, None)
+
+                # call the desired function in the loaded module
+                if instr is None:
+                    val = method(*args)
+                else:
+                    with instr.measure_call(file + ".py", fcn):
+                        val = method(*args)
+
+        if method is None:
+            # the function wasn't present, so report this
+            return {"present": False}, None
+
+        if fcn == "file":
+            file_data = question_phases.filelike_to_bytes(val)
+            if (
+                cache is not None
+                and cache_key is not None
+                and opened_files is not None
+                and not file_cache.reads_course_files(file_path, opened_files)
+            ):
+                cache.set(cache_key, file_data)
+            return file_response(file_data, framed=framed)
+
+        # Any function that is not 'file' or 'render' will modify 'data' and
+        # should not be returning anything (because 'data' is mutable).
+        if fcn != "render":
+            if val is None or val is args[-1]:
+                outp = {"present": True, "val": args[-1]}
+            else:
+                outp = {"present": True, "val": val}
+
+                # We'll only actually complain if the function returned
+                # a completely different object than the one passed in.
+                # Otherwise, we'll just silently ignore the return value
+                # and use the passed-in object (which should in fact be
+                # the same object).
+                #
+                # TODO: Once this has been running in production for a while,
+                # change this to raise an exception.
+                sys.stderr.write(
+                    f"Function {fcn}() in {file + '.py'} returned a data object other than the one that was passed in.\n\n"
+                    + "There is no need to return a value, as the data object is mutable and can be modified in place.\n\n"
+                    + "For now, the return value will be used instead of the data object that was passed in.\n\n"
+                    + "In the future, returning a different object will trigger a fatal error."
+                )
+        else:
+            outp = {"present": True, "val": val}
+
+        return outp, None
+
     # file descriptor 3 is for output data
-    with open(3, "w", encoding="utf-8") as outf:
+    with open(3, "wb") as outf:
         # Infinite loop where we wait for an input command, do it, and
         # return the results. The caller should terminate us with a
         # SIGTERM.
         while True:
-            # Wait for a single line of input
-            json_inp = sys.stdin.readline()
+            # Wait for a single request. Requests are either newline-delimited
+            # JSON or, once the caller has negotiated it with a "ping",
+            # length-prefixed frames; see `zygote_utils.read_request()`.
+            json_inp, framed = zu.read_request(sys.stdin.buffer)
 
             # Sometimes we seem to get an empty line, so we'll just ignore it.
-            if json_inp == "\n":
+            if json_inp == b"\n":
                 continue
 
             # If the input is empty, the server has died and we should exit to avoid
             # becoming a zombie. Exit non-zero to ensure the parent process also exits
-            if json_inp == "":
+            if json_inp == b"":
                 sys.exit(1)
 
             # Unpack the input line as JSON. If that fails, log the line for debugging.
+            decode_start = time.perf_counter()
             try:
-                inp = json.loads(json_inp, parse_int=zu.safe_parse_int)
+                inp = json_serializer.loads(json_inp)
             except json.JSONDecodeError as exc:
-                raise ValueError(f"Error decoding JSON input: {json_inp}") from exc
+                raise ValueError(
+                    f"Error decoding JSON input: {json_inp.decode(errors='replace')}"
+                ) from exc
+            decode_time = time.perf_counter() - decode_start
 
             # Get the contents of the JSON input
             file = inp.get("file", None)
@@ -254,6 +588,9 @@ def worker_loop() -> None:
             cwd = inp.get("cwd", None)
             paths = inp.get("paths", None)
             forbidden_modules = inp.get("forbidden_modules", None)
+            # Identifies the course for the file cache, since the path of the
+            # course may not.
+            course_id = inp.get("course_id", None)
 
             # Wire up the custom importer to forbid modules as needed.
             path_finder.reset_forbidden_modules()
@@ -263,19 +600,33 @@ def worker_loop() -> None:
             # "ping" is a special fake function name that the parent process
             # will use to check if the worker is active and able to respond to
             # calls. We just reply with "pong" to indicate that we're alive.
+            # The caller may also ask to switch to framed requests, which we
+            # acknowledge; callers that don't get the acknowledgment keep using
+            # newline-delimited JSON.
             if file is None and fcn == "ping":
-                json.dump({"present": True, "val": "pong"}, outf)
-                outf.write("\n")
-                outf.flush()
+                pong: dict[str, Any] = {"present": True, "val": "pong"}
+                if inp.get("protocol") == "framed":
+                    pong["protocol"] = "framed"
+                zu.write_response(outf, json.dumps(pong), framed=framed)
                 continue
 
             # "restart" is a special fake function name that causes
             # the forked worker to exit, returning control to the
             # zygote parent process
             if file is None and fcn == "restart":
-                json.dump({"present": True, "val": "success"}, outf)
-                outf.write("\n")
-                outf.flush()
+                sys.stderr.flush()
+                sys.stdout.flush()
+
+                # The helpers inherited this request's state, so they must not
+                # outlive it. This also makes sure that they're gone before the
+                # zygote checks for leftover processes.
+                element_pool.shutdown()
+
+                zu.write_response(
+                    outf,
+                    json.dumps({"present": True, "val": "success"}),
+                    framed=framed,
+                )
 
                 # `sys.exit()` allows the process to gracefully shut down. however, that
                 # makes things much slower than necessary, because we can't reuse this
@@ -322,9 +673,7 @@ def worker_loop() -> None:
                 # If the subprocess exited with a non-zero exit code, raise an exception.
                 result.check_returncode()
 
-                outf.write(result.stdout)
-                outf.write("\n")
-                outf.flush()
+                zu.write_response(outf, result.stdout, framed=framed)
                 continue
 
             # Here, we re-seed the PRNGs if not already seeded in this worker_loop() call.
@@ -348,118 +697,28 @@ def worker_loop() -> None:
             # change to the desired working directory
             os.chdir(cwd)
 
-            if file == "question.html":
-                # This is an experimental implementation of question processing
-                # that does all HTML parsing and rendering in Python. This should
-                # be much faster than the current implementation that does an IPC
-                # call for each element.
-
-                context = args[0]
-                data = args[1]
-
-                result, processed_elements = question_phases.process(fcn, data, context)
-                val = {
-                    "html": result if fcn == "render" else None,
-                    "file": result if fcn == "file" else None,
-                    "data": data,
-                    "processed_elements": list(processed_elements),
-                }
-
-                # make sure all output streams are flushed
-                sys.stderr.flush()
-                sys.stdout.flush()
-
-                # write the return value (JSON on a single line)
-                outf.write(try_dumps({"present": True, "val": val}))
-                outf.write("\n")
-                outf.flush()
-
-                continue
-
-            file_path = os.path.join(cwd, file + ".py")
-
-            mod = mod_cache.get(file_path)
-            if mod is None:
-                mod = {"__file__": file_path}
-
-                with open(file_path, encoding="utf-8") as inf:
-                    # Use `compile` to associate filename with code object, so the
-                    # filename appears in the traceback if there is an error:
-                    # https://stackoverflow.com/a/437857
-                    code = compile(inf.read(), file_path, "exec")
+            instrument = inp.get("instrument", instrumentation_mode)
+            instr = None
+            if instrument:
+                instr = instrumentation.start(trace_memory=instrument == "tracemalloc")
+                instr.json_decode_time = decode_time
+            start_profiler(inp.get("profile"))
 
-                exec(code, mod)
-                mod_cache[file_path] = mod
-
-            # try to load and execute the desired function
-            method = zu.get_module_function(mod, fcn)
-            if method is not None:
-                # check if the desired function is a legacy element function - if
-                # so, we add an argument for element_index
-                arg_names = list(signature(method).parameters.keys())
-                if arg_names == ["element_html", "element_index", "data"]:
-                    args.insert(1, None)
-
-                # call the desired function in the loaded module
-                val = method(*args)
-
-                if fcn == "file":
-                    # if val is None, replace it with empty string
-                    if val is None:
-                        val = ""
-                    # if val is a file-like object, read whatever is inside
-                    if isinstance(val, io.IOBase):
-                        val.seek(0)
-                        val = val.read()
-                    # if val is a string, treat it as utf-8
-                    if isinstance(val, str):
-                        val = bytes(val, "utf-8")
-                    # if this next call does not work, it will throw an error, because
-                    # the thing returned by file() does not have the correct format
-                    val = base64.b64encode(val).decode()
-
-                # Any function that is not 'file' or 'render' will modify 'data' and
-                # should not be returning anything (because 'data' is mutable).
-                if fcn not in ("file", "render"):
-                    if val is None or val is args[-1]:
-                        json_outp = try_dumps(
-                            {"present": True, "val": args[-1]}, allow_nan=False
-                        )
-                    else:
-                        json_outp = try_dumps(
-                            {"present": True, "val": val}, allow_nan=False
-                        )
-
-                        # We'll only actually complain if the function returned
-                        # a completely different object than the one passed in.
-                        # Otherwise, we'll just silently ignore the return value
-                        # and use the passed-in object (which should in fact be
-                        # the same object).
-                        #
-                        # TODO: Once this has been running in production for a while,
-                        # change this to raise an exception.
-                        sys.stderr.write(
-                            f"Function {fcn}() in {file + '.py'} returned a data object other than the one that was passed in.\n\n"
-                            + "There is no need to return a value, as the data object is mutable and can be modified in place.\n\n"
-                            + "For now, the return value will be used instead of the data object that was passed in.\n\n"
-                            + "In the future, returning a different object will trigger a fatal error."
-                        )
-                else:
-                    json_outp = try_dumps(
-                        {"present": True, "val": val}, allow_nan=False
-                    )
+            if file == "question.html":
+                outp, body = call_question_html(fcn, args[0], args[1], framed=framed)
             else:
-                # the function wasn't present, so report this
-                json_outp = try_dumps({"present": False}, allow_nan=False)
+                outp, body = call_function(
+                    cwd, file, fcn, args, framed=framed, course_id=course_id
+                )
+
+            json_outp = encode_response(outp, file, fcn)
 
             # make sure all output streams are flushed
             sys.stderr.flush()
             sys.stdout.flush()
 
-            # write the return value (JSON on a single line)
-            outf.write(json_outp)
-            outf.write("\n")
-            outf.flush()
+            # write the return value
+            zu.write_response(outf, json_outp, framed=framed, body=body or b"")
 
 
 worker_pid = 0
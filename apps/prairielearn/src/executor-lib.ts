@@ -13,6 +13,7 @@ interface ExecutorRequest {
   fcn: string;
   args: any[];
   forbidden_modules: string[];
+  course_id?: string | null;
 }
 
 export interface ExecutorResults {
@@ -24,6 +25,16 @@ export interface ExecutorResults {
   needsFullRestart: boolean;
 }
 
+/**
+ * The executor responds with newline-delimited JSON, so any file data that the
+ * zygote delivered as raw bytes is sent as base64, as the zygote itself used to.
+ */
+function encodeFileData(result: any) {
+  if (Buffer.isBuffer(result)) return result.toString('base64');
+  if (Buffer.isBuffer(result?.file)) return { ...result, file: result.file.toString('base64') };
+  return result;
+}
+
 /**
  * Receives a single line of input and executes the instructions contained in
  * it in the provided code caller.
@@ -67,6 +78,7 @@ export async function handleInput(
   try {
     await codeCaller.prepareForCourse({
       coursePath: '/course',
+      courseId: request.course_id,
       forbiddenModules: request.forbidden_modules,
     });
   } catch {
@@ -94,7 +106,7 @@ export async function handleInput(
     // we'll report it via `functionMissing`
     error: callErr && !functionMissing ? callErr.message : undefined,
     errorData: callErr && !functionMissing ? (callErr as CodeCallerError).data : undefined,
-    data: result,
+    data: encodeFileData(result),
     output,
     functionMissing,
     needsFullRestart: false,
@@ -269,7 +269,16 @@ export class CodeCallerContainer implements CodeCaller {
       throw new Error('not ready for call');
     }
 
-    const callData = { type, directory, file, fcn, args, forbidden_modules: this.forbiddenModules };
+    const callData = {
+      type,
+      directory,
+      file,
+      fcn,
+      args,
+      forbidden_modules: this.forbiddenModules,
+      // The course is always at `/course` inside the container.
+      course_id: this.coursePath,
+    };
     const callDataString = JSON.stringify(callData);
 
     // Reset output accumulators.
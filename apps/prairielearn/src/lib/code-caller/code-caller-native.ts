@@ -17,6 +17,7 @@ import {
   FunctionMissingError,
   type PrepareForCourseOptions,
 } from './code-caller-shared.js';
+import { FramedResponseReader, framedRequestHeader } from './framing.js';
 import { getPythonPath } from './python-path.js';
 
 interface CodeCallerNativeChildProcess extends ChildProcess {
@@ -102,10 +103,17 @@ export class CodeCallerNative implements CodeCaller {
   outputStdout: string[];
   outputStderr: string[];
   outputBoth: string[];
-  outputData: string[];
+  outputData: Buffer[];
   outputRestart: string;
+  /**
+   * Whether the child accepted length-prefixed framing for requests and
+   * responses when it was first pinged. See `framing.ts`.
+   */
+  framed: boolean;
+  framedResponse: FramedResponseReader | null;
   lastCallData: any;
   coursePath: string | null;
+  courseId: string | null;
   forbiddenModules: string[];
 
   /**
@@ -145,11 +153,14 @@ export class CodeCallerNative implements CodeCaller {
     this.outputBoth = [];
     this.outputData = [];
     this.outputRestart = '';
+    this.framed = false;
+    this.framedResponse = null;
 
     // for error logging
     this.lastCallData = null;
 
     this.coursePath = null;
+    this.courseId = null;
     this.forbiddenModules = [];
 
     this._checkState();
@@ -169,9 +180,10 @@ export class CodeCallerNative implements CodeCaller {
     debug(`[${this.uuid} ${paddedState}] ${message}`);
   }
 
-  async prepareForCourse({ coursePath, forbiddenModules }: PrepareForCourseOptions) {
+  async prepareForCourse({ coursePath, courseId, forbiddenModules }: PrepareForCourseOptions) {
     this.debug('enter prepareForCourse()');
     this.coursePath = coursePath;
+    this.courseId = courseId ?? coursePath;
     this.forbiddenModules = forbiddenModules;
     this.debug('exit prepareForCourse()');
   }
@@ -227,7 +239,18 @@ export class CodeCallerNative implements CodeCaller {
         assertNever(type);
     }
 
-    const callData = { file, fcn, args, cwd, paths, forbidden_modules: this.forbiddenModules };
+    const callData = {
+      file,
+      fcn,
+      args,
+      cwd,
+      paths,
+      forbidden_modules: this.forbiddenModules,
+      // Lets the zygote cache generated files per course.
+      course_id: this.courseId,
+      // Ask the child to switch to framed messages. Older zygotes ignore this.
+      ...(type === 'ping' && { protocol: 'framed' }),
+    };
     const callDataString = JSON.stringify(callData);
 
     const promise = withResolvers<CodeCallerResult>();
@@ -251,11 +274,17 @@ export class CodeCallerNative implements CodeCaller {
     this.outputBoth = [];
     this.outputData = [];
     this.outputRestart = '';
+    this.framedResponse = this.framed ? new FramedResponseReader() : null;
 
     this.lastCallData = callData;
 
-    this.child?.stdin?.write(callDataString);
-    this.child?.stdin?.write('\n');
+    if (this.framed) {
+      this.child?.stdin?.write(framedRequestHeader(callDataString));
+      this.child?.stdin?.write(callDataString);
+    } else {
+      this.child?.stdin?.write(callDataString);
+      this.child?.stdin?.write('\n');
+    }
 
     this.state = IN_CALL;
     this._checkState();
@@ -279,6 +308,7 @@ export class CodeCallerNative implements CodeCaller {
     } else if (this.state === WAITING) {
       const { result } = await this.call('restart', null, null, 'restart', []);
       this.coursePath = null;
+      this.courseId = null;
       this.forbiddenModules = [];
       if (result !== 'success') throw new Error(`Error while restarting: ${result}`);
       this.debug('exit restart()');
@@ -372,7 +402,7 @@ export class CodeCallerNative implements CodeCaller {
 
     child.stdio[1].setEncoding('utf8');
     child.stdio[2].setEncoding('utf8');
-    child.stdio[3].setEncoding('utf8');
+    // Data on fd 3 is read as raw bytes, since framed responses carry binary data.
     child.stdio[4].setEncoding('utf8');
 
     child.stdio[1].on('data', this._handleStdoutData.bind(this));
@@ -414,15 +444,21 @@ export class CodeCallerNative implements CodeCaller {
     this.debug('exit _handleStderrData()');
   }
 
-  _handleStdio3Data(data: string) {
+  _handleStdio3Data(data: Buffer) {
     this.debug('enter _handleStdio3Data()');
     this._checkState([IN_CALL, EXITING]);
     if (this.state === IN_CALL) {
-      this.outputData.push(data);
-      // If `data` contains a newline, then `outputData` must contain a newline as well.
-      // We avoid looking in `outputData` because it's a potentially very large string.
-      if (data.includes('\n')) {
-        this._callIsFinished();
+      if (this.framedResponse) {
+        if (this.framedResponse.push(data)) {
+          this._callIsFinished();
+        }
+      } else {
+        this.outputData.push(data);
+        // If `data` contains a newline, then `outputData` must contain a newline as well.
+        // We avoid looking in `outputData` because it's a potentially very large buffer.
+        if (data.includes(0x0a)) {
+          this._callIsFinished();
+        }
       }
     }
     this.debug('exit _handleStdio3Data()');
@@ -578,10 +614,25 @@ export class CodeCallerNative implements CodeCaller {
     let data: {
       val: any;
       present: boolean;
+      protocol?: string;
+      body?: 'val' | 'file';
     } | null = null;
     let err: Error | null = null;
     try {
-      data = JSON.parse(this.outputData.join(''));
+      if (this.framedResponse) {
+        const { payload, body } = this.framedResponse.read();
+        this.framedResponse = null;
+        data = JSON.parse(payload.toString('utf8'));
+        // File data is sent as raw bytes instead of base64 in the JSON payload.
+        if (data?.body === 'val') {
+          data.val = body;
+        } else if (data?.body === 'file') {
+          data.val.file = body;
+        }
+      } else {
+        data = JSON.parse(Buffer.concat(this.outputData).toString('utf8'));
+        if (data?.protocol === 'framed') this.framed = true;
+      }
     } catch (e: any) {
       err = new Error('Error decoding CodeCallerNative JSON: ' + e.message);
     }
@@ -649,7 +700,7 @@ export class CodeCallerNative implements CodeCaller {
       outputStdout: this.outputStdout.join(''),
       outputStderr: this.outputStderr.join(''),
       outputBoth: this.outputBoth.join(''),
-      outputData: this.outputData.join(''),
+      outputData: Buffer.concat(this.outputData).toString('utf8'),
       outputRestart: this.outputRestart,
       stack: errForStack.stack ?? '',
       lastCallData: this.lastCallData,
@@ -20,6 +20,11 @@ export type CallType =
 
 export interface PrepareForCourseOptions {
   coursePath: string;
+  /**
+   * Identifies the course when `coursePath` doesn't, like inside a container,
+   * where every course is mounted at the same path. Defaults to `coursePath`.
+   */
+  courseId?: string | null;
   forbiddenModules: string[];
 }
 
@@ -0,0 +1,49 @@
+import { assert, describe, it } from 'vitest';
+
+import { FramedResponseReader, framedRequestHeader } from './framing.js';
+
+function frame(payload: string, body: Buffer) {
+  const payloadBuffer = Buffer.from(payload, 'utf8');
+  const payloadLength = Buffer.alloc(4);
+  payloadLength.writeUInt32BE(payloadBuffer.length);
+  const bodyLength = Buffer.alloc(4);
+  bodyLength.writeUInt32BE(body.length);
+  return Buffer.concat([payloadLength, payloadBuffer, bodyLength, body]);
+}
+
+describe('framedRequestHeader', () => {
+  it('encodes the byte length of the payload', () => {
+    assert.deepEqual([...framedRequestHeader('{"a":"é"}')], [0, 0, 0, 0, 10]);
+  });
+});
+
+describe('FramedResponseReader', () => {
+  const payload = '{"present":true,"val":"é"}';
+  const body = Buffer.from([0, 1, 2, 255, 10, 13]);
+  const data = frame(payload, body);
+
+  for (const chunkSize of [1, 3, data.length]) {
+    it(`reads a response split into ${chunkSize}-byte chunks`, () => {
+      const reader = new FramedResponseReader();
+      for (let i = 0; i < data.length; i += chunkSize) {
+        const done = reader.push(data.subarray(i, i + chunkSize));
+        assert.equal(done, i + chunkSize >= data.length);
+      }
+      const response = reader.read();
+      assert.equal(response.payload.toString('utf8'), payload);
+      assert.deepEqual(response.body, body);
+    });
+  }
+
+  it('reads a response without a body', () => {
+    const reader = new FramedResponseReader();
+    assert.isTrue(reader.push(frame('{}', Buffer.alloc(0))));
+    assert.equal(reader.read().body.length, 0);
+  });
+
+  it('refuses to read an incomplete response', () => {
+    const reader = new FramedResponseReader();
+    assert.isFalse(reader.push(data.subarray(0, 6)));
+    assert.throws(() => reader.read(), 'Framed response is incomplete');
+  });
+});
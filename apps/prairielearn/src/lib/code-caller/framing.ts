@@ -0,0 +1,85 @@
+/**
+ * Length-prefixed framing for messages exchanged with the Python zygote.
+ *
+ * A framed request is a zero byte, followed by the byte length of the JSON
+ * payload as a 32-bit big-endian unsigned integer, followed by the payload.
+ * Newline-delimited JSON never starts with a zero byte, so the zygote can
+ * accept both kinds of requests.
+ *
+ * A framed response is the length-prefixed JSON payload followed by a
+ * length-prefixed binary body. The body is empty unless the response carries
+ * raw file data, in which case the JSON payload's `body` property says where
+ * the data belongs.
+ */
+
+const FRAME_MARKER = 0;
+const LENGTH_BYTES = 4;
+
+/**
+ * Returns the header that must precede a JSON payload in a framed request.
+ */
+export function framedRequestHeader(payload: string): Buffer {
+  const header = Buffer.alloc(1 + LENGTH_BYTES);
+  header.writeUInt8(FRAME_MARKER, 0);
+  header.writeUInt32BE(Buffer.byteLength(payload, 'utf8'), 1);
+  return header;
+}
+
+export interface FramedResponse {
+  payload: Buffer;
+  body: Buffer;
+}
+
+/**
+ * Accumulates chunks of a single framed response. Chunks are only copied once
+ * the lengths they contain are needed, and again when the response is complete.
+ */
+export class FramedResponseReader {
+  private chunks: Buffer[] = [];
+  private length = 0;
+  private payloadLength: number | null = null;
+  private totalLength: number | null = null;
+
+  /**
+   * Adds a chunk of data. Returns true once the complete response has been received.
+   */
+  push(chunk: Buffer): boolean {
+    this.chunks.push(chunk);
+    this.length += chunk.length;
+
+    if (this.payloadLength === null && this.length >= LENGTH_BYTES) {
+      this.payloadLength = this.merge().readUInt32BE(0);
+    }
+    if (
+      this.payloadLength !== null &&
+      this.totalLength === null &&
+      this.length >= 2 * LENGTH_BYTES + this.payloadLength
+    ) {
+      const bodyLength = this.merge().readUInt32BE(LENGTH_BYTES + this.payloadLength);
+      this.totalLength = 2 * LENGTH_BYTES + this.payloadLength + bodyLength;
+    }
+    return this.totalLength !== null && this.length >= this.totalLength;
+  }
+
+  /**
+   * Returns the complete response. Must only be called once `push()` returned true.
+   */
+  read(): FramedResponse {
+    if (this.payloadLength === null || this.totalLength === null) {
+      throw new Error('Framed response is incomplete');
+    }
+    const data = this.merge();
+    const payloadEnd = LENGTH_BYTES + this.payloadLength;
+    return {
+      payload: data.subarray(LENGTH_BYTES, payloadEnd),
+      body: data.subarray(payloadEnd + LENGTH_BYTES, this.totalLength),
+    };
+  }
+
+  private merge(): Buffer {
+    if (this.chunks.length > 1) {
+      this.chunks = [Buffer.concat(this.chunks, this.length)];
+    }
+    return this.chunks[0];
+  }
+}
@@ -553,7 +553,10 @@ async function processQuestionPhase<T>(
     // to change the top-level shape of the data.
     data: result?.data ?? data,
     html: result?.html ?? '',
-    fileData: Buffer.from(result?.file ?? '', 'base64'),
+    // Native code callers may deliver file data as raw bytes.
+    fileData: Buffer.isBuffer(result?.file)
+      ? result.file
+      : Buffer.from(result?.file ?? '', 'base64'),
     renderedElementNames: result?.processed_elements ?? [],
   };
 }
@@ -700,9 +703,10 @@ async function processQuestionServer<T extends ExecutionData>(
   if (phase === 'render') {
     html = result;
   } else if (phase === 'file') {
-    // Convert ret_val from base64 back to buffer (this always works,
+    // Native code callers may deliver file data as raw bytes. Otherwise,
+    // convert ret_val from base64 back to buffer (this always works,
     // whether or not ret_val is valid base64)
-    const buf = Buffer.from(result, 'base64');
+    const buf = Buffer.isBuffer(result) ? result : Buffer.from(result, 'base64');
 
     // If the buffer has non-zero length...
     if (buf.length > 0) {